@@ -0,0 +1,28 @@
+"""add guest audience indexes
+
+Revision ID: a9b0c1d2e3f4
+Revises: f8a9b0c1d2e3
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = 'a9b0c1d2e3f4'
+down_revision: Union[str, Sequence[str], None] = 'f8a9b0c1d2e3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Guest imports page through a widget's guests in id order and check for
+    # a WhatsApp session per guest.
+    op.create_index('ix_guest_users_widget_id_id', 'guest_users', ['widget_id', 'id'], unique=False)
+    op.create_index(op.f('ix_chat_sessions_guest_id'), 'chat_sessions', ['guest_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_chat_sessions_guest_id'), table_name='chat_sessions')
+    op.drop_index('ix_guest_users_widget_id_id', table_name='guest_users')
@@ -0,0 +1,30 @@
+"""add business rag overrides
+
+Revision ID: b0c1d2e3f4a5
+Revises: a9b0c1d2e3f4
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'b0c1d2e3f4a5'
+down_revision: Union[str, Sequence[str], None] = 'a9b0c1d2e3f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Per-business overrides of RAG_TOP_K and RAG_CONTEXT_TOKENS.
+    with op.batch_alter_table('businesses', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('rag_top_k', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('rag_context_tokens', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('businesses', schema=None) as batch_op:
+        batch_op.drop_column('rag_context_tokens')
+        batch_op.drop_column('rag_top_k')
@@ -0,0 +1,44 @@
+"""add usage_ledger table
+
+Revision ID: b4c5d6e7f8a9
+Revises: a2b3c4d5e6f7
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'b4c5d6e7f8a9'
+down_revision: Union[str, Sequence[str], None] = 'a2b3c4d5e6f7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'usage_ledger',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('business_id', sa.String(), nullable=False),
+        sa.Column('kind', sa.String(), nullable=False),
+        sa.Column('entry_type', sa.String(), nullable=False),
+        sa.Column('amount', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('reservation_id', sa.String(), nullable=True),
+        sa.Column('reference', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('compacted_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['business_id'], ['businesses.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_usage_ledger_reservation_id', 'usage_ledger', ['reservation_id'])
+    op.create_index('ix_usage_ledger_business_pending', 'usage_ledger', ['business_id', 'compacted_at'])
+    op.create_index('ix_usage_ledger_business_created', 'usage_ledger', ['business_id', 'created_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_usage_ledger_business_created', table_name='usage_ledger')
+    op.drop_index('ix_usage_ledger_business_pending', table_name='usage_ledger')
+    op.drop_index('ix_usage_ledger_reservation_id', table_name='usage_ledger')
+    op.drop_table('usage_ledger')
@@ -0,0 +1,27 @@
+"""add chat session analysis high-water mark
+
+Revision ID: d6e7f8a9b0c1
+Revises: c5d6e7f8a9b0
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'd6e7f8a9b0c1'
+down_revision: Union[str, Sequence[str], None] = 'c5d6e7f8a9b0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('chat_sessions', sa.Column('analyzed_message_id', sa.String(), nullable=True))
+    op.add_column('chat_sessions', sa.Column('analyzed_message_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('chat_sessions', 'analyzed_message_at')
+    op.drop_column('chat_sessions', 'analyzed_message_id')
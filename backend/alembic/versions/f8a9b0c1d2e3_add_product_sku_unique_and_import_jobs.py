@@ -0,0 +1,63 @@
+"""add unique (business_id, sku) on products and product_import_jobs table
+
+Revision ID: f8a9b0c1d2e3
+Revises: e7f8a9b0c1d2
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'f8a9b0c1d2e3'
+down_revision: Union[str, Sequence[str], None] = 'e7f8a9b0c1d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Older rows may repeat a SKU within a business. Keep the most recently
+    # updated one as-is and suffix the others so nothing is deleted.
+    op.execute("""
+        UPDATE products SET sku = sku || '-dup-' || substr(id, 1, 8)
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id, row_number() OVER (
+                    PARTITION BY business_id, sku ORDER BY updated_at DESC, id
+                ) AS rn
+                FROM products
+            ) ranked
+            WHERE rn > 1
+        )
+    """)
+    with op.batch_alter_table('products') as batch_op:
+        batch_op.create_unique_constraint('uq_products_business_sku', ['business_id', 'sku'])
+
+    op.create_table(
+        'product_import_jobs',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('business_id', sa.String(), nullable=False),
+        sa.Column('filename', sa.String(), nullable=True),
+        sa.Column('status', sa.String(), nullable=False, server_default='pending'),
+        sa.Column('imported', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('error_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('errors', sa.JSON(), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.ForeignKeyConstraint(['business_id'], ['businesses.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_product_import_jobs_business_id', 'product_import_jobs', ['business_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_product_import_jobs_business_id', table_name='product_import_jobs')
+    op.drop_table('product_import_jobs')
+    with op.batch_alter_table('products') as batch_op:
+        batch_op.drop_constraint('uq_products_business_sku', type_='unique')
@@ -3,7 +3,7 @@ from starlette.requests import Request
 
 from app.db.session import SessionLocal
 from app.models.user import User
-from app.core.security import verify_password
+from app.core.security import verify_password_async
 
 
 class AdminAuth(AuthenticationBackend):
@@ -20,7 +20,7 @@ class AdminAuth(AuthenticationBackend):
             user = db.query(User).filter(User.email == email).first()
             if not user or not user.hashed_password:
                 return False
-            if not verify_password(password, user.hashed_password):
+            if not await verify_password_async(password, user.hashed_password):
                 return False
             if not user.is_admin:
                 return False
@@ -6,9 +6,9 @@ from datetime import datetime, timedelta
 
 from app.db.session import get_db
 from app.models.chat_session import ChatSession
-from app.models.widget import GuestUser, WidgetSettings
-from app.models.user import User
-from app.auth.router import get_current_user
+from app.models.widget import GuestUser
+from app.auth.principal import CurrentTenant
+from app.auth.router import get_current_tenant
 from pydantic import BaseModel
 from app.services.analysis_agent import generate_followup_content
 from app.models.widget import GuestMessage
@@ -20,15 +20,15 @@ router = APIRouter()
 @router.get("/overview")
 def get_analytics_overview(
     days: int = 30,
-    current_user: User = Depends(get_current_user),
+    tenant: CurrentTenant = Depends(get_current_tenant),
     db: Session = Depends(get_db)
 ):
     # Determine date range
     start_date = datetime.utcnow() - timedelta(days=days)
     
     # Get user's widget (assuming 1 widget per user for now)
-    widget = db.query(WidgetSettings).filter(WidgetSettings.user_id == current_user.id).first()
-    if not widget:
+    widget_id = tenant.widget_id
+    if not widget_id:
         return success_response(data={
             "total_sessions": 0,
             "total_guests": 0,
@@ -40,7 +40,7 @@ def get_analytics_overview(
     # Filter sessions by widget -> guest -> session
     # Doing a join: ChatSession -> GuestUser -> WidgetSettings
     query = db.query(ChatSession).join(GuestUser).filter(
-        GuestUser.widget_id == widget.id,
+        GuestUser.widget_id == widget_id,
         ChatSession.created_at >= start_date
     )
     
@@ -51,7 +51,7 @@ def get_analytics_overview(
 
     # Leads (marked manually as leads)
     leads_captured = db.query(GuestUser).join(ChatSession).filter(
-        GuestUser.widget_id == widget.id,
+        GuestUser.widget_id == widget_id,
         ChatSession.created_at >= start_date,
         GuestUser.is_lead.is_(True)
     ).distinct().count()
@@ -66,7 +66,7 @@ def get_analytics_overview(
     # Simple metric: Count sessions where is_returning=True? No, is_returning is on Guest.
     # Let's count guests in period who have is_returning=True.
     returning_guests_count = db.query(GuestUser).join(ChatSession).filter(
-        GuestUser.widget_id == widget.id,
+        GuestUser.widget_id == widget_id,
         ChatSession.created_at >= start_date,
         GuestUser.is_returning.is_(True)
     ).distinct().count()
@@ -86,19 +86,19 @@ def get_analytics_overview(
 @router.get("/intents")
 def get_top_intents(
     days: int = 30,
-    current_user: User = Depends(get_current_user),
+    tenant: CurrentTenant = Depends(get_current_tenant),
     db: Session = Depends(get_db)
 ):
     start_date = datetime.utcnow() - timedelta(days=days)
-    widget = db.query(WidgetSettings).filter(WidgetSettings.user_id == current_user.id).first()
-    if not widget:
+    widget_id = tenant.widget_id
+    if not widget_id:
         return success_response(data=[])
 
     # Group by top_intent, no limit as requested
     results = db.query(
         ChatSession.top_intent, func.count(ChatSession.id)
     ).join(GuestUser).filter(
-        GuestUser.widget_id == widget.id,
+        GuestUser.widget_id == widget_id,
         ChatSession.created_at >= start_date,
         ChatSession.top_intent.isnot(None)
     ).group_by(ChatSession.top_intent).order_by(func.count(ChatSession.id).desc()).all()
@@ -108,12 +108,12 @@ def get_top_intents(
 @router.get("/locations")
 def get_top_locations(
     days: int = 30,
-    current_user: User = Depends(get_current_user),
+    tenant: CurrentTenant = Depends(get_current_tenant),
     db: Session = Depends(get_db)
 ):
     start_date = datetime.utcnow() - timedelta(days=days)
-    widget = db.query(WidgetSettings).filter(WidgetSettings.user_id == current_user.id).first()
-    if not widget:
+    widget_id = tenant.widget_id
+    if not widget_id:
         return success_response(data=[])
 
     # Group by City, Country
@@ -122,7 +122,7 @@ def get_top_locations(
     results = db.query(
         ChatSession.country, ChatSession.city, func.count(ChatSession.id)
     ).join(GuestUser).filter(
-        GuestUser.widget_id == widget.id,
+        GuestUser.widget_id == widget_id,
         ChatSession.created_at >= start_date,
         ChatSession.country.isnot(None)
     ).group_by(ChatSession.country, ChatSession.city).order_by(func.count(ChatSession.id).desc()).limit(10).all()
@@ -132,19 +132,19 @@ def get_top_locations(
 @router.get("/sources")
 def get_traffic_sources(
     days: int = 30,
-    current_user: User = Depends(get_current_user),
+    tenant: CurrentTenant = Depends(get_current_tenant),
     db: Session = Depends(get_db)
 ):
     start_date = datetime.utcnow() - timedelta(days=days)
-    widget = db.query(WidgetSettings).filter(WidgetSettings.user_id == current_user.id).first()
-    if not widget:
+    widget_id = tenant.widget_id
+    if not widget_id:
         return success_response(data=[])
 
     # Count distinct guests per referrer (User asked for per-user basis)
     results = db.query(
         ChatSession.referrer, func.count(func.distinct(ChatSession.guest_id))
     ).join(GuestUser).filter(
-        GuestUser.widget_id == widget.id,
+        GuestUser.widget_id == widget_id,
         ChatSession.created_at >= start_date,
         ChatSession.referrer.isnot(None)
     ).group_by(ChatSession.referrer).order_by(func.count(func.distinct(ChatSession.guest_id)).desc()).all()
@@ -154,12 +154,12 @@ def get_traffic_sources(
 @router.get("/trend")
 def get_traffic_trend(
     days: int = 30,
-    current_user: User = Depends(get_current_user),
+    tenant: CurrentTenant = Depends(get_current_tenant),
     db: Session = Depends(get_db)
 ):
     start_date = datetime.utcnow() - timedelta(days=days)
-    widget = db.query(WidgetSettings).filter(WidgetSettings.user_id == current_user.id).first()
-    if not widget:
+    widget_id = tenant.widget_id
+    if not widget_id:
         return success_response(data=[])
 
     # Daily session counts
@@ -169,7 +169,7 @@ def get_traffic_trend(
     results = db.query(
         func.date(ChatSession.created_at).label('date'), func.count(ChatSession.id)
     ).join(GuestUser).filter(
-        GuestUser.widget_id == widget.id,
+        GuestUser.widget_id == widget_id,
         ChatSession.created_at >= start_date
     ).group_by(func.date(ChatSession.created_at)).order_by(func.date(ChatSession.created_at)).all()
     
@@ -183,17 +183,17 @@ class FollowUpRequest(BaseModel):
 @router.post("/followup", response_model=None)
 async def generate_followup(
     request: FollowUpRequest,
-    current_user: User = Depends(get_current_user),
+    tenant: CurrentTenant = Depends(get_current_tenant),
     db: Session = Depends(get_db)
 ):
     # Verify session belongs to user's widget
-    widget = db.query(WidgetSettings).filter(WidgetSettings.user_id == current_user.id).first()
-    if not widget:
+    widget_id = tenant.widget_id
+    if not widget_id:
         raise HTTPException(status_code=404, detail="Widget not found")
 
     session = db.query(ChatSession).join(GuestUser).filter(
         ChatSession.id == request.session_id,
-        GuestUser.widget_id == widget.id
+        GuestUser.widget_id == widget_id
     ).first()
 
     if not session:
@@ -209,16 +209,16 @@ async def generate_followup(
 def get_recent_sessions(
     limit: int = 20,
     offset: int = 0,
-    current_user: User = Depends(get_current_user),
+    tenant: CurrentTenant = Depends(get_current_tenant),
     db: Session = Depends(get_db)
 ):
-    widget = db.query(WidgetSettings).filter(WidgetSettings.user_id == current_user.id).first()
-    if not widget:
+    widget_id = tenant.widget_id
+    if not widget_id:
         return success_response(data=[])
 
     # Get recent sessions
     sessions = db.query(ChatSession).join(GuestUser).filter(
-        GuestUser.widget_id == widget.id
+        GuestUser.widget_id == widget_id
     ).order_by(ChatSession.created_at.desc()).offset(offset).limit(limit).all()
 
     # Enhance with guest info
@@ -241,16 +241,16 @@ def get_recent_sessions(
 @router.get("/sessions/{session_id}")
 def get_session_details(
     session_id: str,
-    current_user: User = Depends(get_current_user),
+    tenant: CurrentTenant = Depends(get_current_tenant),
     db: Session = Depends(get_db)
 ):
-    widget = db.query(WidgetSettings).filter(WidgetSettings.user_id == current_user.id).first()
-    if not widget:
+    widget_id = tenant.widget_id
+    if not widget_id:
         raise HTTPException(status_code=404, detail="Widget not found")
 
     session = db.query(ChatSession).join(GuestUser).filter(
         ChatSession.id == session_id,
-        GuestUser.widget_id == widget.id
+        GuestUser.widget_id == widget_id
     ).first()
     
     if not session:
@@ -1,14 +1,22 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
 from sqlalchemy.orm import Session
+from datetime import datetime, timedelta, timezone
 from app.db.session import get_db
+from app.auth.principal import principal_cache
 from app.auth.router import get_current_user
 from app.models.user import User
 from app.models.business import Business
 from app.models.plan import Plan
 from app.models.widget import WidgetSettings
-from app.schemas.business import BusinessCreate, BusinessUpdate, BusinessResponse
+from app.models.usage_ledger import UsageKind
+from app.schemas.business import (
+    BusinessCreate, BusinessUpdate, BusinessResponse,
+    BusinessUsageResponse, UsageCounter,
+)
 from app.core.response_wrapper import success_response
 from app.services.analysis_agent import generate_business_intents
+from app.services.entitlements import entitlement_service
+from app.services.usage_ledger import usage_ledger
 from app.core.config import settings
 
 from app.core.subscription import SubscriptionTier
@@ -43,6 +51,8 @@ async def create_business(
     db.add(business)
     db.commit()
     db.refresh(business)
+    entitlement_service.invalidate(user_id=current_user.id)
+    principal_cache.invalidate(user_id=current_user.id)
     
     # Sync logo_url to WidgetSettings if exists
     if business.logo_url:
@@ -74,6 +84,38 @@ async def get_business(
     _enrich_plan_fields(response, business, db)
     return success_response(data=response)
 
+@router.get("/business/usage", response_model=None)
+async def get_business_usage(
+    days: int = Query(default=30, ge=1, le=365),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Live AI response / escalation usage and per-day history from the usage ledger."""
+    business = db.query(Business).filter(Business.user_id == current_user.id).first()
+    if not business:
+        raise HTTPException(status_code=404, detail="Business profile not found. Please create one first.")
+
+    entitlements = entitlement_service.get(db, current_user.id, business=business)
+    pending = usage_ledger.pending(db, business.id)
+    ai_used = (business.used_ai_responses or 0) + pending[UsageKind.AI_RESPONSE.value]
+    escalations_used = (business.used_escalations or 0) + pending[UsageKind.ESCALATION.value]
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+
+    response = BusinessUsageResponse(
+        ai_responses=UsageCounter(
+            allocated=entitlements.ai_responses_allocated,
+            used=ai_used,
+            remaining=max(0, entitlements.ai_responses_allocated - ai_used),
+        ),
+        escalations=UsageCounter(
+            allocated=entitlements.escalations_allocated,
+            used=escalations_used,
+            remaining=max(0, entitlements.escalations_allocated - escalations_used),
+        ),
+        history=usage_ledger.history(db, business.id, since),
+    )
+    return success_response(data=response)
+
 @router.put("/business", response_model=None)
 async def update_business(
     business_data: BusinessUpdate,
@@ -102,6 +144,10 @@ async def update_business(
         business.is_escalation_enabled = business_data.is_escalation_enabled
     if business_data.escalation_emails is not None:
         business.escalation_emails = business_data.escalation_emails
+    if business_data.rag_top_k is not None:
+        business.rag_top_k = business_data.rag_top_k
+    if business_data.rag_context_tokens is not None:
+        business.rag_context_tokens = business_data.rag_context_tokens
     
     # Sync logo_url to WidgetSettings
     if business_data.logo_url is not None:
@@ -114,6 +160,8 @@ async def update_business(
     
     db.commit()
     db.refresh(business)
+    entitlement_service.invalidate(user_id=current_user.id)
+    principal_cache.invalidate(user_id=current_user.id)
     
     response = BusinessResponse.model_validate(business)
     _enrich_plan_fields(response, business, db)
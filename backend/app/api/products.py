@@ -1,41 +1,57 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, UploadFile, File
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-import csv
-import io
+import os
+import shutil
+import tempfile
 from app.db.session import get_db
-from app.auth.router import get_current_user
-from app.models.user import User
-from app.models.business import Business
+from app.auth.principal import CurrentTenant
+from app.auth.router import get_current_tenant
 from app.models.product import Product
-from app.schemas.product import ProductCreate, ProductUpdate, ProductResponse
+from app.models.product_import_job import ProductImportJob
+from app.schemas.product import ProductCreate, ProductUpdate, ProductResponse, ProductImportJobResponse
+from app.core.config import settings
 from app.core.response_wrapper import success_response
+from app.services.product_index import product_index
+from app.services.product_import import ProductImportError, product_importer
 
 router = APIRouter(prefix="/products", tags=["products"])
 
-def get_business(db: Session, user_id: str):
-    business = db.query(Business).filter(Business.user_id == user_id).first()
-    if not business:
+def get_business_id(tenant: CurrentTenant) -> str:
+    if not tenant.business_id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Business profile not found. Please create a business profile first."
         )
-    return business
+    return tenant.business_id
+
+def _commit_or_conflict(db: Session):
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A product with this SKU already exists."
+        )
 
 @router.post("/", response_model=None)
 async def create_product(
     product_in: ProductCreate,
-    current_user: User = Depends(get_current_user),
+    background_tasks: BackgroundTasks,
+    tenant: CurrentTenant = Depends(get_current_tenant),
     db: Session = Depends(get_db)
 ):
-    business = get_business(db, current_user.id)
+    business_id = get_business_id(tenant)
     
     product = Product(
         **product_in.model_dump(),
-        business_id=business.id
+        business_id=business_id
     )
     db.add(product)
-    db.commit()
+    _commit_or_conflict(db)
     db.refresh(product)
+    background_tasks.add_task(product_index.sync, business_id, [product.id])
     return success_response(
         message="Product created successfully",
         data=ProductResponse.from_orm(product)
@@ -43,11 +59,11 @@ async def create_product(
 
 @router.get("/", response_model=None)
 async def list_products(
-    current_user: User = Depends(get_current_user),
+    tenant: CurrentTenant = Depends(get_current_tenant),
     db: Session = Depends(get_db)
 ):
-    business = get_business(db, current_user.id)
-    products = db.query(Product).filter(Product.business_id == business.id).all()
+    business_id = get_business_id(tenant)
+    products = db.query(Product).filter(Product.business_id == business_id).all()
     return success_response(
         data=[ProductResponse.from_orm(p) for p in products]
     )
@@ -55,13 +71,13 @@ async def list_products(
 @router.get("/{product_id}", response_model=None)
 async def get_product(
     product_id: str,
-    current_user: User = Depends(get_current_user),
+    tenant: CurrentTenant = Depends(get_current_tenant),
     db: Session = Depends(get_db)
 ):
-    business = get_business(db, current_user.id)
+    business_id = get_business_id(tenant)
     product = db.query(Product).filter(
         Product.id == product_id,
-        Product.business_id == business.id
+        Product.business_id == business_id
     ).first()
     
     if not product:
@@ -73,13 +89,14 @@ async def get_product(
 async def update_product(
     product_id: str,
     product_in: ProductUpdate,
-    current_user: User = Depends(get_current_user),
+    background_tasks: BackgroundTasks,
+    tenant: CurrentTenant = Depends(get_current_tenant),
     db: Session = Depends(get_db)
 ):
-    business = get_business(db, current_user.id)
+    business_id = get_business_id(tenant)
     product = db.query(Product).filter(
         Product.id == product_id,
-        Product.business_id == business.id
+        Product.business_id == business_id
     ).first()
     
     if not product:
@@ -90,8 +107,9 @@ async def update_product(
         setattr(product, field, value)
     
     db.add(product)
-    db.commit()
+    _commit_or_conflict(db)
     db.refresh(product)
+    background_tasks.add_task(product_index.sync, business_id, [product.id])
     return success_response(
         message="Product updated successfully",
         data=ProductResponse.from_orm(product)
@@ -100,13 +118,14 @@ async def update_product(
 @router.delete("/{product_id}", response_model=None)
 async def delete_product(
     product_id: str,
-    current_user: User = Depends(get_current_user),
+    background_tasks: BackgroundTasks,
+    tenant: CurrentTenant = Depends(get_current_tenant),
     db: Session = Depends(get_db)
 ):
-    business = get_business(db, current_user.id)
+    business_id = get_business_id(tenant)
     product = db.query(Product).filter(
         Product.id == product_id,
-        Product.business_id == business.id
+        Product.business_id == business_id
     ).first()
     
     if not product:
@@ -114,75 +133,66 @@ async def delete_product(
     
     db.delete(product)
     db.commit()
+    background_tasks.add_task(product_index.sync, business_id, [product_id])
     return success_response(message="Product deleted successfully")
 
 @router.post("/bulk", response_model=None)
 async def bulk_upload_products(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
-    current_user: User = Depends(get_current_user),
+    tenant: CurrentTenant = Depends(get_current_tenant),
     db: Session = Depends(get_db)
 ):
-    business = get_business(db, current_user.id)
-    
-    try:
-        content = await file.read()
-        decoded = content.decode('utf-8')
-        reader = csv.DictReader(io.StringIO(decoded))
-        
-        imported = 0
-        updated = 0
-        errors = []
-        
-        for row in reader:
-            try:
-                sku = row.get('sku')
-                if not sku:
-                    errors.append(f"Missing SKU for product: {row.get('name', 'Unknown')}")
-                    continue
-                
-                # Check if product exists
-                product = db.query(Product).filter(
-                    Product.business_id == business.id,
-                    Product.sku == sku
-                ).first()
-                
-                price_str = row.get('price', '0').replace(',', '')
-                price = float(price_str) if price_str else 0.0
-                stock = int(row.get('stock_quantity', 0))
-                is_active = row.get('is_active', 'true').lower() == 'true'
-                
-                if product:
-                    product.name = row.get('name', product.name)
-                    product.description = row.get('description', product.description)
-                    product.price = price
-                    product.stock_quantity = stock
-                    product.category = row.get('category', product.category)
-                    product.is_active = is_active
-                    updated += 1
-                else:
-                    product = Product(
-                        business_id=business.id,
-                        name=row.get('name', 'Unnamed Product'),
-                        description=row.get('description', ''),
-                        price=price,
-                        sku=sku,
-                        stock_quantity=stock,
-                        category=row.get('category', ''),
-                        is_active=is_active
-                    )
-                    db.add(product)
-                    imported += 1
-            except Exception as e:
-                errors.append(f"Error processing row with SKU {row.get('sku')}: {str(e)}")
-        
-        db.commit()
+    business_id = get_business_id(tenant)
+
+    size = file.size
+    if size is None:
+        file.file.seek(0, os.SEEK_END)
+        size = file.file.tell()
+        file.file.seek(0)
+
+    if size > settings.PRODUCT_IMPORT_BACKGROUND_THRESHOLD_BYTES:
+        # The upload is closed when the request ends; keep a copy for the job.
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".csv") as spool:
+            shutil.copyfileobj(file.file, spool)
+        job = product_importer.create_job(db, business_id, file.filename)
+        background_tasks.add_task(product_importer.run_job, job.id, spool.name)
         return success_response(
-            message=f"Bulk upload complete. Imported: {imported}, Updated: {updated}",
-            data={
-                "imported": imported,
-                "updated": updated,
-                "errors": errors
-            }
+            message="Bulk upload queued",
+            data=ProductImportJobResponse.model_validate(job),
+            status_code=status.HTTP_202_ACCEPTED,
         )
-    except Exception as e:
+
+    try:
+        report = product_importer.import_csv(db, business_id, file.file)
+    except ProductImportError as e:
         raise HTTPException(status_code=400, detail=f"Failed to process CSV file: {str(e)}")
+
+    # Unchanged products are skipped by content hash, so a full sync is cheap.
+    background_tasks.add_task(product_index.sync, business_id)
+    return success_response(
+        message=f"Bulk upload complete. Imported: {report.imported}, Updated: {report.updated}",
+        data={
+            "imported": report.imported,
+            "updated": report.updated,
+            "error_count": report.error_count,
+            "errors": report.errors
+        }
+    )
+
+@router.get("/bulk/{job_id}", response_model=None)
+async def get_bulk_upload_job(
+    job_id: str,
+    tenant: CurrentTenant = Depends(get_current_tenant),
+    db: Session = Depends(get_db)
+):
+    business_id = get_business_id(tenant)
+    job = db.query(ProductImportJob).filter(
+        ProductImportJob.id == job_id,
+        ProductImportJob.business_id == business_id
+    ).first()
+
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+
+    return success_response(data=ProductImportJobResponse.model_validate(job))
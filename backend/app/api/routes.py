@@ -5,6 +5,7 @@ from app.auth.router import get_current_user
 from app.models.user import User
 from typing import List
 from app.services.rag_service import rag_service
+from app.services.file_storage import FileTooLargeError
 from app.services.agent_service import run_conversation
 from app.schemas.chat import ChatRequest, ChatResponse
 from app.core.config import settings
@@ -31,11 +32,17 @@ async def upload_documents(
         if not file.filename or file.filename.strip() == "":
             raise HTTPException(status_code=400, detail="Invalid file: filename is missing")
     
-    saved_files = []
+    uploads = []
     for file in files:
-        filename = await rag_service.upload_document(file, user_id=current_user.id, db=db)
-        saved_files.append(filename)
-    return success_response(message="Files uploaded successfully", data={"files": saved_files})
+        try:
+            uploads.append(await rag_service.upload_document(file, user_id=current_user.id, db=db))
+        except FileTooLargeError as e:
+            raise HTTPException(status_code=413, detail=str(e))
+    # Re-uploads of files already stored come back as their existing document (duplicate=True)
+    return success_response(
+        message="Files uploaded successfully",
+        data={"files": [upload.filename for upload in uploads], "uploads": uploads}
+    )
 
 @router.get("/documents", response_model=None)
 async def list_documents(
@@ -44,6 +51,26 @@ async def list_documents(
 ):
     return success_response(data=rag_service.list_documents(user_id=current_user.id, db=db))
 
+# Plain ``def``: re-indexing is blocking work, so FastAPI runs it in its threadpool
+@router.put("/documents/{document_id}", response_model=None)
+def replace_document(
+    document_id: str,
+    file: UploadFile = File(...),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Upload a new version of a document; only its changed chunks are re-embedded."""
+    if not file.filename or file.filename.strip() == "":
+        raise HTTPException(status_code=400, detail="Invalid file: filename is missing")
+
+    try:
+        result = rag_service.replace_document(document_id=document_id, file=file, user_id=current_user.id, db=db)
+    except FileTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    if result is None:
+        raise HTTPException(status_code=404, detail="Document not found")
+    return success_response(message="Document replaced successfully", data=result)
+
 @router.delete("/documents/{document_id}", response_model=None)
 async def delete_document(
     document_id: str,
@@ -14,6 +14,8 @@ from app.core.config import settings
 from app.core.response_wrapper import success_response
 from app.core.subscription import TIER_LIMITS
 from app.services.subscription.factory import SubscriptionServiceFactory
+from app.services.entitlements import entitlement_service
+from app.services.usage_ledger import usage_ledger
 from app.utils.email_helpers import (
     send_subscription_created_email,
     send_subscription_cancelled_email,
@@ -172,10 +174,10 @@ async def upgrade_subscription(
     if not business.payment_customer_id:
         raise HTTPException(status_code=400, detail="Customer profile not found with payment provider")
 
-    old_tier_name = business.subscription_tier or "spark"
-    current_plan = db.query(Plan).filter(Plan.name.ilike(old_tier_name)).first()
-    print(f"\n\n Plan before upgrade: {current_plan.to_dict()}\n\n")
-    old_tier_level = current_plan.tier if current_plan else 0
+    entitlements = entitlement_service.get(db, current_user.id, business=business)
+    old_tier_name = entitlements.tier
+    print(f"\n\n Plan before upgrade: {old_tier_name} (level {entitlements.tier_level})\n\n")
+    old_tier_level = entitlements.tier_level
     new_tier_level = new_plan.tier
 
     if new_tier_level < old_tier_level:
@@ -283,6 +285,7 @@ async def verify_subscription_transaction(
         )
         db.add(tx)
         db.commit()
+        entitlement_service.invalidate(business_id=business.id)
         return success_response(message="Transaction verified successfully")
 
     except Exception as e:
@@ -470,6 +473,8 @@ async def subscription_webhook(
             db.add(tx)
 
         db.commit()
+        if business_id:
+            entitlement_service.invalidate(business_id=business_id)
         logger.info(f"[WEBHOOK] ✅ Webhook processed. business_id={business_id}, event={event['event_type']}")
         return success_response(message="Webhook Processed Successfully")
 
@@ -589,6 +594,9 @@ def _process_renewal_success(db: Session, event: Dict[str, Any]) -> Optional[Bus
     is_upgrade = metadata.get("is_upgrade", False)
     new_tier = metadata.get("tier")
 
+    # Fold outstanding ledger usage into the counters so carry-over sees it
+    usage_ledger.compact(db, business_id=business.id, fold_all=True)
+
     # Capture previous state before updating tier
     old_tier = business.subscription_tier or "spark"
     prev_allocated_ai = business.allocated_ai_responses or 0
@@ -3,11 +3,10 @@ from datetime import datetime, timezone
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
-from app.auth.router import get_current_user
+from app.auth.principal import CurrentTenant
+from app.auth.router import get_current_tenant
 from app.core.response_wrapper import success_response
 from app.db.session import get_db
-from app.models.business import Business
-from app.models.user import User
 from app.models.whatsapp_broadcast import (
     WhatsAppCampaign,
     WhatsAppCampaignMessage,
@@ -23,11 +22,10 @@ from app.services.whatsapp import campaigns as campaign_service
 router = APIRouter()
 
 
-def _get_business_or_404(db: Session, user: User) -> Business:
-    business = db.query(Business).filter(Business.user_id == user.id).first()
-    if not business:
+def _business_id_or_404(tenant: CurrentTenant) -> str:
+    if not tenant.business_id:
         raise HTTPException(status_code=404, detail="Business profile not found")
-    return business
+    return tenant.business_id
 
 
 def _serialize_campaign(campaign: WhatsAppCampaign) -> dict:
@@ -39,11 +37,11 @@ async def list_campaigns(
     status: str | None = Query(default=None),
     limit: int = Query(default=50, le=500),
     offset: int = Query(default=0, ge=0),
-    current_user: User = Depends(get_current_user),
+    tenant: CurrentTenant = Depends(get_current_tenant),
     db: Session = Depends(get_db),
 ):
-    business = _get_business_or_404(db, current_user)
-    query = db.query(WhatsAppCampaign).filter(WhatsAppCampaign.business_id == business.id)
+    business_id = _business_id_or_404(tenant)
+    query = db.query(WhatsAppCampaign).filter(WhatsAppCampaign.business_id == business_id)
     if status:
         query = query.filter(WhatsAppCampaign.status == status)
     total = query.count()
@@ -65,20 +63,20 @@ async def list_campaigns(
 @router.post("/campaigns", response_model=None)
 async def create_campaign(
     payload: CampaignCreateRequest,
-    current_user: User = Depends(get_current_user),
+    tenant: CurrentTenant = Depends(get_current_tenant),
     db: Session = Depends(get_db),
 ):
-    business = _get_business_or_404(db, current_user)
+    business_id = _business_id_or_404(tenant)
     try:
         campaign = campaign_service.create_campaign(
             db,
-            business.id,
+            business_id,
             name=payload.name,
             template_id=payload.template_id,
             audience_type=payload.audience_type,
             audience_ref=payload.audience_ref,
             variable_mapping=payload.variable_mapping,
-            created_by_user_id=current_user.id,
+            created_by_user_id=tenant.user_id,
             scheduled_at=payload.scheduled_at,
         )
     except ValueError as e:
@@ -95,15 +93,15 @@ async def create_campaign(
 @router.get("/campaigns/{campaign_id}", response_model=None)
 async def get_campaign(
     campaign_id: str,
-    current_user: User = Depends(get_current_user),
+    tenant: CurrentTenant = Depends(get_current_tenant),
     db: Session = Depends(get_db),
 ):
-    business = _get_business_or_404(db, current_user)
+    business_id = _business_id_or_404(tenant)
     campaign = (
         db.query(WhatsAppCampaign)
         .filter(
             WhatsAppCampaign.id == campaign_id,
-            WhatsAppCampaign.business_id == business.id,
+            WhatsAppCampaign.business_id == business_id,
         )
         .first()
     )
@@ -118,15 +116,15 @@ async def list_campaign_messages(
     status: str | None = Query(default=None),
     limit: int = Query(default=100, le=1000),
     offset: int = Query(default=0, ge=0),
-    current_user: User = Depends(get_current_user),
+    tenant: CurrentTenant = Depends(get_current_tenant),
     db: Session = Depends(get_db),
 ):
-    business = _get_business_or_404(db, current_user)
+    business_id = _business_id_or_404(tenant)
     campaign = (
         db.query(WhatsAppCampaign)
         .filter(
             WhatsAppCampaign.id == campaign_id,
-            WhatsAppCampaign.business_id == business.id,
+            WhatsAppCampaign.business_id == business_id,
         )
         .first()
     )
@@ -157,15 +155,15 @@ async def list_campaign_messages(
 async def send_campaign(
     campaign_id: str,
     payload: CampaignSendRequest | None = None,
-    current_user: User = Depends(get_current_user),
+    tenant: CurrentTenant = Depends(get_current_tenant),
     db: Session = Depends(get_db),
 ):
-    business = _get_business_or_404(db, current_user)
+    business_id = _business_id_or_404(tenant)
     campaign = (
         db.query(WhatsAppCampaign)
         .filter(
             WhatsAppCampaign.id == campaign_id,
-            WhatsAppCampaign.business_id == business.id,
+            WhatsAppCampaign.business_id == business_id,
         )
         .first()
     )
@@ -185,15 +183,15 @@ async def send_campaign(
 @router.post("/campaigns/{campaign_id}/cancel", response_model=None)
 async def cancel_campaign(
     campaign_id: str,
-    current_user: User = Depends(get_current_user),
+    tenant: CurrentTenant = Depends(get_current_tenant),
     db: Session = Depends(get_db),
 ):
-    business = _get_business_or_404(db, current_user)
+    business_id = _business_id_or_404(tenant)
     campaign = (
         db.query(WhatsAppCampaign)
         .filter(
             WhatsAppCampaign.id == campaign_id,
-            WhatsAppCampaign.business_id == business.id,
+            WhatsAppCampaign.business_id == business_id,
         )
         .first()
     )
@@ -1,11 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
 from sqlalchemy.orm import Session
 
-from app.auth.router import get_current_user
+from app.auth.principal import CurrentTenant
+from app.auth.router import get_current_tenant
 from app.core.response_wrapper import success_response
 from app.db.session import get_db
-from app.models.business import Business
-from app.models.user import User
 from app.models.whatsapp_broadcast import (
     WhatsAppContact,
     WhatsAppContactList,
@@ -28,11 +27,10 @@ from app.services.whatsapp import contacts as contact_service
 router = APIRouter()
 
 
-def _get_business_or_404(db: Session, user: User) -> Business:
-    business = db.query(Business).filter(Business.user_id == user.id).first()
-    if not business:
+def _business_id_or_404(tenant: CurrentTenant) -> str:
+    if not tenant.business_id:
         raise HTTPException(status_code=404, detail="Business profile not found")
-    return business
+    return tenant.business_id
 
 
 # ---------- Contacts ----------
@@ -43,11 +41,11 @@ async def list_contacts(
     q: str | None = Query(default=None),
     limit: int = Query(default=50, le=500),
     offset: int = Query(default=0, ge=0),
-    current_user: User = Depends(get_current_user),
+    tenant: CurrentTenant = Depends(get_current_tenant),
     db: Session = Depends(get_db),
 ):
-    business = _get_business_or_404(db, current_user)
-    query = db.query(WhatsAppContact).filter(WhatsAppContact.business_id == business.id)
+    business_id = _business_id_or_404(tenant)
+    query = db.query(WhatsAppContact).filter(WhatsAppContact.business_id == business_id)
     if q:
         like = f"%{q}%"
         query = query.filter(
@@ -73,14 +71,14 @@ async def list_contacts(
 @router.post("/contacts", response_model=None)
 async def create_contact(
     payload: ContactCreateRequest,
-    current_user: User = Depends(get_current_user),
+    tenant: CurrentTenant = Depends(get_current_tenant),
     db: Session = Depends(get_db),
 ):
-    business = _get_business_or_404(db, current_user)
+    business_id = _business_id_or_404(tenant)
     try:
         contact = contact_service.create_contact(
             db,
-            business.id,
+            business_id,
             phone=payload.phone,
             name=payload.name,
             tags=payload.tags,
@@ -98,15 +96,15 @@ async def create_contact(
 async def update_contact(
     contact_id: str,
     payload: ContactUpdateRequest,
-    current_user: User = Depends(get_current_user),
+    tenant: CurrentTenant = Depends(get_current_tenant),
     db: Session = Depends(get_db),
 ):
-    business = _get_business_or_404(db, current_user)
+    business_id = _business_id_or_404(tenant)
     contact = (
         db.query(WhatsAppContact)
         .filter(
             WhatsAppContact.id == contact_id,
-            WhatsAppContact.business_id == business.id,
+            WhatsAppContact.business_id == business_id,
         )
         .first()
     )
@@ -128,15 +126,15 @@ async def update_contact(
 @router.delete("/contacts/{contact_id}", response_model=None)
 async def delete_contact(
     contact_id: str,
-    current_user: User = Depends(get_current_user),
+    tenant: CurrentTenant = Depends(get_current_tenant),
     db: Session = Depends(get_db),
 ):
-    business = _get_business_or_404(db, current_user)
+    business_id = _business_id_or_404(tenant)
     contact = (
         db.query(WhatsAppContact)
         .filter(
             WhatsAppContact.id == contact_id,
-            WhatsAppContact.business_id == business.id,
+            WhatsAppContact.business_id == business_id,
         )
         .first()
     )
@@ -150,16 +148,22 @@ async def delete_contact(
 @router.post("/contacts/csv", response_model=None)
 async def upload_csv(
     file: UploadFile = File(...),
-    current_user: User = Depends(get_current_user),
+    list_id: str | None = Query(None, description="Also add the imported contacts to this list"),
+    tenant: CurrentTenant = Depends(get_current_tenant),
     db: Session = Depends(get_db),
 ):
-    business = _get_business_or_404(db, current_user)
-    content = await file.read()
-    result = contact_service.import_csv(db, business.id, content)
+    business_id = _business_id_or_404(tenant)
+    try:
+        result = contact_service.import_csv(db, business_id, file.file, list_id=list_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     return success_response(
         message=f"Imported {result.imported}, skipped {result.skipped}",
         data=ContactCsvImportResponse(
-            imported=result.imported, skipped=result.skipped, errors=result.errors
+            imported=result.imported,
+            skipped=result.skipped,
+            errors=result.errors,
+            added_to_list=result.added_to_list,
         ).model_dump(mode="json"),
     )
 
@@ -167,14 +171,14 @@ async def upload_csv(
 @router.post("/contacts/import-guests", response_model=None)
 async def import_guests(
     payload: GuestImportRequest | None = None,
-    current_user: User = Depends(get_current_user),
+    tenant: CurrentTenant = Depends(get_current_tenant),
     db: Session = Depends(get_db),
 ):
-    business = _get_business_or_404(db, current_user)
+    business_id = _business_id_or_404(tenant)
     payload = payload or GuestImportRequest()
     count = contact_service.import_from_guests(
         db,
-        business.id,
+        business_id,
         min_sessions=payload.min_sessions,
         last_seen_after=payload.last_seen_after,
     )
@@ -200,13 +204,13 @@ def _serialize_list(db: Session, lst: WhatsAppContactList) -> dict:
 
 @router.get("/contact-lists", response_model=None)
 async def list_contact_lists(
-    current_user: User = Depends(get_current_user),
+    tenant: CurrentTenant = Depends(get_current_tenant),
     db: Session = Depends(get_db),
 ):
-    business = _get_business_or_404(db, current_user)
+    business_id = _business_id_or_404(tenant)
     rows = (
         db.query(WhatsAppContactList)
-        .filter(WhatsAppContactList.business_id == business.id)
+        .filter(WhatsAppContactList.business_id == business_id)
         .order_by(WhatsAppContactList.created_at.desc())
         .all()
     )
@@ -217,12 +221,12 @@ async def list_contact_lists(
 @router.post("/contact-lists", response_model=None)
 async def create_contact_list(
     payload: ContactListCreateRequest,
-    current_user: User = Depends(get_current_user),
+    tenant: CurrentTenant = Depends(get_current_tenant),
     db: Session = Depends(get_db),
 ):
-    business = _get_business_or_404(db, current_user)
+    business_id = _business_id_or_404(tenant)
     lst = contact_service.create_list(
-        db, business.id, name=payload.name, description=payload.description
+        db, business_id, name=payload.name, description=payload.description
     )
     return success_response(
         message="Contact list created", data=_serialize_list(db, lst)
@@ -233,15 +237,15 @@ async def create_contact_list(
 async def update_contact_list(
     list_id: str,
     payload: ContactListUpdateRequest,
-    current_user: User = Depends(get_current_user),
+    tenant: CurrentTenant = Depends(get_current_tenant),
     db: Session = Depends(get_db),
 ):
-    business = _get_business_or_404(db, current_user)
+    business_id = _business_id_or_404(tenant)
     lst = (
         db.query(WhatsAppContactList)
         .filter(
             WhatsAppContactList.id == list_id,
-            WhatsAppContactList.business_id == business.id,
+            WhatsAppContactList.business_id == business_id,
         )
         .first()
     )
@@ -259,15 +263,15 @@ async def update_contact_list(
 @router.delete("/contact-lists/{list_id}", response_model=None)
 async def delete_contact_list(
     list_id: str,
-    current_user: User = Depends(get_current_user),
+    tenant: CurrentTenant = Depends(get_current_tenant),
     db: Session = Depends(get_db),
 ):
-    business = _get_business_or_404(db, current_user)
+    business_id = _business_id_or_404(tenant)
     lst = (
         db.query(WhatsAppContactList)
         .filter(
             WhatsAppContactList.id == list_id,
-            WhatsAppContactList.business_id == business.id,
+            WhatsAppContactList.business_id == business_id,
         )
         .first()
     )
@@ -282,15 +286,15 @@ async def delete_contact_list(
 async def add_list_members(
     list_id: str,
     payload: ContactListMembersRequest,
-    current_user: User = Depends(get_current_user),
+    tenant: CurrentTenant = Depends(get_current_tenant),
     db: Session = Depends(get_db),
 ):
-    business = _get_business_or_404(db, current_user)
+    business_id = _business_id_or_404(tenant)
     lst = (
         db.query(WhatsAppContactList)
         .filter(
             WhatsAppContactList.id == list_id,
-            WhatsAppContactList.business_id == business.id,
+            WhatsAppContactList.business_id == business_id,
         )
         .first()
     )
@@ -304,15 +308,15 @@ async def add_list_members(
 async def remove_list_members(
     list_id: str,
     payload: ContactListMembersRequest,
-    current_user: User = Depends(get_current_user),
+    tenant: CurrentTenant = Depends(get_current_tenant),
     db: Session = Depends(get_db),
 ):
-    business = _get_business_or_404(db, current_user)
+    business_id = _business_id_or_404(tenant)
     lst = (
         db.query(WhatsAppContactList)
         .filter(
             WhatsAppContactList.id == list_id,
-            WhatsAppContactList.business_id == business.id,
+            WhatsAppContactList.business_id == business_id,
         )
         .first()
     )
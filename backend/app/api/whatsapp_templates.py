@@ -3,11 +3,10 @@ import logging
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
-from app.auth.router import get_current_user
+from app.auth.principal import CurrentTenant
+from app.auth.router import get_current_tenant
 from app.core.response_wrapper import success_response
 from app.db.session import get_db
-from app.models.business import Business
-from app.models.user import User
 from app.models.whatsapp_broadcast import TemplateStatus, WhatsAppTemplate
 from app.schemas.whatsapp import (
     TemplateCreateRequest,
@@ -34,22 +33,21 @@ def _meta_user_message(err: WhatsAppAPIError) -> str:
     )
 
 
-def _get_business_or_404(db: Session, user: User) -> Business:
-    business = db.query(Business).filter(Business.user_id == user.id).first()
-    if not business:
+def _business_id_or_404(tenant: CurrentTenant) -> str:
+    if not tenant.business_id:
         raise HTTPException(status_code=404, detail="Business profile not found")
-    return business
+    return tenant.business_id
 
 
 @router.get("/templates", response_model=None)
 async def list_templates(
-    current_user: User = Depends(get_current_user),
+    tenant: CurrentTenant = Depends(get_current_tenant),
     db: Session = Depends(get_db),
 ):
-    business = _get_business_or_404(db, current_user)
+    business_id = _business_id_or_404(tenant)
     rows = (
         db.query(WhatsAppTemplate)
-        .filter(WhatsAppTemplate.business_id == business.id)
+        .filter(WhatsAppTemplate.business_id == business_id)
         .order_by(WhatsAppTemplate.created_at.desc())
         .all()
     )
@@ -60,14 +58,14 @@ async def list_templates(
 @router.post("/templates", response_model=None)
 async def create_template(
     payload: TemplateCreateRequest,
-    current_user: User = Depends(get_current_user),
+    tenant: CurrentTenant = Depends(get_current_tenant),
     db: Session = Depends(get_db),
 ):
-    business = _get_business_or_404(db, current_user)
+    business_id = _business_id_or_404(tenant)
     try:
         template = template_service.create_draft(
             db,
-            business.id,
+            business_id,
             name=payload.name,
             category=payload.category,
             language=payload.language,
@@ -87,15 +85,15 @@ async def create_template(
 @router.get("/templates/{template_id}", response_model=None)
 async def get_template(
     template_id: str,
-    current_user: User = Depends(get_current_user),
+    tenant: CurrentTenant = Depends(get_current_tenant),
     db: Session = Depends(get_db),
 ):
-    business = _get_business_or_404(db, current_user)
+    business_id = _business_id_or_404(tenant)
     template = (
         db.query(WhatsAppTemplate)
         .filter(
             WhatsAppTemplate.id == template_id,
-            WhatsAppTemplate.business_id == business.id,
+            WhatsAppTemplate.business_id == business_id,
         )
         .first()
     )
@@ -110,15 +108,15 @@ async def get_template(
 async def update_template(
     template_id: str,
     payload: TemplateUpdateRequest,
-    current_user: User = Depends(get_current_user),
+    tenant: CurrentTenant = Depends(get_current_tenant),
     db: Session = Depends(get_db),
 ):
-    business = _get_business_or_404(db, current_user)
+    business_id = _business_id_or_404(tenant)
     template = (
         db.query(WhatsAppTemplate)
         .filter(
             WhatsAppTemplate.id == template_id,
-            WhatsAppTemplate.business_id == business.id,
+            WhatsAppTemplate.business_id == business_id,
         )
         .first()
     )
@@ -147,15 +145,15 @@ async def update_template(
 @router.post("/templates/{template_id}/submit", response_model=None)
 async def submit_template(
     template_id: str,
-    current_user: User = Depends(get_current_user),
+    tenant: CurrentTenant = Depends(get_current_tenant),
     db: Session = Depends(get_db),
 ):
-    business = _get_business_or_404(db, current_user)
+    business_id = _business_id_or_404(tenant)
     template = (
         db.query(WhatsAppTemplate)
         .filter(
             WhatsAppTemplate.id == template_id,
-            WhatsAppTemplate.business_id == business.id,
+            WhatsAppTemplate.business_id == business_id,
         )
         .first()
     )
@@ -182,12 +180,12 @@ async def submit_template(
 
 @router.post("/templates/import", response_model=None)
 async def import_templates(
-    current_user: User = Depends(get_current_user),
+    tenant: CurrentTenant = Depends(get_current_tenant),
     db: Session = Depends(get_db),
 ):
-    business = _get_business_or_404(db, current_user)
+    business_id = _business_id_or_404(tenant)
     try:
-        imported = await template_service.import_from_meta(db, business.id)
+        imported = await template_service.import_from_meta(db, business_id)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except WhatsAppAPIError as e:
@@ -205,15 +203,15 @@ async def import_templates(
 @router.delete("/templates/{template_id}", response_model=None)
 async def delete_template_endpoint(
     template_id: str,
-    current_user: User = Depends(get_current_user),
+    tenant: CurrentTenant = Depends(get_current_tenant),
     db: Session = Depends(get_db),
 ):
-    business = _get_business_or_404(db, current_user)
+    business_id = _business_id_or_404(tenant)
     template = (
         db.query(WhatsAppTemplate)
         .filter(
             WhatsAppTemplate.id == template_id,
-            WhatsAppTemplate.business_id == business.id,
+            WhatsAppTemplate.business_id == business_id,
         )
         .first()
     )
@@ -9,7 +9,6 @@ import httpx
 from app.db.session import get_db
 from app.models.widget import WidgetSettings, GuestUser, GuestMessage
 from app.models.user import User
-from app.models.business import Business
 from app.models.chat_session import ChatSession
 from app.schemas.widget import (
     GuestStartRequest, GuestStartResponse,
@@ -18,9 +17,11 @@ from app.schemas.widget import (
     SessionStartRequest, SessionHistoryResponse
 )
 from app.services.agent_service import run_conversation
+from app.auth.principal import principal_cache
 from app.auth.router import get_current_user
 from app.core.response_wrapper import success_response
 from app.services.analysis_agent import analyze_session, persist_analysis
+from app.services.entitlements import entitlement_service, DEFAULT_MESSAGES_PER_SESSION
 
 # Additional Schema for Updating Settings
 from pydantic import BaseModel
@@ -122,6 +123,7 @@ def get_my_widget_settings(current_user: User = Depends(get_current_user), db: S
         db.add(widget)
         db.commit()
         db.refresh(widget)
+        principal_cache.invalidate(user_id=current_user.id)
     return success_response(data=WidgetConfigResponse.model_validate(widget))
 
 @router.put("/my-settings", response_model=None)
@@ -131,7 +133,8 @@ def update_my_widget_settings(
     db: Session = Depends(get_db)
 ):
     widget = db.query(WidgetSettings).filter(WidgetSettings.user_id == current_user.id).first()
-    if not widget:
+    created = widget is None
+    if created:
         widget = WidgetSettings(user_id=current_user.id)
         db.add(widget)
     
@@ -199,9 +202,9 @@ def update_my_widget_settings(
         widget.max_sessions_per_day = settings.max_sessions_per_day
         
     if settings.whitelisted_domains is not None:
-        business = db.query(Business).filter(Business.user_id == current_user.id).first()
-        if business and len(settings.whitelisted_domains) > business.allocated_whitelisted_domains:
-            raise HTTPException(status_code=400, detail=f"Your plan allows a maximum of {business.allocated_whitelisted_domains} whitelisted domains.")
+        entitlements = entitlement_service.get(db, current_user.id)
+        if entitlements and len(settings.whitelisted_domains) > entitlements.whitelisted_domains:
+            raise HTTPException(status_code=400, detail=f"Your plan allows a maximum of {entitlements.whitelisted_domains} whitelisted domains.")
         widget.whitelisted_domains = settings.whitelisted_domains
         
     if settings.is_active is not None:
@@ -211,6 +214,8 @@ def update_my_widget_settings(
     db.refresh(widget)
     db.commit()
     db.refresh(widget)
+    if created:
+        principal_cache.invalidate(user_id=current_user.id)
     return success_response(data=WidgetConfigResponse.model_validate(widget))
 
 @router.get("/guests", response_model=None)
@@ -484,24 +489,12 @@ async def init_guest_session(
         
     # Create new session
     # Check Daily Session Limit
+    entitlements = entitlement_service.get(db, widget.user_id)
     if guest.total_sessions is not None: # Though total_sessions is lifetime.
-        # We need sessions today.
-        today_start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
-        sessions_today = db.query(ChatSession).filter(
-            ChatSession.guest_id == guest.id,
-            ChatSession.created_at >= today_start
-        ).count()
-        
-        limit = 50 # Default fallback
-        user = db.query(User).filter(User.id == widget.user_id).first()
-        if user and user.business:
-            limit = user.business.allocated_daily_sessions
-        
         # Optional: Also respect widget-specific setting if lower?
         # if widget.max_sessions_per_day and widget.max_sessions_per_day < limit:
         #     limit = widget.max_sessions_per_day
-            
-        if sessions_today >= limit:
+        if not entitlement_service.can_start_session(db, entitlements, guest.id):
             raise HTTPException(status_code=429, detail="Daily session limit reached for this business.")
 
     session = ChatSession(
@@ -624,21 +617,19 @@ async def process_chat_message(db: Session, widget: WidgetSettings, guest: Guest
     db.commit()
     db.refresh(guest_msg)
 
-    # 2. Get business context
-    owner_user = db.query(User).filter(User.id == widget.user_id).first()
-    business = None
-    if owner_user and owner_user.business:
-        business = owner_user.business
-        business_name = business.business_name
-        instruction = business.custom_agent_instruction
-        intents = business.intents
+    # 2. Get business context (cached entitlements snapshot)
+    entitlements = entitlement_service.get(db, widget.user_id)
+    if entitlements:
+        business_name = entitlements.business_name
+        instruction = entitlements.agent_instruction
+        intents = entitlements.intents
     else:
         business_name = "Taimako.AI"
         instruction = None
         intents = None
         
     # AI Responses Check
-    if business and (business.allocated_ai_responses - business.used_ai_responses) <= 0:
+    if entitlements and not entitlement_service.has_ai_credit(entitlements):
         return WidgetChatResponse(
             message=GuestMessageSchema.model_validate(guest_msg),
             response=GuestMessageSchema(
@@ -653,12 +644,14 @@ async def process_chat_message(db: Session, widget: WidgetSettings, guest: Guest
 
     # 3. Call AI
     # Check Message Limit
+    current_session = None
     if session_id:
         current_session = db.query(ChatSession).filter(ChatSession.id == session_id).first()
         if current_session:
-            limit = widget.max_messages_per_session or 50
-            if business and getattr(business, "allocated_messages_per_session", None):
-                limit = min(limit, business.allocated_messages_per_session)
+            if entitlements:
+                limit = entitlements.session_message_limit(widget)
+            else:
+                limit = widget.max_messages_per_session or DEFAULT_MESSAGES_PER_SESSION
             # user_messages is user only. total is user+ai. Requirement: "maximum messages per session per user" usually means user messages.
             # or total? "Businesses should be able to se maximum messages per session per user"
             # Let's limit USER messages.
@@ -694,6 +687,23 @@ async def process_chat_message(db: Session, widget: WidgetSettings, guest: Guest
         )
 
 
+    # Reserve the credit up front; it is refunded if the agent call fails.
+    reservation = None
+    if entitlements:
+        reservation = entitlement_service.reserve_ai_response(db, entitlements, reference=session_id)
+        if not reservation:
+            return WidgetChatResponse(
+                message=GuestMessageSchema.model_validate(guest_msg),
+                response=GuestMessageSchema(
+                    id=str(uuid.uuid4()),
+                    guest_id=guest.id,
+                    session_id=session_id,
+                    sender="ai",
+                    message_text="Service unavailable: The business has insufficient AI credits.",
+                    created_at=datetime.now(timezone.utc)
+                )
+            )
+
     try:
         print(f"Widget: Calling run_conversation with user_id={widget.user_id} (Type: {type(widget.user_id)})")
         ai_response_text = await run_conversation(
@@ -707,6 +717,8 @@ async def process_chat_message(db: Session, widget: WidgetSettings, guest: Guest
         )
     except Exception as e:
         print(f"Agent Execution Error: {e}")
+        if reservation:
+            entitlement_service.refund_usage(db, entitlements, reservation)
         return WidgetChatResponse(
             message=GuestMessageSchema.model_validate(guest_msg),
             response=GuestMessageSchema(
@@ -729,16 +741,15 @@ async def process_chat_message(db: Session, widget: WidgetSettings, guest: Guest
     )
     db.add(ai_msg)
     
-    # Increment used AI responses if success
-    if business:
-        business.used_ai_responses += 1
-        db.add(business) # Ensure update
-    
     db.commit()
     db.refresh(ai_msg)
 
+    # Settle the reserved credit now that the response is stored
+    if reservation:
+        entitlement_service.commit_usage(db, reservation)
+
     # 5. Update Session Stats
-    session = db.query(ChatSession).filter(ChatSession.id == session_id).first()
+    session = current_session
     if session:
         if session.total_messages is None:
             session.total_messages = 0
@@ -0,0 +1,107 @@
+"""
+Cached request principal for dashboard routes.
+
+``get_current_user`` loads the ``User`` row on every request, and most routes
+then look up the caller's ``Business`` or widget again. ``get_current_tenant``
+instead resolves the user, business id and widget id with one query and keeps
+the resulting ``CurrentTenant`` in a short-lived in-process cache keyed by
+user id, so a warm request reaches the database only for its own work.
+Verified token payloads are cached as well, until the token expires.
+
+Entries expire after ``ttl_seconds`` so changes made by other processes are
+picked up without explicit invalidation. Anything in this process that
+creates or changes a user, business or widget must call
+``principal_cache.invalidate``.
+"""
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.core.security import verify_token
+
+
+@dataclass(frozen=True)
+class CurrentTenant:
+    """Who is calling and which business and widget they own (ids only)."""
+
+    user_id: str
+    email: str
+    is_admin: bool
+    business_id: Optional[str]
+    widget_id: Optional[str]
+
+
+class PrincipalCache:
+    """
+    Args:
+        ttl_seconds: how long a resolved ``CurrentTenant`` is reused.
+        max_tokens: verified tokens kept; the oldest is dropped beyond this.
+    """
+
+    def __init__(self, ttl_seconds: int = 30, max_tokens: int = 10000):
+        self._ttl = ttl_seconds
+        self._max_tokens = max_tokens
+        self._lock = threading.Lock()
+        self._tenants: Dict[str, Tuple[float, CurrentTenant]] = {}
+        self._user_by_business: Dict[str, str] = {}
+        self._tokens: Dict[str, Tuple[float, dict]] = {}
+
+    # --- Tokens ---
+
+    def verify(self, token: str) -> Optional[dict]:
+        """``verify_token`` with the payload reused until the token's ``exp``."""
+        now = time.time()
+        with self._lock:
+            entry = self._tokens.get(token)
+            if entry and entry[0] > now:
+                return entry[1]
+
+        payload = verify_token(token)
+        if not payload:
+            return None
+        expires_at = payload.get("exp")
+        if isinstance(expires_at, (int, float)):
+            with self._lock:
+                if len(self._tokens) >= self._max_tokens:
+                    self._tokens.pop(next(iter(self._tokens)))
+                self._tokens[token] = (expires_at, payload)
+        return payload
+
+    # --- Tenants ---
+
+    def get(self, user_id: str) -> Optional[CurrentTenant]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._tenants.get(user_id)
+            if entry and entry[0] > now:
+                return entry[1]
+            if entry:
+                self._tenants.pop(user_id, None)
+        return None
+
+    def store(self, tenant: CurrentTenant) -> None:
+        with self._lock:
+            self._tenants[tenant.user_id] = (time.monotonic() + self._ttl, tenant)
+            if tenant.business_id:
+                self._user_by_business[tenant.business_id] = tenant.user_id
+
+    def invalidate(self, user_id: Optional[str] = None, business_id: Optional[str] = None) -> None:
+        """Drop the cached tenant, addressed by user or business id."""
+        with self._lock:
+            if business_id and not user_id:
+                user_id = self._user_by_business.get(business_id)
+            if business_id:
+                self._user_by_business.pop(business_id, None)
+            if user_id:
+                self._tenants.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tenants.clear()
+            self._user_by_business.clear()
+            self._tokens.clear()
+
+
+principal_cache = PrincipalCache(ttl_seconds=settings.AUTH_PRINCIPAL_CACHE_TTL_SECONDS)
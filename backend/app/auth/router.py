@@ -4,10 +4,13 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 
 from app.db.session import get_db
+from app.models.business import Business
 from app.models.user import User
+from app.models.widget import WidgetSettings
 from app.schemas.user import Token, UserResponse, UserSignup, UserLogin
 from app.auth.oauth import get_google_auth_url, exchange_code_for_token, get_google_user_info
-from app.core.security import create_access_token, create_refresh_token, verify_token, get_password_hash, verify_password
+from app.auth.principal import CurrentTenant, principal_cache
+from app.core.security import create_access_token, create_refresh_token, verify_token, get_password_hash_async, verify_and_update_password
 from app.core.config import settings
 from app.core.response_wrapper import success_response, error_response
 
@@ -16,9 +19,8 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 security = HTTPBearer()
 
 # --- Dependency: Get Current User ---
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)) -> User:
-    token = credentials.credentials
-    payload = verify_token(token)
+def _token_user_id(credentials: HTTPAuthorizationCredentials) -> str:
+    payload = principal_cache.verify(credentials.credentials)
     if not payload:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -28,12 +30,46 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     user_id = payload.get("sub")
     if not user_id:
         raise HTTPException(status_code=401, detail="Invalid token payload")
-    
+    return user_id
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)) -> User:
+    user_id = _token_user_id(credentials)
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
+async def get_current_tenant(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)) -> CurrentTenant:
+    """The caller's user, business and widget ids, from ``principal_cache`` when warm.
+
+    Use this instead of ``get_current_user`` when the route only needs ids;
+    a cache hit costs no queries at all.
+    """
+    user_id = _token_user_id(credentials)
+    tenant = principal_cache.get(user_id)
+    if tenant:
+        return tenant
+
+    row = db.query(
+        User.id, User.email, User.is_admin, Business.id, WidgetSettings.id
+    ).outerjoin(
+        Business, Business.user_id == User.id
+    ).outerjoin(
+        WidgetSettings, WidgetSettings.user_id == User.id
+    ).filter(User.id == user_id).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    tenant = CurrentTenant(
+        user_id=row[0],
+        email=row[1],
+        is_admin=bool(row[2]),
+        business_id=row[3],
+        widget_id=row[4],
+    )
+    principal_cache.store(tenant)
+    return tenant
+
 # --- Endpoints ---
 
 @router.post("/signup")
@@ -42,7 +78,7 @@ async def signup(user_in: UserSignup, db: Session = Depends(get_db)):
     if user:
         return error_response(message="User with this email already exists", status_code=400)
     
-    hashed_password = get_password_hash(user_in.password)
+    hashed_password = await get_password_hash_async(user_in.password)
     user = User(
         email=user_in.email,
         hashed_password=hashed_password,
@@ -64,11 +100,15 @@ async def login(user_in: UserLogin, db: Session = Depends(get_db)):
         print(f"[LOGIN DEBUG] Has hashed_password: {user.hashed_password is not None}")
         if user.hashed_password:
             try:
-                password_valid = verify_password(user_in.password, user.hashed_password)
+                password_valid, new_hash = await verify_and_update_password(user_in.password, user.hashed_password)
                 print(f"[LOGIN DEBUG] Password valid: {password_valid}")
             except Exception as e:
                 print(f"[LOGIN DEBUG] Password verification error: {e}")
-                password_valid = False
+                password_valid, new_hash = False, None
+            if new_hash:
+                # Stored with an older bcrypt cost; upgrade it while we have the password.
+                user.hashed_password = new_hash
+                db.commit()
         else:
             password_valid = False
     else:
@@ -142,6 +182,7 @@ async def google_callback(code: str, db: Session = Depends(get_db)):
     
     db.commit()
     db.refresh(user)
+    principal_cache.invalidate(user_id=user.id)
 
     # 4. Generate JWT Tokens
     access_token = create_access_token(subject=user.id)
@@ -37,6 +37,46 @@ class BaseConfig(BaseSettings):
     # Gemini model configuration
     GEMINI_MODEL: str = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
     GEMINI_EMBEDDING_MODEL: str = os.getenv("GEMINI_EMBEDDING_MODEL", "models/gemini-embedding-001")
+    # Input limit of the embedding model; longer chunks are truncated by the API
+    GEMINI_EMBEDDING_MAX_TOKENS: int = int(os.getenv("GEMINI_EMBEDDING_MAX_TOKENS", "2048"))
+
+    # Product search (search_products tool)
+    PRODUCT_SEARCH_DEFAULT_LIMIT: int = int(os.getenv("PRODUCT_SEARCH_DEFAULT_LIMIT", "10"))
+    PRODUCT_SEARCH_MAX_LIMIT: int = int(os.getenv("PRODUCT_SEARCH_MAX_LIMIT", "50"))
+    # Semantic matches below this cosine similarity are not returned
+    PRODUCT_SEMANTIC_MIN_SIMILARITY: float = float(os.getenv("PRODUCT_SEMANTIC_MIN_SIMILARITY", "0.55"))
+
+    # Document retrieval (get_context tool); businesses can override top-k and the budget
+    RAG_TOP_K: int = int(os.getenv("RAG_TOP_K", "5"))
+    RAG_CONTEXT_TOKENS: int = int(os.getenv("RAG_CONTEXT_TOKENS", "1500"))
+    # Hits each of the vector and keyword rankings contributes before fusion
+    RAG_CANDIDATES: int = int(os.getenv("RAG_CANDIDATES", "20"))
+    # 1.0 ranks by relevance only; lower values favour diverse chunks
+    RAG_MMR_LAMBDA: float = float(os.getenv("RAG_MMR_LAMBDA", "0.7"))
+    # Document chunking for embedding (estimated tokens, see app.utils.text_splitter)
+    RAG_CHUNK_TOKENS: int = int(os.getenv("RAG_CHUNK_TOKENS", "256"))
+    RAG_CHUNK_OVERLAP_TOKENS: int = int(os.getenv("RAG_CHUNK_OVERLAP_TOKENS", "48"))
+    # Document ingestion budget; PDF pages are extracted by a process pool per API worker
+    # (0 = cores // WEB_CONCURRENCY, so all pools together use one process per core)
+    PDF_EXTRACTION_WORKERS: int = int(os.getenv("PDF_EXTRACTION_WORKERS", "0"))
+    DOCUMENT_MAX_BYTES: int = int(os.getenv("DOCUMENT_MAX_BYTES", "50000000"))
+    DOCUMENT_MAX_PAGES: int = int(os.getenv("DOCUMENT_MAX_PAGES", "2000"))
+    DOCUMENT_EXTRACTION_TIMEOUT_SECONDS: int = int(os.getenv("DOCUMENT_EXTRACTION_TIMEOUT_SECONDS", "300"))
+    # Uploaded files: "local" (UPLOAD_DIR) or "s3" (any S3-compatible store, e.g. MinIO via S3_ENDPOINT_URL)
+    FILE_STORAGE_BACKEND: str = os.getenv("FILE_STORAGE_BACKEND", "local")
+    UPLOAD_DIR: str = os.getenv("UPLOAD_DIR", "uploads")
+    S3_BUCKET: str = os.getenv("S3_BUCKET", "")
+    S3_PREFIX: str = os.getenv("S3_PREFIX", "uploads/")
+    S3_ENDPOINT_URL: str = os.getenv("S3_ENDPOINT_URL", "")
+    S3_REGION: str = os.getenv("S3_REGION", "")
+    # Empty uses boto3's default credential chain
+    S3_ACCESS_KEY_ID: str = os.getenv("S3_ACCESS_KEY_ID", "")
+    S3_SECRET_ACCESS_KEY: str = os.getenv("S3_SECRET_ACCESS_KEY", "")
+
+    # Product CSV import (/products/bulk)
+    PRODUCT_IMPORT_CHUNK_SIZE: int = int(os.getenv("PRODUCT_IMPORT_CHUNK_SIZE", "500"))
+    # Larger uploads are imported in the background and tracked as a job
+    PRODUCT_IMPORT_BACKGROUND_THRESHOLD_BYTES: int = int(os.getenv("PRODUCT_IMPORT_BACKGROUND_THRESHOLD_BYTES", "1000000"))
 
     # Paystack
     PAYSTACK_WEBHOOK_SECRET: str = os.getenv("PAYSTACK_WEBHOOK_SECRET", "")
@@ -47,12 +87,60 @@ class BaseConfig(BaseSettings):
     WHATSAPP_CAMPAIGN_POLL_INTERVAL_SECONDS: int = int(os.getenv("WHATSAPP_CAMPAIGN_POLL_INTERVAL_SECONDS", "10"))
     WHATSAPP_CAMPAIGN_SEND_RATE_PER_SECOND: int = int(os.getenv("WHATSAPP_CAMPAIGN_SEND_RATE_PER_SECOND", "20"))
 
+    # Entitlements
+    ENTITLEMENT_CACHE_TTL_SECONDS: int = int(os.getenv("ENTITLEMENT_CACHE_TTL_SECONDS", "60"))
+    USAGE_RESERVATION_TIMEOUT_SECONDS: int = int(os.getenv("USAGE_RESERVATION_TIMEOUT_SECONDS", "300"))
+    USAGE_LEDGER_COMPACTION_INTERVAL_SECONDS: int = int(os.getenv("USAGE_LEDGER_COMPACTION_INTERVAL_SECONDS", "60"))
+
+    # Session analysis queue
+    ANALYSIS_DEBOUNCE_SECONDS: int = int(os.getenv("ANALYSIS_DEBOUNCE_SECONDS", "30"))
+    ANALYSIS_WORKER_CONCURRENCY: int = int(os.getenv("ANALYSIS_WORKER_CONCURRENCY", "4"))
+    ANALYSIS_POLL_INTERVAL_SECONDS: int = int(os.getenv("ANALYSIS_POLL_INTERVAL_SECONDS", "2"))
+    ANALYSIS_MAX_ATTEMPTS: int = int(os.getenv("ANALYSIS_MAX_ATTEMPTS", "3"))
+    ANALYSIS_TIMEOUT_SECONDS: int = int(os.getenv("ANALYSIS_TIMEOUT_SECONDS", "10"))
+    # A RUNNING job whose worker has not finished it this long after claiming is presumed dead and requeued
+    ANALYSIS_LEASE_SECONDS: int = int(os.getenv("ANALYSIS_LEASE_SECONDS", "120"))
+    # Max new messages sent per incremental analysis; older unanalysed ones are left to the summary
+    ANALYSIS_WINDOW_MESSAGES: int = int(os.getenv("ANALYSIS_WINDOW_MESSAGES", "40"))
+    # Bulk re-analysis (app.workers.batch_analysis)
+    BATCH_ANALYSIS_STALE_DAYS: int = int(os.getenv("BATCH_ANALYSIS_STALE_DAYS", "7"))
+    BATCH_ANALYSIS_SESSIONS_PER_REQUEST: int = int(os.getenv("BATCH_ANALYSIS_SESSIONS_PER_REQUEST", "10"))
+    BATCH_ANALYSIS_CONCURRENCY: int = int(os.getenv("BATCH_ANALYSIS_CONCURRENCY", "4"))
+
     
     # JWT
     JWT_SECRET: str = os.getenv("JWT_SECRET", "supersecretkey") # Change in production!
     JWT_ALGORITHM: str = os.getenv("JWT_ALGORITHM", "HS256")
     JWT_EXPIRATION_MINUTES: int = int(os.getenv("JWT_EXPIRATION_MINUTES", 60))
     REFRESH_TOKEN_EXPIRATION_DAYS: int = int(os.getenv("REFRESH_TOKEN_EXPIRATION_DAYS", 30))
+    AUTH_PRINCIPAL_CACHE_TTL_SECONDS: int = int(os.getenv("AUTH_PRINCIPAL_CACHE_TTL_SECONDS", "30"))
+    # bcrypt cost factor for new hashes; existing hashes are upgraded on login.
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+
+    # Import google-adk in the background at startup rather than in the first chat request
+    AGENT_WARM_UP: bool = os.getenv("AGENT_WARM_UP", "true").lower() == "true"
+
+    # Multi-worker deployment (start.sh defaults it via app.core.deployment.default_workers)
+    WEB_CONCURRENCY: int = int(os.getenv("WEB_CONCURRENCY", "1"))
+    # Rate-limit counters; "memory://" is per process, use redis://host:6379 with several workers
+    RATE_LIMIT_STORAGE_URI: str = os.getenv("RATE_LIMIT_STORAGE_URI", "memory://")
+    RATE_LIMIT_DEFAULT: str = os.getenv("RATE_LIMIT_DEFAULT", "100/minute")
+    # Chroma server shared by all workers; when unset each process opens CHROMA_DB_DIR itself
+    CHROMA_SERVER_HOST: str = os.getenv("CHROMA_SERVER_HOST", "")
+    CHROMA_SERVER_PORT: int = int(os.getenv("CHROMA_SERVER_PORT", "8000"))
+    CHROMA_SERVER_SSL: bool = os.getenv("CHROMA_SERVER_SSL", "false").lower() == "true"
+
+    # Vector store: "chroma" (settings above) or "pgvector" (see app.services.vector_store.pgvector)
+    VECTOR_STORE_BACKEND: str = os.getenv("VECTOR_STORE_BACKEND", "chroma")
+    # Defaults to the main database
+    PGVECTOR_DATABASE_URL: str = os.getenv("PGVECTOR_DATABASE_URL", "")
+    # Must match the embedding model; type and size are fixed when the table is created
+    PGVECTOR_DIMENSIONS: int = int(os.getenv("PGVECTOR_DIMENSIONS", "3072"))
+    PGVECTOR_TYPE: str = os.getenv("PGVECTOR_TYPE", "halfvec")
+    PGVECTOR_PARTITIONS: int = int(os.getenv("PGVECTOR_PARTITIONS", "16"))
+    # HNSW candidate list per query; 0 keeps pgvector's default (40)
+    PGVECTOR_EF_SEARCH: int = int(os.getenv("PGVECTOR_EF_SEARCH", "0"))
 
     # Common Middleware Defaults
     CORS_ORIGINS: List[str] = []
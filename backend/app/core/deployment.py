@@ -0,0 +1,66 @@
+"""
+Sanity checks for running the API with several worker processes.
+
+Anything that keeps state inside one process stops being correct once
+``WEB_CONCURRENCY`` workers (or several containers) serve the same traffic:
+in-memory rate-limit counters are multiplied by the worker count, and
+in-process vector stores (Chroma on a local directory) corrupt or miss each
+other's writes.
+``process_local_state`` lists what is still configured that way.
+``default_workers`` (what ``start.sh`` runs when ``WEB_CONCURRENCY`` is unset)
+only picks one worker per core once none of it is left, and
+``check_worker_count`` makes startup refuse an explicit ``WEB_CONCURRENCY``
+above one while any of it is.
+
+The auth principal and entitlement caches stay per process by design. They
+expire within ``AUTH_PRINCIPAL_CACHE_TTL_SECONDS`` and
+``ENTITLEMENT_CACHE_TTL_SECONDS``, so a worker that did not make a change
+sees it at most one TTL late.
+"""
+import os
+from typing import List
+
+
+def process_local_state(settings, vector_store) -> List[str]:
+    """Human-readable descriptions of state that is not shared between workers."""
+    problems = []
+    if settings.RATE_LIMIT_STORAGE_URI.startswith("memory://"):
+        problems.append(
+            "rate limits are counted in memory (set RATE_LIMIT_STORAGE_URI, e.g. redis://redis:6379)"
+        )
+    if vector_store.is_local:
+        problems.append(
+            f"the vector store {vector_store!r} is local to this process "
+            "(set CHROMA_SERVER_HOST or VECTOR_STORE_BACKEND=pgvector)"
+        )
+    return problems
+
+
+def available_cpus() -> int:
+    """Cores this process may run on (what ``nproc`` prints)."""
+    return len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+
+
+def default_workers(settings, vector_store) -> int:
+    """One worker per available core if all state is shared, otherwise one."""
+    if process_local_state(settings, vector_store):
+        return 1
+    return available_cpus()
+
+
+def check_worker_count(settings, vector_store) -> None:
+    """Raise RuntimeError if several workers would run on top of process-local state."""
+    problems = process_local_state(settings, vector_store)
+    if settings.WEB_CONCURRENCY > 1 and problems:
+        raise RuntimeError(
+            f"WEB_CONCURRENCY={settings.WEB_CONCURRENCY} but " + "; ".join(problems)
+            + ". Configure shared state or run a single worker."
+        )
+
+
+if __name__ == "__main__":
+    # Used by start.sh: prints the worker count to use when WEB_CONCURRENCY is unset
+    from app.core.config import settings
+    from app.services.vector_store import vector_store
+
+    print(default_workers(settings, vector_store))
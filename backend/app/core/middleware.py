@@ -12,7 +12,12 @@ from app.core.security_headers import SecurityHeadersMiddleware
 
 def register_middleware(app: FastAPI):
     # Rate Limiter
-    limiter = Limiter(key_func=get_remote_address, default_limits=["100/minute"])
+    # Counters live in RATE_LIMIT_STORAGE_URI so every worker enforces the same limit.
+    limiter = Limiter(
+        key_func=get_remote_address,
+        default_limits=[settings.RATE_LIMIT_DEFAULT],
+        storage_uri=settings.RATE_LIMIT_STORAGE_URI,
+    )
     app.state.limiter = limiter
     app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
     app.add_middleware(SlowAPIMiddleware)
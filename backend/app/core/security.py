@@ -1,5 +1,8 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional, Union, Any
+from typing import Optional, Tuple, Union, Any
 from jose import jwt, JWTError
 import bcrypt
 from app.core.config import settings
@@ -31,13 +34,88 @@ def verify_token(token: str) -> Optional[dict]:
     except JWTError:
         return None
 
+class PasswordHasher:
+    """bcrypt hashing, with async variants that run on a dedicated thread pool.
+
+    A bcrypt call at cost 12 burns roughly 250ms of CPU. Made directly from an
+    ``async def`` handler it blocks the event loop, and every other request on
+    the worker waits. bcrypt releases the GIL while hashing, so the async
+    variants hand the work to ``max_workers`` threads of their own. A login
+    burst then queues there instead of stalling chat traffic or exhausting
+    the default executor.
+
+    Args:
+        rounds: cost factor for new hashes.
+        max_workers: hashes computed concurrently.
+    """
+
+    def __init__(self, rounds: int = 12, max_workers: int = 2):
+        self.rounds = rounds
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def hash(self, password: str) -> str:
+        salt = bcrypt.gensalt(rounds=self.rounds)
+        return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+
+    def verify(self, password: str, hashed_password: str) -> bool:
+        return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """Whether a stored hash was made with a different cost than ``rounds``."""
+        try:
+            return int(hashed_password.split('$')[2]) != self.rounds
+        except (IndexError, ValueError):
+            return False
+
+    def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Verify, and if the hash uses an outdated cost also return a fresh one."""
+        if not self.verify(password, hashed_password):
+            return False, None
+        if self.needs_rehash(hashed_password):
+            return True, self.hash(password)
+        return True, None
+
+    # --- Async variants ---
+
+    async def hash_async(self, password: str) -> str:
+        return await self._run(self.hash, password)
+
+    async def verify_async(self, password: str, hashed_password: str) -> bool:
+        return await self._run(self.verify, password, hashed_password)
+
+    async def verify_and_update_async(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        return await self._run(self.verify_and_update, password, hashed_password)
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._get_executor(), fn, *args)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix="password-hash"
+                    )
+        return self._executor
+
+
+password_hasher = PasswordHasher(rounds=settings.BCRYPT_ROUNDS, max_workers=settings.PASSWORD_HASH_WORKERS)
+
+
 def get_password_hash(password: str) -> str:
-    pwd_bytes = password.encode('utf-8')
-    salt = bcrypt.gensalt()
-    hashed_password = bcrypt.hashpw(pwd_bytes, salt)
-    return hashed_password.decode('utf-8')
+    return password_hasher.hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    pwd_bytes = plain_password.encode('utf-8')
-    hashed_bytes = hashed_password.encode('utf-8')
-    return bcrypt.checkpw(pwd_bytes, hashed_bytes)
+    return password_hasher.verify(plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await password_hasher.hash_async(password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_hasher.verify_async(plain_password, hashed_password)
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify off the event loop. Also returns a new hash when the cost factor changed."""
+    return await password_hasher.verify_and_update_async(plain_password, hashed_password)
@@ -19,6 +19,7 @@ TIER_LIMITS: Dict[str, Dict[str, Any]] = {
         "max_messages_per_session": 20,
         "max_whitelisted_domains": 1,
         "max_monthly_escalations": 5,
+        "max_upload_mb": 10,
         "description": "Essential features for small businesses."
     },
     SubscriptionTier.NEXUS.value: {
@@ -27,6 +28,7 @@ TIER_LIMITS: Dict[str, Dict[str, Any]] = {
         "max_messages_per_session": 50,
         "max_whitelisted_domains": 5,
         "max_monthly_escalations": 100,
+        "max_upload_mb": 25,
         "description": "Advanced power for growing teams."
     },
     SubscriptionTier.FLUX.value: {
@@ -35,6 +37,7 @@ TIER_LIMITS: Dict[str, Dict[str, Any]] = {
         "max_messages_per_session": 100,
         "max_whitelisted_domains": 10,
         "max_monthly_escalations": 500,
+        "max_upload_mb": 50,
         "description": "Unlimited potential for enterprise scale."
     }
 }
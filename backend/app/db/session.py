@@ -28,7 +28,15 @@ else:
 # For PostgreSQL: no special connect_args needed
 connect_args = {"check_same_thread": False} if SQLALCHEMY_DATABASE_URL.startswith("sqlite") else {}
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args=connect_args)
+# Every worker process has its own pool, so keep pool size x workers under the
+# server's max_connections when running several workers.
+pool_args = {} if SQLALCHEMY_DATABASE_URL.startswith("sqlite") else {
+    "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+    "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+    "pool_pre_ping": True,
+}
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args=connect_args, **pool_args)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -0,0 +1,18 @@
+"""Dialect-specific ``INSERT`` for ``ON CONFLICT`` upserts.
+
+PostgreSQL and SQLite share the ``on_conflict_do_update`` /
+``on_conflict_do_nothing`` API but expose it on their own ``insert``
+constructs; pick the right one for the session's bind.
+"""
+from sqlalchemy.orm import Session
+
+
+def upsert_insert(db: Session):
+    dialect_name = db.get_bind().dialect.name
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"ON CONFLICT upserts are not supported on {dialect_name}")
+    return insert
@@ -1,3 +1,6 @@
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.exceptions import HTTPException, RequestValidationError
 from starlette.middleware.sessions import SessionMiddleware
@@ -18,6 +21,7 @@ from app.api.whatsapp_campaigns import router as whatsapp_campaigns_router
 from app.api.orders import router as orders_router
 
 from app.core.config import settings
+from app.core.deployment import check_worker_count
 from app.db.session import engine
 from app.core.exception_handler import (
     http_exception_handler,
@@ -26,6 +30,9 @@ from app.core.exception_handler import (
 )
 from app.core.middleware import register_middleware
 from app.core.response_wrapper import success_response
+from app.services.agent_service import start_warm_up
+from app.services.document_extraction import document_extractor
+from app.services.vector_store import vector_store
 from app.admin.auth import AdminAuth
 from app.admin.views import (
     UserAdmin, BusinessAdmin, PlanAdmin, PaymentTransactionAdmin,
@@ -34,12 +41,28 @@ from app.admin.views import (
     AnalyticsDailySummaryAdmin, ProductAdmin,
 )
 
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    check_worker_count(settings, vector_store)
+    # Opened here rather than at import so the app object is cheap to load.
+    vector_store.connect()
+    if settings.AGENT_WARM_UP:
+        start_warm_up()
+    yield
+    vector_store.close()
+    document_extractor.shutdown()
+
+
 app = FastAPI(
     title="Taimako API",
     description="API for Taimako.",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # Session middleware (required for SQLAdmin cookie-based auth)
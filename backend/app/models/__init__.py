@@ -6,6 +6,9 @@ from app.models.payment import PaymentTransaction  # noqa: F401
 from app.models.chat_session import ChatSession  # noqa: F401
 from app.models.widget import WidgetSettings, GuestUser, GuestMessage  # noqa: F401
 from app.models.escalation import Escalation  # noqa: F401
+from app.models.usage_ledger import UsageLedgerEntry  # noqa: F401
+from app.models.analysis_job import AnalysisJob  # noqa: F401
+from app.models.product_import_job import ProductImportJob  # noqa: F401
 from app.models.document import Document  # noqa: F401
 from app.models.analytics import AnalyticsDailySummary  # noqa: F401
 from app.models.order import Order, OrderItem  # noqa: F401
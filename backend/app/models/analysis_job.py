@@ -0,0 +1,52 @@
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Index, JSON, Text
+from datetime import datetime, timezone
+import uuid
+import enum
+from app.db.base import Base
+from app.models.mixins import SerializerMixin
+
+
+class AnalysisJobStatus(str, enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+def generate_uuid():
+    return str(uuid.uuid4())
+
+
+class AnalysisJob(Base, SerializerMixin):
+    """Pending/last session analysis for a chat session (one row per session).
+
+    Every new message pushes ``run_after`` out by the debounce window and
+    bumps ``generation``; a worker only marks the job done if the generation
+    it ran is still current, and otherwise requeues it, so messages that
+    arrive mid-run get analysed too (without a second worker running it).
+    """
+    __tablename__ = "analysis_jobs"
+
+    id = Column(String, primary_key=True, default=generate_uuid)
+    session_id = Column(String, ForeignKey("chat_sessions.id", ondelete="CASCADE"), nullable=False, unique=True)
+    intents = Column(JSON, nullable=True)
+    status = Column(String, nullable=False, default=AnalysisJobStatus.PENDING.value)
+    run_after = Column(DateTime, nullable=False)
+    requested_at = Column(DateTime, nullable=False)  # first request since the last completed run
+    generation = Column(Integer, nullable=False, default=0)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+    updated_at = Column(
+        DateTime,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+
+    __table_args__ = (
+        Index("ix_analysis_jobs_status_run_after", "status", "run_after"),
+    )
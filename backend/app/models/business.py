@@ -29,6 +29,10 @@ class Business(Base, SerializerMixin):
     intents = Column(JSON, nullable=True)
     is_escalation_enabled = Column(Boolean, default=False)
     escalation_emails = Column(JSON, nullable=True) # List of emails
+
+    # Knowledge-base retrieval overrides (None = platform default)
+    rag_top_k = Column(Integer, nullable=True)
+    rag_context_tokens = Column(Integer, nullable=True)
     
     # Subscription Fields
     subscription_tier = Column(String, default="spark", nullable=False)
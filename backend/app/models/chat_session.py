@@ -22,12 +22,15 @@ class ChatSession(Base, SerializerMixin):
     __tablename__ = "chat_sessions"
 
     id = Column(String, primary_key=True, default=generate_uuid)
-    guest_id = Column(String, ForeignKey("guest_users.id"), nullable=False)
+    guest_id = Column(String, ForeignKey("guest_users.id"), nullable=False, index=True)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     last_message_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     origin = Column(String, default=SessionOrigin.AUTO_START.value)
     summary = Column(Text, nullable=True)
     summary_generated_at = Column(DateTime, nullable=True)
+    # High-water mark of incremental analysis: last message covered by `summary`
+    analyzed_message_id = Column(String, nullable=True)
+    analyzed_message_at = Column(DateTime, nullable=True)
     top_intent = Column(String, nullable=True)
     sentiment_score = Column(Float, nullable=True)
     channel = Column(String, default=SessionChannel.WIDGET.value)
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy import Column, String, DateTime, ForeignKey, Integer
 from datetime import datetime, timezone
 from app.db.base import Base
 from app.models.mixins import SerializerMixin
@@ -17,4 +17,9 @@ class Document(Base, SerializerMixin):
     status = Column(String, default="pending") # pending, processed, error
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     error_message = Column(String, nullable=True)
+    # Bumped each time the file is replaced (PUT /documents/{id})
+    version = Column(Integer, nullable=False, default=1)
+    updated_at = Column(DateTime, nullable=True)
+    # SHA-256 of the file; identical re-uploads are matched on it
+    content_hash = Column(String(64), nullable=True, index=True)
 
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, Text, Numeric, Integer, Boolean, ForeignKey, DateTime, JSON
+from sqlalchemy import Column, String, Text, Numeric, Integer, Boolean, ForeignKey, DateTime, JSON, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import ARRAY as PG_ARRAY
 from datetime import datetime, timezone
@@ -30,3 +30,8 @@ class Product(Base, SerializerMixin):
 
     # Relationship
     business = relationship("Business", back_populates="products")
+
+    __table_args__ = (
+        # Target of the bulk importer's ON CONFLICT upsert
+        UniqueConstraint("business_id", "sku", name="uq_products_business_sku"),
+    )
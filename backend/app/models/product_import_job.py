@@ -0,0 +1,42 @@
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, JSON, Text
+from datetime import datetime, timezone
+import uuid
+import enum
+from app.db.base import Base
+from app.models.mixins import SerializerMixin
+
+
+class ProductImportStatus(str, enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+def generate_uuid():
+    return str(uuid.uuid4())
+
+
+class ProductImportJob(Base, SerializerMixin):
+    """A product CSV import large enough to run after the upload request returns."""
+    __tablename__ = "product_import_jobs"
+
+    id = Column(String, primary_key=True, default=generate_uuid)
+    business_id = Column(String, ForeignKey("businesses.id", ondelete="CASCADE"), nullable=False, index=True)
+    filename = Column(String, nullable=True)
+    status = Column(String, nullable=False, default=ProductImportStatus.PENDING.value)
+    imported = Column(Integer, nullable=False, default=0)
+    updated = Column(Integer, nullable=False, default=0)
+    error_count = Column(Integer, nullable=False, default=0)
+    errors = Column(JSON, nullable=True)  # row-level report, truncated
+    last_error = Column(Text, nullable=True)  # why the whole import failed, if it did
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+    updated_at = Column(
+        DateTime,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
@@ -0,0 +1,48 @@
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Index
+from datetime import datetime, timezone
+import uuid
+import enum
+from app.db.base import Base
+from app.models.mixins import SerializerMixin
+
+
+class UsageKind(str, enum.Enum):
+    AI_RESPONSE = "ai_response"
+    ESCALATION = "escalation"
+
+
+class UsageEntryType(str, enum.Enum):
+    RESERVE = "reserve"   # +amount, taken before the metered work starts
+    COMMIT = "commit"     # 0, the reserved work completed
+    REFUND = "refund"     # -amount, the reserved work failed or timed out
+
+
+def generate_uuid():
+    return str(uuid.uuid4())
+
+
+class UsageLedgerEntry(Base, SerializerMixin):
+    """Append-only record of metered usage.
+
+    Live usage for a business is ``Business.used_*`` plus the sum of its
+    uncompacted entries; compaction folds entries into those counters and
+    stamps ``compacted_at`` (rows are never deleted, so they double as the
+    usage history).
+    """
+    __tablename__ = "usage_ledger"
+
+    id = Column(String, primary_key=True, default=generate_uuid)
+    business_id = Column(String, ForeignKey("businesses.id", ondelete="CASCADE"), nullable=False)
+    kind = Column(String, nullable=False)
+    entry_type = Column(String, nullable=False)
+    amount = Column(Integer, nullable=False, default=0)
+    reservation_id = Column(String, nullable=True, index=True)  # commit/refund -> originating reserve row
+    reference = Column(String, nullable=True)  # e.g. chat session id
+
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+    compacted_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_usage_ledger_business_pending", "business_id", "compacted_at"),
+        Index("ix_usage_ledger_business_created", "business_id", "created_at"),
+    )
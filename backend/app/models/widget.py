@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Boolean, Integer, JSON
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Boolean, Integer, JSON, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 from app.db.base import Base
@@ -49,6 +49,10 @@ class WidgetSettings(Base, SerializerMixin):
 
 class GuestUser(Base, SerializerMixin):
     __tablename__ = "guest_users"
+    __table_args__ = (
+        # Lets a widget's guests be paged in id order without sorting them all.
+        Index("ix_guest_users_widget_id_id", "widget_id", "id"),
+    )
 
     id = Column(String, primary_key=True, default=generate_uuid)
     widget_id = Column(String, ForeignKey("widget_settings.id"), nullable=False)
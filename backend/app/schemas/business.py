@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
 
@@ -11,6 +11,8 @@ class BusinessBase(BaseModel):
     logo_url: Optional[str] = None
     is_escalation_enabled: Optional[bool] = False
     escalation_emails: Optional[List[str]] = []
+    rag_top_k: Optional[int] = Field(None, ge=1, le=20)
+    rag_context_tokens: Optional[int] = Field(None, ge=100, le=8000)
 
 class BusinessCreate(BusinessBase):
     pass
@@ -24,6 +26,8 @@ class BusinessUpdate(BaseModel):
     logo_url: Optional[str] = None
     is_escalation_enabled: Optional[bool] = None
     escalation_emails: Optional[List[str]] = None
+    rag_top_k: Optional[int] = Field(None, ge=1, le=20)
+    rag_context_tokens: Optional[int] = Field(None, ge=100, le=8000)
 
 class BusinessResponse(BusinessBase):
     id: str
@@ -58,3 +62,18 @@ class BusinessResponse(BusinessBase):
         from_attributes = True
 
 
+
+class UsageCounter(BaseModel):
+    allocated: int
+    used: int
+    remaining: int
+
+class UsageHistoryDay(BaseModel):
+    date: str
+    ai_response: int = 0
+    escalation: int = 0
+
+class BusinessUsageResponse(BaseModel):
+    ai_responses: UsageCounter
+    escalations: UsageCounter
+    history: List[UsageHistoryDay]
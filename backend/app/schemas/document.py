@@ -16,6 +16,16 @@ class IngestResponse(BaseModel):
     filename: str
     chunks_created: int
     status: str
+    # Re-indexing only embeds chunks whose text changed
+    chunks_unchanged: int = 0
+    chunks_removed: int = 0
+
+class UploadResult(BaseModel):
+    filename: str
+    document_id: str
+    status: str
+    # The same bytes were already uploaded; no new document was created
+    duplicate: bool = False
 
 class DocumentResponse(BaseModel):
     id: str
@@ -23,3 +33,5 @@ class DocumentResponse(BaseModel):
     status: str
     created_at: datetime
     error_message: Optional[str] = None
+    version: int = 1
+    updated_at: Optional[datetime] = None
@@ -39,3 +39,18 @@ class ProductResponse(ProductBase):
 
 class ProductBulkUpload(BaseModel):
     products: List[ProductCreate]
+
+class ProductImportJobResponse(BaseModel):
+    id: str
+    status: str
+    filename: Optional[str] = None
+    imported: int = 0
+    updated: int = 0
+    error_count: int = 0
+    errors: Optional[List[dict]] = None
+    last_error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
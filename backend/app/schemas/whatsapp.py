@@ -85,6 +85,7 @@ class ContactCsvImportResponse(BaseModel):
     imported: int
     skipped: int
     errors: list[str]
+    added_to_list: int = 0
 
 
 class GuestImportRequest(BaseModel):
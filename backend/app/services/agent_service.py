@@ -1,12 +1,15 @@
+import asyncio
 import logging
+import threading
 import warnings
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
-from google.adk.runners import Runner
-from google.genai import types
+if TYPE_CHECKING:
+    from google.adk.runners import Runner
 
-from app.services.agent_system.service import session_service, init_session
-from app.services.agent_system.agent_factory import AgentFactory
+# google-adk (and litellm behind it) takes seconds to import, so the agent
+# stack is loaded off the event loop: by ``start_warm_up`` from the lifespan,
+# or in a worker thread by the first conversation if that comes sooner.
 
 warnings.filterwarnings("ignore")
 
@@ -25,15 +28,36 @@ USER_ID = "test_user"
 SESSION_ID = "test_session"
 
 logging.basicConfig(level=logging.ERROR)
+logger = logging.getLogger(__name__)
 
 
-print("Libraries imported.")
-# print(f"Google API Key set: {'Yes' if os.environ.get('GOOGLE_API_KEY') and os.environ['GOOGLE_API_KEY'] != 'YOUR_GOOGLE_API_KEY' else 'No (REPLACE PLACEHOLDER!)'}")
+def _load_agent_stack():
+    """The agent classes, importing google-adk on the first call."""
+    from google.adk.runners import Runner
+    from app.services.agent_system.service import session_service, init_session
+    from app.services.agent_system.agent_factory import AgentFactory
+    return Runner, session_service, init_session, AgentFactory
 
 
+def _warm_up() -> None:
+    try:
+        _load_agent_stack()
+    except Exception:
+        # The first conversation imports it again and reports the error there
+        logger.exception("Agent stack warm-up failed")
 
-async def call_agent_async(query: str, runner: Runner, user_id: str, session_id: str):
+
+def start_warm_up() -> threading.Thread:
+    """Import the agent stack in a background thread so the first chat doesn't wait for it."""
+    thread = threading.Thread(target=_warm_up, name="agent-warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
+async def call_agent_async(query: str, runner: "Runner", user_id: str, session_id: str):
     """Sends a query to the agent and prints the final response."""
+    from google.genai import types
+
     print(f"\n>>> User Query: {query} (User: {user_id})")
 
     content = types.Content(role='user', parts=[types.Part(text=query)])
@@ -83,6 +107,9 @@ async def run_conversation(
     Returns:
         Agent's response text
     """
+    # Off the loop: a cold import would stall every other request for seconds
+    Runner, session_service, init_session, AgentFactory = await asyncio.to_thread(_load_agent_stack)
+
     if session_id is None:
         session_id = user_id
     
@@ -102,9 +102,14 @@ class AgentFactory:
             f"1. Use 'search_products' for ANY query related to products, prices, stock, or categories.\n"
             f"2. SEARCH QUERY RULES:\n"
             f"   - For specific product/category searches, pass the relevant keyword (e.g. 'solar', 'panel', 'battery').\n"
+            f"   - When the user describes a need rather than a product (e.g. 'something to keep my phone charged during power cuts'), "
+            f"pass that description as the query; search understands meaning, not just keywords.\n"
             f"   - For general questions like 'what do you sell?', 'show me everything', 'what else do you have?', "
             f"'what other products?', or any phrasing asking for the full catalogue, pass an EMPTY STRING '' as the query to retrieve all products.\n"
             f"   - NEVER pass conversational words like 'other', 'more', 'all', 'everything', 'anything' as the query — use '' instead.\n"
+            f"   - Use the 'category', 'min_price', 'max_price' and 'in_stock_only' arguments for filters instead of putting them in the query "
+            f"(e.g. 'batteries under 50' -> query 'battery', max_price 50).\n"
+            f"   - Results are ranked and paginated; if 'has_more' is true and the user wants more, call again with the next 'page'.\n"
             f"3. Provide clear, concise product information. Always include price and availability if known.\n"
             f"4. If a product is out of stock, suggest looking for similar items.\n"
             f"5. If no products match a specific search, politely inform the user and suggest they try a different term.\n\n"
@@ -1,7 +1,9 @@
 from typing import Optional, Dict, Any
+from functools import lru_cache
 import re
 import unicodedata
 import asyncio
+import inspect
 from google.adk.agents.callback_context import CallbackContext
 from google.adk.models.llm_request import LlmRequest
 from google.adk.models.llm_response import LlmResponse
@@ -9,6 +11,8 @@ from google.adk.tools.base_tool import BaseTool
 from google.adk.tools.tool_context import ToolContext
 from google.genai import types
 
+from app.services.agent_system.response_sanitizer import ResponseSanitizer
+
 
 # ---------------------------------------------------------------------------
 # Text normalisation — defeats Unicode homoglyphs, leetspeak, zero-width chars
@@ -24,6 +28,9 @@ _INVISIBLE_RE = re.compile(
     r"[\u200b\u200c\u200d\u200e\u200f\ufeff\u00ad\u034f\u2060\u2061\u2062\u2063\u2064]"
 )
 
+# Runs of whitespace / punctuation used as word separators
+_SEPARATOR_RE = re.compile(r"[\s\-_.*|/\\]+")
+
 
 def _normalize(text: str) -> str:
     """Normalize text to defeat common obfuscation tricks."""
@@ -32,7 +39,7 @@ def _normalize(text: str) -> str:
     # Unicode → closest ASCII (accented chars, Cyrillic look-alikes, etc.)
     text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode()
     # Collapse repeated punctuation / whitespace used as separators
-    text = re.sub(r"[\s\-_.*|/\\]+", " ", text)
+    text = _SEPARATOR_RE.sub(" ", text)
     # Leetspeak
     text = text.translate(_LEET_MAP)
     return text.lower().strip()
@@ -108,6 +115,42 @@ JAILBREAK_PATTERNS = [
 # Compile once for performance
 _COMPILED_PATTERNS = [re.compile(p) for p in JAILBREAK_PATTERNS]
 
+# Literal prefilter. Every pattern above can only match normalized text that
+# contains at least one of these terms, so a message without any of them is
+# cleared in a single pass and the per-pattern loop only runs on candidates.
+# Keep this in sync when adding patterns (normalized text is lowercase with
+# single spaces, so multi-word terms are safe).
+_PREFILTER_TERMS = [
+    # Instruction override / identity manipulation
+    "ignore", "disregard", "forget", "override", "bypass", "from now on",
+    "stop being", "do not follow", "you are now", "pretend", "roleplay",
+    "act as", "imagine you are", "assume the role of", "mode",
+    # Extraction targets
+    "instruction", "prompt", "rule", "guideline", "configuration", "directive", "system",
+    # Tool / architecture probing
+    "tool", "function", "capabilities", "api", "endpoint", "plugin", "are you", "agent",
+    # Known jailbreaks, delimiters and encodings
+    "do anything now", "jailbreak", "<", "[", "```", "###",
+    "base64", "decode this", "rot13", "hex", "binary", "translate from",
+]
+_PREFILTER_RE = re.compile("|".join(re.escape(term) for term in _PREFILTER_TERMS))
+
+# Verdicts for recently scanned messages. Every agent hop of a turn re-sends
+# the same user message, so only the first hop actually scans it.
+_SCAN_CACHE_SIZE = 1024
+
+
+@lru_cache(maxsize=_SCAN_CACHE_SIZE)
+def detect_jailbreak(text: str) -> Optional[str]:
+    """Return the first jailbreak pattern matched in ``text`` (after normalization), or None."""
+    normalized = _normalize(text)
+    if not _PREFILTER_RE.search(normalized):
+        return None
+    for compiled in _COMPILED_PATTERNS:
+        if compiled.search(normalized):
+            return compiled.pattern
+    return None
+
 # Suspicious content thresholds
 _MAX_MESSAGE_LENGTH = 4000  # Extremely long messages are often injection payloads
 
@@ -132,7 +175,8 @@ def block_unsafe_content(
     Defence layers:
     1. Length cap — reject suspiciously long messages (common injection vector)
     2. Text normalisation — defeats Unicode homoglyphs, leetspeak, zero-width chars
-    3. Pattern matching — broad set of jailbreak / prompt-injection signatures
+    3. Pattern matching — broad set of jailbreak / prompt-injection signatures,
+       behind a literal prefilter and memoised so later agent hops are free
     """
     agent_name = callback_context.agent_name
     print(f"--- Callback: block_unsafe_content running for agent: {agent_name} ---")
@@ -154,13 +198,11 @@ def block_unsafe_content(
         print(f"--- Callback: Message too long ({len(last_user_message_text)} chars). Blocking. ---")
         return _safe_response()
 
-    # Layer 2: Normalize then match
-    normalized = _normalize(last_user_message_text)
-
-    for compiled in _COMPILED_PATTERNS:
-        if compiled.search(normalized):
-            print(f"--- Callback: Jailbreak pattern detected: '{compiled.pattern}' ---")
-            return _safe_response()
+    # Layer 2: Normalize then match (memoised across agent hops)
+    matched_pattern = detect_jailbreak(last_user_message_text)
+    if matched_pattern:
+        print(f"--- Callback: Jailbreak pattern detected: '{matched_pattern}' ---")
+        return _safe_response()
 
     return None
 
@@ -207,21 +249,39 @@ INTERNAL_DETAIL_PATTERNS = [
 
 # Hard-block patterns: if the model output matches these, replace the entire response
 _LEAK_PATTERNS = [
-    re.compile(r"CRITICAL OPERATING RULES", re.IGNORECASE),
-    re.compile(r"STRICT SCOPE BOUNDARIES", re.IGNORECASE),
-    re.compile(r"PROMPT INJECTION DEFENCE", re.IGNORECASE),
-    re.compile(r"SECURITY RULES:\s*\n\s*-\s*NEVER", re.IGNORECASE),
-    re.compile(r"CONTEXT-ONLY RESPONSES:\s*\n", re.IGNORECASE),
-    re.compile(r"before_model_callback|after_model_callback|before_tool_callback", re.IGNORECASE),
-    re.compile(r"block_unsafe_content|sanitize_model_response", re.IGNORECASE),
+    r"CRITICAL OPERATING RULES",
+    r"STRICT SCOPE BOUNDARIES",
+    r"PROMPT INJECTION DEFENCE",
+    r"SECURITY RULES:\s*\n\s*-\s*NEVER",
+    r"CONTEXT-ONLY RESPONSES:\s*\n",
+    r"before_model_callback|after_model_callback|before_tool_callback",
+    r"block_unsafe_content|sanitize_model_response",
 ]
 
+# Literal prefilter for the two lists above: every match of every pattern
+# contains at least one of these (case-insensitive). Keep in sync when adding
+# patterns — a response with none of them skips the regex pass.
+_SANITIZER_PREFILTER_TERMS = [
+    # Agents, delegation, tools
+    "agent", "transfer", "delegate", "forward", "get_context", "say_hello", "say_goodbye",
+    "analyze_sentiment", "escalate_to_human", "specialized",
+    # Knowledge base / instructions / vendors
+    "knowledge", "access", "prompt", "instruct", "programm", "configur", "told",
+    "gemini", "google", "litellm", "langchain",
+    # Leak markers
+    "critical operating rules", "strict scope boundaries", "security rules", "context-only responses",
+    "_callback", "block_unsafe_content", "sanitize_model_response",
+]
+
+# Compiled once: leaks are checked first, then the scrub rules apply in order
+response_sanitizer = ResponseSanitizer(_LEAK_PATTERNS, INTERNAL_DETAIL_PATTERNS, _SANITIZER_PREFILTER_TERMS)
+
 def sanitize_model_response(
     callback_context: CallbackContext, llm_response: LlmResponse
 ) -> Optional[LlmResponse]:
     """Sanitizes model responses to remove mentions of internal system details.
 
-    Two passes:
+    Done by ``response_sanitizer`` in two steps:
     1. Hard-block: if the response contains verbatim instruction leaks, replace entirely.
     2. Soft-scrub: regex-replace internal detail mentions with neutral language.
     """
@@ -233,32 +293,15 @@ def sanitize_model_response(
     if not original_text or not isinstance(original_text, str):
         return None
 
-    # Pass 1: hard-block — if the model leaked system instructions, nuke the whole response
-    for leak_re in _LEAK_PATTERNS:
-        if leak_re.search(original_text):
-            print(f"--- Callback: HARD BLOCK — leaked system details detected ('{leak_re.pattern}') ---")
-            return LlmResponse(
-                content=types.Content(
-                    role="model",
-                    parts=[types.Part(
-                        text="I'm here to help with your questions about our services. How can I assist you today?"
-                    )]
-                )
-            )
-
-    # Pass 2: soft-scrub — remove incidental internal mentions
-    sanitized_text = original_text
+    result = response_sanitizer.sanitize(original_text)
 
-    # Apply all sanitization patterns
-    for pattern, replacement in INTERNAL_DETAIL_PATTERNS:
-        try:
-            sanitized_text = re.sub(pattern, replacement, sanitized_text, flags=re.IGNORECASE)
-        except (TypeError, re.error) as e:
-            print(f"--- Callback: Error in sanitization pattern '{pattern}': {e} ---")
-            continue
+    # Hard-block — if the model leaked system instructions, nuke the whole response
+    if result.blocked:
+        print(f"--- Callback: HARD BLOCK — leaked system details detected ('{result.leak_pattern}') ---")
+        return _safe_response()
 
-    # Clean up extra spaces (only horizontal whitespace)
-    sanitized_text = re.sub(r'[ \t]+', ' ', sanitized_text).strip()
+    # Soft-scrub — incidental internal mentions were replaced with neutral language
+    sanitized_text = result.text
 
     # Only return modified response if changes were made
     if sanitized_text != original_text:
@@ -272,19 +315,19 @@ def sanitize_model_response(
 
     return None
 
-async def _run_analysis_in_background(session_id: str, api_key: Optional[str], intents: Optional[list]):
-    """Background task that runs session analysis without blocking."""
+async def _run_analysis_in_background(session_id: str, api_key: Optional[str], intents: Optional[list]) -> bool:
+    """Run and persist the analysis of one session. Returns True if the result was saved.
+
+    Called by ``app.workers.analysis_worker`` for each due job; the debounce in
+    ``analysis_scheduler`` already guarantees the turn's messages are committed.
+    """
     try:
-        # Wait 2 seconds to ensure messages are committed to database
-        # This prevents analyzing incomplete conversation state
-        print(f"--- Callback: Waiting 2s before analysis to ensure DB commit for session {session_id} ---")
-        await asyncio.sleep(2)
-        
         print(f"--- Callback: Starting background analysis for session {session_id} ---")
         
         # Import here to avoid circular dependencies
         from app.services.analysis_agent import analyze_session, persist_analysis
         from app.db.session import SessionLocal
+        from app.core.config import settings
         
         # Create a new database session for this background task
         db = SessionLocal()
@@ -293,10 +336,10 @@ async def _run_analysis_in_background(session_id: str, api_key: Optional[str], i
             # Log analysis parameters
             print(f"--- Callback: Analysis params - API Key: {'present' if api_key else 'MISSING'}, Intents: {intents} ---")
             
-            # Run analysis with timeout protection (max 10 seconds)
+            # Run analysis with timeout protection
             summary, intent = await asyncio.wait_for(
                 analyze_session(db, session_id, intents=intents, api_key=api_key),
-                timeout=10.0
+                timeout=settings.ANALYSIS_TIMEOUT_SECONDS
             )
             
             # Log analysis results before persistence
@@ -310,11 +353,12 @@ async def _run_analysis_in_background(session_id: str, api_key: Optional[str], i
                 print(f"    ✓ Summary: {summary}")
                 print(f"    ✓ Intent: {intent}")
                 print(f"    ✓ Saved at: {updated_session.summary_generated_at}")
+                return True
             else:
                 print(f"--- Callback: Failed to persist analysis for session {session_id} ---")
                 
         except asyncio.TimeoutError:
-            print(f"--- Callback: Analysis timeout for session {session_id} (exceeded 10s) ---")
+            print(f"--- Callback: Analysis timeout for session {session_id} (exceeded {settings.ANALYSIS_TIMEOUT_SECONDS}s) ---")
         except Exception as e:
             print(f"--- Callback: Analysis error for session {session_id}: {type(e).__name__}: {e} ---")
             import traceback
@@ -324,11 +368,29 @@ async def _run_analysis_in_background(session_id: str, api_key: Optional[str], i
             
     except Exception as e:
         print(f"--- Callback: Fatal error in background analysis: {type(e).__name__}: {e} ---")
+    return False
 
-def trigger_session_analysis(
+def _schedule_analysis(session_id: str, intents: Optional[list]) -> None:
+    # Import here to avoid circular dependencies
+    from app.services.analysis_scheduler import analysis_scheduler
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        analysis_scheduler.schedule(db, session_id, intents=intents)
+    finally:
+        db.close()
+
+async def trigger_session_analysis(
     callback_context: CallbackContext, llm_response: LlmResponse
 ) -> Optional[LlmResponse]:
-    """Triggers automatic session analysis after agent response (non-blocking)."""
+    """Queues a debounced session analysis after agent response (non-blocking).
+
+    The analysis itself runs in ``app.workers.analysis_worker``; this only
+    (re)schedules the session's job, so a burst of agent hops and messages
+    results in a single analysis. The upsert runs in a worker thread so the
+    event loop isn't held up by a database round trip on every model hop.
+    """
     try:
         # Extract session_id from state
         session_id = callback_context.state.get("session_id")
@@ -336,14 +398,11 @@ def trigger_session_analysis(
             # No session to analyze (might be a greeting without session)
             return None
         
-        # Extract API key and intents from state
-        api_key = callback_context.state.get("api_key")
         intents = callback_context.state.get("intents")
         
         print(f"--- Callback: trigger_session_analysis for session {session_id} ---")
         
-        # Launch analysis in background (non-blocking)
-        asyncio.create_task(_run_analysis_in_background(session_id, api_key, intents))
+        await asyncio.to_thread(_schedule_analysis, session_id, intents)
         
     except Exception as e:
         # Don't let analysis errors affect the user response
@@ -356,12 +415,14 @@ def chain_callbacks(*callbacks):
     """
     Creates a callback chain that executes multiple callbacks in sequence.
     Each callback can potentially modify the response, and the first non-None
-    response is returned.
+    response is returned. Callbacks may be sync or async.
     """
-    def chained_callback(callback_context: CallbackContext, llm_response: LlmResponse) -> Optional[LlmResponse]:
+    async def chained_callback(callback_context: CallbackContext, llm_response: LlmResponse) -> Optional[LlmResponse]:
         result = llm_response
         for callback in callbacks:
             modified_response = callback(callback_context, result or llm_response)
+            if inspect.isawaitable(modified_response):
+                modified_response = await modified_response
             if modified_response is not None:
                 result = modified_response
         return result if result != llm_response else None
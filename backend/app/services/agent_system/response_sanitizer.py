@@ -0,0 +1,367 @@
+"""
+Compiled sanitizer for model output.
+
+Hard-block (leak) patterns are checked against the original response, then
+the soft-scrub (replacement) rules are applied one after another, each to the
+output of the one before, exactly as a loop of ``re.sub`` calls would: a rule
+can act on text an earlier rule rewrote ("transfer you to the escalation
+agent" is replaced as a delegation phrase before "I can transfer you to" is
+looked at).
+
+Scanning is narrowed by a literal prefilter: every rule must contain one of a
+set of plain terms, so only the text around occurrences of those terms is
+handed to the regex engine. A response without any scrub match (the usual
+case) is scanned by two alternations, the leaks and all scrub rules, and the
+rules are only applied one by one when one of them matched. How far "around"
+is measured with every run of whitespace counted as one character, because
+the rules' ``\s+`` / ``\s*`` have no upper bound.
+
+``ResponseSanitizer.stream()`` returns a ``SanitizerStream`` that applies the
+same steps incrementally to a token stream: each step holds back just enough
+trailing text that a match split across chunks is still caught, and passes
+what it has settled on to the next. Because a rewrite can let a later rule
+match text before it, a stream holds back about one match length per rule.
+"""
+import re
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+# Horizontal whitespace left behind by removed phrases. Equivalent to
+# collapsing ``[ \t]+`` but leaves single spaces alone, which is much faster.
+_HSPACE_RE = re.compile(r"[ \t]{2,}|\t")
+
+# Characters that make up one unit of ``max_match_length``: a whole whitespace run, or one other character.
+_UNIT = r"(?:\s+|\S)"
+_WS_RUN_RE = re.compile(r"\s\s")
+# Whitespace characters that do not start a run, i.e. don't count as a unit.
+_WS_EXTRA_RE = re.compile(r"(?<=\s)\s")
+
+_LEAK = "leak"
+_SCRUB = "scrub"
+
+
+@dataclass(frozen=True)
+class _Rule:
+    regex: "re.Pattern[str]"
+    action: str
+    value: str  # the leak pattern, or the scrub replacement
+
+
+@dataclass
+class SanitizeResult:
+    text: str
+    blocked: bool = False
+    leak_pattern: Optional[str] = None
+
+
+class _RuleSet:
+    """Rules matched together as one case-insensitive alternation (the first
+    alternative that matches at a position wins), narrowed by the prefilter."""
+
+    def __init__(self, rules: Sequence[_Rule], prefilter_terms: Sequence[str], max_match_length: int):
+        self.rules = list(rules)
+        self.max_match_length = max_match_length
+        self._reach_regex = re.compile(f"{_UNIT}{{0,{max_match_length}}}")
+        # Non-capturing on purpose: a named group per alternative makes
+        # CPython's re about twice as slow; the dispatch happens on hits only.
+        self._regex = re.compile("|".join(f"(?:{rule.regex.pattern})" for rule in self.rules), re.IGNORECASE)
+        self._prefilter_terms = tuple(prefilter_terms)
+
+    def _dispatch(self, text: str, pos: int) -> _Rule:
+        """The rule the alternation picked at ``pos``: the first one that matches there."""
+        if len(self.rules) == 1:
+            return self.rules[0]
+        return next(rule for rule in self.rules if rule.regex.match(text, pos))
+
+    def reach(self, text: str, index: int) -> int:
+        """End of the longest stretch of ``text`` from ``index`` that one match could span."""
+        end = min(len(text), index + self.max_match_length)
+        if not _WS_RUN_RE.search(text, index, end):
+            # Usual case, no whitespace runs: one character per unit, bar a run at the end.
+            while end < len(text) and text[end - 1].isspace() and text[end].isspace():
+                end += 1
+            return end
+        return self._reach_regex.match(text, index).end()
+
+    def reach_back(self, text: str, index: int, floor: int, units: Optional[int] = None) -> int:
+        """Start of the longest stretch of ``text`` ending at ``index`` (and not
+        before ``floor``) that one match could span, or ``units`` of them."""
+        units = self.max_match_length if units is None else units
+        i = max(floor, index - units)
+        while True:
+            # A run of whitespace is one unit, so take all of it.
+            while i > floor and text[i].isspace() and text[i - 1].isspace():
+                i -= 1
+            if i == floor:
+                return i
+            # Walk back by the units still missing; a character adds at most one, so this never overshoots.
+            missing = units - (index - i - len(_WS_EXTRA_RE.findall(text, i, index)))
+            if missing <= 0:
+                return i
+            i = max(floor, i - missing)
+
+    def windows(self, text: str, pos: int, limit: int) -> List[Tuple[int, int]]:
+        """Merged ranges of positions in ``[pos, limit)`` where a match could start."""
+        # Substring search on lowercased text is an order of magnitude faster
+        # than an IGNORECASE regex over the same terms.
+        search_end = self.reach(text, limit)
+        lowered = text[pos:search_end].lower()
+        if len(lowered) != search_end - pos:
+            # Lowercasing changed offsets (rare non-ASCII); scan everything.
+            return [(pos, limit)]
+
+        starts = []
+        for term in self._prefilter_terms:
+            i = lowered.find(term)
+            while i != -1:
+                starts.append(pos + i)
+                i = lowered.find(term, i + 1)
+        if not starts:
+            return []
+
+        windows: List[Tuple[int, int]] = []
+        for hit in sorted(starts):
+            # A match containing the term at ``hit`` starts at most one match length
+            # before it. Walking back stops at the previous window, which it would merge with.
+            floor = max(pos, windows[-1][1]) if windows else pos
+            lo, hi = self.reach_back(text, hit, floor), min(limit, hit + 1)
+            if lo >= hi:
+                continue
+            if windows and lo <= windows[-1][1]:
+                windows[-1] = (windows[-1][0], max(windows[-1][1], hi))
+            else:
+                windows.append((lo, hi))
+        return windows
+
+    def matches(
+        self, text: str, pos: int, limit: int, windows: Optional[List[Tuple[int, int]]] = None
+    ) -> Iterator["re.Match[str]"]:
+        """Non-overlapping matches starting in ``[pos, limit)``, left to right.
+
+        ``windows`` may pass in ``windows(text, pos, limit)`` if it is already known.
+        """
+        cursor = pos
+        for lo, hi in self.windows(text, pos, limit) if windows is None else windows:
+            if cursor >= hi:
+                continue
+            # Let a match that starts inside the window run to its natural end.
+            endpos = min(len(text), self.reach(text, hi) + 1)
+            for match in self._regex.finditer(text, max(lo, cursor), endpos):
+                if match.start() >= hi:
+                    break
+                cursor = match.end()
+                yield match
+
+    def scan(
+        self, text: str, limit: int, pos: int = 0, windows: Optional[List[Tuple[int, int]]] = None
+    ) -> Tuple[List[str], int, Optional[str]]:
+        """Rewrite every match in ``text[pos:]`` that starts before ``limit``.
+
+        Returns the output pieces, how far into ``text`` they cover, and the
+        leak pattern if one was found (in which case the pieces are meaningless).
+        Characters before ``pos`` are only context for ``\\b``.
+        """
+        parts: List[str] = []
+        for match in self.matches(text, pos, limit, windows):
+            start = match.start()
+            rule = self._dispatch(text, start)
+            if rule.action == _LEAK:
+                return parts, pos, rule.value
+            parts.append(text[pos:start])
+            parts.append(rule.value)
+            pos = match.end()
+
+        end = max(pos, limit)
+        parts.append(text[pos:end])
+        return parts, end, None
+
+
+class ResponseSanitizer:
+    """Compiled leak detector + scrubber.
+
+    Args:
+        leak_patterns: regexes that, if found anywhere, block the whole response.
+        scrub_rules: ``(pattern, replacement)`` pairs applied in order to everything else.
+        prefilter_terms: literals such that every possible match of every rule
+            contains at least one of them (compared case-insensitively).
+        max_match_length: upper bound on the length of any single match, with
+            each run of whitespace counted as one character. A stream holds
+            back about this much per scrub rule between chunks.
+    """
+
+    def __init__(
+        self,
+        leak_patterns: Sequence[str],
+        scrub_rules: Sequence[Tuple[str, str]],
+        prefilter_terms: Sequence[str],
+        max_match_length: int = 64,
+    ):
+        self.max_match_length = max_match_length
+        terms = [term.lower() for term in prefilter_terms]
+        leaks = [_Rule(re.compile(p, re.IGNORECASE), _LEAK, p) for p in leak_patterns]
+        scrubs = [_Rule(re.compile(p, re.IGNORECASE), _SCRUB, r) for p, r in scrub_rules]
+
+        self._leaks = _RuleSet(leaks, terms, max_match_length)
+        # All scrub rules at once, only to tell whether any of them matches at all
+        self._any_scrub = _RuleSet(scrubs, terms, max_match_length)
+        # One step per rule, so each sees the previous rules' output
+        self._steps = [_RuleSet([rule], terms, max_match_length) for rule in scrubs]
+
+    def sanitize(self, text: str) -> SanitizeResult:
+        """Sanitize a complete response."""
+        if self._leaks.rules:
+            _, _, leak = self._leaks.scan(text, len(text))
+            if leak:
+                return SanitizeResult(text="", blocked=True, leak_pattern=leak)
+        if self._steps:
+            windows = self._any_scrub.windows(text, 0, len(text))
+            if windows and next(self._any_scrub.matches(text, 0, len(text), windows), None):
+                for step in self._steps:
+                    # Every rule set shares the prefilter, so windows only change with the text.
+                    windows = step.windows(text, 0, len(text)) if windows is None else windows
+                    parts, _, _ = step.scan(text, len(text), windows=windows)
+                    if len(parts) > 1:
+                        text, windows = "".join(parts), None
+        return SanitizeResult(text=_HSPACE_RE.sub(" ", text).strip())
+
+    def stream(self) -> "SanitizerStream":
+        return SanitizerStream(self)
+
+
+class _StepStream:
+    """Incremental ``_RuleSet.scan`` over a stream of text.
+
+    ``context`` is the text just before the stream, for word boundaries at its start.
+    """
+
+    def __init__(self, rules: _RuleSet, context: str = ""):
+        self._rules = rules
+        # The last emitted character is kept at the head of the buffer so word
+        # boundaries at the cut behave as they would on the full text.
+        self._buffer = context[-1:]
+        self._context = len(self._buffer)
+
+    def feed(self, chunk: str, final: bool) -> Tuple[str, Optional[str]]:
+        """The settled output so far, and the leak pattern if one was found."""
+        buffer = self._buffer + chunk
+        self._buffer = buffer
+        if final:
+            limit = len(buffer)
+        else:
+            if len(buffer) - self._context < 3 * self._rules.max_match_length:
+                # Wait for at least one match length beyond the hold-back, so each
+                # step scans (and hands on) text in pieces rather than per token.
+                return "", None
+            limit = self._rules.reach_back(buffer, len(buffer), 0, 2 * self._rules.max_match_length)
+            if limit <= self._context:
+                return "", None
+
+        parts, consumed, leak = self._rules.scan(buffer, limit, pos=self._context)
+        if leak:
+            self._buffer = ""
+            return "", leak
+        self._context = 1 if consumed else 0
+        self._buffer = buffer[consumed - self._context:]
+        return "".join(parts), None
+
+
+class SanitizerStream:
+    """Incremental view of a ``ResponseSanitizer`` over a stream of text chunks.
+
+    ``feed`` returns the text that is safe to emit so far; ``close`` flushes the
+    remainder. Once a leak is seen ``blocked`` is set and nothing more is
+    emitted, so the caller should replace whatever it already sent.
+
+    Until a scrub rule first matches, text only goes through the leak step and
+    a check for any scrub match; from there on, through one step per rule. A
+    rule's rewrite can let the next rule match up to one match length (plus a
+    word-boundary character) before it, so text is passed on unchanged only
+    once it is that far per rule ahead of where a match could still appear.
+    """
+
+    def __init__(self, sanitizer: ResponseSanitizer):
+        self._sanitizer = sanitizer
+        self._leaks = _StepStream(sanitizer._leaks)
+        self._steps: Optional[List[_StepStream]] = None if sanitizer._steps else []
+        # Text after the leak step not yet emitted while no scrub rule has matched,
+        # headed by one emitted character for word boundaries
+        self._held = ""
+        self._held_context = 0
+        self._checked = 0
+        self._pending_ws = ""
+        self._started = False
+        self.blocked = False
+        self.leak_pattern: Optional[str] = None
+
+    def feed(self, chunk: str) -> str:
+        if self.blocked:
+            return ""
+        return self._drain(chunk, final=False)
+
+    def close(self) -> str:
+        if self.blocked:
+            return ""
+        return self._drain("", final=True)
+
+    def _scrub(self, text: str, final: bool) -> str:
+        settled = ""
+        if self._steps is None:
+            settled, text = self._hold(text, final)
+        for step in self._steps or ():
+            text, _ = step.feed(text, final)
+        return settled + text
+
+    def _hold(self, text: str, final: bool) -> Tuple[str, str]:
+        """Pass on what is settled while no scrub rule has matched yet.
+
+        Returns that, and the text for the per-rule steps once one has matched
+        (at which point they are set up).
+        """
+        if not text and not final:
+            return "", ""
+        sanitizer = self._sanitizer
+        held = self._held + text
+        limit = len(held) if final else sanitizer._any_scrub.reach_back(held, len(held), 0, 2 * sanitizer.max_match_length)
+        match = next(sanitizer._any_scrub.matches(held, self._checked, limit), None) if limit > self._checked else None
+        self._checked = max(self._checked, limit)
+
+        margin = len(sanitizer._steps) * (sanitizer.max_match_length + 1)
+        if match:
+            cut = sanitizer._any_scrub.reach_back(held, match.start(), self._held_context, margin)
+            self._steps = [_StepStream(step, context=held[:cut]) for step in sanitizer._steps]
+            self._held = ""
+            return held[self._held_context:cut], held[cut:]
+        if final:
+            self._held = ""
+            return held[self._held_context:], ""
+
+        cut = sanitizer._any_scrub.reach_back(held, self._checked, self._held_context, margin)
+        settled = held[self._held_context:cut]
+        if cut:
+            self._held, self._checked, self._held_context = held[cut - 1:], self._checked - cut + 1, 1
+        else:
+            self._held = held
+        return settled, ""
+
+    def _drain(self, text: str, final: bool) -> str:
+        text, leak = self._leaks.feed(text, final)
+        if leak:
+            self.blocked = True
+            self.leak_pattern = leak
+            return ""
+        text = self._scrub(text, final)
+
+        # Same whitespace clean-up as ``sanitize``, carried across chunk boundaries.
+        text = _HSPACE_RE.sub(" ", self._pending_ws + text)
+        if not self._started:
+            text = text.lstrip()
+        if final:
+            self._pending_ws = ""
+            text = text.rstrip()
+        else:
+            stripped = text.rstrip()
+            self._pending_ws = text[len(stripped):]
+            text = stripped
+        if text:
+            self._started = True
+        return text
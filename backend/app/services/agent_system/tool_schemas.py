@@ -116,6 +116,12 @@ class EscalateToHumanOutput(BaseModel):
 class SearchProductsInput(BaseModel):
     """Input for product search tool."""
     query: str = Field(..., description="Search term for products (name, category, or description)")
+    category: Optional[str] = Field(None, description="Only products in this category")
+    min_price: Optional[float] = Field(None, ge=0, description="Minimum price")
+    max_price: Optional[float] = Field(None, ge=0, description="Maximum price")
+    in_stock_only: bool = Field(False, description="Only products with stock available")
+    limit: int = Field(10, ge=1, description="Maximum number of products to return")
+    page: int = Field(1, ge=1, description="Page of results, starting at 1")
 
 class ProductToolSchema(BaseModel):
     """Internal schema for product data returned to the agent."""
@@ -131,6 +137,8 @@ class SearchProductsOutput(BaseModel):
     """Output for product search tool."""
     products: list[ProductToolSchema]
     count: int
+    page: int = 1
+    has_more: bool = False
 
 
 class OrderItemInput(BaseModel):
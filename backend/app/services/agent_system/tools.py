@@ -19,7 +19,8 @@ from app.services.agent_system.tool_schemas import (
 )
 import json
 from decimal import Decimal
-from app.core.subscription import TIER_LIMITS
+from app.services.entitlements import entitlement_service
+from app.services.product_search import product_search
 from app.core.config import settings
 
 
@@ -250,10 +251,9 @@ def escalate_to_human(reason: str, user_message: str, tool_context: ToolContext)
             return "I apologize, but human escalation is currently not available for this service."
             
         # Check limits
-        tier = business.subscription_tier or "spark"
-        max_escalations = TIER_LIMITS.get(tier, {}).get("max_monthly_escalations", 5)
+        entitlements = entitlement_service.get(db, widget.user_id, business=business)
         
-        if business.used_escalations >= max_escalations:
+        if entitlements.escalations_remaining <= 0:
             print(f"Escalation Limit Reached for business {business.id}")
             return "I apologize, but we cannot process further escalations at this time due to high volume."
 
@@ -270,11 +270,11 @@ def escalate_to_human(reason: str, user_message: str, tool_context: ToolContext)
                 sentiment="Negative", # Default or should be passed.
                 status=EscalationStatus.PENDING.value
             )
-            db.add(escalation)
-            
             # Increment usage only on new creation
-            business.used_escalations += 1
-            db.add(business)
+            if not entitlement_service.consume_escalation(db, entitlements, reference=session_id):
+                print(f"Escalation Limit Reached for business {business.id}")
+                return "I apologize, but we cannot process further escalations at this time due to high volume."
+            db.add(escalation)
             
         db.commit()
         db.refresh(escalation)
@@ -326,20 +326,43 @@ def escalate_to_human(reason: str, user_message: str, tool_context: ToolContext)
     finally:
         db.close()
 
-def search_products(query: str, tool_context: ToolContext) -> str:
+def search_products(
+    query: str,
+    tool_context: ToolContext,
+    category: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    in_stock_only: bool = False,
+    limit: Optional[int] = None,
+    page: int = 1,
+) -> str:
     """Searches the product catalogue for items matching the query.
     
     Args:
-        query: Search term (name, category, description).
+        query: What the customer is looking for, in their words or as keywords. Empty string lists the catalogue.
         tool_context: Context containing business user_id.
+        category: Only return products in this category.
+        min_price: Only return products costing at least this much.
+        max_price: Only return products costing at most this much.
+        in_stock_only: Only return products that are in stock.
+        limit: Maximum number of products to return (default 10).
+        page: Page of results, starting at 1. Use the next page when has_more is true.
         
     Returns:
-        JSON string with list of matching products.
+        JSON string with the best matching products, best match first.
     """
     print(f"--- Tool: search_products called for: {query} ---")
     
     try:
-        validated_input = SearchProductsInput(query=query)
+        validated_input = SearchProductsInput(
+            query=query,
+            category=category,
+            min_price=min_price,
+            max_price=max_price,
+            in_stock_only=in_stock_only,
+            limit=limit or settings.PRODUCT_SEARCH_DEFAULT_LIMIT,
+            page=page,
+        )
     except Exception as e:
         return f"Error: Invalid input - {str(e)}"
 
@@ -354,31 +377,39 @@ def search_products(query: str, tool_context: ToolContext) -> str:
         if not business:
             return "Error: Business not found for this session."
 
-        # 2. Search products
-        search_term = f"%{validated_input.query}%"
-        products = db.query(Product).filter(
-            Product.business_id == business.id,
-            Product.is_active,
-            (Product.name.ilike(search_term)) | 
-            (Product.category.ilike(search_term)) | 
-            (Product.description.ilike(search_term)) |
-            (Product.sku.ilike(search_term))
-        ).all()
-
-        # 3. Format output
+        # 2. Search products (ranked, filtered and paginated)
+        result = product_search.search(
+            db,
+            business.id,
+            query=validated_input.query,
+            category=validated_input.category,
+            min_price=validated_input.min_price,
+            max_price=validated_input.max_price,
+            in_stock_only=validated_input.in_stock_only,
+            limit=validated_input.limit,
+            offset=(validated_input.page - 1) * validated_input.limit,
+            api_key=tool_context.state.get("api_key") or settings.GOOGLE_API_KEY,
+        )
+
+        # 3. Format output (descriptions trimmed to keep the prompt small)
         product_list = [
             ProductToolSchema(
                 name=p.name,
                 price=float(p.price),
                 currency=p.currency,
                 sku=p.sku,
-                description=p.description,
+                description=_preview(p.description),
                 stock_quantity=p.stock_quantity,
                 image_urls=p.image_urls
-            ) for p in products
+            ) for p in result.products
         ]
         
-        output = SearchProductsOutput(products=product_list, count=len(product_list))
+        output = SearchProductsOutput(
+            products=product_list,
+            count=len(product_list),
+            page=validated_input.page,
+            has_more=result.has_more,
+        )
         return json.dumps(output.model_dump())
 
     except Exception as e:
@@ -388,6 +419,12 @@ def search_products(query: str, tool_context: ToolContext) -> str:
         db.close()
 
 
+def _preview(text: Optional[str], max_chars: int = 200) -> Optional[str]:
+    if not text or len(text) <= max_chars:
+        return text
+    return text[:max_chars].rstrip() + "..."
+
+
 def create_order(
     customer_name: str,
     items: list[dict],
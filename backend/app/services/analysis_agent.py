@@ -1,20 +1,50 @@
 import json
 from datetime import datetime, timezone
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
 from app.models.widget import GuestMessage
 from app.models.chat_session import ChatSession
 
-# Use specific client for multi-tenant API key support
-from google import genai
 from app.core.config import settings
+from app.utils.lazy import LazyModule
+
+# Use specific client for multi-tenant API key support (imported on first use)
+genai = LazyModule("google.genai")
+types = LazyModule("google.genai.types")
 
 INTENT_ENUM = ["Support", "Sales", "Feedback", "Bug Report", "General"]
 
+def _new_messages(db: Session, session: ChatSession, window: int) -> Tuple[List[GuestMessage], bool]:
+    """Messages after the session's analysis high-water mark, oldest first.
+
+    At most ``window`` of the newest are returned; the flag says whether older
+    unanalysed messages were left out.
+    """
+    query = db.query(GuestMessage).filter(GuestMessage.session_id == session.id)
+    if session.analyzed_message_at is not None:
+        query = query.filter(or_(
+            GuestMessage.created_at > session.analyzed_message_at,
+            and_(
+                GuestMessage.created_at == session.analyzed_message_at,
+                GuestMessage.id > session.analyzed_message_id,
+            ),
+        ))
+    newest = query.order_by(GuestMessage.created_at.desc(), GuestMessage.id.desc()).limit(window + 1).all()
+    truncated = len(newest) > window
+    return list(reversed(newest[:window])), truncated
+
+
 async def analyze_session(db: Session, session_id: str, intents: Optional[List[str]] = None, api_key: str = None) -> Tuple[str, str]:
     """
     Analyzes a chat session to generate a summary and determine intent.
     Returns (summary, intent).
+
+    Incremental: only messages after the session's high-water mark
+    (``analyzed_message_id`` / ``analyzed_message_at``) are sent, together
+    with the existing summary, and at most ``ANALYSIS_WINDOW_MESSAGES`` of
+    them. On success the mark is advanced on the loaded session; it is
+    saved with the summary by ``persist_analysis`` on the same ``db``.
     """
     print(f"\n=== Analysis Agent: Starting analysis for session {session_id} ===")
     
@@ -28,15 +58,20 @@ async def analyze_session(db: Session, session_id: str, intents: Optional[List[s
         print(f"Analysis Agent: Session {session_id} not found in database — skipping analysis")
         return "No session record", "General"
         
-    messages = db.query(GuestMessage).filter(GuestMessage.session_id == session_id).order_by(GuestMessage.created_at).all()
+    messages, truncated = _new_messages(db, session, settings.ANALYSIS_WINDOW_MESSAGES)
     
-    print(f"Analysis Agent: Found {len(messages)} messages in session")
+    print(f"Analysis Agent: Found {len(messages)} new messages in session{' (window truncated)' if truncated else ''}")
     
     if not messages:
+        if session.summary:
+            print("Analysis Agent: No new messages since last analysis")
+            return session.summary, session.top_intent or "General"
         print("Analysis Agent: No messages to analyze")
         return "No messages in session", "General"
         
     conversation_text = ""
+    if truncated:
+        conversation_text += "[Earlier messages omitted]\n"
     for msg in messages:
         role = "User" if msg.sender == "guest" else "Agent"
         conversation_text += f"{role}: {msg.message_text}\n"
@@ -51,18 +86,18 @@ async def analyze_session(db: Session, session_id: str, intents: Optional[List[s
         
     # Construct Prompt
     prompt = f"""
-    You are an expert Conversation Analyst. Your task is to analyze the following chat transcript between a User and an AI Agent.
+    You are an expert Conversation Analyst. Your task is to analyze a chat between a User and an AI Agent.
     
-    Existing Summary: {session.summary or "None"}
+    Existing Summary (covers the conversation so far): {session.summary or "None"}
     Existing Intent: {session.top_intent or "None"}
     
-    TRANSCRIPT:
+    NEW MESSAGES SINCE THE EXISTING SUMMARY:
     {conversation_text}
     
     INSTRUCTIONS:
-    1. Generate a concise summary of the conversation (max 2-3 sentences). usage: "User asked about X, Agent provided Y."
+    1. Generate a concise summary of the whole conversation (max 2-3 sentences). usage: "User asked about X, Agent provided Y."
     2. Determine the Top Intent from this list: {intent_list}.
-    3. If an existing summary exists, use it as context but update it to reflect the full conversation.
+    3. If an existing summary exists, treat it as the record of everything before the new messages and update it with them.
     
     Output correctly formatted JSON only:
     {{
@@ -105,6 +140,10 @@ async def analyze_session(db: Session, session_id: str, intents: Optional[List[s
             else:
                 intent = intent_list[-1] 
         
+        # Advance the high-water mark; committed together with the summary.
+        session.analyzed_message_id = messages[-1].id
+        session.analyzed_message_at = messages[-1].created_at
+        
         print(f"=== Analysis Agent: Complete - Summary length: {len(summary)} chars, Intent: {intent} ===\n")
         return summary, intent
         
@@ -114,6 +153,74 @@ async def analyze_session(db: Session, session_id: str, intents: Optional[List[s
         traceback.print_exc()
         return session.summary or "Error generating summary", session.top_intent or "General"
 
+async def analyze_sessions_batch(
+    transcripts: Dict[str, str],
+    intents: Optional[List[str]] = None,
+    api_key: str = None,
+) -> Dict[str, Tuple[str, str]]:
+    """
+    Analyzes several sessions in a single LLM request.
+    ``transcripts`` maps a caller-chosen key to a formatted transcript; returns
+    ``{key: (summary, intent)}`` for every session the model answered for.
+    Missing keys mean the caller should retry those sessions.
+    """
+    if not api_key or not transcripts:
+        return {}
+
+    intent_list = intents if intents and len(intents) > 0 else INTENT_ENUM
+    sessions_text = "\n".join(
+        f"### SESSION {key}\n{transcript}" for key, transcript in transcripts.items()
+    )
+
+    prompt = f"""
+    You are an expert Conversation Analyst. Below are {len(transcripts)} separate chats between a User and an AI Agent.
+    Analyze each one independently.
+    
+    {sessions_text}
+    
+    INSTRUCTIONS:
+    1. For each session, generate a concise summary (max 2-3 sentences). usage: "User asked about X, Agent provided Y."
+    2. For each session, determine the Top Intent from this list: {intent_list}.
+    3. A session that starts with "Existing summary" was analysed before: treat that summary as the record of everything before its new messages and update it with them.
+    
+    Output a JSON array with exactly one object per session:
+    [
+        {{"session": "<session key>", "summary": "...", "intent": "..."}}
+    ]
+    """
+
+    try:
+        client = genai.Client(api_key=api_key)
+        response = await client.aio.models.generate_content(
+            model=settings.GEMINI_MODEL,
+            contents=prompt,
+            config=types.GenerateContentConfig(response_mime_type="application/json"),
+        )
+        content = response.text
+        if "```json" in content:
+            content = content.replace("```json", "").replace("```", "")
+        elif "```" in content:
+            content = content.replace("```", "")
+
+        data = json.loads(content)
+    except Exception as e:
+        print(f"Analysis Agent: Batch analysis failed: {type(e).__name__}: {e}")
+        return {}
+
+    results = {}
+    for item in data if isinstance(data, list) else []:
+        if not isinstance(item, dict):
+            continue
+        key = str(item.get("session", ""))
+        summary = item.get("summary")
+        if key not in transcripts or not summary:
+            continue
+        intent = item.get("intent")
+        if intent not in intent_list:
+            intent = "General" if "General" in intent_list else intent_list[-1]
+        results[key] = (summary, intent)
+    return results
+
 async def persist_analysis(db: Session, session_id: str, summary: str, intent: str):
     session = db.query(ChatSession).filter(ChatSession.id == session_id).first()
     if session:
@@ -0,0 +1,211 @@
+"""
+Durable, debounced queue for chat session analysis.
+
+``trigger_session_analysis`` runs after every model response of every agent,
+so it must not start an LLM call itself. Instead it calls ``schedule``, which
+upserts the session's single ``analysis_jobs`` row and pushes its ``run_after``
+out by the debounce window: a burst of messages produces one analysis, run
+once the conversation has been quiet for ``ANALYSIS_DEBOUNCE_SECONDS``.
+A job that is already RUNNING stays RUNNING (so no second worker picks the
+session up); its ``generation`` is bumped, and ``complete`` or ``fail`` puts it
+back in the queue when the run it finished is no longer the current one.
+
+``app.workers.analysis_worker`` claims due jobs with ``claim_due`` and runs
+them on a bounded pool. Jobs live in the database, so nothing is lost on
+restart. A claim is a lease: ``recover`` puts a job back in the queue only
+once it has been RUNNING for longer than ``lease_seconds`` (its worker
+crashed), so a starting replica leaves its peers' jobs alone.
+"""
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import and_, case, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.analysis_job import AnalysisJob, AnalysisJobStatus, generate_uuid
+
+logger = logging.getLogger(__name__)
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes; everything is stored in UTC.
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+@dataclass
+class ClaimedJob:
+    id: str
+    session_id: str
+    intents: Optional[list]
+    generation: int
+    attempts: int
+
+
+class AnalysisScheduler:
+    def __init__(self, debounce_seconds: int = 30, max_attempts: int = 3, lease_seconds: int = 120):
+        self.debounce = timedelta(seconds=debounce_seconds)
+        self.max_attempts = max_attempts
+        self.lease = timedelta(seconds=lease_seconds)
+
+    # --- Producer side ---
+
+    def schedule(self, db: Session, session_id: str, intents: Optional[list] = None) -> None:
+        """(Re)schedule analysis of a session ``debounce`` seconds from now. Commits."""
+        now = datetime.now(timezone.utc)
+        for _ in range(2):
+            # One UPDATE, so concurrent triggers each bump the generation.
+            running = AnalysisJob.status == AnalysisJobStatus.RUNNING.value
+            finished = AnalysisJob.status.in_([AnalysisJobStatus.DONE.value, AnalysisJobStatus.FAILED.value])
+            updated = db.query(AnalysisJob).filter(AnalysisJob.session_id == session_id).update({
+                # Lag is measured from the first request after the last run started.
+                AnalysisJob.requested_at: case(
+                    (finished, now),
+                    (and_(running, AnalysisJob.requested_at <= AnalysisJob.started_at), now),
+                    else_=AnalysisJob.requested_at,
+                ),
+                AnalysisJob.attempts: case((finished, 0), else_=AnalysisJob.attempts),
+                # A running job is left to its worker; ``complete``/``fail`` requeue it.
+                AnalysisJob.status: case((running, AnalysisJobStatus.RUNNING.value),
+                                         else_=AnalysisJobStatus.PENDING.value),
+                AnalysisJob.run_after: now + self.debounce,
+                AnalysisJob.generation: AnalysisJob.generation + 1,
+                AnalysisJob.intents: intents,
+            }, synchronize_session=False)
+            if not updated:
+                db.add(AnalysisJob(
+                    id=generate_uuid(),
+                    session_id=session_id,
+                    intents=intents,
+                    status=AnalysisJobStatus.PENDING.value,
+                    run_after=now + self.debounce,
+                    requested_at=now,
+                    generation=1,
+                ))
+            try:
+                db.commit()
+                return
+            except IntegrityError:
+                # Another replica inserted the row first; update it instead.
+                db.rollback()
+        logger.warning(f"Could not schedule analysis for session {session_id}")
+
+    # --- Consumer side ---
+
+    def claim_due(self, db: Session, limit: int) -> List[ClaimedJob]:
+        """Mark up to ``limit`` due jobs as running and return them. Commits.
+
+        Uses ``FOR UPDATE SKIP LOCKED`` so several workers can share the queue
+        (ignored on SQLite, where only one worker should run).
+        """
+        if limit <= 0:
+            return []
+        now = datetime.now(timezone.utc)
+        jobs = db.query(AnalysisJob).filter(
+            AnalysisJob.status == AnalysisJobStatus.PENDING.value,
+            AnalysisJob.run_after <= now,
+        ).order_by(AnalysisJob.run_after).limit(limit).with_for_update(skip_locked=True).all()
+
+        claimed = []
+        for job in jobs:
+            job.status = AnalysisJobStatus.RUNNING.value
+            job.started_at = now
+            job.attempts = (job.attempts or 0) + 1
+            claimed.append(ClaimedJob(
+                id=job.id,
+                session_id=job.session_id,
+                intents=job.intents,
+                generation=job.generation,
+                attempts=job.attempts,
+            ))
+        db.commit()
+        return claimed
+
+    def complete(self, db: Session, job: ClaimedJob) -> None:
+        """Mark a run as finished, or requeue it if the session was rescheduled meanwhile. Commits."""
+        done = db.query(AnalysisJob).filter(
+            AnalysisJob.id == job.id,
+            AnalysisJob.generation == job.generation,
+        ).update({
+            AnalysisJob.status: AnalysisJobStatus.DONE.value,
+            AnalysisJob.finished_at: datetime.now(timezone.utc),
+            AnalysisJob.last_error: None,
+        }, synchronize_session=False)
+        if not done:
+            self._requeue_rescheduled(db, job, {AnalysisJob.attempts: 0, AnalysisJob.last_error: None})
+        db.commit()
+
+    def fail(self, db: Session, job: ClaimedJob, error: str) -> None:
+        """Retry with backoff, or give up after ``max_attempts``. Commits."""
+        now = datetime.now(timezone.utc)
+        if job.attempts >= self.max_attempts:
+            values = {AnalysisJob.status: AnalysisJobStatus.FAILED.value, AnalysisJob.finished_at: now}
+        else:
+            backoff = self.debounce * (2 ** (job.attempts - 1))
+            values = {AnalysisJob.status: AnalysisJobStatus.PENDING.value, AnalysisJob.run_after: now + backoff}
+        values[AnalysisJob.last_error] = error[:1000]
+
+        failed = db.query(AnalysisJob).filter(
+            AnalysisJob.id == job.id,
+            AnalysisJob.generation == job.generation,
+        ).update(values, synchronize_session=False)
+        if not failed:
+            self._requeue_rescheduled(db, job, {AnalysisJob.last_error: error[:1000]})
+        db.commit()
+
+    def _requeue_rescheduled(self, db: Session, job: ClaimedJob, values: dict) -> None:
+        """Hand a job rescheduled during its run back to the queue, due at its debounced ``run_after``."""
+        db.query(AnalysisJob).filter(
+            AnalysisJob.id == job.id,
+            AnalysisJob.status == AnalysisJobStatus.RUNNING.value,
+        ).update({AnalysisJob.status: AnalysisJobStatus.PENDING.value, **values}, synchronize_session=False)
+
+    def recover(self, db: Session) -> int:
+        """Return jobs whose lease ran out (left RUNNING by a dead worker) to the queue. Commits."""
+        now = datetime.now(timezone.utc)
+        count = db.query(AnalysisJob).filter(
+            AnalysisJob.status == AnalysisJobStatus.RUNNING.value,
+            AnalysisJob.started_at < now - self.lease,
+        ).update({
+            AnalysisJob.status: AnalysisJobStatus.PENDING.value,
+            AnalysisJob.run_after: now,
+        }, synchronize_session=False)
+        db.commit()
+        return count
+
+    # --- Metrics ---
+
+    def metrics(self, db: Session) -> Dict[str, float]:
+        """Queue depth per status plus lag of the oldest due job.
+
+        ``lag_seconds`` is how long the oldest due job has been waiting since
+        it was first requested (debounce included); it should stay close to
+        the debounce window when the pool keeps up.
+        """
+        now = datetime.now(timezone.utc)
+        counts = dict(
+            db.query(AnalysisJob.status, func.count(AnalysisJob.id)).group_by(AnalysisJob.status).all()
+        )
+        due = db.query(func.count(AnalysisJob.id), func.min(AnalysisJob.requested_at)).filter(
+            AnalysisJob.status == AnalysisJobStatus.PENDING.value,
+            AnalysisJob.run_after <= now,
+        ).one()
+
+        oldest = due[1]
+        return {
+            "pending": counts.get(AnalysisJobStatus.PENDING.value, 0),
+            "due": due[0] or 0,
+            "running": counts.get(AnalysisJobStatus.RUNNING.value, 0),
+            "failed": counts.get(AnalysisJobStatus.FAILED.value, 0),
+            "lag_seconds": (now - _as_utc(oldest)).total_seconds() if oldest else 0.0,
+        }
+
+
+analysis_scheduler = AnalysisScheduler(
+    debounce_seconds=settings.ANALYSIS_DEBOUNCE_SECONDS,
+    max_attempts=settings.ANALYSIS_MAX_ATTEMPTS,
+    lease_seconds=settings.ANALYSIS_LEASE_SECONDS,
+)
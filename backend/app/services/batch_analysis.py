@@ -0,0 +1,262 @@
+"""
+Bulk (re-)analysis of chat sessions, e.g. a nightly backfill.
+
+Sessions that have never been summarised, or whose ``summary_generated_at`` is
+older than the staleness cut-off and who have had messages since, are walked
+in ``ChatSession.id`` order one page at a time. A session already summarised
+is sent with its existing summary and only the messages after its analysis
+high-water mark, so the new summary still covers the whole conversation.
+
+Each page is grouped by tenant (sessions share the owning business's intent
+list) and packed into requests of several short transcripts, which
+``analyze_sessions_batch`` answers with one JSON object per session. Requests
+run with bounded concurrency.
+
+After every page the last session id is written to a checkpoint file, so an
+interrupted run picks up where it stopped. The file is removed once the run
+reaches the end.
+"""
+import asyncio
+import json
+import logging
+import os
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, exists, or_
+from sqlalchemy.orm import Session
+
+from app.models.business import Business
+from app.models.chat_session import ChatSession
+from app.models.widget import GuestMessage, GuestUser, WidgetSettings
+from app.services.analysis_agent import analyze_sessions_batch
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Item:
+    session_id: str
+    transcript: str
+    last_message_id: str
+    last_message_at: datetime
+
+
+@dataclass
+class BatchAnalysisStats:
+    selected: int = 0
+    analyzed: int = 0
+    failed: int = 0
+    requests: int = 0
+    last_session_id: Optional[str] = None
+    failed_ids: List[str] = field(default_factory=list)
+
+
+def load_checkpoint(path: Optional[str]) -> Optional[str]:
+    if not path or not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f).get("last_session_id")
+
+
+def save_checkpoint(path: Optional[str], last_session_id: str) -> None:
+    if not path:
+        return
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump({"last_session_id": last_session_id}, f)
+    os.replace(tmp, path)
+
+
+class BatchAnalyzer:
+    """
+    Args:
+        sessions_per_request: max transcripts packed into one LLM request.
+        max_request_chars: max total transcript characters per request.
+        max_transcript_chars: a longer transcript keeps only its most recent part.
+        window_messages: max new messages read per session (the most recent ones).
+        concurrency: max LLM requests in flight.
+        page_size: sessions selected (and checkpointed) at a time.
+    """
+
+    def __init__(
+        self,
+        sessions_per_request: int = 10,
+        max_request_chars: int = 24000,
+        max_transcript_chars: int = 4000,
+        window_messages: int = 40,
+        concurrency: int = 4,
+        page_size: int = 200,
+    ):
+        self.sessions_per_request = sessions_per_request
+        self.max_request_chars = max_request_chars
+        self.max_transcript_chars = max_transcript_chars
+        self.window_messages = window_messages
+        self.concurrency = concurrency
+        self.page_size = page_size
+
+    # --- Selection ---
+
+    def select_page(
+        self,
+        db: Session,
+        stale_before: datetime,
+        after_id: Optional[str] = None,
+        business_id: Optional[str] = None,
+    ) -> List[Tuple[str, Optional[list]]]:
+        """Next page of ``(session_id, business intents)`` with messages not yet summarised."""
+        query = db.query(ChatSession.id, Business.intents).join(
+            GuestUser, GuestUser.id == ChatSession.guest_id
+        ).join(
+            WidgetSettings, WidgetSettings.id == GuestUser.widget_id
+        ).outerjoin(
+            Business, Business.user_id == WidgetSettings.user_id
+        ).filter(
+            or_(ChatSession.summary.is_(None), ChatSession.summary_generated_at < stale_before),
+            exists().where(
+                GuestMessage.session_id == ChatSession.id,
+                or_(
+                    ChatSession.summary_generated_at.is_(None),
+                    GuestMessage.created_at > ChatSession.summary_generated_at,
+                ),
+            ),
+        )
+        if business_id:
+            query = query.filter(Business.id == business_id)
+        if after_id:
+            query = query.filter(ChatSession.id > after_id)
+        return [(row[0], row[1]) for row in query.order_by(ChatSession.id).limit(self.page_size).all()]
+
+    def load_transcripts(self, db: Session, session_ids: List[str]) -> Dict[str, _Item]:
+        """Formatted transcripts of each session's messages since its last analysis
+        (the most recent ``window_messages``), after its existing summary."""
+        sessions = {s.id: s for s in db.query(ChatSession).filter(ChatSession.id.in_(session_ids)).all()}
+        recent: Dict[str, deque] = defaultdict(lambda: deque(maxlen=self.window_messages))
+        # Messages after the high-water mark, as in analysis_agent._new_messages
+        messages = db.query(GuestMessage).join(ChatSession, ChatSession.id == GuestMessage.session_id).filter(
+            GuestMessage.session_id.in_(session_ids),
+            or_(
+                ChatSession.summary.is_(None),
+                ChatSession.analyzed_message_at.is_(None),
+                GuestMessage.created_at > ChatSession.analyzed_message_at,
+                and_(
+                    GuestMessage.created_at == ChatSession.analyzed_message_at,
+                    GuestMessage.id > ChatSession.analyzed_message_id,
+                ),
+            ),
+        ).order_by(GuestMessage.session_id, GuestMessage.created_at, GuestMessage.id).all()
+        for msg in messages:
+            recent[msg.session_id].append(msg)
+
+        items = {}
+        for session_id, window in recent.items():
+            lines = [f"{'User' if m.sender == 'guest' else 'Agent'}: {m.message_text}" for m in window]
+            transcript = "\n".join(lines)
+            if len(transcript) > self.max_transcript_chars:
+                transcript = "[Earlier messages omitted]\n" + transcript[-self.max_transcript_chars:]
+            summary = sessions[session_id].summary
+            if summary:
+                transcript = f"Existing summary: {summary}\nNew messages:\n{transcript}"
+            items[session_id] = _Item(session_id, transcript, window[-1].id, window[-1].created_at)
+        return items
+
+    def pack(self, items: List[_Item]) -> List[List[_Item]]:
+        """Split items into requests bounded by count and total characters."""
+        batches: List[List[_Item]] = []
+        current: List[_Item] = []
+        size = 0
+        for item in items:
+            if current and (
+                len(current) >= self.sessions_per_request
+                or size + len(item.transcript) > self.max_request_chars
+            ):
+                batches.append(current)
+                current, size = [], 0
+            current.append(item)
+            size += len(item.transcript)
+        if current:
+            batches.append(current)
+        return batches
+
+    # --- Execution ---
+
+    async def run(
+        self,
+        db: Session,
+        api_key: str,
+        stale_before: datetime,
+        business_id: Optional[str] = None,
+        checkpoint_path: Optional[str] = None,
+        max_sessions: Optional[int] = None,
+    ) -> BatchAnalysisStats:
+        stats = BatchAnalysisStats()
+        after_id = load_checkpoint(checkpoint_path)
+        if after_id:
+            logger.info(f"Batch analysis: resuming after session {after_id}")
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        while max_sessions is None or stats.selected < max_sessions:
+            page = self.select_page(db, stale_before, after_id=after_id, business_id=business_id)
+            if max_sessions is not None:
+                page = page[:max_sessions - stats.selected]
+            if not page:
+                if checkpoint_path and os.path.exists(checkpoint_path):
+                    os.remove(checkpoint_path)
+                break
+
+            stats.selected += len(page)
+            items = self.load_transcripts(db, [session_id for session_id, _ in page])
+
+            by_tenant: Dict[tuple, List[_Item]] = defaultdict(list)
+            for session_id, intents in page:
+                if session_id in items:
+                    by_tenant[tuple(intents or ())].append(items[session_id])
+
+            async def run_batch(batch: List[_Item], intents: Optional[list]):
+                async with semaphore:
+                    results = await analyze_sessions_batch(
+                        {str(i): item.transcript for i, item in enumerate(batch)},
+                        intents=intents,
+                        api_key=api_key,
+                    )
+                return batch, results
+
+            tasks = [
+                run_batch(batch, list(intents) or None)
+                for intents, tenant_items in by_tenant.items()
+                for batch in self.pack(tenant_items)
+            ]
+            stats.requests += len(tasks)
+            for batch, results in await asyncio.gather(*tasks):
+                self._persist(db, batch, results, stats)
+
+            after_id = page[-1][0]
+            stats.last_session_id = after_id
+            save_checkpoint(checkpoint_path, after_id)
+            logger.info(
+                f"Batch analysis: {stats.analyzed} analyzed, {stats.failed} failed, "
+                f"{stats.requests} requests (through session {after_id})"
+            )
+
+        return stats
+
+    def _persist(self, db: Session, batch: List[_Item], results: Dict[str, Tuple[str, str]], stats: BatchAnalysisStats) -> None:
+        now = datetime.now(timezone.utc)
+        sessions = {
+            s.id: s for s in db.query(ChatSession).filter(ChatSession.id.in_([item.session_id for item in batch])).all()
+        }
+        for i, item in enumerate(batch):
+            session = sessions.get(item.session_id)
+            result = results.get(str(i))
+            if not session or not result:
+                stats.failed += 1
+                stats.failed_ids.append(item.session_id)
+                continue
+            session.summary, session.top_intent = result
+            session.summary_generated_at = now
+            session.analyzed_message_id = item.last_message_id
+            session.analyzed_message_at = item.last_message_at
+            stats.analyzed += 1
+        db.commit()
@@ -0,0 +1,254 @@
+"""
+Text extraction for uploaded documents, as a stream of pages.
+
+PDF pages are extracted in a process pool (pypdf is pure Python, so threads
+would serialise on the GIL). The pages are cut into batches and each worker
+opens the file itself, extracts a batch and returns its texts. Batches come
+back in page order with at most two per worker in flight, so a 1,000-page
+manual keeps every core busy while memory holds a few batches rather than
+the whole text. PDFs of a single batch are extracted inline. Other files are
+read as one page.
+
+Every document has a budget: file size (``max_bytes``), page count
+(``max_pages``) and time spent waiting for extraction (``timeout``). Going
+over any of them raises ``DocumentExtractionError`` before more pages are
+read. A page that is already being extracted when the time runs out finishes
+in its worker, but its result is dropped.
+
+PDFs are read through a read-only memory map (``map_file``), so the workers
+share the file's pages in the OS page cache instead of each reading a copy.
+A worker keeps its reader between batches of one document, keyed on the file
+version (path, inode, mtime, size) so a replaced file is never read through
+a stale reader, and unmaps it once idle.
+
+The pool uses the ``spawn`` start method: forking the API process, which
+runs threads, is not safe. Every API worker has its own pool, so by default
+each gets an equal share of the cores rather than one process per core.
+"""
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+from app.core.config import settings
+from app.core.deployment import available_cpus
+from app.services.file_storage import map_file
+
+logger = logging.getLogger(__name__)
+
+
+class Page(NamedTuple):
+    number: Optional[int]  # 1-based; None for files without pages
+    text: str
+
+
+class DocumentExtractionError(ValueError):
+    """The document is over its budget or cannot be read."""
+
+
+# --- Worker side (runs in the pool processes) ---
+
+# Identity of a file version: a new upload under the same name is renamed over
+# the old one (see LocalFileStorage), so the path alone would match a stale reader.
+FileKey = Tuple[str, int, int, int]
+
+# Seconds a pool worker keeps an idle reader, and the mapping that pins its file, open.
+_READER_IDLE_SECONDS = 2.0
+
+# The reader for the file version this process last opened, and the mapping
+# under it; batches of one document usually land on the same workers.
+_worker_reader: Optional[Tuple[FileKey, ExitStack, object]] = None
+_worker_lock = threading.Lock()
+_release_timer: Optional[threading.Timer] = None
+
+
+def _file_key(path: str) -> FileKey:
+    st = os.stat(path)
+    return (path, st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def _open_pdf(path: str, resources: ExitStack):
+    """A reader over the mapped file; the mapping is released with ``resources``."""
+    from pypdf import PdfReader
+    return PdfReader(resources.enter_context(map_file(path)))
+
+
+def _release_reader() -> None:
+    global _worker_reader
+    with _worker_lock:
+        if _worker_reader is not None:
+            _worker_reader[1].close()
+            _worker_reader = None
+
+
+def _open_version(key: FileKey, resources: ExitStack):
+    """A reader over exactly the file version ``key``."""
+    path = key[0]
+    reader = _open_pdf(path, resources)
+    if _file_key(path) != key:
+        raise DocumentExtractionError(f"{os.path.basename(path)} changed while it was being extracted.")
+    return reader
+
+
+def _page_texts(reader, first: int, last: int) -> List[str]:
+    return [reader.pages[i].extract_text() or "" for i in range(first, last)]
+
+
+def _extract_batch(key: FileKey, first: int, last: int) -> List[str]:
+    """Texts of pages ``first`` (inclusive) to ``last`` (exclusive), 0-based, of
+    the file version ``key``. The reader is closed once no batch has arrived
+    for ``_READER_IDLE_SECONDS``."""
+    global _worker_reader, _release_timer
+    if _release_timer is not None:
+        _release_timer.cancel()
+        _release_timer = None
+    with _worker_lock:
+        if _worker_reader is None or _worker_reader[0] != key:
+            if _worker_reader is not None:
+                _worker_reader[1].close()
+                _worker_reader = None
+            resources = ExitStack()
+            try:
+                reader = _open_version(key, resources)
+            except BaseException:
+                resources.close()
+                raise
+            _worker_reader = (key, resources, reader)
+        texts = _page_texts(_worker_reader[2], first, last)
+    _release_timer = threading.Timer(_READER_IDLE_SECONDS, _release_reader)
+    _release_timer.daemon = True
+    _release_timer.start()
+    return texts
+
+
+# --- Parent side ---
+
+class DocumentExtractor:
+    """
+    Args:
+        workers: pool processes (0 = this API worker's share of the cores).
+        web_workers: API worker processes on the host, each with its own pool.
+        batch_pages: pages per task sent to a worker.
+        max_bytes / max_pages / timeout: per-document budget (seconds for timeout).
+    """
+
+    def __init__(
+        self,
+        workers: int = 0,
+        web_workers: int = 1,
+        batch_pages: int = 8,
+        max_bytes: int = 50_000_000,
+        max_pages: int = 2000,
+        timeout: float = 300.0,
+    ):
+        self.workers = workers or max(1, available_cpus() // max(1, web_workers))
+        self.batch_pages = batch_pages
+        self.max_bytes = max_bytes
+        self.max_pages = max_pages
+        self.timeout = timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def pages(self, path: str, filename: str) -> Iterator[Page]:
+        """Yield the document's pages in order, enforcing the budget."""
+        size = os.path.getsize(path)
+        if size > self.max_bytes:
+            raise DocumentExtractionError(
+                f"{filename} is {size / 1e6:.1f} MB; the limit is {self.max_bytes / 1e6:.1f} MB."
+            )
+        if filename.lower().endswith(".pdf"):
+            yield from self._pdf_pages(path, filename)
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                yield Page(None, f.read())
+
+    def _pdf_pages(self, path: str, filename: str) -> Iterator[Page]:
+        try:
+            key = _file_key(path)
+            with ExitStack() as resources:
+                page_count = len(_open_pdf(path, resources).pages)
+        except Exception as e:
+            raise DocumentExtractionError(f"{filename} could not be read as a PDF: {e}") from e
+        if page_count > self.max_pages:
+            raise DocumentExtractionError(f"{filename} has {page_count} pages; the limit is {self.max_pages}.")
+
+        batches = [(first, min(first + self.batch_pages, page_count))
+                   for first in range(0, page_count, self.batch_pages)]
+        if len(batches) <= 1 or self.workers <= 1:
+            yield from self._inline(key, filename, batches)
+        else:
+            yield from self._pooled(key, filename, batches)
+
+    def _inline(self, key: FileKey, filename: str, batches: List[Tuple[int, int]]) -> Iterator[Page]:
+        waited = 0.0
+        # One reader for the whole document, unmapped as soon as it is done.
+        with ExitStack() as resources:
+            reader = _open_version(key, resources)
+            for first, last in batches:
+                started = time.monotonic()
+                texts = _page_texts(reader, first, last)
+                waited += time.monotonic() - started
+                if waited > self.timeout:
+                    raise self._timed_out(filename)
+                for offset, text in enumerate(texts):
+                    yield Page(first + offset + 1, text)
+
+    def _pooled(self, key: FileKey, filename: str, batches: List[Tuple[int, int]]) -> Iterator[Page]:
+        executor = self._get_executor()
+        pending = deque()
+        queued = iter(batches)
+        waited = 0.0
+        try:
+            for first, last in queued:
+                pending.append((first, executor.submit(_extract_batch, key, first, last)))
+                if len(pending) >= 2 * self.workers:
+                    break
+            while pending:
+                first, future = pending.popleft()
+                started = time.monotonic()
+                try:
+                    texts = future.result(timeout=max(0.0, self.timeout - waited))
+                except FutureTimeoutError:
+                    raise self._timed_out(filename) from None
+                waited += time.monotonic() - started
+                # Refill before handing pages to the (slow) consumer.
+                following = next(queued, None)
+                if following is not None:
+                    pending.append((following[0], executor.submit(_extract_batch, key, *following)))
+                for offset, text in enumerate(texts):
+                    yield Page(first + offset + 1, text)
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+    def _timed_out(self, filename: str) -> DocumentExtractionError:
+        return DocumentExtractionError(f"Extracting {filename} took longer than {self.timeout:.0f}s.")
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                    )
+        return self._executor
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+document_extractor = DocumentExtractor(
+    workers=settings.PDF_EXTRACTION_WORKERS,
+    web_workers=settings.WEB_CONCURRENCY,
+    max_bytes=settings.DOCUMENT_MAX_BYTES,
+    max_pages=settings.DOCUMENT_MAX_PAGES,
+    timeout=settings.DOCUMENT_EXTRACTION_TIMEOUT_SECONDS,
+)
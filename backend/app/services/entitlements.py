@@ -0,0 +1,259 @@
+"""
+Tenant entitlements.
+
+Resolves a business's effective plan limits (tier table, ``allocated_*``
+columns and the matching ``Plan`` row) in one place and keeps the result in a
+short-lived in-process cache, so a widget chat turn does a single cached
+lookup instead of re-reading the user, business and plan tables.
+
+Usage is recorded through the append-only ``usage_ledger`` rather than by
+incrementing ``Business`` counters, so concurrent requests neither lose
+updates nor contend on the business row. Anything that changes a business's
+plan or profile must call ``entitlement_service.invalidate``.
+"""
+import logging
+import threading
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.subscription import TIER_LIMITS, SubscriptionTier
+from app.models.business import Business
+from app.models.chat_session import ChatSession
+from app.models.plan import Plan
+from app.models.usage_ledger import UsageKind
+from app.models.widget import WidgetSettings
+from app.services.usage_ledger import Reservation, usage_ledger
+
+logger = logging.getLogger(__name__)
+
+# Fallback used when a widget has no per-session message cap configured.
+DEFAULT_MESSAGES_PER_SESSION = 50
+# Daily session cap for a widget whose owner has no business profile (the entry tier's).
+DEFAULT_DAILY_SESSIONS = TIER_LIMITS[SubscriptionTier.SPARK.value]["max_daily_sessions"]
+
+
+def upload_limit(tier: Optional[str]) -> int:
+    """Largest document (bytes) the tier may upload, never above DOCUMENT_MAX_BYTES."""
+    tier_info = TIER_LIMITS.get(tier or "", TIER_LIMITS[SubscriptionTier.SPARK.value])
+    return min(tier_info["max_upload_mb"] * 1_000_000, settings.DOCUMENT_MAX_BYTES)
+
+
+@dataclass(frozen=True)
+class Entitlements:
+    """Immutable snapshot of what a business is allowed to do right now."""
+
+    business_id: str
+    user_id: str
+    tier: str
+    tier_level: int
+    business_name: str
+    agent_instruction: Optional[str]
+    intents: Optional[List[Any]]
+    is_escalation_enabled: bool
+    ai_responses_allocated: int
+    ai_responses_used: int
+    escalations_allocated: int
+    escalations_used: int
+    messages_per_session: int
+    daily_sessions: int
+    whitelisted_domains: int
+    max_upload_bytes: int
+
+    @property
+    def ai_responses_remaining(self) -> int:
+        return max(0, self.ai_responses_allocated - self.ai_responses_used)
+
+    @property
+    def escalations_remaining(self) -> int:
+        return max(0, self.escalations_allocated - self.escalations_used)
+
+    def session_message_limit(self, widget: Optional[WidgetSettings] = None) -> int:
+        """Effective user-message cap for one chat session (widget and plan, whichever is lower)."""
+        limit = (widget.max_messages_per_session if widget else None) or DEFAULT_MESSAGES_PER_SESSION
+        if self.messages_per_session:
+            limit = min(limit, self.messages_per_session)
+        return limit
+
+
+class EntitlementService:
+    """Resolves, caches and consumes per-business entitlements.
+
+    Snapshots are keyed by the owning ``user_id`` because that is what the
+    widget and agent tools carry around. Entries expire after ``ttl_seconds``
+    so changes made by other processes are picked up without explicit
+    invalidation.
+    """
+
+    def __init__(self, ttl_seconds: int = 60):
+        self._ttl = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[float, Entitlements]] = {}
+        self._user_by_business: Dict[str, str] = {}
+
+    # --- Resolution ---
+
+    def get(self, db: Session, user_id: str, business: Optional[Business] = None) -> Optional[Entitlements]:
+        """Return the cached entitlements for ``user_id``'s business, resolving on a miss.
+
+        Callers that already hold the ``Business`` row can pass it to skip
+        the lookup query on a cache miss. Returns None if the user has no
+        business profile.
+        """
+        cached = self._lookup(user_id)
+        if cached:
+            return cached
+
+        if business is None:
+            business = db.query(Business).filter(Business.user_id == user_id).first()
+        if not business:
+            return None
+
+        entitlements = self._resolve(db, business)
+        self._store(entitlements)
+        return entitlements
+
+    def _resolve(self, db: Session, business: Business) -> Entitlements:
+        tier = business.subscription_tier or SubscriptionTier.SPARK.value
+        tier_info = TIER_LIMITS.get(tier, {})
+
+        plan = db.query(Plan).filter(Plan.name.ilike(tier)).first()
+        tier_level = plan.tier if plan else 0
+
+        # Renewals write the carried-over escalation allowance to the column;
+        # businesses that never renewed fall back to the tier default.
+        escalations_allocated = business.allocated_escalations or tier_info.get("max_monthly_escalations", 5)
+        pending = usage_ledger.pending(db, business.id)
+
+        return Entitlements(
+            business_id=business.id,
+            user_id=business.user_id,
+            tier=tier,
+            tier_level=tier_level,
+            business_name=business.business_name,
+            agent_instruction=business.custom_agent_instruction,
+            intents=business.intents,
+            is_escalation_enabled=bool(business.is_escalation_enabled),
+            ai_responses_allocated=business.allocated_ai_responses or 0,
+            ai_responses_used=(business.used_ai_responses or 0) + pending[UsageKind.AI_RESPONSE.value],
+            escalations_allocated=escalations_allocated,
+            escalations_used=(business.used_escalations or 0) + pending[UsageKind.ESCALATION.value],
+            messages_per_session=business.allocated_messages_per_session or 0,
+            daily_sessions=business.allocated_daily_sessions or 0,
+            whitelisted_domains=business.allocated_whitelisted_domains or 0,
+            max_upload_bytes=upload_limit(tier),
+        )
+
+    # --- Cache ---
+
+    def _lookup(self, user_id: str) -> Optional[Entitlements]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry and entry[0] > now:
+                return entry[1]
+            if entry:
+                self._entries.pop(user_id, None)
+        return None
+
+    def _store(self, entitlements: Entitlements) -> None:
+        with self._lock:
+            self._entries[entitlements.user_id] = (time.monotonic() + self._ttl, entitlements)
+            self._user_by_business[entitlements.business_id] = entitlements.user_id
+
+    def _adjust(self, entitlements: Entitlements, field: str, delta: int = 0, exhausted: bool = False) -> None:
+        """Apply a local usage change to the cached snapshot (keeping its expiry).
+
+        Works on whatever is cached now rather than the caller's copy, so
+        concurrent turns don't overwrite each other's adjustments.
+        """
+        with self._lock:
+            entry = self._entries.get(entitlements.user_id)
+            if not entry:
+                return
+            current = entry[1]
+            if exhausted:
+                value = getattr(current, field.replace("_used", "_allocated"))
+            else:
+                value = max(0, getattr(current, field) + delta)
+            self._entries[entitlements.user_id] = (entry[0], replace(current, **{field: value}))
+
+    def invalidate(self, user_id: Optional[str] = None, business_id: Optional[str] = None) -> None:
+        """Drop the cached snapshot for a business, addressed by owner or business id."""
+        with self._lock:
+            if business_id and not user_id:
+                user_id = self._user_by_business.get(business_id)
+            if business_id:
+                self._user_by_business.pop(business_id, None)
+            if user_id:
+                self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._user_by_business.clear()
+
+    # --- Checks & consumption ---
+
+    def has_ai_credit(self, entitlements: Entitlements) -> bool:
+        return entitlements.ai_responses_remaining > 0
+
+    def reserve_ai_response(self, db: Session, entitlements: Entitlements,
+                            reference: Optional[str] = None) -> Optional[Reservation]:
+        """Reserve one AI response ahead of the LLM call. Returns None if credits are exhausted.
+
+        The reservation must be settled with ``commit_usage`` or ``refund_usage``.
+        """
+        reservation = usage_ledger.reserve(
+            db, entitlements.business_id, UsageKind.AI_RESPONSE.value,
+            limit=entitlements.ai_responses_allocated, reference=reference,
+        )
+        if not reservation:
+            self._adjust(entitlements, "ai_responses_used", exhausted=True)
+            return None
+
+        self._adjust(entitlements, "ai_responses_used", 1)
+        return reservation
+
+    def commit_usage(self, db: Session, reservation: Reservation) -> None:
+        usage_ledger.commit(db, reservation)
+
+    def refund_usage(self, db: Session, entitlements: Entitlements, reservation: Reservation) -> None:
+        usage_ledger.refund(db, reservation)
+        self._adjust(entitlements, "ai_responses_used", -reservation.amount)
+
+    def consume_escalation(self, db: Session, entitlements: Entitlements,
+                           reference: Optional[str] = None) -> bool:
+        """Record one escalation. Returns False if the monthly allowance is exhausted."""
+        if entitlements.escalations_remaining <= 0:
+            return False
+
+        recorded = usage_ledger.record(
+            db, entitlements.business_id, UsageKind.ESCALATION.value,
+            limit=entitlements.escalations_allocated, reference=reference,
+        )
+        if not recorded:
+            logger.info(f"Escalation allowance exhausted for business {entitlements.business_id}")
+            self._adjust(entitlements, "escalations_used", exhausted=True)
+            return False
+
+        self._adjust(entitlements, "escalations_used", 1)
+        return True
+
+    def can_start_session(self, db: Session, entitlements: Optional[Entitlements], guest_id: str) -> bool:
+        """Whether ``guest_id`` may open another chat session today under the daily limit
+        (``DEFAULT_DAILY_SESSIONS`` when there are no entitlements)."""
+        today_start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        sessions_today = db.query(ChatSession).filter(
+            ChatSession.guest_id == guest_id,
+            ChatSession.created_at >= today_start
+        ).count()
+        limit = entitlements.daily_sessions if entitlements else DEFAULT_DAILY_SESSIONS
+        return sessions_today < limit
+
+
+entitlement_service = EntitlementService(ttl_seconds=settings.ENTITLEMENT_CACHE_TTL_SECONDS)
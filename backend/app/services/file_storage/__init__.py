@@ -0,0 +1,53 @@
+"""
+Storage for uploaded files behind one interface (``base.BaseFileStorage``),
+chosen by ``FILE_STORAGE_BACKEND``:
+
+* ``local`` — directory on this machine (``UPLOAD_DIR``)
+* ``s3``    — S3-compatible bucket shared by all replicas (``S3_*`` settings)
+"""
+from typing import Optional
+
+from app.core.config import settings
+from app.services.file_storage.base import (
+    BaseFileStorage,
+    FileTooLargeError,
+    StoredFile,
+    content_hash,
+    map_file,
+)
+from app.services.file_storage.local import LocalFileStorage
+from app.services.file_storage.s3 import S3FileStorage
+
+BACKENDS = ("local", "s3")
+
+
+def create_file_storage(backend: Optional[str] = None) -> BaseFileStorage:
+    backend = (backend or settings.FILE_STORAGE_BACKEND).lower()
+    if backend == "local":
+        return LocalFileStorage(settings.UPLOAD_DIR)
+    if backend == "s3":
+        return S3FileStorage(
+            bucket=settings.S3_BUCKET,
+            prefix=settings.S3_PREFIX,
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            region=settings.S3_REGION,
+            access_key_id=settings.S3_ACCESS_KEY_ID,
+            secret_access_key=settings.S3_SECRET_ACCESS_KEY,
+        )
+    raise ValueError(f"File storage backend '{backend}' not supported (expected one of {', '.join(BACKENDS)}).")
+
+
+file_storage = create_file_storage()
+
+__all__ = [
+    "BACKENDS",
+    "BaseFileStorage",
+    "FileTooLargeError",
+    "LocalFileStorage",
+    "S3FileStorage",
+    "StoredFile",
+    "content_hash",
+    "create_file_storage",
+    "file_storage",
+    "map_file",
+]
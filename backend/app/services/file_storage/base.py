@@ -0,0 +1,132 @@
+"""
+Backend-neutral storage for uploaded files.
+
+``save`` streams the upload in ``CHUNK_SIZE`` pieces: each piece is hashed
+and written as it is read, so a file is never held in memory whole, its
+SHA-256 is known once it is stored, and an upload over ``max_bytes`` is
+rejected as soon as it crosses the limit (nothing partial is kept).
+
+``content_hash`` hashes an upload that is already spooled (FastAPI's
+``UploadFile``) without storing it, for deduplication.
+
+Extraction needs a file on the local disk; ``local_copy`` provides one
+(the stored file itself, or a temporary download) and ``map_file`` maps it
+read-only, so the extraction workers share the page cache rather than each
+reading the whole file into its own memory.
+"""
+import hashlib
+import mmap
+import os
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import BinaryIO, ContextManager, Iterator, List, NamedTuple, Optional
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class StoredFile(NamedTuple):
+    path: str  # what the backend needs to find the file again
+    size: int
+    sha256: str
+
+
+class FileTooLargeError(ValueError):
+    """The upload is over the size limit."""
+
+    def __init__(self, filename: str, max_bytes: int):
+        super().__init__(f"{filename} is over the {max_bytes / 1e6:.0f} MB upload limit.")
+        self.max_bytes = max_bytes
+
+
+class UploadStream:
+    """Chunks of ``file_obj``, hashed and counted on the way through."""
+
+    def __init__(self, file_obj: BinaryIO, filename: str, max_bytes: Optional[int] = None,
+                 chunk_size: int = CHUNK_SIZE):
+        self._file = file_obj
+        self.filename = filename
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self.size = 0
+        self._hash = hashlib.sha256()
+
+    def __iter__(self) -> Iterator[bytes]:
+        while True:
+            chunk = self._file.read(self.chunk_size)
+            if not chunk:
+                return
+            self.size += len(chunk)
+            if self.max_bytes is not None and self.size > self.max_bytes:
+                raise FileTooLargeError(self.filename, self.max_bytes)
+            self._hash.update(chunk)
+            yield chunk
+
+    def stored(self, path: str) -> StoredFile:
+        return StoredFile(path=path, size=self.size, sha256=self._hash.hexdigest())
+
+
+def content_hash(file_obj: BinaryIO, filename: str, max_bytes: Optional[int] = None) -> str:
+    """SHA-256 of a seekable upload, read in chunks and rewound, so a duplicate
+    can be recognised before anything is stored. Enforces ``max_bytes`` too."""
+    stream = UploadStream(file_obj, filename, max_bytes)
+    for _ in stream:
+        pass
+    file_obj.seek(0)
+    return stream.stored("").sha256
+
+
+def safe_filename(filename: str) -> str:
+    """The upload's name without any directory part."""
+    name = os.path.basename((filename or "").replace("\\", "/"))
+    if name in ("", ".", ".."):
+        raise ValueError("Invalid file: filename is missing")
+    return name
+
+
+def safe_folder(folder: Optional[str]) -> List[str]:
+    """Path segments of a sub-folder under the user's directory ([] for none)."""
+    parts = [part for part in (folder or "").replace("\\", "/").split("/") if part]
+    if any(part in (".", "..") for part in parts):
+        raise ValueError(f"Invalid storage folder '{folder}'")
+    return parts
+
+
+@contextmanager
+def map_file(path: str):
+    """The file mapped read-only (an empty ``bytes`` for an empty file, which cannot be mapped)."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""
+            return
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        yield mapping
+    finally:
+        mapping.close()
+
+
+class BaseFileStorage(ABC):
+    @abstractmethod
+    def save(self, file_obj: BinaryIO, filename: str, user_id: str, max_bytes: Optional[int] = None,
+             folder: Optional[str] = None) -> StoredFile:
+        """Stream the file into storage; raises ``FileTooLargeError`` past ``max_bytes``.
+
+        ``folder`` (e.g. ``"<document_id>/<version>"``) stores the file under
+        that sub-folder of the user's directory, so it cannot replace a file
+        saved under the same name elsewhere.
+        """
+
+    @abstractmethod
+    def local_copy(self, file_path: str) -> ContextManager[str]:
+        """Path of the stored file on the local disk, valid inside the ``with`` block.
+
+        Raises FileNotFoundError if nothing is stored at ``file_path``.
+        """
+
+    @abstractmethod
+    def list_files(self, user_id: str) -> list[str]:
+        """Lists files for a user."""
+
+    @abstractmethod
+    def delete(self, file_path: str) -> bool:
+        """Deletes a file."""
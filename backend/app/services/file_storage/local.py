@@ -0,0 +1,73 @@
+"""
+Uploads on the local disk, under ``base_dir/<user_id>/[<folder>/]<filename>``.
+
+A file is written to a temporary name next to its target and renamed into
+place once complete, so a failed or oversized upload leaves the previous
+version untouched, and a file that extraction has mapped (see ``map_file``)
+is never truncated under it. Only one replica can see this disk; use the S3
+backend for several.
+"""
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, Optional
+
+from app.services.file_storage.base import BaseFileStorage, StoredFile, UploadStream, safe_filename, safe_folder
+
+
+class LocalFileStorage(BaseFileStorage):
+    def __init__(self, base_dir: str = "uploads"):
+        self.base_dir = base_dir
+        os.makedirs(self.base_dir, exist_ok=True)
+
+    def save(self, file_obj: BinaryIO, filename: str, user_id: str, max_bytes: Optional[int] = None,
+             folder: Optional[str] = None) -> StoredFile:
+        user_dir = os.path.join(self.base_dir, user_id, *safe_folder(folder))
+        os.makedirs(user_dir, exist_ok=True)
+        file_path = os.path.join(user_dir, safe_filename(filename))
+
+        stream = UploadStream(file_obj, filename, max_bytes)
+        fd, temp_path = tempfile.mkstemp(dir=user_dir, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as buffer:
+                for chunk in stream:
+                    buffer.write(chunk)
+            os.replace(temp_path, file_path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+        # Path relative to the project root, as stored on Document.file_path
+        return stream.stored(file_path)
+
+    def get_full_path(self, file_path: str) -> str:
+        return os.path.abspath(file_path)
+
+    @contextmanager
+    def local_copy(self, file_path: str) -> Iterator[str]:
+        full_path = self.get_full_path(file_path)
+        if not os.path.exists(full_path):
+            raise FileNotFoundError(f"File not found at {full_path}")
+        yield full_path
+
+    def list_files(self, user_id: str) -> list[str]:
+        user_dir = os.path.join(self.base_dir, user_id)
+        if not os.path.exists(user_dir):
+            return []
+        return [name for name in os.listdir(user_dir) if not name.startswith(".upload-")]
+
+    def delete(self, file_path: str) -> bool:
+        full_path = self.get_full_path(file_path)
+        if not os.path.exists(full_path):
+            return False
+        os.remove(full_path)
+        # Drop emptied sub-folders, stopping at the user's directory
+        base_dir = os.path.abspath(self.base_dir)
+        parent = os.path.dirname(full_path)
+        while os.path.commonpath([base_dir, parent]) == base_dir and os.sep in os.path.relpath(parent, base_dir):
+            try:
+                os.rmdir(parent)
+            except OSError:
+                break
+            parent = os.path.dirname(parent)
+        return True
@@ -0,0 +1,150 @@
+"""
+Uploads in an S3-compatible bucket (AWS S3, MinIO, R2, ...), under
+``prefix<user_id>/[<folder>/]<filename>``, so every API replica and worker
+sees them.
+
+Uploads are streamed: a file that fits in one part (``part_size``) is sent
+with a single ``put_object``; anything larger goes up as a multipart upload
+while it is still being read, which is aborted if the upload fails or goes
+over its size limit. ``local_copy`` downloads the object to a temporary file
+for extraction and deletes it afterwards.
+
+Needs ``boto3``; it is imported on first use, so other backends run without
+it. Tests pass an S3 client stand-in as ``client``.
+"""
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, List, Optional
+
+from app.services.file_storage.base import (
+    CHUNK_SIZE,
+    BaseFileStorage,
+    StoredFile,
+    UploadStream,
+    safe_filename,
+    safe_folder,
+)
+
+# S3's minimum size for every part but the last
+MIN_PART_SIZE = 5 * 1024 * 1024
+
+
+class S3FileStorage(BaseFileStorage):
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = "",
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        access_key_id: Optional[str] = None,
+        secret_access_key: Optional[str] = None,
+        part_size: int = 8 * 1024 * 1024,
+        client=None,
+    ):
+        if not bucket:
+            raise ValueError("S3 file storage needs a bucket (S3_BUCKET).")
+        if part_size < MIN_PART_SIZE:
+            raise ValueError(f"part_size must be at least {MIN_PART_SIZE} bytes.")
+        self.bucket = bucket
+        self.prefix = prefix
+        self.endpoint_url = endpoint_url
+        self.region = region
+        self.access_key_id = access_key_id
+        self.secret_access_key = secret_access_key
+        self.part_size = part_size
+        self._client = client
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"<S3FileStorage {self.endpoint_url or 's3'}/{self.bucket}/{self.prefix}>"
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    import boto3
+                    self._client = boto3.client(
+                        "s3",
+                        endpoint_url=self.endpoint_url or None,
+                        region_name=self.region or None,
+                        aws_access_key_id=self.access_key_id or None,
+                        aws_secret_access_key=self.secret_access_key or None,
+                    )
+        return self._client
+
+    def _key(self, user_id: str, filename: str, folder: Optional[str] = None) -> str:
+        return "/".join([f"{self.prefix}{user_id}", *safe_folder(folder), safe_filename(filename)])
+
+    def save(self, file_obj: BinaryIO, filename: str, user_id: str, max_bytes: Optional[int] = None,
+             folder: Optional[str] = None) -> StoredFile:
+        key = self._key(user_id, filename, folder)
+        stream = UploadStream(file_obj, filename, max_bytes, chunk_size=min(CHUNK_SIZE, self.part_size))
+        buffer = bytearray()
+        upload_id = None
+        parts = []
+        try:
+            for chunk in stream:
+                buffer += chunk
+                if len(buffer) >= self.part_size:
+                    if upload_id is None:
+                        upload_id = self.client.create_multipart_upload(Bucket=self.bucket, Key=key)["UploadId"]
+                    parts.append(self._upload_part(key, upload_id, len(parts) + 1, bytes(buffer[:self.part_size])))
+                    del buffer[:self.part_size]
+
+            if upload_id is None:
+                self.client.put_object(Bucket=self.bucket, Key=key, Body=bytes(buffer))
+            else:
+                if buffer:
+                    parts.append(self._upload_part(key, upload_id, len(parts) + 1, bytes(buffer)))
+                self.client.complete_multipart_upload(
+                    Bucket=self.bucket, Key=key, UploadId=upload_id, MultipartUpload={"Parts": parts}
+                )
+        except BaseException:
+            if upload_id is not None:
+                self.client.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id)
+            raise
+        return stream.stored(key)
+
+    def _upload_part(self, key: str, upload_id: str, number: int, body: bytes) -> dict:
+        response = self.client.upload_part(
+            Bucket=self.bucket, Key=key, UploadId=upload_id, PartNumber=number, Body=body
+        )
+        return {"PartNumber": number, "ETag": response["ETag"]}
+
+    @contextmanager
+    def local_copy(self, file_path: str) -> Iterator[str]:
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=file_path)
+        except self.client.exceptions.NoSuchKey:
+            raise FileNotFoundError(f"File not found at s3://{self.bucket}/{file_path}") from None
+
+        fd, temp_path = tempfile.mkstemp(suffix=os.path.splitext(file_path)[1])
+        try:
+            with os.fdopen(fd, "wb") as f:
+                shutil.copyfileobj(response["Body"], f, CHUNK_SIZE)
+            yield temp_path
+        finally:
+            os.unlink(temp_path)
+
+    def list_files(self, user_id: str) -> List[str]:
+        prefix = f"{self.prefix}{user_id}/"
+        names = []
+        token = None
+        while True:
+            kwargs = {"Bucket": self.bucket, "Prefix": prefix}
+            if token:
+                kwargs["ContinuationToken"] = token
+            page = self.client.list_objects_v2(**kwargs)
+            names.extend(item["Key"][len(prefix):] for item in page.get("Contents", []))
+            if not page.get("IsTruncated"):
+                return names
+            token = page["NextContinuationToken"]
+
+    def delete(self, file_path: str) -> bool:
+        # S3 deletes are idempotent and do not say whether the key existed.
+        self.client.delete_object(Bucket=self.bucket, Key=file_path)
+        return True
@@ -0,0 +1,226 @@
+"""
+Streaming CSV importer for product catalogues.
+
+The upload is decoded and parsed row by row, ``chunk_size`` rows at a time.
+Per chunk, one ``IN`` query tells which SKUs already exist (for the
+imported/updated counts) and one ``INSERT ... ON CONFLICT (business_id, sku)
+DO UPDATE`` writes the whole chunk, so a 20k-row file costs a few dozen
+statements instead of tens of thousands. Each chunk is committed on its own.
+
+Columns follow the original importer: ``sku`` is required; ``price``,
+``stock_quantity`` and ``is_active`` are always written (with the same
+defaults); ``name``, ``description`` and ``category`` only overwrite an
+existing product when the file has that column. Bad rows are skipped and
+reported with their line number; so are the rows of a chunk the database
+rejects, which is rolled back while the other chunks are still imported.
+
+Uploads above ``PRODUCT_IMPORT_BACKGROUND_THRESHOLD_BYTES`` are spooled to disk
+and imported by ``run_job`` after the request returns, tracked in a
+``ProductImportJob`` row.
+"""
+import codecs
+import csv
+import logging
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from decimal import Decimal, InvalidOperation
+from typing import BinaryIO, Dict, Iterator, List, Tuple
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.db.upsert import upsert_insert
+from app.models.product import Product, generate_uuid
+from app.models.product_import_job import ProductImportJob, ProductImportStatus
+
+logger = logging.getLogger(__name__)
+
+# Only this many row errors are kept in the report; ``error_count`` has the total.
+MAX_REPORTED_ERRORS = 500
+
+_OPTIONAL_TEXT_COLUMNS = ("name", "description", "category")
+
+
+class ProductImportError(ValueError):
+    """The file as a whole can't be imported (bad encoding, missing header)."""
+
+
+@dataclass
+class ImportReport:
+    imported: int = 0
+    updated: int = 0
+    error_count: int = 0
+    errors: List[Dict[str, object]] = field(default_factory=list)
+
+    def add_error(self, row: int, sku: str, error: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "sku": sku, "error": error})
+
+
+def parse_row(row: Dict[str, str]) -> Dict[str, object]:
+    """Validate one CSV row into column values. Raises ValueError with a readable reason."""
+    sku = (row.get("sku") or "").strip()
+    if not sku:
+        raise ValueError("Missing SKU")
+
+    price_str = (row.get("price") or "0").replace(",", "").strip()
+    try:
+        price = Decimal(price_str) if price_str else Decimal("0")
+    except InvalidOperation:
+        raise ValueError(f"Invalid price '{row.get('price')}'")
+
+    stock_str = (row.get("stock_quantity") or "0").strip()
+    try:
+        stock = int(stock_str) if stock_str else 0
+    except ValueError:
+        raise ValueError(f"Invalid stock_quantity '{row.get('stock_quantity')}'")
+
+    return {
+        "sku": sku,
+        "name": row.get("name") or "Unnamed Product",
+        "description": row.get("description") or "",
+        "category": row.get("category") or "",
+        "price": price,
+        "stock_quantity": stock,
+        "is_active": (row.get("is_active") or "true").lower() == "true",
+    }
+
+
+class ProductImporter:
+    def __init__(self, chunk_size: int = 500):
+        self.chunk_size = chunk_size
+
+    def import_csv(self, db: Session, business_id: str, fileobj: BinaryIO) -> ImportReport:
+        """Import a UTF-8 CSV from a binary file object. Commits once per chunk."""
+        report = ImportReport()
+        rows = csv.DictReader(codecs.getreader("utf-8-sig")(fileobj))
+        try:
+            header = rows.fieldnames or []
+        except UnicodeDecodeError:
+            raise ProductImportError("File is not valid UTF-8")
+        if "sku" not in header:
+            raise ProductImportError("CSV must have a 'sku' column")
+        update_columns = ["price", "stock_quantity", "is_active"] + [
+            column for column in _OPTIONAL_TEXT_COLUMNS if column in header
+        ]
+
+        insert = upsert_insert(db)
+        for chunk in self._chunks(rows, report):
+            try:
+                self._write_chunk(db, insert, business_id, chunk, update_columns, report)
+            except SQLAlchemyError as e:
+                db.rollback()
+                logger.warning(f"Product import: chunk of {len(chunk)} rows for business {business_id} failed: {e}")
+                for sku, (line, _) in chunk.items():
+                    report.add_error(line, sku, "Could not be saved (database error)")
+        return report
+
+    def _chunks(self, rows: csv.DictReader, report: ImportReport) -> Iterator[Dict[str, Tuple[int, Dict]]]:
+        """Parsed rows keyed by SKU, ``chunk_size`` lines at a time (last duplicate in a chunk wins)."""
+        chunk: Dict[str, Tuple[int, Dict]] = {}
+        consumed = 0
+        try:
+            for row in rows:
+                consumed += 1
+                try:
+                    values = parse_row(row)
+                except ValueError as e:
+                    report.add_error(rows.line_num, (row.get("sku") or "").strip(), str(e))
+                else:
+                    chunk[values["sku"]] = (rows.line_num, values)
+                if consumed >= self.chunk_size:
+                    yield chunk
+                    chunk, consumed = {}, 0
+        except UnicodeDecodeError:
+            raise ProductImportError(f"File is not valid UTF-8 (after line {rows.line_num})")
+        if chunk:
+            yield chunk
+
+    def _write_chunk(self, db, insert, business_id, chunk, update_columns, report) -> None:
+        if not chunk:
+            return
+        existing = {
+            sku for (sku,) in db.query(Product.sku).filter(
+                Product.business_id == business_id, Product.sku.in_(list(chunk))
+            )
+        }
+
+        now = datetime.now(timezone.utc)
+        values = [
+            {
+                "id": generate_uuid(),
+                "business_id": business_id,
+                "currency": "USD",
+                "created_at": now,
+                "updated_at": now,
+                **row_values,
+            }
+            for _, row_values in chunk.values()
+        ]
+        stmt = insert(Product.__table__).values(values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["business_id", "sku"],
+            set_={**{column: stmt.excluded[column] for column in update_columns}, "updated_at": now},
+        )
+        db.execute(stmt)
+        db.commit()
+
+        report.updated += len(existing)
+        report.imported += len(chunk) - len(existing)
+
+    # --- Background jobs ---
+
+    def create_job(self, db: Session, business_id: str, filename: str) -> ProductImportJob:
+        job = ProductImportJob(business_id=business_id, filename=filename, status=ProductImportStatus.PENDING.value)
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        return job
+
+    def run_job(self, job_id: str, path: str) -> None:
+        """Import a spooled upload for a queued job, then delete the file. Opens its own session."""
+        from app.services.product_index import product_index
+
+        db = SessionLocal()
+        business_id = None
+        try:
+            job = db.get(ProductImportJob, job_id)
+            if not job:
+                return
+            business_id = job.business_id
+            job.status = ProductImportStatus.RUNNING.value
+            job.started_at = datetime.now(timezone.utc)
+            db.commit()
+
+            try:
+                with open(path, "rb") as f:
+                    report = self.import_csv(db, business_id, f)
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Product import {job_id} failed: {e}")
+                job.status = ProductImportStatus.FAILED.value
+                job.last_error = str(e)[:1000]
+            else:
+                job.status = ProductImportStatus.DONE.value
+                job.imported = report.imported
+                job.updated = report.updated
+                job.error_count = report.error_count
+                job.errors = report.errors
+            job.finished_at = datetime.now(timezone.utc)
+            db.commit()
+        finally:
+            db.close()
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+        if business_id:
+            product_index.sync(business_id)
+
+
+product_importer = ProductImporter(chunk_size=settings.PRODUCT_IMPORT_CHUNK_SIZE)
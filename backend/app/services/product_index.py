@@ -0,0 +1,131 @@
+"""
+Semantic index of product catalogues.
+
+Each business gets its own vector collection holding one embedding per active
+product (name + category + description), keyed by product id. The index is
+kept in step with the catalogue by ``sync``, which the product endpoints
+schedule as a background task after every create, update, delete and bulk
+upload. Products whose embedded text has not changed are not re-embedded.
+
+``query`` returns cosine similarities for the nearest products; hybrid ranking
+with keyword scores happens in ``app.services.product_search``.
+"""
+import hashlib
+import logging
+from typing import Dict, Iterable, List, Optional
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.product import Product
+from app.services.vector_store import vector_store
+from app.utils.lazy import LazyModule
+
+genai = LazyModule("google.generativeai")
+
+logger = logging.getLogger(__name__)
+
+
+def product_text(product: Product) -> str:
+    parts = [product.name, product.category, product.description]
+    return "\n".join(part for part in parts if part)
+
+
+def _content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ProductIndex:
+    def __init__(self, vector_db=vector_store, batch_size: int = 100):
+        self.vector_db = vector_db
+        self.batch_size = batch_size
+
+    def collection(self, business_id: str):
+        return self.vector_db.get_collection(f"products-{business_id}")
+
+    # --- Embeddings ---
+
+    def _embed(self, texts: List[str], api_key: str, task_type: str) -> List[List[float]]:
+        genai.configure(api_key=api_key)
+        result = genai.embed_content(
+            model=settings.GEMINI_EMBEDDING_MODEL,
+            content=texts,
+            task_type=task_type,
+        )
+        return result["embedding"]
+
+    # --- Maintenance ---
+
+    def upsert(self, business_id: str, products: List[Product], api_key: str) -> int:
+        """Embed and store products whose text changed. Returns how many were embedded."""
+        if not products:
+            return 0
+        collection = self.collection(business_id)
+        texts = {p.id: product_text(p) for p in products}
+        hashes = {pid: _content_hash(text) for pid, text in texts.items()}
+
+        existing = collection.get(ids=list(texts), include=["metadatas"])
+        current = {
+            pid: (meta or {}).get("content_hash")
+            for pid, meta in zip(existing.get("ids") or [], existing.get("metadatas") or [])
+        }
+        changed = [pid for pid in texts if current.get(pid) != hashes[pid]]
+
+        for start in range(0, len(changed), self.batch_size):
+            ids = changed[start:start + self.batch_size]
+            documents = [texts[pid] for pid in ids]
+            collection.upsert(
+                ids=ids,
+                documents=documents,
+                embeddings=self._embed(documents, api_key, "retrieval_document"),
+                metadatas=[{"business_id": business_id, "content_hash": hashes[pid]} for pid in ids],
+            )
+        return len(changed)
+
+    def delete(self, business_id: str, product_ids: Iterable[str]) -> None:
+        ids = list(product_ids)
+        if ids:
+            self.collection(business_id).delete(ids=ids)
+
+    def sync(self, business_id: str, product_ids: Optional[List[str]] = None, api_key: Optional[str] = None) -> None:
+        """Bring the index in line with the database for some (or all) of a business's products.
+
+        Opens its own session; meant to run as a background task. Failures are
+        logged and leave the index stale, which search tolerates.
+        """
+        api_key = api_key or settings.GOOGLE_API_KEY
+        if not api_key:
+            logger.warning(f"Product index: no API key, skipping sync for business {business_id}")
+            return
+
+        db = SessionLocal()
+        try:
+            query = db.query(Product).filter(Product.business_id == business_id)
+            if product_ids is not None:
+                query = query.filter(Product.id.in_(product_ids))
+            products = query.all()
+
+            active = [p for p in products if p.is_active]
+            stale = {p.id for p in products if not p.is_active}
+            if product_ids is not None:
+                stale |= set(product_ids) - {p.id for p in products}
+
+            embedded = self.upsert(business_id, active, api_key)
+            self.delete(business_id, stale)
+            logger.info(f"Product index: business {business_id}: {embedded} embedded, {len(stale)} removed")
+        except Exception as e:
+            logger.error(f"Product index: sync failed for business {business_id}: {e}")
+        finally:
+            db.close()
+
+    # --- Retrieval ---
+
+    def query(self, business_id: str, text: str, api_key: str, n_results: int = 20) -> Dict[str, float]:
+        """``{product_id: cosine similarity}`` for the products nearest to ``text``."""
+        embedding = self._embed([text], api_key, "retrieval_query")[0]
+        results = self.collection(business_id).query(query_embeddings=[embedding], n_results=n_results)
+        ids = (results.get("ids") or [[]])[0]
+        distances = (results.get("distances") or [[]])[0]
+        return {pid: 1.0 - distance for pid, distance in zip(ids, distances)}
+
+
+product_index = ProductIndex()
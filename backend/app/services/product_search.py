@@ -0,0 +1,223 @@
+"""
+Ranked, paginated product search for a single business's catalogue.
+
+On PostgreSQL the query is matched against a weighted ``tsvector`` of name,
+SKU, category and description (prefix-matched, so "pan" finds "panels") and
+against trigram-indexed ``ILIKE`` on name and SKU for partial codes. Both are
+backed by GIN indexes (migration e7f8a9b0c1d2), so a search touches only the
+matching rows instead of scanning the table. Results are ranked by
+``ts_rank`` plus name similarity.
+
+Other databases (SQLite in development and tests) fall back to filtering in
+SQL and scoring the tenant's remaining products in Python.
+
+When an API key is available the keyword ranking is fused with semantic
+matches from ``app.services.product_index`` (reciprocal rank fusion), so a
+query like "keep my phone charged during power cuts" finds the power bank
+even though no word matches. Semantic hits below ``min_similarity`` are
+dropped, and if the index is unavailable search stays keyword-only. Fusion
+ranks the top ``candidates`` of each list; pages past that window carry on
+down the keyword ranking, skipping the products already listed.
+
+An empty query lists the catalogue alphabetically. Category, price and stock
+filters always run in SQL, and every search is limited and offset so the
+agent never receives the whole catalogue.
+"""
+import logging
+import re
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, literal_column, or_
+from sqlalchemy.orm import Query, Session
+
+from app.core.config import settings
+from app.models.product import Product
+
+logger = logging.getLogger(__name__)
+
+# Must stay identical to the expression index created by migration e7f8a9b0c1d2.
+_PG_DOCUMENT = (
+    "(setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(sku, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(category, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'C'))"
+)
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# Python fallback: score per query token, by the best field it appears in.
+_FIELD_WEIGHTS = (("name", 3), ("sku", 3), ("category", 2), ("description", 1))
+
+
+# Reciprocal rank fusion constant; 60 is the usual choice and keeps either
+# ranking from dominating on its top hit alone.
+_RRF_K = 60
+
+
+@dataclass
+class ProductSearchResult:
+    products: List[Product]
+    has_more: bool
+
+
+def _tokens(query: str) -> List[str]:
+    return _TOKEN_RE.findall(query.lower())
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("!", "!!").replace("%", "!%").replace("_", "!_")
+
+
+class ProductSearch:
+    """
+    Args:
+        max_limit: hard cap on results per page.
+        index: semantic index (defaults to ``product_index``, imported lazily).
+        candidates: how many hits each ranking contributes to the fusion.
+        min_similarity: cosine similarity below which semantic hits are ignored.
+    """
+
+    def __init__(self, max_limit: int = 50, index=None, candidates: int = 50, min_similarity: float = 0.55):
+        self.max_limit = max_limit
+        self._index = index
+        self.candidates = candidates
+        self.min_similarity = min_similarity
+
+    def search(
+        self,
+        db: Session,
+        business_id: str,
+        query: str = "",
+        category: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        in_stock_only: bool = False,
+        limit: int = 10,
+        offset: int = 0,
+        api_key: Optional[str] = None,
+    ) -> ProductSearchResult:
+        limit = max(1, min(limit, self.max_limit))
+        offset = max(0, offset)
+        base = self._filtered(db, business_id, category, min_price, max_price, in_stock_only)
+
+        query = (query or "").strip()
+        if not query:
+            rows = base.order_by(Product.name, Product.id).offset(offset).limit(limit + 1).all()
+            return ProductSearchResult(products=rows[:limit], has_more=len(rows) > limit)
+
+        keyword = self._search_postgres if db.get_bind().dialect.name == "postgresql" else self._search_python
+        semantic = self._semantic(business_id, query, api_key) if api_key else {}
+        if not semantic:
+            rows = keyword(base, query, offset, limit + 1)
+            return ProductSearchResult(products=rows[:limit], has_more=len(rows) > limit)
+
+        fused = self._fuse(base, keyword(base, query, 0, self.candidates), semantic)
+        page = fused[offset:offset + limit + 1]
+        if len(page) <= limit:
+            rest = base.filter(Product.id.notin_([p.id for p in fused])) if fused else base
+            page += keyword(rest, query, max(0, offset - len(fused)), limit + 1 - len(page))
+        return ProductSearchResult(products=page[:limit], has_more=len(page) > limit)
+
+    # --- Internals ---
+
+    @property
+    def index(self):
+        if self._index is None:
+            from app.services.product_index import product_index
+            self._index = product_index
+        return self._index
+
+    def _semantic(self, business_id: str, query: str, api_key: str) -> Dict[str, float]:
+        try:
+            hits = self.index.query(business_id, query, api_key, n_results=self.candidates)
+        except Exception as e:
+            logger.warning(f"Product search: semantic lookup failed, using keywords only: {e}")
+            return {}
+        return {pid: score for pid, score in hits.items() if score >= self.min_similarity}
+
+    def _fuse(self, base: Query, keyword_rows: List[Product], semantic: Dict[str, float]) -> List[Product]:
+        """Merge both rankings by reciprocal rank fusion."""
+        products = {p.id: p for p in keyword_rows}
+        missing = [pid for pid in semantic if pid not in products]
+        if missing:
+            # Loaded through ``base`` so filters and tenancy still apply.
+            products.update((p.id, p) for p in base.filter(Product.id.in_(missing)).all())
+
+        scores: Dict[str, float] = {}
+        for rank, product in enumerate(keyword_rows):
+            scores[product.id] = 1.0 / (_RRF_K + rank + 1)
+        ranked = sorted(semantic, key=semantic.get, reverse=True)
+        for rank, pid in enumerate(ranked):
+            if pid in products:
+                scores[pid] = scores.get(pid, 0.0) + 1.0 / (_RRF_K + rank + 1)
+
+        order = sorted(scores, key=lambda pid: (-scores[pid], products[pid].name, pid))
+        return [products[pid] for pid in order]
+
+    def _filtered(
+        self,
+        db: Session,
+        business_id: str,
+        category: Optional[str],
+        min_price: Optional[float],
+        max_price: Optional[float],
+        in_stock_only: bool,
+    ) -> Query:
+        q = db.query(Product).filter(Product.business_id == business_id, Product.is_active)
+        if category:
+            q = q.filter(func.lower(Product.category) == category.strip().lower())
+        if min_price is not None:
+            q = q.filter(Product.price >= Decimal(str(min_price)))
+        if max_price is not None:
+            q = q.filter(Product.price <= Decimal(str(max_price)))
+        if in_stock_only:
+            q = q.filter(Product.stock_quantity > 0)
+        return q
+
+    def _search_postgres(self, base: Query, query: str, offset: int, limit: int) -> List[Product]:
+        document = literal_column(_PG_DOCUMENT)
+        like = f"%{_escape_like(query)}%"
+        conditions = [
+            Product.name.ilike(like, escape="!"),
+            Product.sku.ilike(like, escape="!"),
+        ]
+        rank = func.similarity(Product.name, query)
+
+        tokens = _tokens(query)
+        if tokens:
+            tsquery = func.to_tsquery("simple", " & ".join(f"{t}:*" for t in tokens))
+            conditions.append(document.op("@@")(tsquery))
+            rank = rank + func.ts_rank(document, tsquery)
+
+        return base.filter(or_(*conditions)).order_by(
+            rank.desc(), Product.name, Product.id
+        ).offset(offset).limit(limit).all()
+
+    def _search_python(self, base: Query, query: str, offset: int, limit: int) -> List[Product]:
+        phrase = query.lower()
+        tokens = _tokens(query)
+
+        scored = []
+        for product in base.all():
+            fields = [(((getattr(product, attr) or "").lower()), weight) for attr, weight in _FIELD_WEIGHTS]
+            name, sku = fields[0][0], fields[1][0]
+
+            score = 0
+            if phrase in name or phrase in sku:
+                score += 5
+            token_scores = [max((w for text, w in fields if token in text), default=0) for token in tokens]
+            if token_scores and all(token_scores):
+                score += sum(token_scores)
+            if score:
+                scored.append((-score, product.name, product.id, product))
+
+        scored.sort(key=lambda item: item[:3])
+        return [item[3] for item in scored[offset:offset + limit]]
+
+
+product_search = ProductSearch(
+    max_limit=settings.PRODUCT_SEARCH_MAX_LIMIT,
+    min_similarity=settings.PRODUCT_SEMANTIC_MIN_SIMILARITY,
+)
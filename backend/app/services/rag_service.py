@@ -1,22 +1,84 @@
-import uuid
-import os
-from typing import List, Optional
+import hashlib
+from collections import Counter
+from contextlib import ExitStack
+from datetime import datetime, timezone
+from itertools import islice
+from uuid import uuid4
+from typing import Dict, List, Optional, Set, Tuple
 from fastapi import UploadFile
-from pypdf import PdfReader
-import google.generativeai as genai
-from app.services.vector_db import vector_db
-from app.utils.text_splitter import recursive_character_text_splitter
-from app.schemas.document import IngestResponse
+from fastapi.concurrency import run_in_threadpool
+from app.services.vector_store import VectorCollection, vector_store
+from app.services.vector_store.base import Where
+from app.utils.text_splitter import TextSplitter
+from app.schemas.document import IngestResponse, UploadResult
+from app.models.business import Business
 from app.models.document import Document
-from app.services.file_storage import file_storage
+from app.services.retrieval import retriever
+from app.services.document_extraction import document_extractor
+from app.services.entitlements import entitlement_service, upload_limit
+from app.services.file_storage import content_hash, file_storage
 from app.core.config import settings
+from app.db.session import SessionLocal
+from app.utils.lazy import LazyModule
 from sqlalchemy.orm import Session
 
+genai = LazyModule("google.generativeai")
+
+# Single collection shared by every tenant before per-tenant collections;
+# scripts.split_document_collection moves its chunks out.
+LEGACY_COLLECTION = "rag_documents"
+COLLECTION_PREFIX = "documents-"
+
+# Chunks embedded and stored per upsert while a document streams in.
+INGEST_BATCH_SIZE = 64
+
+
+def document_collection_name(user_id: str) -> str:
+    return f"{COLLECTION_PREFIX}{user_id}"
+
+
+def chunk_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def chunk_id(document_id: str, content_hash: str, occurrence: int) -> str:
+    """Chunks are keyed by their text, so re-indexing an edited file finds the
+    chunks it already has; ``occurrence`` tells repeated texts apart."""
+    return f"{document_id}:{content_hash[:32]}:{occurrence}"
+
+
+def version_folder(document_id: str, version: int) -> str:
+    """Storage folder for one version of a document's file; unique, so saving
+    it never replaces another version or another document's file."""
+    return f"{document_id}/v{version}-{uuid4().hex[:12]}"
+
+
+def splitter_for(filename: str) -> TextSplitter:
+    """Markdown splits on headings first; PDF text splits on sentences, as its line breaks are layout."""
+    name = filename.lower()
+    if name.endswith((".md", ".markdown")):
+        strategy = "markdown"
+    elif name.endswith(".pdf"):
+        strategy = "sentence"
+    else:
+        strategy = "recursive"
+    return TextSplitter(
+        max_tokens=min(settings.RAG_CHUNK_TOKENS, settings.GEMINI_EMBEDDING_MAX_TOKENS),
+        overlap_tokens=settings.RAG_CHUNK_OVERLAP_TOKENS,
+        strategy=strategy,
+    )
+
+
 class RAGService:
     def __init__(self):
-        self.vector_db = vector_db
+        self.vector_db = vector_store
         self.file_storage = file_storage
 
+    def collection(self, user_id: str):
+        """The tenant's own chunk collection (created on first use), so searches
+        and deletes only touch that tenant's vectors."""
+        return self.vector_db.get_collection(document_collection_name(user_id))
+
     def _get_embedding(self, text: str, api_key: str) -> List[float]:
         """Generate embedding using Google's Generative AI."""
         if not api_key:
@@ -51,22 +113,53 @@ class RAGService:
             print(f"Error generating query embedding: {e}")
             raise e
 
-    async def upload_document(self, file: UploadFile, user_id: str, db: Session) -> str:
-        # Save to file storage
-        file_path = self.file_storage.save(file.file, file.filename, user_id)
+    def upload_limit(self, user_id: str, db: Session) -> int:
+        """Largest file (bytes) the tenant's plan allows; users without a business get the base tier's."""
+        entitlements = entitlement_service.get(db, user_id)
+        return entitlements.max_upload_bytes if entitlements else upload_limit(None)
+
+    async def upload_document(self, file: UploadFile, user_id: str, db: Session) -> UploadResult:
+        """Store the file as a pending document, unless the tenant already has these bytes.
+
+        The spooled upload is hashed first, so a re-upload is answered with
+        the existing document (``duplicate=True``) without being stored or
+        processed again. Raises FileTooLargeError past the plan's limit.
+        Hashing and storing (network I/O for S3) run in the threadpool so
+        they do not block the event loop.
+        """
+        max_bytes = self.upload_limit(user_id, db)
+        digest = await run_in_threadpool(content_hash, file.file, file.filename, max_bytes)
+        duplicate = db.query(Document).filter(
+            Document.user_id == user_id,
+            Document.content_hash == digest,
+            Document.status != "error"
+        ).first()
+        if duplicate:
+            return UploadResult(
+                filename=duplicate.filename, document_id=duplicate.id, status=duplicate.status, duplicate=True
+            )
+
+        # Stream to file storage
+        document_id = str(uuid4())
+        stored = await run_in_threadpool(
+            self.file_storage.save, file.file, file.filename, user_id,
+            max_bytes=max_bytes, folder=version_folder(document_id, 1),
+        )
         
         # Save to DB
         doc = Document(
+            id=document_id,
             user_id=user_id,
             filename=file.filename,
-            file_path=file_path,
+            file_path=stored.path,
+            content_hash=digest,
             status="pending"
         )
         db.add(doc)
         db.commit()
         db.refresh(doc)
         
-        return doc.filename
+        return UploadResult(filename=doc.filename, document_id=doc.id, status=doc.status)
 
     def process_documents(self, user_id: str, db: Session) -> List[IngestResponse]:
         results = []
@@ -84,52 +177,251 @@ class RAGService:
         ).all()
         
         for doc in documents:
-            try:
-                text = ""
-                full_path = self.file_storage.get_full_path(doc.file_path)
-                
-                if not os.path.exists(full_path):
-                     raise FileNotFoundError(f"File not found at {full_path}")
-
-                if doc.filename.endswith(".pdf"):
-                    reader = PdfReader(full_path)
-                    for page in reader.pages:
-                        text += page.extract_text() + "\n"
-                else:
-                    with open(full_path, "r", encoding="utf-8") as f:
-                        text = f.read()
-                
-                chunks = recursive_character_text_splitter(text)
-                ids = [str(uuid.uuid4()) for _ in chunks]
-                
-                # Generate embeddings for all chunks
-                embeddings = [self._get_embedding(chunk, api_key) for chunk in chunks]
-                
-                # Embed chunks with user_id metadata for filtering
-                metadatas = [{"filename": doc.filename, "chunk_index": i, "user_id": user_id} for i in range(len(chunks))]
-                
-                if chunks:
-                    self.vector_db.add_documents(documents=chunks, metadatas=metadatas, ids=ids, embeddings=embeddings)
-                
-                doc.status = "processed"
-                results.append(IngestResponse(
-                    filename=doc.filename,
-                    chunks_created=len(chunks),
-                    status="success"
-                ))
-            except Exception as e:
-                print(f"Error processing {doc.filename}: {e}")
-                doc.status = "error"
-                doc.error_message = str(e)
-                results.append(IngestResponse(
-                    filename=doc.filename,
-                    chunks_created=0,
-                    status=f"error: {str(e)}"
-                ))
+            results.append(self._index_document(doc, api_key, db))
         
         db.commit()
         return results
 
+    def replace_document(
+        self, document_id: str, file: UploadFile, user_id: str, db: Session
+    ) -> Optional[IngestResponse]:
+        """Swap the document's file for a new version and re-index it.
+
+        Only chunks whose text changed are embedded or deleted, and the same
+        bytes under the same name change nothing. Each version is stored under
+        its own key (see ``version_folder``), so the previous file stays in
+        place and no other document's file can be overwritten. The
+        document switches to the new file only once it is indexed; if indexing
+        fails, the new file is deleted and the document keeps the previous
+        version (whose chunks were left in place). Without an API key the
+        document is left pending for ``process_documents``. Returns None if
+        the document does not exist.
+        """
+        doc = db.query(Document).filter(Document.id == document_id, Document.user_id == user_id).first()
+        if not doc:
+            return None
+
+        max_bytes = self.upload_limit(user_id, db)
+        digest = content_hash(file.file, file.filename, max_bytes)
+        if digest == doc.content_hash and file.filename == doc.filename and doc.status == "processed":
+            return IngestResponse(filename=doc.filename, chunks_created=0, status="unchanged")
+
+        previous = {
+            "file_path": doc.file_path,
+            "filename": doc.filename,
+            "content_hash": doc.content_hash,
+            "version": doc.version,
+            "updated_at": doc.updated_at,
+            "status": doc.status,
+        }
+        version = (doc.version or 1) + 1
+        stored = self.file_storage.save(
+            file.file, file.filename, user_id, max_bytes=max_bytes, folder=version_folder(doc.id, version)
+        )
+        doc.file_path = stored.path
+        doc.filename = file.filename
+        doc.content_hash = digest
+        doc.version = version
+        doc.updated_at = datetime.now(timezone.utc)
+        doc.status = "pending"
+        doc.error_message = None
+
+        api_key = settings.GOOGLE_API_KEY
+        if not api_key:
+            db.commit()
+            self._delete_file(previous["file_path"], db)
+            return IngestResponse(filename=doc.filename, chunks_created=0, status="pending: AI service not configured.")
+
+        # Not flushed while indexing: the row keeps pointing at the previous file until it succeeds
+        with db.no_autoflush:
+            result = self._index_document(doc, api_key, db, legacy_filenames={previous["filename"], doc.filename})
+        if doc.status == "processed":
+            db.commit()
+            self._delete_file(previous["file_path"], db)
+        else:
+            for field, value in previous.items():
+                setattr(doc, field, value)
+            db.commit()
+            self._delete_file(stored.path, db)
+        return result
+
+    def _delete_file(self, file_path: str, db: Session) -> None:
+        """Delete a stored file no document points at any more (files saved before
+        ``version_folder`` may be shared by two documents with the same name)."""
+        if db.query(Document.id).filter(Document.file_path == file_path).first():
+            return
+        try:
+            self.file_storage.delete(file_path)
+        except Exception:
+            pass
+
+    def _index_document(
+        self, doc: Document, api_key: str, db: Session, legacy_filenames: Set[str] = frozenset()
+    ) -> IngestResponse:
+        """Bring the tenant's collection in line with the document's current file.
+
+        The chunks the document already has are diffed against the new ones by
+        id (see ``chunk_id``): new chunks are inserted, chunks that are gone
+        are deleted, the rest stay as they are. A new chunk whose text is
+        already stored (see ``_embedding_sources``) gets a copy of that
+        embedding instead of a model call. Chunks stored before ids were
+        derived from content carry no ``document_id``; they are found by
+        filename and deleted once the new version is in.
+        """
+        collection = self.collection(doc.user_id)
+        sources = self._embedding_sources(doc, db)
+        existing: Dict[str, dict] = {}
+        inserted: List[str] = []
+        unchanged = 0
+        reused = 0
+        # Holds the local copy of the file (a download, for remote storage) until indexing ends
+        resources = ExitStack()
+        try:
+            stored = collection.get(where={"document_id": doc.id}, include=("metadatas",))
+            existing = dict(zip(stored["ids"], stored.get("metadatas") or [{}] * len(stored["ids"])))
+
+            # Pages stream from the extractor through the splitter and chunks are
+            # stored in batches, so the document's full text is never held at once.
+            full_path = resources.enter_context(self.file_storage.local_copy(doc.file_path))
+            pages = document_extractor.pages(full_path, doc.filename)
+            located = splitter_for(doc.filename).iter_pages(pages)
+            occurrences: Counter = Counter()
+            seen: Set[str] = set()
+            while True:
+                batch = list(islice(located, INGEST_BATCH_SIZE))
+                if not batch:
+                    break
+                new_ids, new_chunks, new_metadatas = [], [], []
+                moved: Dict[str, Tuple[str, dict]] = {}
+                for chunk, first_page, last_page in batch:
+                    content_hash = chunk_hash(chunk.text)
+                    record_id = chunk_id(doc.id, content_hash, occurrences[content_hash])
+                    occurrences[content_hash] += 1
+                    seen.add(record_id)
+                    # user_id, document_id and filename for filtering; page numbers for citations
+                    metadata = {
+                        "filename": doc.filename,
+                        "user_id": doc.user_id,
+                        "document_id": doc.id,
+                        "content_hash": content_hash,
+                    }
+                    if first_page is not None:
+                        metadata.update(page_start=first_page, page_end=last_page)
+                    if record_id not in existing:
+                        new_ids.append(record_id)
+                        new_chunks.append(chunk.text)
+                        new_metadatas.append(metadata)
+                    else:
+                        unchanged += 1
+                        if existing[record_id] != metadata:
+                            # Same text on other pages (or a renamed file)
+                            moved[record_id] = (chunk.text, metadata)
+
+                if new_ids:
+                    known = self._stored_embeddings(sources, {metadata["content_hash"] for metadata in new_metadatas})
+                    embeddings = []
+                    for text, metadata in zip(new_chunks, new_metadatas):
+                        if metadata["content_hash"] in known:
+                            reused += 1
+                        else:
+                            known[metadata["content_hash"]] = self._get_embedding(text, api_key)
+                        embeddings.append(known[metadata["content_hash"]])
+                    collection.upsert(ids=new_ids, embeddings=embeddings, documents=new_chunks, metadatas=new_metadatas)
+                    inserted.extend(new_ids)
+                if moved:
+                    # Rewrite metadata with the stored embeddings rather than re-embedding
+                    rows = collection.get(ids=list(moved), include=("embeddings",))
+                    collection.upsert(
+                        ids=rows["ids"],
+                        embeddings=rows["embeddings"],
+                        documents=[moved[record_id][0] for record_id in rows["ids"]],
+                        metadatas=[moved[record_id][1] for record_id in rows["ids"]],
+                    )
+
+            removed = [record_id for record_id in existing if record_id not in seen]
+            removed += self._legacy_chunk_ids(collection, legacy_filenames or {doc.filename})
+            if removed:
+                collection.delete(ids=removed)
+            if inserted or removed:
+                retriever.invalidate(collection.name)
+            
+            if reused:
+                # Server-side only: the count includes copies from other tenants' identical
+                # files, so returning it would reveal that someone else uploaded the file.
+                print(f"RAG Service: Reused {reused} stored embeddings for document {doc.id}")
+            doc.status = "processed"
+            doc.error_message = None
+            return IngestResponse(
+                filename=doc.filename,
+                chunks_created=len(inserted),
+                chunks_unchanged=unchanged,
+                chunks_removed=len(removed),
+                status="success"
+            )
+        except Exception as e:
+            print(f"Error processing {doc.filename}: {e}")
+            if inserted:
+                # Drop this run's batches; the previous version's chunks are still there
+                collection.delete(ids=inserted)
+                retriever.invalidate(collection.name)
+            doc.status = "error"
+            doc.error_message = str(e)
+            return IngestResponse(
+                filename=doc.filename,
+                chunks_created=0,
+                status=f"error: {str(e)}"
+            )
+        finally:
+            resources.close()
+
+    def _embedding_sources(self, doc: Document, db: Session) -> List[Tuple[VectorCollection, Optional[Where]]]:
+        """Where to look for embeddings of chunk texts already seen: the tenant's
+        whole collection, then another tenant's processed copy of the same file.
+
+        Embeddings depend only on the text, so copying one reveals nothing the
+        uploader does not already have.
+        """
+        sources = [(self.collection(doc.user_id), None)]
+        if doc.content_hash:
+            twin = db.query(Document.id, Document.user_id).filter(
+                Document.content_hash == doc.content_hash,
+                Document.user_id != doc.user_id,
+                Document.status == "processed"
+            ).first()
+            if twin:
+                sources.append((self.collection(twin.user_id), {"document_id": twin.id}))
+        return sources
+
+    @staticmethod
+    def _stored_embeddings(sources, hashes: Set[str]) -> Dict[str, List[float]]:
+        """``{content_hash: embedding}`` for the hashes found in ``sources``."""
+        found: Dict[str, List[float]] = {}
+        for collection, where in sources:
+            missing = [h for h in hashes if h not in found]
+            if not missing:
+                break
+            condition = {"content_hash": {"$in": missing}}
+            rows = collection.get(
+                where={"$and": [where, condition]} if where else condition, include=("metadatas", "embeddings")
+            )
+            for metadata, embedding in zip(rows.get("metadatas") or [], rows.get("embeddings") or []):
+                if metadata and embedding is not None:
+                    found.setdefault(metadata["content_hash"], embedding)
+        return found
+
+    @staticmethod
+    def _legacy_chunk_ids(collection, filenames) -> List[str]:
+        """Ids of chunks stored under these filenames before chunks carried a ``document_id``."""
+        ids = []
+        for filename in filenames:
+            rows = collection.get(where={"filename": filename}, include=("metadatas",))
+            metadatas = rows.get("metadatas") or [None] * len(rows["ids"])
+            ids.extend(
+                record_id for record_id, metadata in zip(rows["ids"], metadatas)
+                if not (metadata or {}).get("document_id")
+            )
+        return ids
+
     def list_documents(self, user_id: str, db: Session) -> List[dict]:
         # Return docs from DB
         docs = db.query(Document).filter(Document.user_id == user_id).all()
@@ -139,12 +431,27 @@ class RAGService:
                 "filename": doc.filename, 
                 "status": doc.status, 
                 "created_at": doc.created_at,
-                "error_message": doc.error_message
+                "error_message": doc.error_message,
+                "version": doc.version,
+                "updated_at": doc.updated_at
             } 
             for doc in docs
         ]
 
+    def _retrieval_limits(self, user_id: str, db: Optional[Session]) -> Tuple[int, int]:
+        """``(top_k, max_tokens)`` for the tenant: its business overrides, else the platform defaults."""
+        owns_session = db is None
+        db = db or SessionLocal()
+        try:
+            row = db.query(Business.rag_top_k, Business.rag_context_tokens).filter(Business.user_id == user_id).first()
+        finally:
+            if owns_session:
+                db.close()
+        top_k, max_tokens = row if row else (None, None)
+        return top_k or settings.RAG_TOP_K, max_tokens or settings.RAG_CONTEXT_TOKENS
+
     def query(self, text: str, user_id: str, api_key: Optional[str] = None, db: Session = None) -> List[str]:
+        """Context chunks for ``text`` from the tenant's documents (hybrid retrieval, see ``app.services.retrieval``)."""
         if not api_key:
             api_key = settings.GOOGLE_API_KEY
 
@@ -154,26 +461,17 @@ class RAGService:
 
         try:
             print(f"RAG Service: Querying for user_id={user_id}")
-            query_embedding = self._get_query_embedding(text, api_key)
-            # Query with user_id filter and query_embedding
-            # Wrap in list as vector_db expects list of embeddings
-            
-            where_clause = {"user_id": user_id}
-            print(f"RAG Service: Executing vector_db.query with where={where_clause}")
-            
-            results = self.vector_db.query(query_embeddings=[query_embedding], where=where_clause)
-            
-            print(f"RAG Service: Raw results keys: {results.keys() if results else 'None'}")
-            if results and results.get('documents'):
-                doc_count = len(results['documents'][0])
-                print(f"RAG Service: Found {doc_count} documents.")
-                # console log first few chars of first doc if exists
-                if doc_count > 0:
-                    print(f"RAG Service: First doc snippet: {results['documents'][0][0][:50]}...")
-                return results['documents'][0]
-            
-            print("RAG Service: No documents found.")
-            return []
+            try:
+                query_embedding = self._get_query_embedding(text, api_key)
+            except Exception:
+                # Keyword ranking still works without the embedding.
+                query_embedding = None
+
+            top_k, max_tokens = self._retrieval_limits(user_id, db)
+            collection = self.collection(user_id)
+            chunks = retriever.retrieve(collection, text, query_embedding, top_k=top_k, max_tokens=max_tokens)
+            print(f"RAG Service: Found {len(chunks)} chunks in {collection.name} (top_k={top_k}, max_tokens={max_tokens}).")
+            return chunks
         except Exception as e:
             print(f"Error querying RAG: {e}")
             return []
@@ -183,9 +481,13 @@ class RAGService:
         if not doc:
             return False
             
-        # Delete from Chroma
-        # Using $and operator for multiple conditions as required by newer Chroma versions
-        self.vector_db.delete(where={"$and": [{"filename": doc.filename}, {"user_id": user_id}]})
+        # Delete the document's chunks from the tenant's collection
+        collection = self.collection(user_id)
+        collection.delete(where={"document_id": doc.id})
+        legacy = self._legacy_chunk_ids(collection, {doc.filename})
+        if legacy:
+            collection.delete(ids=legacy)
+        retriever.invalidate(document_collection_name(user_id))
         
         # Delete file
         try:
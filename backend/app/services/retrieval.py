@@ -0,0 +1,243 @@
+"""
+Hybrid retrieval over one tenant's document chunks.
+
+Candidates come from two rankings of the tenant's collection:
+
+* vector: the ``candidates`` nearest chunks to the query embedding;
+* keyword: BM25 over the chunk text, from an in-process index per collection.
+
+The rankings are merged by reciprocal rank fusion, then maximal marginal
+relevance picks up to ``top_k`` chunks, trading fused relevance against
+cosine similarity to the chunks already picked. That stops the overlapping
+windows the splitter produces from filling every slot with the same passage.
+Finally the picks are cut to a token budget, so the context handed to the
+model stays bounded whatever the chunk size.
+
+Keyword indexes are built from the collection on first use and rebuilt when
+its ``version`` changes, which every write bumps, so an index built in one
+process never outlives another process's upload, edit or delete
+(``invalidate`` drops it at once in the writing process). If the query
+embedding is unavailable, retrieval runs on keywords alone.
+"""
+import logging
+import math
+import re
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.services.vector_store.base import VectorCollection, cosine_distance
+from app.utils.text_splitter import count_tokens
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# Reciprocal rank fusion constant, as in app.services.product_search.
+_RRF_K = 60
+
+# BM25 parameters (the usual defaults).
+_BM25_K1 = 1.5
+_BM25_B = 0.75
+
+# Characters kept per token when the best chunk alone is over budget.
+_CHARS_PER_TOKEN = 4
+
+# Page size when reading a collection to build its keyword index.
+_INDEX_PAGE_SIZE = 1000
+
+
+def _tokens(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+class KeywordIndex:
+    """BM25 over a fixed set of chunks."""
+
+    def __init__(self, ids: Sequence[str], documents: Sequence[Optional[str]]):
+        self.ids = list(ids)
+        self._term_freqs = [Counter(_tokens(document or "")) for document in documents]
+        self._lengths = [sum(freqs.values()) for freqs in self._term_freqs]
+        self._avg_length = (sum(self._lengths) / len(self._lengths)) if self._lengths else 0.0
+        self._doc_freqs: Counter = Counter()
+        for freqs in self._term_freqs:
+            self._doc_freqs.update(freqs.keys())
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def search(self, query: str, n: int) -> List[Tuple[str, float]]:
+        """Up to ``n`` ``(id, score)`` pairs with a positive score, best first."""
+        terms = set(_tokens(query))
+        if not terms or not self.ids:
+            return []
+        total = len(self.ids)
+        idf = {
+            term: math.log(1 + (total - self._doc_freqs[term] + 0.5) / (self._doc_freqs[term] + 0.5))
+            for term in terms if self._doc_freqs[term]
+        }
+        scored = []
+        for i, freqs in enumerate(self._term_freqs):
+            score = 0.0
+            norm = _BM25_K1 * (1 - _BM25_B + _BM25_B * self._lengths[i] / (self._avg_length or 1))
+            for term, weight in idf.items():
+                tf = freqs.get(term)
+                if tf:
+                    score += weight * tf * (_BM25_K1 + 1) / (tf + norm)
+            if score > 0:
+                scored.append((score, self.ids[i]))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [(record_id, score) for score, record_id in scored[:n]]
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]]) -> Dict[str, float]:
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, record_id in enumerate(ranking):
+            scores[record_id] = scores.get(record_id, 0.0) + 1.0 / (_RRF_K + rank + 1)
+    return scores
+
+
+def maximal_marginal_relevance(
+    relevance: Dict[str, float],
+    embeddings: Dict[str, List[float]],
+    k: int,
+    mmr_lambda: float,
+) -> List[str]:
+    """Greedily pick ``k`` ids by ``lambda * relevance - (1 - lambda) * max similarity to the picks``.
+
+    Relevance is scaled to [0, 1] first so it is comparable with cosine
+    similarity. Ids without an embedding are never penalised.
+    """
+    if not relevance:
+        return []
+    top = max(relevance.values()) or 1.0
+    remaining = sorted(relevance, key=lambda record_id: (-relevance[record_id], record_id))
+    picked: List[str] = []
+    while remaining and len(picked) < k:
+        best_id, best_score = None, -math.inf
+        for record_id in remaining:
+            redundancy = 0.0
+            if record_id in embeddings:
+                redundancy = max(
+                    (1.0 - cosine_distance(embeddings[record_id], embeddings[other])
+                     for other in picked if other in embeddings),
+                    default=0.0,
+                )
+            score = mmr_lambda * relevance[record_id] / top - (1 - mmr_lambda) * redundancy
+            if score > best_score:
+                best_id, best_score = record_id, score
+        picked.append(best_id)
+        remaining.remove(best_id)
+    return picked
+
+
+def fit_to_budget(chunks: Sequence[str], max_tokens: int) -> List[str]:
+    """Keep chunks in order while they fit in ``max_tokens``.
+
+    Chunks that would overflow are skipped so a smaller later one can still
+    fit. The first chunk is truncated rather than dropped if it alone is over
+    budget, so a non-empty result never comes back empty.
+    """
+    kept: List[str] = []
+    used = 0
+    for chunk in chunks:
+        cost = count_tokens(chunk)
+        if used + cost <= max_tokens:
+            kept.append(chunk)
+            used += cost
+    if not kept and chunks:
+        kept.append(chunks[0][:max_tokens * _CHARS_PER_TOKEN])
+    return kept
+
+
+class Retriever:
+    """
+    Args:
+        candidates: how many hits each ranking contributes to the fusion.
+        mmr_lambda: 1.0 ranks by relevance only; lower values favour diversity.
+        cache_size: keyword indexes kept in memory (least recently used evicted).
+    """
+
+    def __init__(self, candidates: int = 20, mmr_lambda: float = 0.7, cache_size: int = 128):
+        self.candidates = candidates
+        self.mmr_lambda = mmr_lambda
+        self.cache_size = cache_size
+        self._indexes: "OrderedDict[str, Tuple[str, KeywordIndex]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def retrieve(
+        self,
+        collection: VectorCollection,
+        query: str,
+        query_embedding: Optional[List[float]],
+        top_k: int,
+        max_tokens: int,
+    ) -> List[str]:
+        """The chunk texts to use as context, most relevant first."""
+        documents: Dict[str, str] = {}
+        embeddings: Dict[str, List[float]] = {}
+
+        vector_ranking: List[str] = []
+        if query_embedding is not None:
+            hits = collection.query(
+                query_embeddings=[query_embedding],
+                n_results=self.candidates,
+                include=("documents", "embeddings"),
+            )
+            vector_ranking = (hits.get("ids") or [[]])[0]
+            documents.update(zip(vector_ranking, (hits.get("documents") or [[]])[0]))
+            embeddings.update(zip(vector_ranking, (hits.get("embeddings") or [[]])[0]))
+
+        keyword_ranking = [record_id for record_id, _ in self.keyword_index(collection).search(query, self.candidates)]
+
+        missing = [record_id for record_id in keyword_ranking if record_id not in documents]
+        if missing:
+            rows = collection.get(ids=missing, include=("documents", "embeddings"))
+            documents.update(zip(rows["ids"], rows.get("documents") or []))
+            embeddings.update(zip(rows["ids"], rows.get("embeddings") or []))
+
+        relevance = reciprocal_rank_fusion([vector_ranking, keyword_ranking])
+        picked = maximal_marginal_relevance(relevance, embeddings, top_k, self.mmr_lambda)
+        return fit_to_budget([documents[record_id] for record_id in picked if documents.get(record_id)], max_tokens)
+
+    # --- Keyword indexes ---
+
+    def keyword_index(self, collection: VectorCollection) -> KeywordIndex:
+        # Read before the records: a write that lands while they are read leaves
+        # the index under the old version, so the next call rebuilds it.
+        version = collection.version()
+        with self._lock:
+            cached = self._indexes.get(collection.name)
+            if cached and cached[0] == version:
+                self._indexes.move_to_end(collection.name)
+                return cached[1]
+
+        ids: List[str] = []
+        documents: List[Optional[str]] = []
+        offset = 0
+        while True:
+            page = collection.get(include=("documents",), limit=_INDEX_PAGE_SIZE, offset=offset)
+            page_ids = page.get("ids") or []
+            ids.extend(page_ids)
+            documents.extend(page.get("documents") or [None] * len(page_ids))
+            offset += len(page_ids)
+            if len(page_ids) < _INDEX_PAGE_SIZE:
+                break
+        index = KeywordIndex(ids, documents)
+        logger.info(f"Retrieval: built keyword index for {collection.name} ({len(index)} chunks)")
+
+        with self._lock:
+            self._indexes[collection.name] = (version, index)
+            self._indexes.move_to_end(collection.name)
+            while len(self._indexes) > self.cache_size:
+                self._indexes.popitem(last=False)
+        return index
+
+    def invalidate(self, name: str) -> None:
+        with self._lock:
+            self._indexes.pop(name, None)
+
+
+retriever = Retriever(candidates=settings.RAG_CANDIDATES, mmr_lambda=settings.RAG_MMR_LAMBDA)
@@ -0,0 +1,252 @@
+"""
+Append-only usage ledger.
+
+Metered actions (AI responses, escalations) are written as ledger rows instead
+of read-modify-write increments on ``businesses``, so concurrent chats for the
+same business neither lose increments nor queue on that row's lock.
+
+Flow for a metered call::
+
+    reservation = usage_ledger.reserve(db, business_id, kind, limit)
+    try:
+        ...  # the LLM call
+    except Exception:
+        usage_ledger.refund(db, reservation)
+        raise
+    usage_ledger.commit(db, reservation)
+
+Reservations and settlements are written and committed in a session of
+their own, so they are visible to racing reservations at once without
+committing (or being rolled back with) whatever the caller has pending.
+
+Live usage is ``Business.used_*`` plus the sum of uncompacted rows.
+``compact`` (run by ``app.workers.usage_compaction_worker``) refunds
+reservations that were never settled and folds old rows into the
+``Business`` counters. Rows are claimed with ``FOR UPDATE SKIP LOCKED`` and
+the counters bumped with ``used_x = used_x + delta``, so concurrent passes
+fold disjoint rows and never overwrite each other's increments.
+"""
+import logging
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.business import Business
+from app.models.usage_ledger import UsageEntryType, UsageKind, UsageLedgerEntry, generate_uuid
+
+logger = logging.getLogger(__name__)
+
+_USED_COLUMNS = {
+    UsageKind.AI_RESPONSE.value: "used_ai_responses",
+    UsageKind.ESCALATION.value: "used_escalations",
+}
+
+
+@dataclass
+class Reservation:
+    id: str
+    business_id: str
+    kind: str
+    amount: int
+    settled: bool = False
+
+
+class UsageLedger:
+    def __init__(self, reservation_timeout_seconds: int = 300):
+        self.reservation_timeout = timedelta(seconds=reservation_timeout_seconds)
+
+    # --- Reads ---
+
+    def pending(self, db: Session, business_id: str) -> Dict[str, int]:
+        """Net uncompacted usage per kind for a business."""
+        rows = db.query(
+            UsageLedgerEntry.kind, func.coalesce(func.sum(UsageLedgerEntry.amount), 0)
+        ).filter(
+            UsageLedgerEntry.business_id == business_id,
+            UsageLedgerEntry.compacted_at.is_(None),
+        ).group_by(UsageLedgerEntry.kind).all()
+
+        totals = {kind.value: 0 for kind in UsageKind}
+        for kind, amount in rows:
+            totals[kind] = int(amount or 0)
+        return totals
+
+    def used(self, db: Session, business_id: str, kind: str) -> int:
+        """Compacted counter plus pending ledger rows."""
+        column = getattr(Business, _USED_COLUMNS[kind])
+        compacted = int(db.query(column).filter(Business.id == business_id).scalar() or 0)
+        return compacted + self.pending(db, business_id)[kind]
+
+    def history(self, db: Session, business_id: str, since: datetime) -> List[dict]:
+        """Net usage per day and kind since ``since``, oldest first."""
+        day = func.date(UsageLedgerEntry.created_at)
+        rows = db.query(
+            day, UsageLedgerEntry.kind, func.sum(UsageLedgerEntry.amount)
+        ).filter(
+            UsageLedgerEntry.business_id == business_id,
+            UsageLedgerEntry.created_at >= since,
+        ).group_by(day, UsageLedgerEntry.kind).order_by(day).all()
+
+        by_day: Dict[str, dict] = {}
+        for date, kind, amount in rows:
+            key = str(date)
+            entry = by_day.setdefault(key, {"date": key, **{k.value: 0 for k in UsageKind}})
+            entry[kind] = int(amount or 0)
+        return list(by_day.values())
+
+    # --- Writes ---
+
+    def _append(self, db: Session, business_id: str, kind: str, entry_type: str, amount: int,
+                reservation_id: Optional[str] = None, reference: Optional[str] = None) -> UsageLedgerEntry:
+        entry = UsageLedgerEntry(
+            id=generate_uuid(),
+            business_id=business_id,
+            kind=kind,
+            entry_type=entry_type,
+            amount=amount,
+            reservation_id=reservation_id,
+            reference=reference,
+        )
+        db.add(entry)
+        return entry
+
+    @contextmanager
+    def _own_transaction(self, db: Session) -> Iterator[Session]:
+        """A session beside ``db`` on the same database, committed on exit."""
+        ledger_db = Session(bind=db.get_bind(), expire_on_commit=False)
+        try:
+            yield ledger_db
+            ledger_db.commit()
+        except BaseException:
+            ledger_db.rollback()
+            raise
+        finally:
+            ledger_db.close()
+
+    def reserve(self, db: Session, business_id: str, kind: str, limit: int,
+                amount: int = 1, reference: Optional[str] = None) -> Optional[Reservation]:
+        """Reserve ``amount`` units, or return None if that would exceed ``limit``.
+
+        The reservation row is committed before the limit is checked, so two
+        racing reservations always see each other; whichever pushes usage over
+        the limit refunds itself. ``db`` itself is left uncommitted.
+        """
+        with self._own_transaction(db) as ledger_db:
+            entry = self._append(ledger_db, business_id, kind, UsageEntryType.RESERVE.value, amount,
+                                 reference=reference)
+        reservation = Reservation(id=entry.id, business_id=business_id, kind=kind, amount=amount)
+
+        with self._own_transaction(db) as ledger_db:
+            over_limit = self.used(ledger_db, business_id, kind) > limit
+        if over_limit:
+            self._settle(db, reservation, UsageEntryType.REFUND.value, -amount)
+            logger.info(f"Usage limit reached for business {business_id} ({kind})")
+            return None
+        return reservation
+
+    def commit(self, db: Session, reservation: Reservation) -> None:
+        """Mark a reservation as used. The reserved amount already counts, so this only records the outcome."""
+        self._settle(db, reservation, UsageEntryType.COMMIT.value, 0)
+
+    def refund(self, db: Session, reservation: Reservation) -> None:
+        """Give a reservation back, unless the compactor already expired it."""
+        self._settle(db, reservation, UsageEntryType.REFUND.value, -reservation.amount)
+
+    def record(self, db: Session, business_id: str, kind: str, limit: int,
+               amount: int = 1, reference: Optional[str] = None) -> bool:
+        """Reserve and immediately commit, for usage that is known to have happened."""
+        reservation = self.reserve(db, business_id, kind, limit, amount=amount, reference=reference)
+        if not reservation:
+            return False
+        self.commit(db, reservation)
+        return True
+
+    def _settle(self, db: Session, reservation: Reservation, entry_type: str, amount: int) -> None:
+        """Record the reservation's outcome, once: the reservation row is locked
+        so a settlement racing the compactor's expiry cannot be written twice."""
+        if reservation.settled:
+            return
+        with self._own_transaction(db) as ledger_db:
+            ledger_db.query(UsageLedgerEntry.id).filter(
+                UsageLedgerEntry.id == reservation.id
+            ).with_for_update().first()
+            already_settled = ledger_db.query(UsageLedgerEntry.id).filter(
+                UsageLedgerEntry.reservation_id == reservation.id
+            ).first()
+            if not already_settled:
+                self._append(
+                    ledger_db, reservation.business_id, reservation.kind, entry_type, amount,
+                    reservation_id=reservation.id,
+                )
+        reservation.settled = True
+
+    # --- Compaction ---
+
+    def compact(self, db: Session, business_id: Optional[str] = None, fold_all: bool = False) -> int:
+        """Fold ledger rows into the ``Business`` counters. Returns the number of rows folded.
+
+        Only rows older than the reservation timeout are folded, so an
+        in-flight reservation and its settlement land in the same pass.
+        Reservations past the timeout with no settlement are refunded first.
+        ``fold_all`` folds everything (used before a billing-cycle reset).
+        The caller owns the transaction and must commit; the claimed rows stay
+        locked until it does, and rows another pass has claimed are skipped.
+        """
+        now = datetime.now(timezone.utc)
+        cutoff = now - self.reservation_timeout
+
+        settled_ids = db.query(UsageLedgerEntry.reservation_id).filter(
+            UsageLedgerEntry.reservation_id.isnot(None)
+        )
+        stale = db.query(UsageLedgerEntry).filter(
+            UsageLedgerEntry.entry_type == UsageEntryType.RESERVE.value,
+            UsageLedgerEntry.compacted_at.is_(None),
+            UsageLedgerEntry.created_at < cutoff,
+            ~UsageLedgerEntry.id.in_(settled_ids),
+        )
+        if business_id:
+            stale = stale.filter(UsageLedgerEntry.business_id == business_id)
+        for entry in stale.with_for_update(skip_locked=True).all():
+            self._append(
+                db, entry.business_id, entry.kind, UsageEntryType.REFUND.value, -entry.amount,
+                reservation_id=entry.id,
+            )
+        db.flush()
+
+        rows = db.query(UsageLedgerEntry).filter(UsageLedgerEntry.compacted_at.is_(None))
+        if business_id:
+            rows = rows.filter(UsageLedgerEntry.business_id == business_id)
+        if not fold_all:
+            rows = rows.filter(UsageLedgerEntry.created_at < cutoff)
+        rows = rows.with_for_update(skip_locked=True).all()
+        if not rows:
+            return 0
+
+        deltas: Dict[str, Dict[str, int]] = {}
+        for row in rows:
+            per_kind = deltas.setdefault(row.business_id, {})
+            per_kind[row.kind] = per_kind.get(row.kind, 0) + row.amount
+            row.compacted_at = now
+
+        for folded_business_id, per_kind in deltas.items():
+            values = {}
+            for kind, delta in per_kind.items():
+                column = getattr(Business, _USED_COLUMNS[kind])
+                total = func.coalesce(column, 0) + delta
+                # A refund can arrive after a cycle reset zeroed the counter.
+                values[column] = case((total < 0, 0), else_=total)
+            # "fetch" refreshes the counters of Business objects already loaded in ``db``.
+            db.query(Business).filter(Business.id == folded_business_id).update(
+                values, synchronize_session="fetch"
+            )
+
+        logger.info(f"Compacted {len(rows)} usage ledger rows for {len(deltas)} businesses")
+        return len(rows)
+
+
+usage_ledger = UsageLedger(reservation_timeout_seconds=settings.USAGE_RESERVATION_TIMEOUT_SECONDS)
@@ -0,0 +1,57 @@
+"""
+Vector storage behind one interface (``base.VectorStore``), chosen by
+``VECTOR_STORE_BACKEND``:
+
+* ``chroma``   — local directory or Chroma server (``CHROMA_*`` settings)
+* ``pgvector`` — PostgreSQL with the pgvector extension (``PGVECTOR_*`` settings)
+* ``memory``   — in-process, for tests and benchmarks
+
+``scripts.migrate_vectors`` copies stored embeddings from one backend to
+another without re-embedding.
+"""
+from typing import Optional
+
+from app.core.config import settings
+from app.services.vector_store.base import VectorCollection, VectorStore
+from app.services.vector_store.chroma import ChromaVectorStore
+from app.services.vector_store.memory import InMemoryVectorStore
+from app.services.vector_store.pgvector import PgVectorStore
+
+BACKENDS = ("chroma", "pgvector", "memory")
+
+
+def create_vector_store(backend: Optional[str] = None) -> VectorStore:
+    backend = (backend or settings.VECTOR_STORE_BACKEND).lower()
+    if backend == "chroma":
+        return ChromaVectorStore(
+            path=settings.CHROMA_DB_DIR,
+            host=settings.CHROMA_SERVER_HOST or None,
+            port=settings.CHROMA_SERVER_PORT,
+            ssl=settings.CHROMA_SERVER_SSL,
+        )
+    if backend == "pgvector":
+        from app.db.session import engine
+        return PgVectorStore(
+            settings.PGVECTOR_DATABASE_URL or engine,
+            dimensions=settings.PGVECTOR_DIMENSIONS,
+            vector_type=settings.PGVECTOR_TYPE,
+            partitions=settings.PGVECTOR_PARTITIONS,
+            ef_search=settings.PGVECTOR_EF_SEARCH or None,
+        )
+    if backend == "memory":
+        return InMemoryVectorStore()
+    raise ValueError(f"Vector store backend '{backend}' not supported (expected one of {', '.join(BACKENDS)}).")
+
+
+vector_store = create_vector_store()
+
+__all__ = [
+    "BACKENDS",
+    "ChromaVectorStore",
+    "InMemoryVectorStore",
+    "PgVectorStore",
+    "VectorCollection",
+    "VectorStore",
+    "create_vector_store",
+    "vector_store",
+]
@@ -0,0 +1,141 @@
+"""
+Backend-neutral vector storage.
+
+A ``VectorStore`` holds named collections of ``(id, embedding, document,
+metadata)`` records. Callers embed text themselves and always pass vectors
+in; stores never call a model. Results keep Chroma's shapes, which the
+services already parse:
+
+* ``get``   -> ``{"ids": [...], "documents": [...], "metadatas": [...], "embeddings": [...]}``
+* ``query`` -> the same keys plus ``"distances"``, each holding one list per query embedding
+
+Distances are cosine distances (``1 - cosine similarity``). Metadata filters
+use Chroma's ``where`` syntax: ``{"key": value}``, ``{"key": {"$eq"|"$ne"|"$in"|"$nin": ...}}``,
+``{"$and": [...]}`` and ``{"$or": [...]}``.
+"""
+import math
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Sequence
+
+Where = Dict[str, Any]
+
+DEFAULT_INCLUDE = ("documents", "metadatas")
+DEFAULT_QUERY_INCLUDE = ("documents", "metadatas", "distances")
+
+
+class VectorCollection(ABC):
+    name: str
+
+    @abstractmethod
+    def upsert(
+        self,
+        ids: List[str],
+        embeddings: List[List[float]],
+        documents: Optional[List[str]] = None,
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+    ) -> None:
+        """Insert or replace records by id."""
+
+    @abstractmethod
+    def get(
+        self,
+        ids: Optional[List[str]] = None,
+        where: Optional[Where] = None,
+        include: Sequence[str] = DEFAULT_INCLUDE,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> Dict[str, list]:
+        """Records by id and/or filter, in a stable order so ``limit``/``offset`` can page."""
+
+    @abstractmethod
+    def query(
+        self,
+        query_embeddings: List[List[float]],
+        n_results: int = 5,
+        where: Optional[Where] = None,
+        include: Sequence[str] = DEFAULT_QUERY_INCLUDE,
+    ) -> Dict[str, List[list]]:
+        """The ``n_results`` nearest records to each query embedding, nearest first."""
+
+    @abstractmethod
+    def delete(self, ids: Optional[List[str]] = None, where: Optional[Where] = None) -> None:
+        """Remove records matching ``ids`` and/or ``where``."""
+
+    @abstractmethod
+    def count(self) -> int:
+        pass
+
+    @abstractmethod
+    def version(self) -> str:
+        """Opaque stamp that changes on every ``upsert`` or ``delete``, seen by
+        every process, so caches built from the records can tell they are stale."""
+
+
+class VectorStore(ABC):
+    def connect(self) -> None:
+        """Open connections; called from the app lifespan. Stores also connect on first use."""
+
+    def close(self) -> None:
+        pass
+
+    @property
+    def is_local(self) -> bool:
+        """True when the data lives inside this process (not shareable between workers)."""
+        return False
+
+    @abstractmethod
+    def get_collection(self, name: str) -> VectorCollection:
+        """A named collection, created on first use."""
+
+    @abstractmethod
+    def list_collections(self) -> List[str]:
+        pass
+
+    @abstractmethod
+    def delete_collection(self, name: str) -> None:
+        pass
+
+
+# --- Helpers shared by the implementations ---
+
+def matches(where: Optional[Where], metadata: Optional[Dict[str, Any]]) -> bool:
+    """Evaluate a Chroma-style ``where`` filter against one record's metadata."""
+    if not where:
+        return True
+    metadata = metadata or {}
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(matches(clause, metadata) for clause in condition):
+                return False
+        elif key == "$or":
+            if not any(matches(clause, metadata) for clause in condition):
+                return False
+        elif not _matches_field(metadata, key, condition):
+            return False
+    return True
+
+
+def _matches_field(metadata: Dict[str, Any], key: str, condition: Any) -> bool:
+    if not isinstance(condition, dict):
+        return key in metadata and metadata[key] == condition
+    for op, value in condition.items():
+        present = key in metadata
+        if op == "$eq":
+            ok = present and metadata[key] == value
+        elif op == "$ne":
+            ok = not present or metadata[key] != value
+        elif op == "$in":
+            ok = present and metadata[key] in value
+        elif op == "$nin":
+            ok = not present or metadata[key] not in value
+        else:
+            raise ValueError(f"Unsupported filter operator: {op}")
+        if not ok:
+            return False
+    return True
+
+
+def cosine_distance(a: Sequence[float], b: Sequence[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return 1.0 - dot / norm if norm else 1.0
@@ -0,0 +1,173 @@
+"""
+Chroma implementation of ``VectorStore``.
+
+With ``host`` set the store talks to a Chroma server, which is what several
+API workers (or nodes) must share; otherwise it opens the local ``path``
+in-process, which only one process may write to. Nothing is opened at import
+time: the API connects in its lifespan, and workers and scripts connect on
+first use.
+
+Collections are created with cosine distance. A ``rag_documents`` collection
+created before this module existed keeps Chroma's default L2 space; callers
+only use its distances for ordering.
+
+Chroma keeps no modification stamp, so every write also stores a fresh token
+for its collection in the ``vector-collection-versions`` collection (one
+record per collection, named after it); ``version`` reads it back.
+"""
+import threading
+import uuid
+from typing import Dict, List, Optional, Sequence
+
+from app.services.vector_store.base import (
+    DEFAULT_INCLUDE,
+    DEFAULT_QUERY_INCLUDE,
+    VectorCollection,
+    VectorStore,
+    Where,
+)
+
+
+def _as_lists(embeddings) -> Optional[List[List[float]]]:
+    # Chroma hands back numpy arrays.
+    if embeddings is None:
+        return None
+    return [[float(x) for x in embedding] for embedding in embeddings]
+
+
+VERSIONS_COLLECTION = "vector-collection-versions"
+
+
+class ChromaCollection(VectorCollection):
+    def __init__(self, collection, versions):
+        self._collection = collection
+        self._versions = versions
+        self.name = collection.name
+
+    def _bump_version(self) -> None:
+        _bump_version(self._versions, self.name)
+
+    def upsert(self, ids, embeddings, documents=None, metadatas=None) -> None:
+        if metadatas is not None:
+            # Chroma rejects empty metadata dicts.
+            metadatas = [metadata or None for metadata in metadatas]
+        self._collection.upsert(ids=ids, embeddings=embeddings, documents=documents, metadatas=metadatas)
+        self._bump_version()
+
+    def get(
+        self,
+        ids: Optional[List[str]] = None,
+        where: Optional[Where] = None,
+        include: Sequence[str] = DEFAULT_INCLUDE,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> Dict[str, list]:
+        result = self._collection.get(
+            ids=ids, where=where or None, include=list(include), limit=limit, offset=offset or None
+        )
+        result = dict(result)
+        if "embeddings" in include:
+            result["embeddings"] = _as_lists(result.get("embeddings"))
+        return result
+
+    def query(
+        self,
+        query_embeddings: List[List[float]],
+        n_results: int = 5,
+        where: Optional[Where] = None,
+        include: Sequence[str] = DEFAULT_QUERY_INCLUDE,
+    ) -> Dict[str, List[list]]:
+        result = dict(self._collection.query(
+            query_embeddings=query_embeddings, n_results=n_results, where=where or None, include=list(include)
+        ))
+        if "embeddings" in include and result.get("embeddings") is not None:
+            result["embeddings"] = [_as_lists(batch) for batch in result["embeddings"]]
+        return result
+
+    def delete(self, ids: Optional[List[str]] = None, where: Optional[Where] = None) -> None:
+        self._collection.delete(ids=ids, where=where or None)
+        self._bump_version()
+
+    def count(self) -> int:
+        return self._collection.count()
+
+    def version(self) -> str:
+        metadatas = self._versions.get(ids=[self.name], include=["metadatas"]).get("metadatas") or [None]
+        return (metadatas[0] or {}).get("version", "")
+
+
+def _bump_version(versions, name: str) -> None:
+    versions.upsert(ids=[name], embeddings=[[1.0]], metadatas=[{"version": uuid.uuid4().hex}])
+
+
+class ChromaVectorStore(VectorStore):
+    def __init__(self, path: str = "chroma_db", host: Optional[str] = None, port: int = 8000, ssl: bool = False):
+        self.path = path
+        self.host = host
+        self.port = port
+        self.ssl = ssl
+        self._client = None
+        self._collections: Dict[str, ChromaCollection] = {}
+        self._versions = None
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        where = f"{self.host}:{self.port}" if self.host else self.path
+        return f"<ChromaVectorStore {where}>"
+
+    def connect(self) -> None:
+        """Open the client (importing chromadb) if not already open."""
+        if self._client is not None:
+            return
+        with self._lock:
+            if self._client is not None:
+                return
+            import chromadb
+            if self.host:
+                self._client = chromadb.HttpClient(host=self.host, port=self.port, ssl=self.ssl)
+            else:
+                self._client = chromadb.PersistentClient(path=self.path)
+
+    def close(self) -> None:
+        self._client = None
+        self._collections = {}
+        self._versions = None
+
+    @property
+    def is_local(self) -> bool:
+        return not self.host
+
+    @property
+    def client(self):
+        self.connect()
+        return self._client
+
+    @property
+    def versions(self):
+        if self._versions is None:
+            self._versions = self.client.get_or_create_collection(name=VERSIONS_COLLECTION)
+        return self._versions
+
+    def get_collection(self, name: str) -> ChromaCollection:
+        collection = self._collections.get(name)
+        if collection is None:
+            # Cosine distance for new collections; an existing collection keeps its space.
+            collection = ChromaCollection(
+                self.client.get_or_create_collection(name=name, metadata={"hnsw:space": "cosine"}),
+                self.versions,
+            )
+            self._collections[name] = collection
+        return collection
+
+    def list_collections(self) -> List[str]:
+        names = [c if isinstance(c, str) else c.name for c in self.client.list_collections()]
+        return [name for name in names if name != VERSIONS_COLLECTION]
+
+    def delete_collection(self, name: str) -> None:
+        self._collections.pop(name, None)
+        try:
+            self.client.delete_collection(name=name)
+        except Exception:
+            # Already gone.
+            pass
+        _bump_version(self.versions, name)
@@ -0,0 +1,133 @@
+"""
+In-process ``VectorStore`` with brute-force cosine search.
+
+For tests, benchmarks and local experiments: nothing is persisted, and every
+query scans the whole collection.
+"""
+import threading
+import uuid
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.services.vector_store.base import (
+    DEFAULT_INCLUDE,
+    DEFAULT_QUERY_INCLUDE,
+    VectorCollection,
+    VectorStore,
+    Where,
+    cosine_distance,
+    matches,
+)
+
+_Record = Tuple[List[float], Optional[str], Dict[str, Any]]
+
+
+def _select(records: List[Tuple[str, _Record]], include: Sequence[str]) -> Dict[str, list]:
+    result: Dict[str, list] = {"ids": [record_id for record_id, _ in records]}
+    if "embeddings" in include:
+        result["embeddings"] = [list(record[0]) for _, record in records]
+    if "documents" in include:
+        result["documents"] = [record[1] for _, record in records]
+    if "metadatas" in include:
+        result["metadatas"] = [dict(record[2]) for _, record in records]
+    return result
+
+
+class InMemoryCollection(VectorCollection):
+    def __init__(self, name: str):
+        self.name = name
+        self._records: Dict[str, _Record] = {}
+        self._lock = threading.Lock()
+        # Unique per instance, so a collection deleted and created again never repeats a version
+        self._instance = uuid.uuid4().hex
+        self._writes = 0
+
+    def upsert(self, ids, embeddings, documents=None, metadatas=None) -> None:
+        with self._lock:
+            self._writes += 1
+            for i, record_id in enumerate(ids):
+                self._records[record_id] = (
+                    list(embeddings[i]),
+                    documents[i] if documents is not None else None,
+                    dict(metadatas[i] or {}) if metadatas is not None else {},
+                )
+
+    def _matching(self, ids: Optional[List[str]], where: Optional[Where]) -> List[Tuple[str, _Record]]:
+        with self._lock:
+            if ids is not None:
+                items = [(record_id, self._records[record_id]) for record_id in ids if record_id in self._records]
+            else:
+                items = sorted(self._records.items())
+        return [(record_id, record) for record_id, record in items if matches(where, record[2])]
+
+    def get(
+        self,
+        ids: Optional[List[str]] = None,
+        where: Optional[Where] = None,
+        include: Sequence[str] = DEFAULT_INCLUDE,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> Dict[str, list]:
+        records = self._matching(ids, where)
+        end = None if limit is None else offset + limit
+        return _select(records[offset:end], include)
+
+    def query(
+        self,
+        query_embeddings: List[List[float]],
+        n_results: int = 5,
+        where: Optional[Where] = None,
+        include: Sequence[str] = DEFAULT_QUERY_INCLUDE,
+    ) -> Dict[str, List[list]]:
+        candidates = self._matching(None, where)
+        keys = ["ids"] + [key for key in ("embeddings", "documents", "metadatas", "distances") if key in include]
+        result: Dict[str, List[list]] = {key: [] for key in keys}
+        for query_embedding in query_embeddings:
+            scored = sorted(
+                ((cosine_distance(query_embedding, record[0]), record_id, record) for record_id, record in candidates),
+                key=lambda item: (item[0], item[1]),
+            )[:n_results]
+            selected = _select([(record_id, record) for _, record_id, record in scored], include)
+            for key in selected:
+                result[key].append(selected[key])
+            if "distances" in include:
+                result["distances"].append([distance for distance, _, _ in scored])
+        return result
+
+    def delete(self, ids: Optional[List[str]] = None, where: Optional[Where] = None) -> None:
+        doomed = [record_id for record_id, _ in self._matching(ids, where)]
+        with self._lock:
+            self._writes += 1
+            for record_id in doomed:
+                self._records.pop(record_id, None)
+
+    def count(self) -> int:
+        return len(self._records)
+
+    def version(self) -> str:
+        return f"{self._instance}:{self._writes}"
+
+
+class InMemoryVectorStore(VectorStore):
+    def __init__(self):
+        self._collections: Dict[str, InMemoryCollection] = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return "<InMemoryVectorStore>"
+
+    @property
+    def is_local(self) -> bool:
+        return True
+
+    def get_collection(self, name: str) -> InMemoryCollection:
+        with self._lock:
+            if name not in self._collections:
+                self._collections[name] = InMemoryCollection(name)
+            return self._collections[name]
+
+    def list_collections(self) -> List[str]:
+        return sorted(self._collections)
+
+    def delete_collection(self, name: str) -> None:
+        with self._lock:
+            self._collections.pop(name, None)
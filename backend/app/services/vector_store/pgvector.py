@@ -0,0 +1,346 @@
+"""
+PostgreSQL + pgvector implementation of ``VectorStore``.
+
+All collections share one table, ``vector_embeddings``, hash-partitioned on
+the collection name. Collections are per tenant (``products-<business id>``
+and friends), so each tenant's vectors sit in a single partition and a query,
+which always filters on its collection, is pruned to that partition. Every
+partition has its own HNSW index (cosine) on the embedding and a GIN index
+on the metadata for ``where`` filters. ``vector_collection_versions`` holds a
+counter per collection, bumped in the same transaction as every write.
+
+Embeddings are stored as ``halfvec`` (pgvector >= 0.7): HNSW indexes
+``vector`` columns of at most 2,000 dimensions, ``halfvec`` up to 4,000, and
+``gemini-embedding-001`` produces 3,072. Older servers can use ``vector`` with
+a smaller embedding size. Type and dimension are fixed when the table is
+created.
+
+The store creates its schema on ``connect`` (``CREATE ... IF NOT EXISTS``),
+so the main migrations don't require the extension on servers that keep
+using Chroma. The database role needs permission to ``CREATE EXTENSION
+vector``, or the extension must already be installed.
+"""
+import json
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import bindparam, create_engine, text
+from sqlalchemy.engine import Engine
+
+from app.services.vector_store.base import (
+    DEFAULT_INCLUDE,
+    DEFAULT_QUERY_INCLUDE,
+    VectorCollection,
+    VectorStore,
+    Where,
+)
+
+logger = logging.getLogger(__name__)
+
+TABLE = "vector_embeddings"
+VERSIONS_TABLE = "vector_collection_versions"
+
+_BUMP_VERSION = text(
+    f"INSERT INTO {VERSIONS_TABLE} (collection, version) VALUES (:collection, 1) "
+    f"ON CONFLICT (collection) DO UPDATE SET version = {VERSIONS_TABLE}.version + 1"
+)
+
+
+def _vector_literal(embedding: Sequence[float]) -> str:
+    return "[" + ",".join(repr(float(x)) for x in embedding) + "]"
+
+
+def _parse_vector(value: str) -> List[float]:
+    return [float(x) for x in json.loads(value)]
+
+
+def where_sql(where: Optional[Where], params: Dict[str, Any]) -> str:
+    """Translate a Chroma-style filter into SQL over the ``metadata`` column.
+
+    Equality becomes JSONB containment (``metadata @> '{"k": v}'``), which the
+    GIN index serves and which compares values with their JSON types.
+    Parameters are added to ``params``.
+    """
+    if not where:
+        return "TRUE"
+    clauses = []
+    for key, condition in where.items():
+        if key in ("$and", "$or"):
+            joiner = " AND " if key == "$and" else " OR "
+            clauses.append("(" + joiner.join(where_sql(clause, params) for clause in condition) + ")")
+        elif isinstance(condition, dict):
+            for op, value in condition.items():
+                clauses.append(_operator_sql(key, op, value, params))
+        else:
+            clauses.append(_contains(key, condition, params))
+    return clauses[0] if len(clauses) == 1 else "(" + " AND ".join(clauses) + ")"
+
+
+def _contains(key: str, value: Any, params: Dict[str, Any]) -> str:
+    name = f"w{len(params)}"
+    params[name] = json.dumps({key: value})
+    return f"metadata @> CAST(:{name} AS jsonb)"
+
+
+def _operator_sql(key: str, op: str, value: Any, params: Dict[str, Any]) -> str:
+    if op == "$eq":
+        return _contains(key, value, params)
+    if op == "$ne":
+        return f"NOT {_contains(key, value, params)}"
+    if op in ("$in", "$nin"):
+        if not value:
+            return "FALSE" if op == "$in" else "TRUE"
+        any_of = "(" + " OR ".join(_contains(key, v, params) for v in value) + ")"
+        return any_of if op == "$in" else f"NOT {any_of}"
+    raise ValueError(f"Unsupported filter operator: {op}")
+
+
+class PgVectorCollection(VectorCollection):
+    def __init__(self, store: "PgVectorStore", name: str):
+        self.store = store
+        self.name = name
+
+    def upsert(self, ids, embeddings, documents=None, metadatas=None) -> None:
+        if not ids:
+            return
+        dimensions = self.store.dimensions
+        rows = []
+        for i, record_id in enumerate(ids):
+            if len(embeddings[i]) != dimensions:
+                raise ValueError(f"Embedding for {record_id} has {len(embeddings[i])} dimensions, expected {dimensions}")
+            rows.append({
+                "collection": self.name,
+                "id": record_id,
+                "embedding": _vector_literal(embeddings[i]),
+                "document": documents[i] if documents is not None else None,
+                "metadata": json.dumps((metadatas[i] if metadatas is not None else None) or {}),
+            })
+        stmt = text(
+            f"INSERT INTO {TABLE} (collection, id, embedding, document, metadata) "
+            f"VALUES (:collection, :id, CAST(:embedding AS {self.store.vector_type}), :document, CAST(:metadata AS jsonb)) "
+            "ON CONFLICT (collection, id) DO UPDATE SET "
+            "embedding = EXCLUDED.embedding, document = EXCLUDED.document, metadata = EXCLUDED.metadata"
+        )
+        with self.store.engine.begin() as conn:
+            conn.execute(stmt, rows)
+            conn.execute(_BUMP_VERSION, {"collection": self.name})
+
+    def _filter(self, ids: Optional[List[str]], where: Optional[Where], params: Dict[str, Any]) -> str:
+        params["collection"] = self.name
+        sql = "collection = :collection"
+        if ids is not None:
+            params["ids"] = list(ids)
+            sql += " AND id IN :ids"
+        if where:
+            sql += f" AND {where_sql(where, params)}"
+        return sql
+
+    @staticmethod
+    def _columns(include: Sequence[str]) -> str:
+        columns = ["id"]
+        if "documents" in include:
+            columns.append("document")
+        if "metadatas" in include:
+            columns.append("metadata")
+        if "embeddings" in include:
+            columns.append("embedding::text AS embedding")
+        return ", ".join(columns)
+
+    @staticmethod
+    def _collect(rows, include: Sequence[str]) -> Dict[str, list]:
+        result: Dict[str, list] = {"ids": [row.id for row in rows]}
+        if "documents" in include:
+            result["documents"] = [row.document for row in rows]
+        if "metadatas" in include:
+            result["metadatas"] = [row.metadata for row in rows]
+        if "embeddings" in include:
+            result["embeddings"] = [_parse_vector(row.embedding) for row in rows]
+        return result
+
+    def _text(self, sql: str, params: Dict[str, Any]):
+        stmt = text(sql)
+        if "ids" in params:
+            stmt = stmt.bindparams(bindparam("ids", expanding=True))
+        return stmt
+
+    def get(
+        self,
+        ids: Optional[List[str]] = None,
+        where: Optional[Where] = None,
+        include: Sequence[str] = DEFAULT_INCLUDE,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> Dict[str, list]:
+        if ids is not None and not ids:
+            return self._collect([], include)
+        params: Dict[str, Any] = {}
+        sql = f"SELECT {self._columns(include)} FROM {TABLE} WHERE {self._filter(ids, where, params)} ORDER BY id"
+        if limit is not None:
+            sql += " LIMIT :limit"
+            params["limit"] = limit
+        if offset:
+            sql += " OFFSET :offset"
+            params["offset"] = offset
+        with self.store.engine.connect() as conn:
+            rows = conn.execute(self._text(sql, params), params).all()
+        return self._collect(rows, include)
+
+    def query(
+        self,
+        query_embeddings: List[List[float]],
+        n_results: int = 5,
+        where: Optional[Where] = None,
+        include: Sequence[str] = DEFAULT_QUERY_INCLUDE,
+    ) -> Dict[str, List[list]]:
+        keys = ["ids"] + [key for key in ("embeddings", "documents", "metadatas", "distances") if key in include]
+        result: Dict[str, List[list]] = {key: [] for key in keys}
+        vector_type = self.store.vector_type
+        with self.store.engine.begin() as conn:
+            self.store.configure_search(conn)
+            for embedding in query_embeddings:
+                params: Dict[str, Any] = {"query": _vector_literal(embedding), "k": n_results}
+                sql = (
+                    f"SELECT {self._columns(include)}, embedding <=> CAST(:query AS {vector_type}) AS distance "
+                    f"FROM {TABLE} WHERE {self._filter(None, where, params)} "
+                    f"ORDER BY embedding <=> CAST(:query AS {vector_type}) LIMIT :k"
+                )
+                # Iterative index scans may return rows slightly out of order.
+                rows = sorted(conn.execute(self._text(sql, params), params).all(), key=lambda row: row.distance)
+                collected = self._collect(rows, include)
+                for key in collected:
+                    result[key].append(collected[key])
+                if "distances" in include:
+                    result["distances"].append([float(row.distance) for row in rows])
+        return result
+
+    def delete(self, ids: Optional[List[str]] = None, where: Optional[Where] = None) -> None:
+        if ids is not None and not ids:
+            return
+        params: Dict[str, Any] = {}
+        sql = f"DELETE FROM {TABLE} WHERE {self._filter(ids, where, params)}"
+        with self.store.engine.begin() as conn:
+            conn.execute(self._text(sql, params), params)
+            conn.execute(_BUMP_VERSION, {"collection": self.name})
+
+    def count(self) -> int:
+        with self.store.engine.connect() as conn:
+            return conn.execute(
+                text(f"SELECT count(*) FROM {TABLE} WHERE collection = :collection"), {"collection": self.name}
+            ).scalar_one()
+
+    def version(self) -> str:
+        with self.store.engine.connect() as conn:
+            version = conn.execute(
+                text(f"SELECT version FROM {VERSIONS_TABLE} WHERE collection = :collection"),
+                {"collection": self.name},
+            ).scalar()
+        return str(version or 0)
+
+
+class PgVectorStore(VectorStore):
+    """
+    Args:
+        engine: engine (or URL) of the PostgreSQL database holding the vectors.
+        dimensions: embedding size; fixed once the table exists.
+        vector_type: ``halfvec`` or ``vector``; fixed once the table exists.
+        partitions: hash partitions created with the table.
+        ef_search: HNSW candidate list size per query (pgvector default 40 when None).
+        iterative_scan: ``hnsw.iterative_scan`` mode (pgvector >= 0.8) so filtered
+            queries keep scanning until ``n_results`` matches are found; empty disables.
+    """
+
+    def __init__(
+        self,
+        engine,
+        dimensions: int = 3072,
+        vector_type: str = "halfvec",
+        partitions: int = 16,
+        ef_search: Optional[int] = None,
+        iterative_scan: str = "relaxed_order",
+    ):
+        self.engine: Engine = create_engine(engine, pool_pre_ping=True) if isinstance(engine, str) else engine
+        if vector_type not in ("halfvec", "vector"):
+            raise ValueError(f"Unsupported vector type: {vector_type}")
+        self.dimensions = dimensions
+        self.vector_type = vector_type
+        self.partitions = partitions
+        self.ef_search = ef_search
+        self.iterative_scan = iterative_scan
+        self._ready = False
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"<PgVectorStore {self.engine.url.render_as_string(hide_password=True)}>"
+
+    def connect(self) -> None:
+        if self._ready:
+            return
+        with self._lock:
+            if not self._ready:
+                self.create_schema()
+                if self.iterative_scan and self.extension_version() < (0, 8):
+                    logger.warning("pgvector < 0.8 has no iterative index scans; filtered queries may return fewer results")
+                    self.iterative_scan = ""
+                self._ready = True
+
+    def close(self) -> None:
+        self._ready = False
+
+    def create_schema(self) -> None:
+        """Create the extension, partitioned table and indexes if missing."""
+        with self.engine.begin() as conn:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+            conn.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {TABLE} ("
+                "collection text NOT NULL, "
+                "id text NOT NULL, "
+                f"embedding {self.vector_type}({int(self.dimensions)}) NOT NULL, "
+                "document text, "
+                "metadata jsonb NOT NULL DEFAULT '{}'::jsonb, "
+                "PRIMARY KEY (collection, id)"
+                ") PARTITION BY HASH (collection)"
+            ))
+            for remainder in range(self.partitions):
+                conn.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {TABLE}_p{remainder} PARTITION OF {TABLE} "
+                    f"FOR VALUES WITH (MODULUS {int(self.partitions)}, REMAINDER {remainder})"
+                ))
+            conn.execute(text(
+                f"CREATE INDEX IF NOT EXISTS ix_{TABLE}_embedding ON {TABLE} "
+                f"USING hnsw (embedding {self.vector_type}_cosine_ops)"
+            ))
+            conn.execute(text(
+                f"CREATE INDEX IF NOT EXISTS ix_{TABLE}_metadata ON {TABLE} USING gin (metadata jsonb_path_ops)"
+            ))
+            conn.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {VERSIONS_TABLE} ("
+                "collection text PRIMARY KEY, version bigint NOT NULL)"
+            ))
+
+    def extension_version(self) -> Tuple[int, ...]:
+        with self.engine.connect() as conn:
+            version = conn.execute(text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")).scalar()
+        return tuple(int(part) for part in (version or "0").split(".") if part.isdigit())
+
+    def configure_search(self, conn) -> None:
+        """Per-transaction HNSW settings for a query."""
+        if self.ef_search:
+            conn.execute(text(f"SET LOCAL hnsw.ef_search = {int(self.ef_search)}"))
+        if self.iterative_scan:
+            conn.execute(text("SELECT set_config('hnsw.iterative_scan', :mode, true)"), {"mode": self.iterative_scan})
+
+    def get_collection(self, name: str) -> PgVectorCollection:
+        self.connect()
+        return PgVectorCollection(self, name)
+
+    def list_collections(self) -> List[str]:
+        self.connect()
+        with self.engine.connect() as conn:
+            return list(conn.execute(text(f"SELECT DISTINCT collection FROM {TABLE} ORDER BY collection")).scalars())
+
+    def delete_collection(self, name: str) -> None:
+        self.connect()
+        with self.engine.begin() as conn:
+            conn.execute(text(f"DELETE FROM {TABLE} WHERE collection = :collection"), {"collection": name})
+            conn.execute(_BUMP_VERSION, {"collection": name})
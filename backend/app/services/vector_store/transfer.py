@@ -0,0 +1,92 @@
+"""
+Copy stored vectors between backends or collections without re-embedding.
+
+Each collection is read from the source in pages (``get`` with ``limit`` and
+``offset``, embeddings included) and upserted into the target under the same
+ids, so a copy can be re-run after an interruption and converges.
+"""
+import logging
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+from app.services.vector_store.base import VectorStore
+
+logger = logging.getLogger(__name__)
+
+_INCLUDE = ("embeddings", "documents", "metadatas")
+
+
+def _pages(collection, batch_size: int) -> Iterator[Dict[str, list]]:
+    offset = 0
+    while True:
+        page = collection.get(include=_INCLUDE, limit=batch_size, offset=offset)
+        ids = page.get("ids") or []
+        if not ids:
+            return
+        yield page
+        offset += len(ids)
+        if len(ids) < batch_size:
+            return
+
+
+def copy_collection(source: VectorStore, target: VectorStore, name: str, batch_size: int = 500) -> int:
+    """Copy one collection page by page. Returns the number of records copied."""
+    target_collection = target.get_collection(name)
+    copied = 0
+    for page in _pages(source.get_collection(name), batch_size):
+        target_collection.upsert(
+            ids=page["ids"],
+            embeddings=page["embeddings"],
+            documents=page.get("documents"),
+            metadatas=page.get("metadatas"),
+        )
+        copied += len(page["ids"])
+    return copied
+
+
+def split_collection(
+    store: VectorStore,
+    name: str,
+    route: Callable[[Dict[str, Any]], Optional[str]],
+    batch_size: int = 500,
+) -> Tuple[Dict[str, int], int]:
+    """Fan the records of one collection out into the collections named by
+    ``route(metadata)``, leaving the source untouched.
+
+    Records ``route`` maps to ``None`` stay where they are. Returns the records
+    copied per target collection and the number skipped.
+    """
+    counts: Dict[str, int] = defaultdict(int)
+    skipped = 0
+    for page in _pages(store.get_collection(name), batch_size):
+        groups: Dict[str, Dict[str, list]] = {}
+        documents = page.get("documents") or [None] * len(page["ids"])
+        metadatas = page.get("metadatas") or [None] * len(page["ids"])
+        for record_id, embedding, document, metadata in zip(page["ids"], page["embeddings"], documents, metadatas):
+            target = route(metadata or {})
+            if target is None:
+                skipped += 1
+                continue
+            group = groups.setdefault(target, {"ids": [], "embeddings": [], "documents": [], "metadatas": []})
+            group["ids"].append(record_id)
+            group["embeddings"].append(embedding)
+            group["documents"].append(document)
+            group["metadatas"].append(metadata)
+        for target, group in groups.items():
+            store.get_collection(target).upsert(**group)
+            counts[target] += len(group["ids"])
+    return dict(counts), skipped
+
+
+def copy_all(
+    source: VectorStore,
+    target: VectorStore,
+    names: Optional[Iterable[str]] = None,
+    batch_size: int = 500,
+) -> Dict[str, int]:
+    """Copy every collection (or just ``names``). Returns records copied per collection."""
+    counts = {}
+    for name in names or source.list_collections():
+        counts[name] = copy_collection(source, target, name, batch_size=batch_size)
+        logger.info(f"Vector copy: {name}: {counts[name]} records")
+    return counts
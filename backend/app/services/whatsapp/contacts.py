@@ -1,12 +1,17 @@
 """Contact CRUD, CSV import, and GuestUser import."""
+import codecs
 import csv
 import io
 import re
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timezone
+from typing import BinaryIO, Iterable
 
+from sqlalchemy import exists, func, literal, null, select
 from sqlalchemy.orm import Session
 
+from app.db.upsert import upsert_insert
+
 from app.models.business import Business
 from app.models.chat_session import ChatSession, SessionChannel
 from app.models.widget import GuestUser, WidgetSettings
@@ -15,21 +20,50 @@ from app.models.whatsapp_broadcast import (
     WhatsAppContact,
     WhatsAppContactList,
     WhatsAppContactListMember,
+    generate_uuid,
 )
 
 # Minimal E.164 validator: leading +, 8–15 digits total.
 E164_PATTERN = re.compile(r"^\+?[1-9]\d{7,14}$")
 
+# ASCII separators stripped from phone numbers; str.translate is much faster
+# than a regex substitution when normalising whole CSV chunks.
+_PHONE_SEPARATORS = str.maketrans("", "", " \t\n\r\f\v-()")
+_PHONE_SEPARATOR_RE = re.compile(r"[\s\-()]")
+
+# Rows per CSV import chunk (one existence query + one upsert each).
+CSV_IMPORT_CHUNK_SIZE = 1000
+# Only this many row errors are reported back.
+MAX_REPORTED_ERRORS = 500
+# Guests read per page by import_from_guests.
+GUEST_IMPORT_CHUNK_SIZE = 5000
+# Contact ids per membership INSERT ... SELECT (keeps bound parameters in check).
+MEMBERS_CHUNK_SIZE = 1000
+
+
+def normalize_phones(raws: Iterable[str | None]) -> list[str | None]:
+    """Normalise a batch of raw phone numbers to E.164 (None where invalid)."""
+    match = E164_PATTERN.match
+    normalized = []
+    for raw in raws:
+        if not raw:
+            normalized.append(None)
+            continue
+        cleaned = raw.translate(_PHONE_SEPARATORS)
+        if not cleaned.isascii():
+            # Unicode whitespace needs the full \s class.
+            cleaned = _PHONE_SEPARATOR_RE.sub("", cleaned)
+        if not cleaned:
+            normalized.append(None)
+            continue
+        if cleaned[0] != "+":
+            cleaned = "+" + cleaned
+        normalized.append(cleaned if match(cleaned) else None)
+    return normalized
+
 
 def normalize_phone(raw: str) -> str | None:
-    if not raw:
-        return None
-    cleaned = re.sub(r"[\s\-()]", "", raw.strip())
-    if not cleaned:
-        return None
-    if not cleaned.startswith("+"):
-        cleaned = "+" + cleaned
-    return cleaned if E164_PATTERN.match(cleaned) else None
+    return normalize_phones([raw])[0]
 
 
 @dataclass
@@ -37,6 +71,13 @@ class CsvImportResult:
     imported: int = 0
     skipped: int = 0
     errors: list[str] = field(default_factory=list)
+    added_to_list: int = 0
+
+    def add_error(self, message: str) -> None:
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(message)
+        elif len(self.errors) == MAX_REPORTED_ERRORS:
+            self.errors.append("Further errors omitted")
 
 
 def create_contact(
@@ -85,66 +126,156 @@ def create_contact(
     return contact
 
 
-def import_csv(db: Session, business_id: str, file_bytes: bytes) -> CsvImportResult:
-    """Import contacts from a CSV with headers: phone, name (optional), tags (optional, comma-sep)."""
+def import_csv(
+    db: Session,
+    business_id: str,
+    file: bytes | BinaryIO,
+    *,
+    list_id: str | None = None,
+    chunk_size: int = CSV_IMPORT_CHUNK_SIZE,
+) -> CsvImportResult:
+    """Import contacts from a CSV with headers: phone, name (optional), tags (optional, comma-sep).
+
+    The file is streamed in chunks of ``chunk_size`` rows. Each chunk is
+    normalised in one pass, checked against existing contacts with a single
+    ``IN`` query and written with one ``ON CONFLICT (business_id, phone_e164)``
+    upsert, then committed. Existing contacts keep their name (unless they had
+    none) and get the new tags if the row has any. If ``list_id`` is given,
+    every imported or matched contact is also added to that list.
+    """
     result = CsvImportResult()
+    contact_list = None
+    if list_id:
+        contact_list = (
+            db.query(WhatsAppContactList)
+            .filter(
+                WhatsAppContactList.id == list_id,
+                WhatsAppContactList.business_id == business_id,
+            )
+            .first()
+        )
+        if not contact_list:
+            raise ValueError("Contact list not found")
+
+    if isinstance(file, (bytes, bytearray)):
+        file = io.BytesIO(file)
+    reader = csv.DictReader(codecs.getreader("utf-8-sig")(file))
     try:
-        text = file_bytes.decode("utf-8-sig")
+        fieldnames = reader.fieldnames
     except UnicodeDecodeError:
         result.errors.append("File is not valid UTF-8")
         return result
-
-    reader = csv.DictReader(io.StringIO(text))
-    if not reader.fieldnames or "phone" not in [h.lower() for h in reader.fieldnames]:
+    if not fieldnames or "phone" not in [h.lower() for h in fieldnames]:
         result.errors.append("CSV must have a 'phone' header column")
         return result
 
-    # Normalize headers to lowercase for lookup
-    for row_num, row in enumerate(reader, start=2):
-        row_lower = {(k or "").lower(): v for k, v in row.items()}
-        raw_phone = (row_lower.get("phone") or "").strip()
+    insert = upsert_insert(db)
+    chunk: list[tuple[int, dict]] = []
+    try:
+        # Normalize headers to lowercase for lookup
+        for row_num, row in enumerate(reader, start=2):
+            chunk.append((row_num, {(k or "").lower(): v for k, v in row.items()}))
+            if len(chunk) >= chunk_size:
+                _import_csv_chunk(db, insert, business_id, chunk, contact_list, result)
+                chunk = []
+    except UnicodeDecodeError:
+        result.errors.append(f"File is not valid UTF-8 (after row {reader.line_num})")
+        return result
+    if chunk:
+        _import_csv_chunk(db, insert, business_id, chunk, contact_list, result)
+    return result
+
+
+def _import_csv_chunk(
+    db: Session,
+    insert,
+    business_id: str,
+    rows: list[tuple[int, dict]],
+    contact_list: WhatsAppContactList | None,
+    result: CsvImportResult,
+) -> None:
+    raw_phones = [(row.get("phone") or "").strip() for _, row in rows]
+
+    # Merge rows by number; a repeat within the file counts as skipped, like an existing contact.
+    contacts: dict[str, dict] = {}
+    for (row_num, row), raw_phone, normalized in zip(rows, raw_phones, normalize_phones(raw_phones)):
         if not raw_phone:
             result.skipped += 1
             continue
-        normalized = normalize_phone(raw_phone)
         if not normalized:
-            result.errors.append(f"Row {row_num}: invalid phone '{raw_phone}'")
+            result.add_error(f"Row {row_num}: invalid phone '{raw_phone}'")
             result.skipped += 1
             continue
 
-        name = (row_lower.get("name") or "").strip() or None
-        tags_raw = (row_lower.get("tags") or "").strip()
+        name = (row.get("name") or "").strip() or None
+        tags_raw = (row.get("tags") or "").strip()
         tags = [t.strip() for t in tags_raw.split(",") if t.strip()] if tags_raw else None
 
-        existing = (
-            db.query(WhatsAppContact)
-            .filter(
-                WhatsAppContact.business_id == business_id,
-                WhatsAppContact.phone_e164 == normalized,
-            )
-            .first()
-        )
-        if existing:
-            if name and not existing.name:
-                existing.name = name
-            if tags:
-                existing.tags = tags
+        if normalized in contacts:
+            merged = contacts[normalized]
+            merged["name"] = merged["name"] or name
+            merged["tags"] = tags or merged["tags"]
             result.skipped += 1
             continue
+        contacts[normalized] = {"name": name, "tags": tags}
 
-        contact = WhatsAppContact(
-            business_id=business_id,
-            phone_e164=normalized,
-            name=name,
-            tags=tags,
-            source=ContactSource.CSV.value,
-            opted_in=True,
+    if not contacts:
+        return
+
+    existing = {
+        phone
+        for (phone,) in db.query(WhatsAppContact.phone_e164).filter(
+            WhatsAppContact.business_id == business_id,
+            WhatsAppContact.phone_e164.in_(list(contacts)),
         )
-        db.add(contact)
-        result.imported += 1
+    }
 
+    now = datetime.now(timezone.utc)
+    table = WhatsAppContact.__table__
+    stmt = insert(table).values([
+        {
+            "id": generate_uuid(),
+            "business_id": business_id,
+            "phone_e164": phone,
+            "name": values["name"],
+            # SQL NULL, not JSON null, so COALESCE below keeps existing tags.
+            "tags": values["tags"] if values["tags"] else null(),
+            "source": ContactSource.CSV.value,
+            "opted_in": True,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for phone, values in contacts.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["business_id", "phone_e164"],
+        set_={
+            "name": func.coalesce(table.c.name, stmt.excluded.name),
+            "tags": func.coalesce(stmt.excluded.tags, table.c.tags),
+            "updated_at": now,
+        },
+    )
+    if contact_list is not None:
+        contact_ids = [cid for (cid,) in db.execute(stmt.returning(table.c.id))]
+        result.added_to_list += _insert_members(db, insert, contact_list.id, contact_ids)
+    else:
+        db.execute(stmt)
     db.commit()
-    return result
+
+    result.imported += len(contacts) - len(existing)
+    result.skipped += len(existing)
+
+
+def _insert_members(db: Session, insert, contact_list_id: str, contact_ids: list[str]) -> int:
+    """Add contacts to a list, ignoring ones already in it. Returns how many were added."""
+    if not contact_ids:
+        return 0
+    now = datetime.now(timezone.utc)
+    stmt = insert(WhatsAppContactListMember.__table__).values([
+        {"contact_list_id": contact_list_id, "contact_id": cid, "created_at": now}
+        for cid in contact_ids
+    ]).on_conflict_do_nothing(index_elements=["contact_list_id", "contact_id"])
+    return db.execute(stmt).rowcount
 
 
 def import_from_guests(
@@ -153,63 +284,80 @@ def import_from_guests(
     *,
     min_sessions: int = 1,
     last_seen_after: datetime | None = None,
+    chunk_size: int = GUEST_IMPORT_CHUNK_SIZE,
 ) -> int:
-    """Import phone-bearing GuestUsers from WhatsApp channel sessions into contacts."""
+    """Import phone-bearing GuestUsers from WhatsApp channel sessions into contacts.
+
+    Each widget's guests are read ``chunk_size`` at a time in id order, so
+    memory stays flat however many a business has. Each page's phones are
+    normalised together and written with one ``INSERT ... ON CONFLICT
+    (business_id, phone_e164) DO NOTHING``; numbers that are already contacts
+    are left untouched.
+    """
     business = db.query(Business).filter(Business.id == business_id).first()
     if not business:
         return 0
 
     widget_ids = [
-        w.id
-        for w in db.query(WidgetSettings)
+        widget_id
+        for (widget_id,) in db.query(WidgetSettings.id)
         .filter(WidgetSettings.user_id == business.user_id)
         .all()
     ]
-    if not widget_ids:
-        return 0
-
-    query = (
-        db.query(GuestUser)
-        .join(ChatSession, ChatSession.guest_id == GuestUser.id)
-        .filter(
-            GuestUser.widget_id.in_(widget_ids),
-            GuestUser.phone.isnot(None),
-            ChatSession.channel == SessionChannel.WHATSAPP.value,
-        )
-    )
-    if min_sessions > 1:
-        query = query.filter(GuestUser.total_sessions >= min_sessions)
-    if last_seen_after:
-        query = query.filter(GuestUser.last_seen_at >= last_seen_after)
-
-    guests = query.distinct().all()
 
+    table = WhatsAppContact.__table__
+    stmt = upsert_insert(db)(table).on_conflict_do_nothing(
+        index_elements=["business_id", "phone_e164"]
+    ).returning(table.c.id)
     imported = 0
-    for guest in guests:
-        normalized = normalize_phone(guest.phone)
-        if not normalized:
-            continue
-        existing = (
-            db.query(WhatsAppContact)
-            .filter(
-                WhatsAppContact.business_id == business_id,
-                WhatsAppContact.phone_e164 == normalized,
-            )
-            .first()
-        )
-        if existing:
-            continue
-        contact = WhatsAppContact(
-            business_id=business_id,
-            phone_e164=normalized,
-            name=guest.name,
-            source=ContactSource.GUEST_IMPORT.value,
-            opted_in=True,
+    for widget_id in widget_ids:
+        query = db.query(GuestUser.id, GuestUser.phone, GuestUser.name).filter(
+            GuestUser.widget_id == widget_id,
+            GuestUser.phone.isnot(None),
+            exists().where(
+                ChatSession.guest_id == GuestUser.id,
+                ChatSession.channel == SessionChannel.WHATSAPP.value,
+            ),
         )
-        db.add(contact)
-        imported += 1
-
-    db.commit()
+        if min_sessions > 1:
+            query = query.filter(GuestUser.total_sessions >= min_sessions)
+        if last_seen_after:
+            query = query.filter(GuestUser.last_seen_at >= last_seen_after)
+
+        after_id = None
+        while True:
+            page = query.filter(GuestUser.id > after_id) if after_id else query
+            guests = page.order_by(GuestUser.id).limit(chunk_size).all()
+            if not guests:
+                break
+            after_id = guests[-1].id
+
+            contacts: dict[str, str] = {}
+            for guest, normalized in zip(guests, normalize_phones([g.phone for g in guests])):
+                if normalized and normalized not in contacts:
+                    contacts[normalized] = guest.name
+            if contacts:
+                now = datetime.now(timezone.utc)
+                # Executemany form: compiled once and cached, unlike a VALUES
+                # list per page. RETURNING yields only the rows inserted.
+                inserted = db.execute(stmt, [
+                    {
+                        "id": generate_uuid(),
+                        "business_id": business_id,
+                        "phone_e164": phone,
+                        "name": name,
+                        "source": ContactSource.GUEST_IMPORT.value,
+                        "opted_in": True,
+                        "created_at": now,
+                        "updated_at": now,
+                    }
+                    for phone, name in contacts.items()
+                ])
+                imported += len(inserted.all())
+                db.commit()
+
+            if len(guests) < chunk_size:
+                break
     return imported
 
 
@@ -228,30 +376,27 @@ def create_list(
 def add_members(
     db: Session, contact_list: WhatsAppContactList, contact_ids: list[str]
 ) -> int:
-    existing_ids = {
-        m.contact_id
-        for m in db.query(WhatsAppContactListMember)
-        .filter(WhatsAppContactListMember.contact_list_id == contact_list.id)
-        .all()
-    }
+    """Add the business's contacts among ``contact_ids`` to a list. Returns how many were new.
+
+    Written as ``INSERT ... SELECT ... ON CONFLICT DO NOTHING`` in batches of
+    ``MEMBERS_CHUNK_SIZE`` ids, so the list's existing members are never loaded.
+    """
+    insert = upsert_insert(db)
+    members = WhatsAppContactListMember.__table__
     added = 0
-    valid_contacts = (
-        db.query(WhatsAppContact.id)
-        .filter(
-            WhatsAppContact.id.in_(contact_ids),
+    for i in range(0, len(contact_ids), MEMBERS_CHUNK_SIZE):
+        rows = select(
+            literal(contact_list.id),
+            WhatsAppContact.id,
+            literal(datetime.now(timezone.utc), type_=members.c.created_at.type),
+        ).where(
+            WhatsAppContact.id.in_(contact_ids[i:i + MEMBERS_CHUNK_SIZE]),
             WhatsAppContact.business_id == contact_list.business_id,
         )
-        .all()
-    )
-    for (cid,) in valid_contacts:
-        if cid in existing_ids:
-            continue
-        db.add(
-            WhatsAppContactListMember(
-                contact_list_id=contact_list.id, contact_id=cid
-            )
-        )
-        added += 1
+        stmt = insert(members).from_select(
+            ["contact_list_id", "contact_id", "created_at"], rows
+        ).on_conflict_do_nothing(index_elements=["contact_list_id", "contact_id"])
+        added += db.execute(stmt).rowcount
     db.commit()
     return added
 
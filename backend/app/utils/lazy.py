@@ -0,0 +1,29 @@
+"""
+Deferred imports for heavy SDKs.
+
+``LazyModule("google.genai")`` stands in for the module and imports it on the
+first attribute access, so services can keep a module-level ``genai`` name
+(and tests can keep patching it) without paying the SDK's import cost when
+the app starts.
+"""
+import importlib
+from types import ModuleType
+
+
+class LazyModule:
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def _load(self) -> ModuleType:
+        if self._module is None:
+            # import_module holds the import lock, so concurrent first uses are safe.
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<LazyModule {self._name!r} ({state})>"
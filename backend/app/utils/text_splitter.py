@@ -1,37 +1,196 @@
+"""
+Token-aware text splitting for embedding.
 
-def recursive_character_text_splitter(text: str, chunk_size: int = 1000, chunk_overlap: int = 200) -> list[str]:
-    if not text:
-        return []
-    
-    chunks = []
-    start = 0
-    text_len = len(text)
-    
-    while start < text_len:
-        end = start + chunk_size
-        if end >= text_len:
-            chunks.append(text[start:])
-            break
-            
-        # Try to find a natural break point (newline, period, space)
-        # Look back from 'end' to find the best split point
-        split_point = -1
-        for char in ['\n\n', '\n', '. ', ' ']:
-            pos = text.rfind(char, start, end)
-            if pos != -1:
-                split_point = pos + len(char)
-                break
-        
-        if split_point != -1:
-            chunks.append(text[start:split_point])
-            # Ensure we make progress to avoid infinite loops
-            next_start = split_point - chunk_overlap
-            if next_start <= start:
-                next_start = start + 1
-            start = next_start
-        else:
-            # Hard split if no natural break found
-            chunks.append(text[start:end])
-            start = end - chunk_overlap
-            
-    return chunks
+Sizes are estimated tokens (``count_tokens``): each run of non-space
+characters costs ``ceil(len / 4)`` tokens and whitespace is free. That tracks
+SentencePiece-style tokenizers on prose and overestimates slightly on code
+and numbers, so a chunk sized against the embedding model's input limit stays
+under it.
+
+A document is scanned once. A regex cuts it into words (runs of non-space,
+at most 64 characters so unbroken blobs still split), and a prefix sum over
+their token counts makes "tokens between word i and word j" a subtraction.
+The separator positions of every level are also collected once, then looked
+up by binary search for each chunk. Splitting is therefore O(n log n) in the
+document size whatever its shape, and a chunk always advances by at least
+``max_tokens / 2 - overlap_tokens`` tokens.
+
+Strategies decide where a chunk may end, best first:
+
+* ``recursive`` — paragraph, line, sentence, word (plain text)
+* ``sentence``  — paragraph, sentence, word (PDF text, whose line breaks are layout)
+* ``markdown``  — heading, paragraph, line, sentence, word
+
+A break is taken at the best level that leaves the chunk at least half full.
+Consecutive chunks share at most ``overlap_tokens`` tokens of whole words.
+
+``iter_pages`` chunks a document that arrives page by page (PDF extraction)
+and yields the same chunks as splitting the pages joined by newlines, each
+with the pages it spans. It holds one page plus the open last chunk.
+"""
+import re
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from itertools import accumulate
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+_CHARS_PER_TOKEN = 4
+_MAX_WORD_CHARS = 64
+
+_WORD_SPLIT_RE = re.compile(r"(\S{1,%d})" % _MAX_WORD_CHARS)
+# Tokens for a word of each possible length.
+_WORD_TOKENS = [(length + _CHARS_PER_TOKEN - 1) // _CHARS_PER_TOKEN for length in range(_MAX_WORD_CHARS + 1)]
+
+# Each pattern ends where the next chunk would start (its first word).
+_SEPARATORS: Dict[str, Tuple[re.Pattern, bool]] = {
+    # name: (pattern, chunk starts at match start rather than match end)
+    "heading": (re.compile(r"^#{1,6}[ \t]", re.MULTILINE), True),
+    "paragraph": (re.compile(r"\n[^\S\n]*\n\s*"), False),
+    "line": (re.compile(r"\n\s*"), False),
+    "sentence": (re.compile(r"[.!?][\"')\]]*\s+"), False),
+}
+
+STRATEGIES: Dict[str, Tuple[str, ...]] = {
+    "recursive": ("paragraph", "line", "sentence"),
+    "sentence": ("paragraph", "sentence"),
+    "markdown": ("heading", "paragraph", "line", "sentence"),
+}
+
+
+def count_tokens(text: str) -> int:
+    """Estimated tokens in ``text`` (the measure the splitter uses)."""
+    return sum((len(word) + _CHARS_PER_TOKEN - 1) // _CHARS_PER_TOKEN for word in text.split())
+
+
+@dataclass(frozen=True)
+class Chunk:
+    text: str
+    start: int  # character offsets into the document
+    end: int
+    tokens: int
+
+
+class TextSplitter:
+    """
+    Args:
+        max_tokens: upper bound on a chunk's estimated tokens.
+        overlap_tokens: tokens repeated from the end of one chunk at the start
+            of the next; must be under half of ``max_tokens``.
+        strategy: one of ``STRATEGIES``.
+    """
+
+    def __init__(self, max_tokens: int = 256, overlap_tokens: int = 48, strategy: str = "recursive"):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown splitting strategy '{strategy}' (expected one of {', '.join(STRATEGIES)}).")
+        if max_tokens < 2 * _MAX_WORD_CHARS // _CHARS_PER_TOKEN:
+            raise ValueError(f"max_tokens must be at least {2 * _MAX_WORD_CHARS // _CHARS_PER_TOKEN}.")
+        if not 0 <= overlap_tokens < max_tokens // 2:
+            raise ValueError("overlap_tokens must be non-negative and under half of max_tokens.")
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        self.strategy = strategy
+
+    def split(self, text: str) -> List[str]:
+        return [chunk.text for chunk in self.iter_chunks(text)]
+
+    def iter_chunks(self, text: str) -> Iterator[Chunk]:
+        """Yield chunks in document order."""
+        if not text:
+            return
+        # re.split alternates whitespace and words: [space, word, space, word, ..., space].
+        # Offsets, word bounds and token prefix sums are then derived with C-level
+        # map/accumulate rather than a Python loop per word.
+        parts = _WORD_SPLIT_RE.split(text)
+        if len(parts) < 3:
+            return
+        offsets = list(accumulate(map(len, parts), initial=0))
+        starts = offsets[1:-1:2]
+        ends = offsets[2::2]
+        prefix = list(accumulate(map(_WORD_TOKENS.__getitem__, map(len, parts[1::2])), initial=0))
+        levels = [self._boundaries(text, starts, name) for name in STRATEGIES[self.strategy]]
+
+        count = len(starts)
+        min_fill = self.max_tokens // 2
+        start = 0
+        while start < count:
+            # Furthest end (exclusive word index) that keeps the chunk within max_tokens.
+            end = bisect_right(prefix, prefix[start] + self.max_tokens, lo=start + 1) - 1
+            if end >= count:
+                yield self._chunk(text, starts, ends, prefix, start, count)
+                return
+            floor = bisect_left(prefix, prefix[start] + min_fill, lo=start + 1)
+            end = self._break(levels, starts, ends, floor, end)
+            yield self._chunk(text, starts, ends, prefix, start, end)
+            # First word such that at most overlap_tokens remain before ``end``; past
+            # ``start`` because the chunk holds more than overlap_tokens.
+            start = bisect_left(prefix, prefix[end] - self.overlap_tokens, lo=start + 1, hi=end)
+
+    def iter_pages(
+        self, pages: Iterable[Tuple[Optional[int], str]]
+    ) -> Iterator[Tuple[Chunk, Optional[int], Optional[int]]]:
+        """Yield ``(chunk, first page, last page)`` for ``(page number, text)`` pairs.
+
+        Offsets are into the pages joined by ``"\n"``. Every chunk but the
+        last of what has arrived so far is final (its window ends inside the
+        text seen), so only that last chunk is re-split with the next page.
+        """
+        buffer = ""
+        base = 0  # document offset of buffer[0]
+        marks: List[Tuple[int, Optional[int]]] = []  # (document offset where a page starts, number)
+        seen = False
+        last: Optional[Chunk] = None
+        for number, text in pages:
+            if seen:
+                buffer += "\n"
+            seen = True
+            marks.append((base + len(buffer), number))
+            buffer += text
+
+            last = None
+            for chunk in self.iter_chunks(buffer):
+                if last is not None:
+                    yield self._located(last, marks)
+                last = Chunk(chunk.text, chunk.start + base, chunk.end + base, chunk.tokens)
+            if last is not None:
+                buffer = buffer[last.start - base:]
+                base = last.start
+                # Keep the page the open chunk starts on, and everything after it.
+                keep = bisect_right([offset for offset, _ in marks], base) - 1
+                marks = marks[max(keep, 0):]
+        if last is not None:
+            yield self._located(last, marks)
+
+    # --- Internals ---
+
+    @staticmethod
+    def _located(chunk: Chunk, marks: List[Tuple[int, Optional[int]]]) -> Tuple[Chunk, Optional[int], Optional[int]]:
+        offsets = [offset for offset, _ in marks]
+        first = marks[max(bisect_right(offsets, chunk.start) - 1, 0)][1]
+        last = marks[max(bisect_right(offsets, chunk.end - 1) - 1, 0)][1]
+        return chunk, first, last
+
+    @staticmethod
+    def _boundaries(text: str, starts: List[int], name: str) -> List[int]:
+        """Word indices a chunk may end before, for one separator level."""
+        pattern, at_start = _SEPARATORS[name]
+        return [
+            bisect_left(starts, match.start() if at_start else match.end())
+            for match in pattern.finditer(text)
+        ]
+
+    @staticmethod
+    def _break(levels: List[List[int]], starts: List[int], ends: List[int], floor: int, end: int) -> int:
+        for boundaries in levels:
+            i = bisect_right(boundaries, end) - 1
+            if i >= 0 and boundaries[i] >= floor:
+                return boundaries[i]
+        # Any whitespace; the pieces of an over-long word have none between them.
+        for candidate in range(end, floor - 1, -1):
+            if ends[candidate - 1] != starts[candidate]:
+                return candidate
+        return end
+
+    @staticmethod
+    def _chunk(text: str, starts: List[int], ends: List[int], prefix: List[int], first: int, last: int) -> Chunk:
+        start, end = starts[first], ends[last - 1]
+        return Chunk(text=text[start:end], start=start, end=end, tokens=prefix[last] - prefix[first])
@@ -0,0 +1,111 @@
+"""Standalone worker that runs queued chat session analyses.
+
+Run as: `uv run python -m app.workers.analysis_worker`
+
+Sessions are queued (and debounced) by `trigger_session_analysis` through
+`app.services.analysis_scheduler`. The worker claims due jobs up to
+`ANALYSIS_WORKER_CONCURRENCY` at a time, so Gemini calls stay bounded no
+matter how busy the widget is, and logs queue depth and lag each poll.
+Replicas can run side by side on PostgreSQL (`FOR UPDATE SKIP LOCKED`).
+Every `ANALYSIS_LEASE_SECONDS` the worker requeues jobs whose lease ran
+out, i.e. jobs claimed by a replica that died before finishing them.
+"""
+import asyncio
+import signal
+import time
+from typing import Dict
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+
+# Import all models so SQLAlchemy can resolve string-based relationships
+# (this worker runs standalone, not through FastAPI/main.py).
+from app.models.user import User  # noqa: F401
+from app.models.business import Business  # noqa: F401
+from app.models.plan import Plan  # noqa: F401
+from app.models.payment import PaymentTransaction  # noqa: F401
+from app.models.product import Product  # noqa: F401
+from app.models.widget import WidgetSettings, GuestUser, GuestMessage  # noqa: F401
+from app.models.chat_session import ChatSession  # noqa: F401
+from app.models.escalation import Escalation  # noqa: F401
+from app.models.order import Order, OrderItem  # noqa: F401
+from app.models.analysis_job import AnalysisJob  # noqa: F401
+from app.services.agent_system.callbacks import _run_analysis_in_background
+from app.services.analysis_scheduler import ClaimedJob, analysis_scheduler
+
+POLL_INTERVAL = settings.ANALYSIS_POLL_INTERVAL_SECONDS
+CONCURRENCY = settings.ANALYSIS_WORKER_CONCURRENCY
+RECOVER_INTERVAL = settings.ANALYSIS_LEASE_SECONDS
+
+_shutdown = False
+
+
+def _handle_signal(signum, frame):
+    global _shutdown
+    print(f"analysis-worker: signal {signum} received; shutting down after running jobs finish")
+    _shutdown = True
+
+
+def _with_db(fn, *args):
+    db = SessionLocal()
+    try:
+        return fn(db, *args)
+    finally:
+        db.close()
+
+
+async def run_job(job: ClaimedJob) -> bool:
+    try:
+        ok = await _run_analysis_in_background(job.session_id, settings.GOOGLE_API_KEY, job.intents)
+    except Exception as e:
+        ok = False
+        print(f"analysis-worker: job {job.id} crashed: {e}")
+
+    if ok:
+        _with_db(analysis_scheduler.complete, job)
+    else:
+        _with_db(analysis_scheduler.fail, job, "analysis did not produce a result")
+    return ok
+
+
+def _log_metrics(metrics: Dict[str, float]) -> None:
+    print(
+        "analysis-worker: queue "
+        f"pending={metrics['pending']} due={metrics['due']} running={metrics['running']} "
+        f"failed={metrics['failed']} lag={metrics['lag_seconds']:.1f}s"
+    )
+
+
+async def main() -> None:
+    signal.signal(signal.SIGTERM, _handle_signal)
+    signal.signal(signal.SIGINT, _handle_signal)
+
+    print(f"analysis-worker: started (poll={POLL_INTERVAL}s, concurrency={CONCURRENCY})")
+
+    running: set = set()
+    next_recovery = 0.0
+    while not _shutdown:
+        if time.monotonic() >= next_recovery:
+            recovered = _with_db(analysis_scheduler.recover)
+            if recovered:
+                print(f"analysis-worker: recovered {recovered} orphaned job(s)")
+            next_recovery = time.monotonic() + RECOVER_INTERVAL
+
+        jobs = _with_db(analysis_scheduler.claim_due, CONCURRENCY - len(running))
+        for job in jobs:
+            running.add(asyncio.create_task(run_job(job)))
+        if jobs:
+            _log_metrics(_with_db(analysis_scheduler.metrics))
+
+        if running:
+            _, running = await asyncio.wait(running, timeout=POLL_INTERVAL, return_when=asyncio.FIRST_COMPLETED)
+        else:
+            await asyncio.sleep(POLL_INTERVAL)
+
+    if running:
+        await asyncio.wait(running)
+    print("analysis-worker: stopped")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,80 @@
+"""One-shot bulk analysis of chat sessions, meant for a nightly cron job.
+
+Run as: `uv run python -m app.workers.batch_analysis [--business-id ID] [--stale-days N]`
+
+Selects sessions with no summary, or a summary older than `--stale-days`,
+and analyses them several per Gemini request with at most `--concurrency`
+requests in flight (see `app.services.batch_analysis`). Progress is saved to
+`--checkpoint` after every page; rerunning after an interruption resumes from
+it. Sessions the model did not answer for are left for the next run.
+"""
+import argparse
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+
+# Import all models so SQLAlchemy can resolve string-based relationships
+# (this worker runs standalone, not through FastAPI/main.py).
+from app.models.user import User  # noqa: F401
+from app.models.business import Business  # noqa: F401
+from app.models.plan import Plan  # noqa: F401
+from app.models.payment import PaymentTransaction  # noqa: F401
+from app.models.product import Product  # noqa: F401
+from app.models.widget import WidgetSettings, GuestUser, GuestMessage  # noqa: F401
+from app.models.chat_session import ChatSession  # noqa: F401
+from app.models.escalation import Escalation  # noqa: F401
+from app.models.order import Order, OrderItem  # noqa: F401
+from app.services.batch_analysis import BatchAnalyzer
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Analyse chat sessions in bulk.")
+    parser.add_argument("--business-id", help="Only sessions of this business")
+    parser.add_argument("--stale-days", type=int, default=settings.BATCH_ANALYSIS_STALE_DAYS,
+                        help="Re-analyse summaries older than this many days")
+    parser.add_argument("--sessions-per-request", type=int, default=settings.BATCH_ANALYSIS_SESSIONS_PER_REQUEST)
+    parser.add_argument("--concurrency", type=int, default=settings.BATCH_ANALYSIS_CONCURRENCY)
+    parser.add_argument("--max-sessions", type=int, help="Stop after this many sessions")
+    parser.add_argument("--checkpoint", default="batch_analysis.checkpoint.json",
+                        help="Progress file; resumed from if present, removed when the run completes")
+    return parser.parse_args(argv)
+
+
+async def main(argv=None) -> None:
+    args = parse_args(argv)
+    analyzer = BatchAnalyzer(
+        sessions_per_request=args.sessions_per_request,
+        window_messages=settings.ANALYSIS_WINDOW_MESSAGES,
+        concurrency=args.concurrency,
+    )
+    stale_before = datetime.now(timezone.utc) - timedelta(days=args.stale_days)
+
+    print(
+        f"batch-analysis: started (stale_days={args.stale_days}, "
+        f"sessions_per_request={args.sessions_per_request}, concurrency={args.concurrency})"
+    )
+    db = SessionLocal()
+    try:
+        stats = await analyzer.run(
+            db,
+            api_key=settings.GOOGLE_API_KEY,
+            stale_before=stale_before,
+            business_id=args.business_id,
+            checkpoint_path=args.checkpoint,
+            max_sessions=args.max_sessions,
+        )
+    finally:
+        db.close()
+
+    print(
+        f"batch-analysis: done — {stats.selected} selected, {stats.analyzed} analyzed, "
+        f"{stats.failed} failed, {stats.requests} LLM requests"
+    )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
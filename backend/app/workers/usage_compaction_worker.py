@@ -0,0 +1,75 @@
+"""Standalone worker that compacts the usage ledger into business counters.
+
+Run as: `uv run python -m app.workers.usage_compaction_worker`
+
+Every `USAGE_LEDGER_COMPACTION_INTERVAL_SECONDS` the worker refunds
+reservations that were never committed or refunded within
+`USAGE_RESERVATION_TIMEOUT_SECONDS`, then folds settled ledger rows into
+`businesses.used_ai_responses` / `used_escalations` via
+`app.services.usage_ledger.UsageLedger.compact`. Running more than one
+replica is safe: each pass claims its rows with `FOR UPDATE SKIP LOCKED`
+and adds to the counters with atomic `UPDATE`s, so concurrent passes fold
+disjoint rows and neither refunds nor counts a row twice.
+"""
+import asyncio
+import signal
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+
+# Import all models so SQLAlchemy can resolve string-based relationships
+# (this worker runs standalone, not through FastAPI/main.py).
+from app.models.user import User  # noqa: F401
+from app.models.business import Business  # noqa: F401
+from app.models.plan import Plan  # noqa: F401
+from app.models.payment import PaymentTransaction  # noqa: F401
+from app.models.product import Product  # noqa: F401
+from app.models.widget import WidgetSettings, GuestUser, GuestMessage  # noqa: F401
+from app.models.chat_session import ChatSession  # noqa: F401
+from app.models.escalation import Escalation  # noqa: F401
+from app.models.order import Order, OrderItem  # noqa: F401
+from app.models.usage_ledger import UsageLedgerEntry  # noqa: F401
+from app.services.usage_ledger import usage_ledger
+
+POLL_INTERVAL = settings.USAGE_LEDGER_COMPACTION_INTERVAL_SECONDS
+
+_shutdown = False
+
+
+def _handle_signal(signum, frame):
+    global _shutdown
+    print(f"usage-compaction-worker: signal {signum} received; shutting down after current pass")
+    _shutdown = True
+
+
+def compact_once() -> int:
+    db = SessionLocal()
+    try:
+        folded = usage_ledger.compact(db)
+        db.commit()
+        return folded
+    except Exception as e:
+        db.rollback()
+        print(f"usage-compaction-worker: compaction error: {e}")
+        return 0
+    finally:
+        db.close()
+
+
+async def main() -> None:
+    signal.signal(signal.SIGTERM, _handle_signal)
+    signal.signal(signal.SIGINT, _handle_signal)
+
+    print(f"usage-compaction-worker: started (poll={POLL_INTERVAL}s)")
+
+    while not _shutdown:
+        folded = compact_once()
+        if folded:
+            print(f"usage-compaction-worker: folded {folded} ledger row(s)")
+        await asyncio.sleep(POLL_INTERVAL)
+
+    print("usage-compaction-worker: stopped")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,56 @@
+"""
+Micro-benchmark for the jailbreak detector used by ``block_unsafe_content``.
+
+Compares, per message:
+  * legacy    — normalise, then loop over every pattern one regex at a time
+  * prefilter — ``detect_jailbreak`` uncached: literal prefilter, then the
+                pattern loop only for candidate messages (first hop of a turn)
+  * memoised  — ``detect_jailbreak`` as called on every later agent hop
+
+Usage:
+    uv run python -m benchmarks.bench_guardrails
+    uv run python -m benchmarks.bench_guardrails --iterations 2000
+"""
+
+import argparse
+import timeit
+
+from app.services.agent_system.callbacks import _COMPILED_PATTERNS, _normalize, detect_jailbreak
+from benchmarks.guardrail_corpus import BENIGN_PROMPTS, MALICIOUS_PROMPTS
+
+
+def legacy_scan(text: str) -> bool:
+    normalized = _normalize(text)
+    return any(p.search(normalized) for p in _COMPILED_PATTERNS)
+
+
+def prefilter_scan(text: str) -> bool:
+    return detect_jailbreak.__wrapped__(text) is not None
+
+
+def memoised_scan(text: str) -> bool:
+    return detect_jailbreak(text) is not None
+
+
+def _per_message_us(fn, corpus, iterations: int) -> float:
+    total = timeit.timeit(lambda: [fn(t) for t in corpus], number=iterations)
+    return total / (iterations * len(corpus)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the jailbreak detector")
+    parser.add_argument("--iterations", type=int, default=500, help="Passes over the corpus per variant")
+    args = parser.parse_args()
+
+    # Sanity: every variant must agree before timing means anything.
+    for text in BENIGN_PROMPTS + MALICIOUS_PROMPTS:
+        assert legacy_scan(text) == prefilter_scan(text) == memoised_scan(text), text
+
+    print(f"{'corpus':<10} {'variant':<10} {'us/message':>12}")
+    for name, corpus in (("benign", BENIGN_PROMPTS), ("malicious", MALICIOUS_PROMPTS)):
+        for variant, fn in (("legacy", legacy_scan), ("prefilter", prefilter_scan), ("memoised", memoised_scan)):
+            print(f"{name:<10} {variant:<10} {_per_message_us(fn, corpus, args.iterations):>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Benchmark for building WhatsApp audiences from a large guest base.
+
+Seeds a throwaway database with one business and ``--guests`` guests (phones in
+mixed formats, some repeated, most with a WhatsApp session), then times:
+  * legacy        — one contact existence query and ORM insert per guest
+                    (only with ``--legacy``; it takes minutes at 500k)
+  * import        — ``import_from_guests``: paged, one ``ON CONFLICT`` insert per page
+  * add_members   — every imported contact added to a new list, then again
+                    (all conflicts) to show the idempotent path
+
+With ``--trace-memory`` the peak Python allocation of each step is reported too,
+to show it stays flat as guests grow (tracing slows every step down).
+
+Usage:
+    uv run python -m benchmarks.bench_guest_import
+    uv run python -m benchmarks.bench_guest_import --guests 50000 --legacy --trace-memory
+    uv run python -m benchmarks.bench_guest_import --database-url postgresql://localhost/bench
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401
+from app.db.base import Base
+from app.models.business import Business
+from app.models.chat_session import ChatSession, SessionChannel
+from app.models.user import User
+from app.models.whatsapp_broadcast import ContactSource, WhatsAppContact
+from app.models.widget import GuestUser, WidgetSettings
+from app.services.whatsapp import contacts as contact_service
+
+SEED_BATCH = 10000
+
+
+def _phone(i: int) -> str:
+    digits = f"80{i % 100_000_000:08d}"
+    # Mixed formatting, as guests type them.
+    if i % 3 == 0:
+        return f"+234 {digits[:3]} {digits[3:6]} {digits[6:]}"
+    if i % 3 == 1:
+        return f"234-{digits}"
+    return f"+234{digits}"
+
+
+def seed(session_factory, guests: int) -> str:
+    db = session_factory()
+    now = datetime.now(timezone.utc)
+    user = User(email=f"bench-{uuid.uuid4().hex}@example.com", name="Bench")
+    db.add(user)
+    db.flush()
+    business = Business(user_id=user.id, business_name="Bench")
+    widget = WidgetSettings(user_id=user.id)
+    db.add_all([business, widget])
+    db.commit()
+    business_id, widget_id = business.id, widget.id
+
+    for start in range(0, guests, SEED_BATCH):
+        guest_rows, session_rows = [], []
+        for i in range(start, min(start + SEED_BATCH, guests)):
+            guest_id = str(uuid.uuid4())
+            # Every 50th guest reuses an earlier number.
+            phone = _phone(i - 1 if i % 50 == 0 and i else i)
+            guest_rows.append({
+                "id": guest_id, "widget_id": widget_id, "name": f"Guest {i}", "phone": phone,
+                "created_at": now, "first_seen_at": now, "last_seen_at": now, "total_sessions": 1,
+            })
+            channel = SessionChannel.WIDGET.value if i % 10 == 0 else SessionChannel.WHATSAPP.value
+            session_rows.append({
+                "id": str(uuid.uuid4()), "guest_id": guest_id, "channel": channel,
+                "created_at": now, "last_message_at": now,
+            })
+        db.execute(insert(GuestUser), guest_rows)
+        db.execute(insert(ChatSession), session_rows)
+        db.commit()
+    db.close()
+    return business_id
+
+
+def legacy_import_from_guests(db, business_id: str) -> int:
+    business = db.query(Business).filter(Business.id == business_id).first()
+    widget_ids = [w.id for w in db.query(WidgetSettings).filter(WidgetSettings.user_id == business.user_id).all()]
+    guests = (
+        db.query(GuestUser)
+        .join(ChatSession, ChatSession.guest_id == GuestUser.id)
+        .filter(
+            GuestUser.widget_id.in_(widget_ids),
+            GuestUser.phone.isnot(None),
+            ChatSession.channel == SessionChannel.WHATSAPP.value,
+        )
+        .distinct()
+        .all()
+    )
+    imported = 0
+    for guest in guests:
+        normalized = contact_service.normalize_phone(guest.phone)
+        if not normalized:
+            continue
+        existing = db.query(WhatsAppContact).filter(
+            WhatsAppContact.business_id == business_id,
+            WhatsAppContact.phone_e164 == normalized,
+        ).first()
+        if existing:
+            continue
+        db.add(WhatsAppContact(
+            business_id=business_id, phone_e164=normalized, name=guest.name,
+            source=ContactSource.GUEST_IMPORT.value, opted_in=True,
+        ))
+        imported += 1
+    db.commit()
+    return imported
+
+
+def analyze(engine) -> None:
+    """Refresh planner statistics, as autovacuum would on PostgreSQL.
+
+    Without them SQLite prefers the ``business_id`` index over primary-key
+    lookups for the ``IN`` lists in ``add_members``. SQLite connections only
+    load statistics when they open, so the pool is emptied afterwards.
+    """
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+    engine.dispose()
+
+
+def _measure(label: str, fn, trace_memory: bool):
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    peak = "-"
+    if trace_memory:
+        peak = f"{tracemalloc.get_traced_memory()[1] / 1e6:.1f}"
+        tracemalloc.stop()
+    print(f"{label:<22} {result:>9} {elapsed:>9.2f} {peak:>10}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark guest import and list building")
+    parser.add_argument("--guests", type=int, default=500_000, help="Guests to seed")
+    parser.add_argument("--database-url", help="Database to seed (default: a temporary SQLite file)")
+    parser.add_argument("--legacy", action="store_true", help="Also time the per-guest implementation")
+    parser.add_argument("--trace-memory", action="store_true", help="Report peak Python memory per step")
+    args = parser.parse_args()
+
+    tmpdir = None
+    url = args.database_url
+    if not url:
+        tmpdir = tempfile.TemporaryDirectory()
+        url = f"sqlite:///{os.path.join(tmpdir.name, 'bench.db')}"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine)
+
+    start = time.perf_counter()
+    business_id = seed(session_factory, args.guests)
+    analyze(engine)
+    print(f"Seeded {args.guests} guests in {time.perf_counter() - start:.1f}s\n")
+
+    print(f"{'step':<22} {'rows':>9} {'seconds':>9} {'peak MB':>10}")
+    db = session_factory()
+    if args.legacy:
+        _measure("legacy import", lambda: legacy_import_from_guests(db, business_id), args.trace_memory)
+        db.query(WhatsAppContact).filter(WhatsAppContact.business_id == business_id).delete()
+        db.commit()
+
+    def run_import():
+        return contact_service.import_from_guests(db, business_id)
+
+    _measure("import_from_guests", run_import, args.trace_memory)
+    _measure("import (again)", run_import, args.trace_memory)
+
+    analyze(engine)
+    contact_ids = [cid for (cid,) in db.query(WhatsAppContact.id).filter(WhatsAppContact.business_id == business_id)]
+    contact_list = contact_service.create_list(db, business_id, name="Everyone")
+
+    def run_add_members():
+        return contact_service.add_members(db, contact_list, contact_ids)
+
+    _measure("add_members", run_add_members, args.trace_memory)
+    _measure("add_members (again)", run_add_members, args.trace_memory)
+
+    db.close()
+    engine.dispose()
+    if tmpdir:
+        tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
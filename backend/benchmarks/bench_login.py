@@ -0,0 +1,86 @@
+"""
+Benchmark for password checks under concurrent logins.
+
+Fires ``--logins`` concurrent password checks at one event loop, the way a burst
+of ``POST /auth/login`` requests would arrive, and times:
+  * inline     — ``verify_password`` called on the event loop (the old handlers)
+  * offloaded  — ``verify_password_async`` on the bounded ``password-hash`` pool
+
+Alongside throughput, a ticker coroutine measures event-loop lag: how late a
+10ms sleep wakes up while the checks run. Inline hashing blocks every other
+request for the full bcrypt cost; offloaded hashing keeps the loop responsive.
+
+Usage:
+    uv run python -m benchmarks.bench_login
+    uv run python -m benchmarks.bench_login --logins 200 --rounds 10 --workers 4
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.core.security import PasswordHasher
+
+TICK_SECONDS = 0.01
+
+
+async def _ticker(lags: list, stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK_SECONDS)
+        lags.append(time.perf_counter() - start - TICK_SECONDS)
+
+
+async def _run(label: str, check, logins: int) -> None:
+    lags: list = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_ticker(lags, stop))
+    await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(check() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await ticker
+
+    assert all(results)
+    lags.sort()
+    p99 = lags[min(len(lags) - 1, int(len(lags) * 0.99))] if lags else 0.0
+    worst = lags[-1] if lags else 0.0
+    median = statistics.median(lags) if lags else 0.0
+    print(
+        f"{label:<12} {logins / elapsed:>10.1f} {elapsed:>9.2f} "
+        f"{median * 1000:>10.1f} {p99 * 1000:>10.1f} {worst * 1000:>10.1f}"
+    )
+
+
+async def _bench(logins: int, rounds: int, workers: int) -> None:
+    hasher = PasswordHasher(rounds=rounds, max_workers=workers)
+    hashed = hasher.hash("correct horse battery staple")
+
+    async def inline():
+        return hasher.verify("correct horse battery staple", hashed)
+
+    async def offloaded():
+        return await hasher.verify_async("correct horse battery staple", hashed)
+
+    await offloaded()  # start the pool outside the timed run
+
+    print(f"{logins} logins, cost {rounds}, {workers} hash workers\n")
+    print(f"{'mode':<12} {'logins/s':>10} {'seconds':>9} {'lag p50 ms':>10} {'lag p99 ms':>10} {'lag max ms':>10}")
+    await _run("inline", inline, logins)
+    await _run("offloaded", offloaded, logins)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark password checks under concurrent logins")
+    parser.add_argument("--logins", type=int, default=100, help="Concurrent password checks")
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost factor")
+    parser.add_argument("--workers", type=int, default=2, help="Hash pool size")
+    args = parser.parse_args()
+    asyncio.run(_bench(args.logins, args.rounds, args.workers))
+
+
+if __name__ == "__main__":
+    main()
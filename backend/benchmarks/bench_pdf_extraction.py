@@ -0,0 +1,80 @@
+"""
+Benchmark for PDF ingestion up to the chunker (no embedding).
+
+Builds a synthetic manual and runs:
+  * legacy — ``text += page.extract_text()`` over every page in one thread, then split
+  * inline — ``DocumentExtractor`` with one worker, pages streamed into ``TextSplitter.iter_pages``
+  * pool   — the same with ``--workers`` processes (default: one per core)
+
+Reports wall time, pages per second, chunks, and the peak memory the parent
+process allocates (tracemalloc, measured in a second run so tracing does not
+distort the timings; pool workers are separate processes and not included).
+
+Usage:
+    uv run python -m benchmarks.bench_pdf_extraction
+    uv run python -m benchmarks.bench_pdf_extraction --pages 1000 --workers 8
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from app.services.document_extraction import DocumentExtractor
+from app.utils.text_splitter import TextSplitter
+from benchmarks.pdf_corpus import make_pdf
+
+
+def legacy(path: str, splitter: TextSplitter) -> int:
+    from pypdf import PdfReader
+    text = ""
+    for page in PdfReader(path).pages:
+        text += page.extract_text() + "\n"
+    return len(splitter.split(text))
+
+
+def streamed(extractor: DocumentExtractor):
+    def run(path: str, splitter: TextSplitter) -> int:
+        return sum(1 for _ in splitter.iter_pages(extractor.pages(path, "manual.pdf")))
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PDF extraction and chunking")
+    parser.add_argument("--pages", type=int, default=1000, help="Pages in the synthetic manual")
+    parser.add_argument("--workers", type=int, default=0, help="Pool processes (0 = one per core)")
+    parser.add_argument("--batch-pages", type=int, default=8, help="Pages per pool task")
+    args = parser.parse_args()
+
+    budget = dict(max_bytes=10**10, max_pages=10**6, timeout=3600)
+    pool = DocumentExtractor(workers=args.workers, batch_pages=args.batch_pages, **budget)
+    variants = (
+        ("legacy", legacy),
+        ("inline", streamed(DocumentExtractor(workers=1, batch_pages=args.batch_pages, **budget))),
+        (f"pool x{pool.workers}", streamed(pool)),
+    )
+    splitter = TextSplitter(strategy="sentence")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "manual.pdf")
+        make_pdf(path, args.pages)
+        print(f"{args.pages} pages, {os.path.getsize(path) / 1e6:.1f} MB, {os.cpu_count()} cores\n")
+        print(f"{'variant':<10} {'seconds':>8} {'pages/s':>8} {'chunks':>7} {'peak MB':>8}")
+        try:
+            for name, run in variants:
+                start = time.perf_counter()
+                chunks = run(path, splitter)
+                elapsed = time.perf_counter() - start
+
+                tracemalloc.start()
+                run(path, splitter)
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                print(f"{name:<10} {elapsed:>8.2f} {args.pages / elapsed:>8.0f} {chunks:>7} {peak / 1e6:>8.1f}")
+        finally:
+            pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""
+Retrieval quality and latency benchmark for the RAG stack.
+
+Ingests ``benchmarks.rag_corpus`` (plus optional distractor documents)
+through the pieces the service uses: ``TextSplitter`` with the strategy
+``splitter_for`` picks per file, an in-memory vector store and the hybrid
+``Retriever``. Then it asks every labelled question and reports:
+  * recall@k       — share of questions with an answer-bearing chunk among those returned
+  * recall@1       — share where the first chunk returned bears the answer
+  * MRR            — mean reciprocal rank of the first answer-bearing chunk (0 if none)
+  * context tokens — mean estimated tokens handed to the model per question
+  * ingest         — chunks and MB per second (splitting, embedding, storing, keyword index)
+  * query latency  — p50 / p95 of query embedding plus retrieval
+
+Embeddings come from ``FakeEmbedder`` by default: hashed words and character
+trigrams, deterministic across runs and machines, so a difference between
+two commits comes from chunking and retrieval alone. ``--embedder gemini``
+uses the configured model instead (needs GOOGLE_API_KEY; network time is then
+part of the timings).
+
+``--output`` saves the run as JSON (settings, metrics, per-question ranks and
+the commit); ``--baseline`` prints the change against a saved run.
+
+Usage:
+    uv run python -m benchmarks.bench_rag
+    uv run python -m benchmarks.bench_rag --chunk-tokens 128 --top-k 3 --output rag.json
+    uv run python -m benchmarks.bench_rag --distractors 200 --baseline rag.json
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import subprocess
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Sequence
+
+from app.core.config import settings
+from app.services.rag_service import splitter_for
+from app.services.retrieval import Retriever
+from app.services.vector_store import InMemoryVectorStore
+from app.utils.text_splitter import TextSplitter, count_tokens
+from benchmarks.rag_corpus import DOCUMENTS, QUESTIONS, Question, distractors
+
+# Metrics printed and compared, with whether higher is better.
+METRICS = {
+    "recall_at_k": True,
+    "recall_at_1": True,
+    "mrr": True,
+    "context_tokens": False,
+    "chunks": None,
+    "ingest_chunks_per_second": True,
+    "ingest_mb_per_second": True,
+    "query_p50_ms": False,
+    "query_p95_ms": False,
+}
+
+_BATCH_SIZE = 64
+
+
+@lru_cache(maxsize=65536)
+def _bucket(feature: str, dimensions: int) -> int:
+    """Signed bucket: the index, negated (minus one) for half the features."""
+    value = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+    index = value % dimensions
+    return index if value >> 63 else -index - 1
+
+
+class FakeEmbedder:
+    """Feature-hashing embedder: each word adds 1 and each of its character
+    trigrams 0.5 to a signed bucket, and the vector is L2-normalised. Shared
+    words and word parts ("instalment" / "instalments") make texts close."""
+
+    def __init__(self, dimensions: int = 256):
+        self.dimensions = dimensions
+
+    def __call__(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimensions
+        for word in text.lower().split():
+            word = word.strip(".,;:!?()\"'")
+            if not word:
+                continue
+            self._add(vector, word, 1.0)
+            padded = f"#{word}#"
+            for i in range(len(padded) - 2):
+                self._add(vector, padded[i:i + 3], 0.5)
+        norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+        return [x / norm for x in vector]
+
+    def _add(self, vector: List[float], feature: str, weight: float) -> None:
+        bucket = _bucket(feature, self.dimensions)
+        if bucket >= 0:
+            vector[bucket] += weight
+        else:
+            vector[-bucket - 1] -= weight
+
+
+def _normalise(text: str) -> str:
+    return " ".join(text.split()).lower()
+
+
+def _percentile(values: Sequence[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def evaluate(
+    documents: Dict[str, str],
+    questions: Sequence[Question],
+    embed_document: Callable[[str], List[float]],
+    embed_query: Callable[[str], List[float]],
+    top_k: int,
+    max_tokens: int,
+    chunk_tokens: int,
+    overlap_tokens: int,
+    candidates: int,
+    mmr_lambda: float,
+    repeat: int = 1,
+) -> dict:
+    """Ingest ``documents``, answer ``questions`` and return ``{"metrics": ..., "questions": [...]}``."""
+    collection = InMemoryVectorStore().get_collection("documents-bench")
+    retriever = Retriever(candidates=candidates, mmr_lambda=mmr_lambda)
+
+    chunk_count = 0
+    start = time.perf_counter()
+    for filename, text in documents.items():
+        splitter = TextSplitter(chunk_tokens, overlap_tokens, splitter_for(filename).strategy)
+        chunks = splitter.split(text)
+        for first in range(0, len(chunks), _BATCH_SIZE):
+            batch = chunks[first:first + _BATCH_SIZE]
+            collection.upsert(
+                ids=[f"{filename}:{first + i}" for i in range(len(batch))],
+                embeddings=[embed_document(chunk) for chunk in batch],
+                documents=batch,
+                metadatas=[{"filename": filename} for _ in batch],
+            )
+        chunk_count += len(chunks)
+    retriever.keyword_index(collection)
+    ingest_seconds = time.perf_counter() - start
+    megabytes = sum(len(text.encode("utf-8")) for text in documents.values()) / 1e6
+
+    latencies = []
+    results = []
+    for question in questions:
+        answer = _normalise(question.answer)
+        for _ in range(repeat):
+            started = time.perf_counter()
+            context = retriever.retrieve(
+                collection, question.text, embed_query(question.text), top_k=top_k, max_tokens=max_tokens
+            )
+            latencies.append(time.perf_counter() - started)
+        rank = next((i + 1 for i, chunk in enumerate(context) if answer in _normalise(chunk)), None)
+        results.append({
+            "question": question.text,
+            "filename": question.filename,
+            "rank": rank,
+            "context_tokens": sum(count_tokens(chunk) for chunk in context),
+        })
+
+    total = len(results) or 1
+    metrics = {
+        "recall_at_k": sum(1 for r in results if r["rank"]) / total,
+        "recall_at_1": sum(1 for r in results if r["rank"] == 1) / total,
+        "mrr": sum(1 / r["rank"] for r in results if r["rank"]) / total,
+        "context_tokens": sum(r["context_tokens"] for r in results) / total,
+        "chunks": chunk_count,
+        "ingest_chunks_per_second": chunk_count / ingest_seconds,
+        "ingest_mb_per_second": megabytes / ingest_seconds,
+        "query_p50_ms": _percentile(latencies, 0.5) * 1000 if latencies else 0.0,
+        "query_p95_ms": _percentile(latencies, 0.95) * 1000 if latencies else 0.0,
+    }
+    return {"metrics": metrics, "questions": results}
+
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _print_metrics(metrics: dict, baseline: Optional[dict]) -> None:
+    for name, higher_is_better in METRICS.items():
+        value = metrics[name]
+        line = f"{name:<26} {value:>10.3f}"
+        if baseline and name in baseline:
+            old = baseline[name]
+            change = value - old
+            verdict = ""
+            if higher_is_better is not None and abs(change) > 1e-9:
+                verdict = "better" if (change > 0) == higher_is_better else "worse"
+            line += f"   was {old:>10.3f}   {change:+.3f} {verdict}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top-k", type=int, default=settings.RAG_TOP_K)
+    parser.add_argument("--max-tokens", type=int, default=settings.RAG_CONTEXT_TOKENS, help="context budget")
+    parser.add_argument("--chunk-tokens", type=int, default=settings.RAG_CHUNK_TOKENS)
+    parser.add_argument("--overlap", type=int, default=settings.RAG_CHUNK_OVERLAP_TOKENS)
+    parser.add_argument("--candidates", type=int, default=settings.RAG_CANDIDATES)
+    parser.add_argument("--mmr-lambda", type=float, default=settings.RAG_MMR_LAMBDA)
+    parser.add_argument("--distractors", type=int, default=0, help="off-topic documents added to the corpus")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs of each question")
+    parser.add_argument("--embedder", choices=("fake", "gemini"), default="fake")
+    parser.add_argument("--dimensions", type=int, default=256, help="fake embedder size")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON file of an earlier run to compare with")
+    parser.add_argument("--show-misses", action="store_true", help="list questions without an answer in context")
+    args = parser.parse_args()
+
+    if args.embedder == "gemini":
+        from app.services.rag_service import rag_service
+        if not settings.GOOGLE_API_KEY:
+            parser.error("--embedder gemini needs GOOGLE_API_KEY")
+        embed_document = lambda text: rag_service._get_embedding(text, settings.GOOGLE_API_KEY)  # noqa: E731
+        embed_query = lambda text: rag_service._get_query_embedding(text, settings.GOOGLE_API_KEY)  # noqa: E731
+    else:
+        embed_document = embed_query = FakeEmbedder(args.dimensions)
+
+    documents = dict(DOCUMENTS)
+    documents.update(distractors(args.distractors))
+    config = {
+        "top_k": args.top_k,
+        "max_tokens": args.max_tokens,
+        "chunk_tokens": args.chunk_tokens,
+        "overlap_tokens": args.overlap,
+        "candidates": args.candidates,
+        "mmr_lambda": args.mmr_lambda,
+    }
+    result = evaluate(
+        documents, QUESTIONS, embed_document, embed_query, repeat=args.repeat, **config
+    )
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"baseline: {baseline.get('commit')} {baseline.get('config')}")
+    print(f"{len(documents)} documents, {len(QUESTIONS)} questions, embedder={args.embedder}, {config}\n")
+    _print_metrics(result["metrics"], baseline["metrics"] if baseline else None)
+
+    if args.show_misses:
+        missed = [r for r in result["questions"] if not r["rank"]]
+        print(f"\nmissed: {len(missed)}")
+        for r in missed:
+            print(f"  [{r['filename']}] {r['question']}")
+
+    if args.output:
+        record = {
+            "commit": _commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "embedder": args.embedder,
+            "documents": len(documents),
+            "config": config,
+            **result,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(record, f, indent=2)
+        print(f"\nwrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
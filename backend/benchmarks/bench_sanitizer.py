@@ -0,0 +1,99 @@
+"""
+Throughput benchmark for ``sanitize_model_response``'s text processing.
+
+Compares, on long synthetic model outputs:
+  * legacy   — a leak search per hard-block pattern, then ``re.sub`` per scrub rule
+  * combined — ``response_sanitizer.sanitize`` (prefiltered, rules applied only when one matches)
+  * stream   — the same sanitizer fed in small chunks, as a streaming response would be
+
+Usage:
+    uv run python -m benchmarks.bench_sanitizer
+    uv run python -m benchmarks.bench_sanitizer --paragraphs 200 --chunk-size 8
+"""
+
+import argparse
+import re
+import time
+
+from app.services.agent_system.callbacks import (
+    INTERNAL_DETAIL_PATTERNS,
+    _LEAK_PATTERNS,
+    response_sanitizer,
+)
+
+CLEAN_PARAGRAPH = (
+    "Thanks for reaching out! Our store is open Monday to Saturday from 9am to 6pm, "
+    "and we deliver within Lagos in two to three working days. If you'd like to place "
+    "an order, just tell me the product name and quantity and I'll put it together for you. "
+)
+DIRTY_PARAGRAPH = (
+    "According to my knowledge base, the blue hoodie is in stock. "
+    "I can transfer you to the escalation_agent if you need a refund, "
+    "or one of our specialized agents can follow up using get_context.   "
+)
+
+_LEGACY_LEAKS = [re.compile(p, re.IGNORECASE) for p in _LEAK_PATTERNS]
+
+
+def legacy_sanitize(text: str) -> str:
+    for leak_re in _LEGACY_LEAKS:
+        if leak_re.search(text):
+            return ""
+    for pattern, replacement in INTERNAL_DETAIL_PATTERNS:
+        text = re.sub(pattern, replacement, text, flags=re.IGNORECASE)
+    return re.sub(r"[ \t]+", " ", text).strip()
+
+
+def combined_sanitize(text: str) -> str:
+    return response_sanitizer.sanitize(text).text
+
+
+def make_stream_sanitize(chunk_size: int):
+    def stream_sanitize(text: str) -> str:
+        stream = response_sanitizer.stream()
+        out = [stream.feed(text[i:i + chunk_size]) for i in range(0, len(text), chunk_size)]
+        out.append(stream.close())
+        return "".join(out)
+    return stream_sanitize
+
+
+def make_output(paragraphs: int, dirty_every: int) -> str:
+    return "\n".join(
+        DIRTY_PARAGRAPH if dirty_every and i % dirty_every == 0 else CLEAN_PARAGRAPH
+        for i in range(paragraphs)
+    )
+
+
+def _throughput_mb_s(fn, text: str, min_seconds: float = 0.5) -> float:
+    runs, start = 0, time.perf_counter()
+    while time.perf_counter() - start < min_seconds:
+        fn(text)
+        runs += 1
+    elapsed = time.perf_counter() - start
+    return runs * len(text) / elapsed / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the model response sanitizer")
+    parser.add_argument("--paragraphs", type=int, default=100, help="Paragraphs per synthetic output")
+    parser.add_argument("--chunk-size", type=int, default=16, help="Characters per streamed chunk")
+    args = parser.parse_args()
+
+    variants = (
+        ("legacy", legacy_sanitize),
+        ("combined", combined_sanitize),
+        ("stream", make_stream_sanitize(args.chunk_size)),
+    )
+
+    print(f"{'output':<8} {'chars':>8} {'variant':<10} {'MB/s':>8}")
+    for name, dirty_every in (("clean", 0), ("dirty", 5)):
+        text = make_output(args.paragraphs, dirty_every)
+        expected = combined_sanitize(text)
+        assert legacy_sanitize(text) == expected
+        assert make_stream_sanitize(args.chunk_size)(text) == expected
+        for variant, fn in variants:
+            print(f"{name:<8} {len(text):>8} {variant:<10} {_throughput_mb_s(fn, text):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Benchmark for document chunking on multi-megabyte inputs.
+
+Compares, on synthetic documents:
+  * legacy    — the character splitter (1,000 chars, 200 overlap, ``rfind`` per separator per chunk)
+  * recursive — ``TextSplitter`` with the default strategy
+  * sentence / markdown — the other ``TextSplitter`` strategies
+
+The documents are plain prose, Markdown with headings, and "runs": prose
+broken by long separator-free runs (tables, URLs, base64), where the legacy
+splitter steps one character at a time and emits hundreds of near-identical
+chunks, each of which would be embedded.
+
+Reports time, throughput, chunk count and the largest chunk in estimated
+tokens.
+
+Usage:
+    uv run python -m benchmarks.bench_splitter
+    uv run python -m benchmarks.bench_splitter --megabytes 8 --max-tokens 512 --overlap 64
+"""
+
+import argparse
+import random
+import time
+
+from app.utils.text_splitter import TextSplitter, count_tokens
+
+_WORDS = (
+    "delivery order refund customer payment Lagos within days product stock "
+    "warranty store opening hours please contact support available price"
+).split()
+
+
+def legacy_split(text: str, chunk_size: int = 1000, chunk_overlap: int = 200) -> list:
+    chunks = []
+    start = 0
+    text_len = len(text)
+    while start < text_len:
+        end = start + chunk_size
+        if end >= text_len:
+            chunks.append(text[start:])
+            break
+        split_point = -1
+        for char in ['\n\n', '\n', '. ', ' ']:
+            pos = text.rfind(char, start, end)
+            if pos != -1:
+                split_point = pos + len(char)
+                break
+        if split_point != -1:
+            chunks.append(text[start:split_point])
+            next_start = split_point - chunk_overlap
+            if next_start <= start:
+                next_start = start + 1
+            start = next_start
+        else:
+            chunks.append(text[start:end])
+            start = end - chunk_overlap
+    return chunks
+
+
+def _sentence(rng: random.Random) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(rng.randint(6, 20))).capitalize() + ". "
+
+
+def make_document(kind: str, size: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    parts, length, section = [], 0, 0
+    while length < size:
+        if kind == "markdown" and rng.random() < 0.1:
+            section += 1
+            part = f"\n\n## Section {section}\n\n"
+        elif kind == "runs" and rng.random() < 0.05:
+            part = "".join(rng.choice("0123456789abcdef") for _ in range(rng.randint(1000, 4000))) + " "
+        else:
+            part = "".join(_sentence(rng) for _ in range(rng.randint(2, 6))) + "\n\n"
+        parts.append(part)
+        length += len(part)
+    return "".join(parts)[:size]
+
+
+def _run(fn, text: str):
+    start = time.perf_counter()
+    chunks = fn(text)
+    return time.perf_counter() - start, chunks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark document chunking")
+    parser.add_argument("--megabytes", type=float, default=4.0, help="Size of each synthetic document")
+    parser.add_argument("--max-tokens", type=int, default=256, help="TextSplitter max_tokens")
+    parser.add_argument("--overlap", type=int, default=48, help="TextSplitter overlap_tokens")
+    args = parser.parse_args()
+
+    size = int(args.megabytes * 1_000_000)
+    variants = [("legacy", legacy_split)] + [
+        (strategy, TextSplitter(args.max_tokens, args.overlap, strategy).split)
+        for strategy in ("recursive", "sentence", "markdown")
+    ]
+
+    print(f"{'document':<10} {'variant':<10} {'seconds':>8} {'MB/s':>7} {'chunks':>8} {'max tokens':>11}")
+    for kind in ("prose", "markdown", "runs"):
+        text = make_document(kind, size)
+        for variant, fn in variants:
+            elapsed, chunks = _run(fn, text)
+            largest = max((count_tokens(chunk) for chunk in chunks), default=0)
+            print(
+                f"{kind:<10} {variant:<10} {elapsed:>8.2f} {len(text) / elapsed / 1e6:>7.1f} "
+                f"{len(chunks):>8} {largest:>11}"
+            )
+
+
+if __name__ == "__main__":
+    main()
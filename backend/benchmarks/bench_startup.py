@@ -0,0 +1,97 @@
+"""
+Cold-start benchmark for the API process.
+
+Imports ``app.main`` in fresh interpreters under ``python -X importtime`` and
+reports the best total import time over ``--runs`` runs, the modules with the
+largest cumulative cost, and any heavy SDK that got imported at startup
+(google-adk, litellm, chromadb, the Gemini SDKs and pypdf must load on first
+use, not on import).
+
+Exits non-zero when the import takes longer than ``--budget`` seconds or a
+heavy SDK is imported, so it can gate CI or a container build.
+
+Usage:
+    uv run python -m benchmarks.bench_startup
+    uv run python -m benchmarks.bench_startup --budget 2.5 --runs 5 --top 25
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+# Only imported when first used; importing any of these at startup is a regression.
+HEAVY_MODULES = (
+    "google.adk",
+    "litellm",
+    "chromadb",
+    "google.genai",
+    "google.generativeai",
+    "pypdf",
+)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_PROBE = (
+    "import sys, app.main; "
+    f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+)
+
+
+def parse_importtime(stderr: str) -> Dict[str, Tuple[int, int]]:
+    """``{module: (self_us, cumulative_us)}`` from ``-X importtime`` output."""
+    timings: Dict[str, Tuple[int, int]] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        timings.setdefault(name.strip(), (int(self_us), int(cumulative_us)))
+    return timings
+
+
+def profile_once() -> Tuple[float, Dict[str, Tuple[int, int]], List[str]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    timings = parse_importtime(result.stderr)
+    total = timings["app.main"][1] / 1e6
+    last_line = (result.stdout.strip().splitlines() or [""])[-1]
+    heavy = [name for name in last_line.split(",") if name]
+    return total, timings, heavy
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile and budget the import time of app.main")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters to time (best run is reported)")
+    parser.add_argument("--budget", type=float, default=3.0, help="Maximum seconds to import app.main")
+    parser.add_argument("--top", type=int, default=15, help="Slowest modules to list")
+    args = parser.parse_args()
+
+    runs = [profile_once() for _ in range(args.runs)]
+    total, timings, heavy = min(runs, key=lambda run: run[0])
+
+    print(f"import app.main: best {total:.2f}s over {args.runs} runs (budget {args.budget:.2f}s)\n")
+    print(f"{'module':<50} {'cumulative ms':>14} {'self ms':>9}")
+    ranked = sorted(timings.items(), key=lambda item: item[1][1], reverse=True)
+    for name, (self_us, cumulative_us) in ranked[:args.top]:
+        print(f"{name:<50} {cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}")
+
+    failed = False
+    if heavy:
+        print(f"\nFAIL: heavy modules imported at startup: {', '.join(heavy)}")
+        failed = True
+    if total > args.budget:
+        print(f"\nFAIL: import took {total:.2f}s, over the {args.budget:.2f}s budget")
+        failed = True
+    if not failed:
+        print("\nOK")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Synthetic text PDFs for the extraction benchmark and tests.
+
+Writes a minimal PDF by hand (one Helvetica text block per page) so no PDF
+authoring library is needed. Each page's text starts with ``Page <n>.`` so
+extraction can be checked page by page.
+"""
+
+import random
+from typing import List
+
+_WORDS = (
+    "install the unit on a level surface and connect the power cable before "
+    "pressing the reset button for five seconds until the indicator turns green"
+).split()
+
+
+def page_lines(number: int, lines: int, seed: int = 0) -> List[str]:
+    rng = random.Random(f"{seed}-{number}")
+    body = [" ".join(rng.choice(_WORDS) for _ in range(12)).capitalize() + "." for _ in range(lines - 1)]
+    return [f"Page {number}."] + body
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(path: str, pages: int, lines_per_page: int = 40, seed: int = 0) -> None:
+    """Write a ``pages``-page PDF of prose to ``path``."""
+    objects: List[bytes] = []
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    catalog = add(b"")  # filled in once the page tree exists
+    tree = add(b"")
+    font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    kids = []
+    for number in range(1, pages + 1):
+        operations = ["BT", "/F1 10 Tf", "12 TL", "50 780 Td"]
+        operations += [f"({_escape(line)}) '" for line in page_lines(number, lines_per_page, seed)]
+        operations.append("ET")
+        stream = "\n".join(operations).encode("latin-1")
+        content = add(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        kids.append(add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>" % (tree, font, content)
+        ))
+    objects[catalog - 1] = b"<< /Type /Catalog /Pages %d 0 R >>" % tree
+    objects[tree - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % kid for kid in kids), len(kids)
+    )
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog, xref)
+    with open(path, "wb") as f:
+        f.write(out)
@@ -0,0 +1,276 @@
+"""
+Labelled QA corpus for RAG benchmarks and tests.
+
+DOCUMENTS are the knowledge base of a fictional Lagos homeware shop, as a
+business would upload it: Markdown FAQs, plain-text policies and a product
+guide. QUESTIONS are customer questions, worded the way customers ask
+rather than copied from the documents. Each one names the document that
+answers it and an answer phrase that appears exactly once in the corpus. A
+retrieved chunk is relevant if it contains that phrase (compared with
+whitespace collapsed, as line breaks move), so the labels do not depend on
+how the documents are chunked.
+
+``distractors`` makes extra off-topic documents for scaling the corpus up
+(ingest throughput, query latency over a larger collection).
+"""
+import random
+from typing import Dict, List, NamedTuple
+
+
+class Question(NamedTuple):
+    text: str
+    filename: str
+    answer: str
+
+
+DOCUMENTS: Dict[str, str] = {
+    "shipping.md": """# Shipping and delivery
+
+## Where we deliver
+We deliver to every state in Nigeria. Orders within Lagos are handled by our own riders; orders
+outside Lagos go through our courier partner, GIG Logistics. We do not currently ship outside
+Nigeria, but customers in Ghana can collect from our partner store in Accra.
+
+## Delivery times
+Lagos Mainland orders placed before 2pm arrive the same day. Lagos Island and Lekki orders
+arrive the next working day. Deliveries to Abuja and Port Harcourt take 2 to 3 working days,
+and all other states take 3 to 5 working days. We do not deliver on Sundays or public holidays.
+
+## Delivery fees
+Delivery within Lagos costs a flat ₦2,500. Delivery to other states is ₦4,000 for parcels under
+5kg and ₦6,500 for heavier parcels. Orders above ₦75,000 ship free anywhere in Nigeria.
+
+## Tracking your order
+Once your order leaves our warehouse you receive an SMS with a tracking link. Lagos riders share
+their live location from the moment they pick up your parcel. If the tracking link has not moved
+for 48 hours, contact support with your order number.
+
+## Missed deliveries
+If you are not home, the rider will call twice and wait ten minutes. After a missed delivery we
+reattempt the next working day at no cost; a third attempt is charged at the normal delivery fee.
+""",
+    "returns.txt": """Returns and refunds policy
+
+You can return most items within 14 days of delivery for a full refund, as long as they are
+unused and in the original packaging. Sale items marked "final sale" cannot be returned.
+Mattresses and pillows can only be returned if the seal is unbroken, for hygiene reasons.
+
+To start a return, reply to your order confirmation email or message us on WhatsApp with your
+order number and photos of the item. We will send you a return code within one working day.
+Lagos customers can have a rider collect the item for ₦1,500; customers in other states drop the
+parcel at any GIG Logistics office using the return code.
+
+Refunds go back to the original payment method within 5 to 7 working days after the item
+reaches our warehouse and passes inspection. If you paid by bank transfer, we refund to the
+account the payment came from. Delivery fees are refunded only if the item arrived damaged or
+we sent the wrong item.
+
+Damaged or wrong items: tell us within 48 hours of delivery and keep the packaging. We replace
+the item free of charge, or refund it in full if it is out of stock. You do not need to pay for
+the return pickup in this case.
+
+Exchanges for a different size or colour are free the first time. We hold the replacement for
+you for up to seven days while the original item is on its way back.
+""",
+    "payments.md": """# Payments
+
+## Accepted payment methods
+We accept Visa, Mastercard and Verve cards, bank transfers and USSD payments through Paystack.
+Pay on delivery is available in Lagos only, for orders under ₦150,000, by card or transfer to
+the rider's POS terminal. We do not accept cash on delivery.
+
+## Failed payments
+If your card was debited but the order shows as unpaid, do not pay again. Paystack reverses
+failed debits automatically within 24 hours. If the money has not returned after 24 hours, send
+us the transaction reference and we will chase it with Paystack.
+
+## Instalments
+Orders above ₦100,000 can be split into three monthly instalments with CDcare at no extra
+interest. The first instalment is paid at checkout and the item ships once it clears.
+
+## Invoices and business purchases
+Every order comes with a VAT invoice by email. Businesses buying in bulk can ask for a
+proforma invoice before paying; we hold the quoted prices for ten working days.
+""",
+    "warranty.txt": """Warranty information
+
+All electrical appliances we sell (blenders, kettles, air fryers, fans and irons) carry a
+12-month manufacturer warranty from the delivery date. Furniture carries a 24-month warranty
+against structural defects such as broken frames or joints. Cookware is covered for 6 months
+against manufacturing defects.
+
+The warranty does not cover normal wear and tear, damage from power surges, misuse, or repairs
+done by anyone other than our service centre. We strongly recommend using a surge protector or
+stabiliser with electrical appliances, because power surge damage is the most common reason
+claims are declined.
+
+To make a warranty claim, bring the item and your order number to our service centre at
+14 Allen Avenue, Ikeja, or book a pickup through support. Repairs usually take 7 to 10 working
+days. If an item cannot be repaired, we replace it with the same model or the closest
+equivalent.
+
+Extended warranty: when you buy an appliance you can add two more years of cover for 8% of the
+item price. The extended warranty can only be added at checkout or within 30 days of delivery.
+""",
+    "store_hours.md": """# Visiting our stores
+
+## Locations
+Our flagship showroom is at 14 Allen Avenue, Ikeja, Lagos, next to the service centre. We also
+have a store at The Palms Mall, Lekki, on the first floor, and a partner store in Accra, Ghana.
+
+## Opening hours
+The Ikeja showroom is open Monday to Saturday from 9am to 7pm, and on Sundays from 12pm to 5pm.
+The Lekki store follows the mall's hours: 10am to 9pm every day. Both stores close early, at
+3pm, on the day before a public holiday.
+
+## Parking and access
+The Ikeja showroom has free parking for twelve cars behind the building, and a ramp at the side
+entrance for wheelchair users. At The Palms, use the mall's car park; we validate parking tickets
+for purchases above ₦20,000.
+
+## Click and collect
+Order online and pick up from either Lagos store, usually within three hours. Bring the
+collection code from your confirmation SMS and a photo ID. Uncollected orders are held for five
+days before they are cancelled and refunded.
+""",
+    "products.md": """# Product care guide
+
+## Non-stick cookware
+Use wooden or silicone utensils only. Wash by hand with warm soapy water; our non-stick pans
+are not dishwasher safe, as the detergent wears the coating down. Never heat an empty pan on a
+high flame.
+
+## Cast iron
+Cast iron pots come pre-seasoned. After cooking, rinse with hot water, dry immediately on the
+stove, and rub in a thin layer of vegetable oil to stop rust.
+
+## Wooden furniture
+Keep wooden furniture out of direct sunlight and away from air conditioner vents, which dry the
+wood and cause cracks. Dust weekly and polish with beeswax every three months. Wipe spills
+straight away with a dry cloth.
+
+## Fabric sofas
+Our sofa covers are removable and can be machine washed at 30 degrees on a gentle cycle. Dry
+them flat in the shade; tumble drying shrinks the fabric. Vacuum the cushions every week.
+
+## Air fryers
+Clean the basket after every use. Do not use metal scouring pads, which scratch the coating.
+Leave at least 10cm of space around the fryer while it is running.
+
+## Kettles
+Descale the kettle once a month with a mix of water and white vinegar, then boil clean water
+twice before use.
+""",
+    "account.txt": """Your account
+
+Creating an account lets you track orders, save addresses and earn loyalty points. You can also
+check out as a guest; guest orders can be linked to a new account later using the same email.
+
+Forgot your password? Use the "Forgot password" link on the sign-in page. The reset link we
+email you expires after 30 minutes. If it does not arrive, check your spam folder before
+requesting another one.
+
+Loyalty points: you earn one point for every ₦1,000 spent, and every 100 points is worth ₦2,000
+off a future order. Points expire 12 months after they are earned and cannot be used on
+delivery fees.
+
+To change your email address or phone number, go to Account settings. For security, a code is
+sent to the old phone number before the change is saved. To close your account, contact
+support; we delete your personal data within 30 days, except what we must keep for tax records.
+
+Newsletter: we send at most one email a week. Unsubscribe with the link at the bottom of any
+newsletter; order and delivery emails are not affected.
+""",
+    "wholesale.md": """# Wholesale and corporate orders
+
+## Who can buy wholesale
+Hotels, restaurants, offices and resellers registered with the CAC can open a wholesale
+account. Send your CAC certificate and a short description of your business to our sales team.
+
+## Minimum orders and discounts
+The minimum wholesale order is ₦500,000. Discounts start at 10% for orders up to ₦2 million
+and rise to 18% for orders above ₦5 million. Prices are fixed for the quarter.
+
+## Delivery for large orders
+Wholesale orders are delivered by truck with a dedicated account manager. Delivery is free in
+Lagos and quoted separately elsewhere. Allow two weeks for orders of custom furniture.
+
+## Payment terms
+New wholesale accounts pay upfront. After three orders, businesses can apply for 30-day credit
+terms, subject to a credit check.
+
+## Corporate gifts
+We offer branded gift boxes for end-of-year corporate gifts, with your logo printed on the
+box. Orders for December must be placed by 15 November.
+""",
+}
+
+QUESTIONS: List[Question] = [
+    Question("Do you ship to other countries?", "shipping.md", "We do not currently ship outside"),
+    Question("If I order before 2pm in Yaba, when will I get it?", "shipping.md", "arrive the same day"),
+    Question("How long does delivery to Abuja take?", "shipping.md", "take 2 to 3 working days"),
+    Question("Do you deliver on Sundays?", "shipping.md", "We do not deliver on Sundays"),
+    Question("How much is delivery inside Lagos?", "shipping.md", "flat ₦2,500"),
+    Question("Is there free shipping above a certain amount?", "shipping.md", "Orders above ₦75,000 ship free"),
+    Question("My tracking link hasn't updated in two days, what do I do?", "shipping.md", "has not moved"),
+    Question("What happens if I'm not at home when the rider comes?", "shipping.md", "call twice and wait ten minutes"),
+    Question("How many days do I have to return something?", "returns.txt", "within 14 days of delivery"),
+    Question("Can I return an item I bought on sale?", "returns.txt", "cannot be returned"),
+    Question("Can I return a pillow?", "returns.txt", "seal is unbroken"),
+    Question("How do I start a return?", "returns.txt", "send you a return code"),
+    Question("How long until I get my money back?", "returns.txt", "within 5 to 7 working days"),
+    Question("The blender arrived broken, what should I do?", "returns.txt", "tell us within 48 hours of delivery"),
+    Question("Can I swap for another colour?", "returns.txt", "Exchanges for a different size or colour"),
+    Question("Which cards do you take?", "payments.md", "Visa, Mastercard and Verve"),
+    Question("Can I pay cash when the item arrives?", "payments.md", "We do not accept cash on delivery"),
+    Question("I was charged but my order says unpaid", "payments.md", "reverses failed debits"),
+    Question("Can I pay in instalments?", "payments.md", "three monthly instalments"),
+    Question("Do I get a VAT invoice?", "payments.md", "VAT invoice by email"),
+    Question("How long is the guarantee on an air fryer?", "warranty.txt", "12-month manufacturer warranty"),
+    Question("Is a sofa with a broken frame covered?", "warranty.txt", "24-month warranty"),
+    Question("Does the warranty cover damage from NEPA power surges?", "warranty.txt", "power surge damage is the most common"),
+    Question("How long do warranty repairs take?", "warranty.txt", "7 to 10 working days"),
+    Question("Can I buy extra warranty cover?", "warranty.txt", "8% of the item price"),
+    Question("Where is your showroom?", "store_hours.md", "flagship showroom"),
+    Question("What time does the Ikeja store open on Sunday?", "store_hours.md", "Sundays from 12pm to 5pm"),
+    Question("Is there parking at the Ikeja showroom?", "store_hours.md", "free parking for twelve cars"),
+    Question("Can I order online and pick it up myself?", "store_hours.md", "usually within three hours"),
+    Question("Can non-stick pans go in the dishwasher?", "products.md", "not dishwasher safe"),
+    Question("How do I stop my cast iron pot from rusting?", "products.md", "thin layer of vegetable oil"),
+    Question("How should I look after my wooden table?", "products.md", "polish with beeswax"),
+    Question("Can I wash the sofa cover in a machine?", "products.md", "machine washed at 30 degrees"),
+    Question("How do I descale my kettle?", "products.md", "water and white vinegar"),
+    Question("My password reset link isn't working", "account.txt", "expires after 30 minutes"),
+    Question("How do loyalty points work?", "account.txt", "one point for every ₦1,000"),
+    Question("Do loyalty points expire?", "account.txt", "Points expire 12 months"),
+    Question("How do I delete my account?", "account.txt", "delete your personal data within 30 days"),
+    Question("What is the minimum order for wholesale?", "wholesale.md", "minimum wholesale order is ₦500,000"),
+    Question("What discount do big orders get?", "wholesale.md", "rise to 18%"),
+    Question("Can my company pay later on credit?", "wholesale.md", "30-day credit terms"),
+    Question("When is the deadline for Christmas corporate gifts?", "wholesale.md", "placed by 15 November"),
+]
+
+_DISTRACTOR_WORDS = (
+    "quarterly report meeting agenda minutes budget approval supplier invoice vendor audit "
+    "training schedule staff rota inventory count warehouse shelf label barcode scanner "
+    "generator diesel maintenance cleaning roster security gate visitor log printer toner"
+).split()
+
+
+def distractors(count: int, words_per_document: int = 600, seed: int = 0) -> Dict[str, str]:
+    """``count`` off-topic internal documents of paragraph-broken random words."""
+    rng = random.Random(seed)
+    documents = {}
+    for i in range(count):
+        paragraphs = []
+        remaining = words_per_document
+        while remaining > 0:
+            length = min(remaining, rng.randint(40, 120))
+            sentences = []
+            for _ in range(max(1, length // 12)):
+                sentence = " ".join(rng.choice(_DISTRACTOR_WORDS) for _ in range(12))
+                sentences.append(sentence.capitalize() + ".")
+            paragraphs.append(" ".join(sentences))
+            remaining -= length
+        documents[f"internal_{i:04d}.txt"] = "\n\n".join(paragraphs)
+    return documents
@@ -0,0 +1,59 @@
+"""
+Copy stored embeddings between vector store backends, without re-embedding.
+
+Collections keep their names and record ids, and records are upserted, so the
+copy can be re-run after an interruption. Point VECTOR_STORE_BACKEND at the
+target once the counts match.
+
+Usage:
+    # Everything from the local Chroma directory into pgvector:
+    uv run python -m scripts.migrate_vectors --source chroma --target pgvector
+
+    # Only some collections, in smaller pages:
+    uv run python -m scripts.migrate_vectors --source chroma --target pgvector \\
+        --collection documents-<user id> --collection products-<business id> --batch-size 200
+"""
+
+import argparse
+import logging
+import sys
+
+from app.services.vector_store import BACKENDS, create_vector_store
+from app.services.vector_store.transfer import copy_all
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Copy embeddings between vector store backends")
+    parser.add_argument("--source", required=True, choices=BACKENDS, help="Backend to read from")
+    parser.add_argument("--target", required=True, choices=BACKENDS, help="Backend to write to")
+    parser.add_argument("--collection", action="append", dest="collections",
+                        help="Collection to copy (repeatable; default: all)")
+    parser.add_argument("--batch-size", type=int, default=500, help="Records read and written per page")
+    args = parser.parse_args()
+
+    if args.source == args.target:
+        print("Source and target must differ")
+        sys.exit(1)
+
+    source = create_vector_store(args.source)
+    target = create_vector_store(args.target)
+    source.connect()
+    target.connect()
+
+    counts = copy_all(source, target, names=args.collections, batch_size=args.batch_size)
+
+    mismatched = []
+    for name, copied in counts.items():
+        in_target = target.get_collection(name).count()
+        print(f"{name}: {copied} copied, {in_target} in target")
+        if in_target < copied:
+            mismatched.append(name)
+    print(f"Done: {sum(counts.values())} records in {len(counts)} collections")
+    if mismatched:
+        print(f"Target has fewer records than copied for: {', '.join(mismatched)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
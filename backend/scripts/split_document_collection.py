@@ -0,0 +1,57 @@
+"""
+Move uploaded-document chunks from the shared ``rag_documents`` collection into
+one collection per tenant (``documents-<user id>``), which is where
+``RAGService`` reads and writes them.
+
+Embeddings are copied, not recomputed. The copy is an upsert keyed by chunk
+id, so the script can be re-run; chunks without a ``user_id`` are reported
+and left in place. Run it once when deploying per-tenant collections, then
+re-run with ``--drop-legacy`` to delete the shared collection.
+
+Usage:
+    uv run python -m scripts.split_document_collection
+    uv run python -m scripts.split_document_collection --drop-legacy
+"""
+
+import argparse
+import logging
+import sys
+
+from app.services.rag_service import LEGACY_COLLECTION, document_collection_name
+from app.services.vector_store import vector_store
+from app.services.vector_store.transfer import split_collection
+
+
+def _route(metadata):
+    user_id = metadata.get("user_id")
+    return document_collection_name(user_id) if user_id else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Split the shared document collection into per-tenant collections")
+    parser.add_argument("--batch-size", type=int, default=500, help="Records read per page")
+    parser.add_argument("--drop-legacy", action="store_true",
+                        help="Delete the shared collection after a complete copy")
+    args = parser.parse_args()
+
+    vector_store.connect()
+    if LEGACY_COLLECTION not in vector_store.list_collections():
+        print(f"No '{LEGACY_COLLECTION}' collection in {vector_store!r}; nothing to do.")
+        return
+
+    counts, skipped = split_collection(vector_store, LEGACY_COLLECTION, _route, batch_size=args.batch_size)
+    for name, copied in sorted(counts.items()):
+        print(f"{name}: {copied} chunks")
+    print(f"Done: {sum(counts.values())} chunks into {len(counts)} tenant collections, {skipped} without a user_id")
+
+    if args.drop_legacy:
+        if skipped:
+            print(f"Keeping '{LEGACY_COLLECTION}': {skipped} chunks have no user_id")
+            sys.exit(1)
+        vector_store.delete_collection(LEGACY_COLLECTION)
+        print(f"Deleted '{LEGACY_COLLECTION}'")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
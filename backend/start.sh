@@ -1,4 +1,8 @@
 #!/bin/sh
 set -e
 alembic upgrade head
-exec uvicorn app.main:app --host 0.0.0.0 --port 8000 --workers 1 --proxy-headers --forwarded-allow-ips '*'
+# Without WEB_CONCURRENCY: one worker per core once RATE_LIMIT_STORAGE_URI and
+# CHROMA_SERVER_HOST (or pgvector) make state shared, otherwise a single worker.
+# The app refuses to start with more than one worker on process-local state.
+export WEB_CONCURRENCY="${WEB_CONCURRENCY:-$(python -m app.core.deployment)}"
+exec uvicorn app.main:app --host 0.0.0.0 --port 8000 --workers "$WEB_CONCURRENCY" --proxy-headers --forwarded-allow-ips '*'
@@ -68,3 +68,23 @@ def test_login_invalid_credentials(client):
     assert response.status_code == 401
     data = response.json()
     assert data["status"] == "error"
+
+def test_login_upgrades_hash_with_outdated_cost(client, db_session, monkeypatch):
+    import bcrypt
+    from app.core.security import password_hasher
+    from app.models.user import User
+    from tests.factories import UserFactory
+
+    monkeypatch.setattr(password_hasher, "rounds", 4)
+    old_hash = bcrypt.hashpw(b"password123", bcrypt.gensalt(rounds=5)).decode()
+    user = UserFactory(email="rehash@example.com", hashed_password=old_hash)
+    db_session.commit()
+
+    response = client.post("/auth/login", json={"email": "rehash@example.com", "password": "password123"})
+
+    assert response.status_code == 200
+    db_session.expire_all()
+    new_hash = db_session.get(User, user.id).hashed_password
+    assert new_hash != old_hash
+    assert new_hash.split("$")[2] == "04"
+    assert bcrypt.checkpw(b"password123", new_hash.encode())
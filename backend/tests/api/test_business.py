@@ -153,6 +153,23 @@ def test_update_business(client, db_session):
     assert data["data"]["custom_agent_instruction"] == "New instruction"
     assert data["data"]["description"] == "Original description"  # Unchanged
 
+def test_update_business_retrieval_overrides(client, db_session):
+    """Businesses can tune how much knowledge-base context the agent gets."""
+    user = User(email="rag@test.com", name="Test User", is_active=True)
+    db_session.add(user)
+    db_session.commit()
+    db_session.add(Business(user_id=user.id, business_name="RAG Co"))
+    db_session.commit()
+    headers = {"Authorization": f"Bearer {create_access_token(subject=user.id)}"}
+
+    response = client.put("/business", json={"rag_top_k": 8, "rag_context_tokens": 3000}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["data"]["rag_top_k"] == 8
+    assert response.json()["data"]["rag_context_tokens"] == 3000
+
+    response = client.put("/business", json={"rag_top_k": 100}, headers=headers)
+    assert response.status_code == 422
+
 def test_update_business_not_found(client, db_session):
     """Test updating business when none exists."""
     user = User(email="noupdate@test.com", name="Test User", is_active=True)
@@ -188,3 +205,29 @@ def test_chat_requires_business(client, db_session):
     
     assert response.status_code == 400
     assert "Business profile not found" in response.json()["message"]
+
+def test_get_business_usage(auth_client_with_business, db_session):
+    """Usage endpoint reports compacted counters plus pending ledger rows."""
+    from tests.factories import UsageLedgerEntryFactory
+
+    client, user, business = auth_client_with_business
+    business.allocated_ai_responses = 10
+    business.used_ai_responses = 3
+    UsageLedgerEntryFactory(business=business)
+    UsageLedgerEntryFactory(business=business)
+    db_session.commit()
+
+    response = client.get("/business/usage?days=7")
+
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["ai_responses"] == {"allocated": 10, "used": 5, "remaining": 5}
+    assert data["history"][-1]["ai_response"] == 2
+
+def test_get_business_usage_not_found(authenticated_client):
+    """Usage endpoint returns 404 without a business profile."""
+    client, user = authenticated_client
+
+    response = client.get("/business/usage")
+
+    assert response.status_code == 404
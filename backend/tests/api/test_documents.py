@@ -1,6 +1,7 @@
 from unittest.mock import patch
 from app.core.security import create_access_token
 from app.models.user import User
+from app.schemas.document import IngestResponse, UploadResult
 
 def test_api_upload_documents_scoped(client, db_session):
     # 1. Auth Headers
@@ -12,7 +13,8 @@ def test_api_upload_documents_scoped(client, db_session):
     db_session.commit()
     
     # 3. Upload
-    with patch("app.services.rag_service.rag_service.upload_document", return_value="f1.txt") as mock_upload:
+    result = UploadResult(filename="f1.txt", document_id="d1", status="pending")
+    with patch("app.services.rag_service.rag_service.upload_document", return_value=result) as mock_upload:
         files = {'files': ('test.txt', b'content', 'text/plain')}
         response = client.post("/documents/upload", files=files, headers=headers)
         
@@ -82,3 +84,36 @@ def test_api_chat_scoped(client, db_session):
         args, kwargs = mock_chat.call_args
         assert kwargs['user_id'] == "u1"
         assert kwargs['session_id'] == "u1"
+
+def test_api_replace_document_scoped(client, db_session):
+    token = create_access_token(subject="u1")
+    headers = {"Authorization": f"Bearer {token}"}
+    db_session.add(User(id="u1", email="u1@test.com", google_id="g1"))
+    db_session.commit()
+
+    result = IngestResponse(filename="test.txt", chunks_created=1, chunks_unchanged=4, status="success")
+    with patch("app.services.rag_service.rag_service.replace_document", return_value=result) as mock_replace:
+        files = {'file': ('test.txt', b'content v2', 'text/plain')}
+        response = client.put("/documents/doc-1", files=files, headers=headers)
+
+        assert response.status_code == 200
+        assert response.json()["data"]["chunks_unchanged"] == 4
+        args, kwargs = mock_replace.call_args
+        assert kwargs['user_id'] == "u1"
+        assert kwargs['document_id'] == "doc-1"
+
+    with patch("app.services.rag_service.rag_service.replace_document", return_value=None):
+        response = client.put("/documents/missing", files=files, headers=headers)
+        assert response.status_code == 404
+
+def test_api_upload_over_plan_limit(client, db_session):
+    token = create_access_token(subject="u1")
+    headers = {"Authorization": f"Bearer {token}"}
+    db_session.add(User(id="u1", email="u1@test.com", google_id="g1"))
+    db_session.commit()
+
+    with patch("app.services.rag_service.rag_service.upload_limit", return_value=4):
+        files = {'files': ('big.txt', b'more than four bytes', 'text/plain')}
+        response = client.post("/documents/upload", files=files, headers=headers)
+
+    assert response.status_code == 413
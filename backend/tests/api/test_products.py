@@ -0,0 +1,56 @@
+"""API tests for product bulk upload and SKU uniqueness."""
+from unittest.mock import patch
+
+import pytest
+
+from tests.factories import ProductFactory
+
+
+@pytest.fixture(autouse=True)
+def mock_product_index():
+    with patch("app.api.products.product_index") as mock_index:
+        yield mock_index
+
+
+def _upload(client, content: bytes):
+    return client.post("/products/bulk", files={"file": ("products.csv", content, "text/csv")})
+
+
+def test_bulk_upload_imports_inline(auth_client_with_business, mock_product_index):
+    client, _, business = auth_client_with_business
+
+    response = _upload(client, b"sku,name,price\nS-1,Shirt,12\n,Broken,1\n")
+
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["imported"] == 1
+    assert data["error_count"] == 1
+    assert data["errors"][0]["row"] == 3
+    mock_product_index.sync.assert_called_once_with(business.id)
+
+
+def test_bulk_upload_over_threshold_runs_as_job(auth_client_with_business, db_session):
+    client, _, _ = auth_client_with_business
+
+    with patch("app.api.products.settings.PRODUCT_IMPORT_BACKGROUND_THRESHOLD_BYTES", 10), \
+            patch("app.services.product_import.SessionLocal", return_value=db_session), \
+            patch("app.services.product_index.product_index.sync"):
+        response = _upload(client, b"sku,name,price\nS-1,Shirt,12\nS-2,Socks,3\n")
+
+    assert response.status_code == 202
+    job_id = response.json()["data"]["id"]
+
+    status = client.get(f"/products/bulk/{job_id}")
+    assert status.status_code == 200
+    assert status.json()["data"]["status"] == "done"
+    assert status.json()["data"]["imported"] == 2
+
+
+def test_create_product_with_duplicate_sku_conflicts(auth_client_with_business, db_session):
+    client, _, business = auth_client_with_business
+    ProductFactory(business=business, sku="DUP-1")
+    db_session.commit()
+
+    response = client.post("/products/", json={"name": "Again", "price": "5.00", "sku": "DUP-1"})
+
+    assert response.status_code == 409
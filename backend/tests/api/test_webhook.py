@@ -13,6 +13,7 @@ from tests.factories import (
     UserFactory,
     BusinessFactory,
     PaymentTransactionFactory,
+    UsageLedgerEntryFactory,
 )
 
 VERIFY_SIG_PATH = (
@@ -138,6 +139,29 @@ class TestRenewalSuccess:
         assert business.used_escalations == 0
         assert business.subscription_status == "active"
 
+    def test_renewal_folds_pending_ledger_usage_first(self, client, db_session):
+        """Usage still in the ledger counts as used when the carry-over is computed."""
+        user = UserFactory(email="ledger@test.com")
+        business = BusinessFactory(user=user, user_id=user.id)
+        business.subscription_tier = "spark"
+        business.allocated_ai_responses = 100
+        business.used_ai_responses = 50
+        business.allocated_escalations = 5
+        business.used_escalations = 2
+        UsageLedgerEntryFactory(business=business, amount=10)  # 40 remaining once folded
+        db_session.commit()
+
+        event = _make_event("RENEWAL_SUCCESS", email="ledger@test.com")
+        svc = _mock_service_with_event(event)
+
+        with patch(FACTORY_PATH, return_value=svc):
+            resp = _post_webhook(client, {"event": "charge.success"})
+
+        assert resp.status_code == 200
+        db_session.refresh(business)
+        assert business.allocated_ai_responses == 140
+        assert business.used_ai_responses == 0
+
     def test_renewal_cap_at_2x(self, client, db_session):
         """Carryover should not exceed 2x plan allocation."""
         user = UserFactory(email="cap@test.com")
@@ -196,6 +196,27 @@ class TestChatInSession:
         # AI should NOT have been called
         mock_ai.assert_not_called()
 
+    @patch(SETTINGS)
+    @patch(RUN_CONVERSATION, new_callable=AsyncMock, side_effect=RuntimeError("agent down"))
+    def test_credit_refunded_when_agent_fails(self, mock_ai, mock_settings, client, db_session, widget_env):
+        """A failed agent call must not consume an AI credit."""
+        from app.services.usage_ledger import usage_ledger
+
+        mock_settings.GOOGLE_API_KEY = "test-key"
+        widget = widget_env["widget"]
+        business = widget_env["business"]
+        guest = GuestUserFactory(widget=widget, widget_id=widget.id)
+        session = ChatSessionFactory(guest=guest, guest_id=guest.id)
+        db_session.commit()
+
+        resp = client.post(
+            f"/widgets/chat/{widget.public_widget_id}/session/{session.id}",
+            json={"message": "Hello"},
+        )
+        assert resp.status_code == 200
+        assert "trouble connecting" in resp.json()["response"]["message_text"]
+        assert usage_ledger.used(db_session, business.id, "ai_response") == 0
+
     def test_ai_credit_exhaustion(self, client, db_session, widget_env):
         """Returns credit-exhaustion message when business has no remaining credits."""
         widget = widget_env["widget"]
@@ -4,6 +4,7 @@ Root test configuration.
 Sets up in-memory SQLite, mocks external services, and provides
 core fixtures used across all test categories.
 """
+import os
 import sys
 import pytest
 from unittest.mock import MagicMock
@@ -15,6 +16,8 @@ from unittest.mock import MagicMock
 sys.modules["chromadb"] = MagicMock()
 sys.modules["chromadb.config"] = MagicMock()
 sys.modules["google.generativeai"] = MagicMock()
+# The lifespan would otherwise import the real google-adk in a thread during tests
+os.environ.setdefault("AGENT_WARM_UP", "false")
 
 from sqlalchemy import create_engine  # noqa: E402
 from sqlalchemy.orm import sessionmaker  # noqa: E402
@@ -36,6 +39,9 @@ from app.models.document import Document  # noqa: F401, E402
 from app.models.widget import WidgetSettings, GuestUser, GuestMessage  # noqa: F401, E402
 from app.models.chat_session import ChatSession  # noqa: F401, E402
 from app.models.escalation import Escalation  # noqa: F401, E402
+from app.models.usage_ledger import UsageLedgerEntry  # noqa: F401, E402
+from app.models.analysis_job import AnalysisJob  # noqa: F401, E402
+from app.models.product_import_job import ProductImportJob  # noqa: F401, E402
 from app.models.plan import Plan  # noqa: F401, E402
 from app.models.payment import PaymentTransaction  # noqa: F401, E402
 from app.models.analytics import AnalyticsDailySummary  # noqa: F401, E402
@@ -100,8 +106,10 @@ def _bind_factory_sessions(db_session):
         ChatSessionFactory,
         EscalationFactory,
         GuestMessageFactory,
+        ProductFactory,
         PlanFactory,
         PaymentTransactionFactory,
+        UsageLedgerEntryFactory,
     )
 
     for cls in (
@@ -112,12 +120,34 @@ def _bind_factory_sessions(db_session):
         ChatSessionFactory,
         EscalationFactory,
         GuestMessageFactory,
+        ProductFactory,
         PlanFactory,
         PaymentTransactionFactory,
+        UsageLedgerEntryFactory,
     ):
         cls._meta.sqlalchemy_session = db_session
 
 
+@pytest.fixture(autouse=True)
+def _clear_entitlement_cache():
+    """Entitlement snapshots are process-wide; never let one test see another's."""
+    from app.services.entitlements import entitlement_service
+
+    entitlement_service.clear()
+    yield
+    entitlement_service.clear()
+
+
+@pytest.fixture(autouse=True)
+def _clear_principal_cache():
+    """Cached tenants are process-wide too."""
+    from app.auth.principal import principal_cache
+
+    principal_cache.clear()
+    yield
+    principal_cache.clear()
+
+
 # ===== Auth Helpers =====
 
 
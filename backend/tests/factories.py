@@ -14,6 +14,8 @@ from app.models.chat_session import ChatSession, SessionOrigin
 from app.models.escalation import Escalation, EscalationStatus
 from app.models.plan import Plan
 from app.models.payment import PaymentTransaction
+from app.models.product import Product
+from app.models.usage_ledger import UsageLedgerEntry, UsageKind, UsageEntryType
 
 
 class BaseFactory(SQLAlchemyModelFactory):
@@ -191,6 +193,28 @@ class GuestMessageFactory(BaseFactory):
     created_at = factory.LazyFunction(lambda: datetime.now(timezone.utc))
 
 
+class ProductFactory(BaseFactory):
+    """Factory for creating Product instances."""
+
+    class Meta:
+        model = Product
+
+    id = factory.LazyFunction(lambda: str(uuid.uuid4()))
+    business_id = factory.SelfAttribute("business.id")
+    business = factory.SubFactory(BusinessFactory)
+    name = factory.Faker("word")
+    description = factory.Faker("sentence")
+    price = 10
+    currency = "USD"
+    sku = factory.Sequence(lambda n: f"SKU-{n:05d}")
+    stock_quantity = 10
+    category = None
+    image_urls = None
+    is_active = True
+    created_at = factory.LazyFunction(lambda: datetime.now(timezone.utc))
+    updated_at = factory.LazyFunction(lambda: datetime.now(timezone.utc))
+
+
 class PlanFactory(BaseFactory):
     """Factory for creating Plan instances."""
 
@@ -229,3 +253,22 @@ class PaymentTransactionFactory(BaseFactory):
     transaction_metadata = factory.LazyFunction(dict)
     raw_webhook_payload = factory.LazyFunction(dict)
     created_at = factory.LazyFunction(lambda: datetime.now(timezone.utc))
+
+
+class UsageLedgerEntryFactory(BaseFactory):
+    """Factory for creating UsageLedgerEntry instances (an AI-response reservation by default)."""
+
+    class Meta:
+        model = UsageLedgerEntry
+        exclude = ("business",)
+
+    id = factory.LazyFunction(lambda: str(uuid.uuid4()))
+    business_id = factory.SelfAttribute("business.id")
+    business = factory.SubFactory(BusinessFactory)
+    kind = UsageKind.AI_RESPONSE.value
+    entry_type = UsageEntryType.RESERVE.value
+    amount = 1
+    reservation_id = None
+    reference = None
+    created_at = factory.LazyFunction(lambda: datetime.now(timezone.utc))
+    compacted_at = None
@@ -26,16 +26,50 @@ class TestAutomatedAnalysis:
             parts=[types.Part(text="Hello! How can I help you?")]
         )
         
-        # Patch the background task creation
-        with patch('asyncio.create_task') as mock_create_task:
-            result = trigger_session_analysis(mock_context, mock_response)
+        # Patch the analysis queue
+        with patch('app.services.analysis_scheduler.analysis_scheduler.schedule') as mock_schedule, \
+                patch('asyncio.create_task') as mock_create_task:
+            result = await trigger_session_analysis(mock_context, mock_response)
             
             # Verify callback doesn't modify response
             assert result is None
             
-            # Verify background task was created
-            assert mock_create_task.called
+            # Verify the session was queued rather than analysed inline
+            assert mock_schedule.called
+            assert mock_schedule.call_args.args[1] == "test-session-123"
+            assert mock_schedule.call_args.kwargs["intents"] == ["Support", "Sales"]
+            assert not mock_create_task.called
             
+    async def test_analysis_callback_schedules_off_the_event_loop(self):
+        import threading
+
+        mock_context = Mock(spec=CallbackContext)
+        mock_context.state = {"session_id": "test-session-thread", "intents": None}
+        threads = []
+
+        with patch('app.services.analysis_scheduler.analysis_scheduler.schedule',
+                   side_effect=lambda *args, **kwargs: threads.append(threading.current_thread())):
+            assert await trigger_session_analysis(mock_context, Mock(spec=LlmResponse)) is None
+
+        assert threads and threads[0] is not threading.current_thread()
+
+    async def test_chain_awaits_async_callbacks(self):
+        from app.services.agent_system.callbacks import chain_callbacks
+
+        replaced = Mock(spec=LlmResponse)
+        calls = []
+
+        def sync_callback(callback_context, llm_response):
+            calls.append("sync")
+
+        async def async_callback(callback_context, llm_response):
+            calls.append("async")
+            return replaced
+
+        chained = chain_callbacks(sync_callback, async_callback)
+        assert await chained(Mock(spec=CallbackContext), Mock(spec=LlmResponse)) is replaced
+        assert calls == ["sync", "async"]
+
     async def test_analysis_callback_no_session(self):
         """Test that analysis callback gracefully handles missing session_id."""
         # Mock callback context WITHOUT session_id
@@ -47,7 +81,7 @@ class TestAutomatedAnalysis:
         mock_response = Mock(spec=LlmResponse)
         
         # Should return None and not crash
-        result = trigger_session_analysis(mock_context, mock_response)
+        result = await trigger_session_analysis(mock_context, mock_response)
         assert result is None
     
     async def test_analysis_persists_to_db(self, db_session):
@@ -108,7 +142,7 @@ class TestAutomatedAnalysis:
         start_time = time.time()
         
         # Trigger analysis
-        result = trigger_session_analysis(mock_context, mock_response)
+        result = await trigger_session_analysis(mock_context, mock_response)
         
         end_time = time.time()
         elapsed = end_time - start_time
@@ -131,7 +165,7 @@ class TestAutomatedAnalysis:
         
         # Should not raise exception
         try:
-            result = trigger_session_analysis(mock_context, mock_response)
+            result = await trigger_session_analysis(mock_context, mock_response)
             assert result is None  # Response should still be returned
         except Exception as e:
             pytest.fail(f"Analysis error should be handled gracefully, but raised: {e}")
@@ -28,7 +28,14 @@ def mock_email_factory():
         mock_factory.get_service.return_value = mock_service
         yield mock_service
 
-def test_escalate_to_human_tool(mock_db_session, mock_email_factory):
+@pytest.fixture
+def mock_usage_ledger():
+    with patch("app.services.entitlements.usage_ledger") as mock_ledger:
+        mock_ledger.pending.return_value = {"ai_response": 0, "escalation": 0}
+        mock_ledger.record.return_value = True
+        yield mock_ledger
+
+def test_escalate_to_human_tool(mock_db_session, mock_email_factory, mock_usage_ledger):
     # Setup Data - use MagicMock for business to control all attributes
     mock_business = MagicMock(spec=Business)
     mock_business.id = "biz-123"
@@ -1,13 +1,22 @@
+import hashlib
+import io
 import pytest
+from contextlib import nullcontext
 from unittest.mock import MagicMock, patch
 from app.services.rag_service import rag_service
 from app.models.document import Document
+from app.services.vector_store import InMemoryVectorStore
+from app.services.document_extraction import DocumentExtractor
+from app.services.file_storage import LocalFileStorage, StoredFile
+from benchmarks.pdf_corpus import make_pdf
+from tests.factories import BusinessFactory
 
 @pytest.fixture
 def mock_file_storage(monkeypatch):
     mock = MagicMock()
-    mock.save.return_value = "saved/path/test.txt"
+    mock.save.return_value = StoredFile("saved/path/test.txt", 7, "0" * 64)
     mock.get_full_path.return_value = "/tmp/saved/path/test.txt"
+    mock.local_copy.side_effect = lambda file_path: nullcontext(mock.get_full_path(file_path))
     monkeypatch.setattr(rag_service, "file_storage", mock)
     return mock
 
@@ -22,14 +31,16 @@ def test_upload_document_scoped(db_session, mock_file_storage):
     user_id = "user_123"
     file_mock = MagicMock()
     file_mock.filename = "test.txt"
+    file_mock.file = io.BytesIO(b"content")
     
     # Run async function in sync test? pytest-asyncio handles this if marked async
     # But RAGService.upload_document is async.
     import asyncio
     loop = asyncio.new_event_loop()
-    filename = loop.run_until_complete(rag_service.upload_document(file_mock, user_id, db_session))
+    result = loop.run_until_complete(rag_service.upload_document(file_mock, user_id, db_session))
     
-    assert filename == "test.txt"
+    assert result.filename == "test.txt"
+    assert not result.duplicate
     mock_file_storage.save.assert_called_once()
     
     # Verify DB
@@ -38,7 +49,7 @@ def test_upload_document_scoped(db_session, mock_file_storage):
     assert doc.filename == "test.txt"
     assert doc.status == "pending"
 
-def test_process_documents_scoped(db_session, mock_file_storage, mock_vector_db_service):
+def test_process_documents_scoped(db_session, mock_file_storage, mock_vector_db_service, tmp_path):
     user1 = "u1"
     user2 = "u2"
 
@@ -48,28 +59,74 @@ def test_process_documents_scoped(db_session, mock_file_storage, mock_vector_db_
     db_session.add_all([doc1, doc2])
     db_session.commit()
 
-    # Mock file content and API key
-    with patch("builtins.open", new_callable=MagicMock) as mock_open, \
-         patch("app.services.rag_service.settings") as mock_settings:
-        mock_settings.GOOGLE_API_KEY = "test-key"
-        mock_open.return_value.__enter__.return_value.read.return_value = "content"
-        with patch("os.path.exists", return_value=True):
-            # Process for User 1
-            results = rag_service.process_documents(user1, db_session)
-            
-            assert len(results) == 1
-            assert results[0].filename == "doc1.txt"
-            
-            # Verify DB updates
-            db_session.refresh(doc1)
-            db_session.refresh(doc2)
-            assert doc1.status == "processed"
-            assert doc2.status == "pending" # User 2 doc untouched
-            
-            # Verify Vector DB add with user metadata
-            args, kwargs = mock_vector_db_service.add_documents.call_args
-            metadatas = kwargs['metadatas']
-            assert metadatas[0]['user_id'] == user1
+    # File content and API key
+    content = tmp_path / "doc1.txt"
+    content.write_text("content", encoding="utf-8")
+    mock_file_storage.get_full_path.return_value = str(content)
+    with patch("app.services.rag_service.settings.GOOGLE_API_KEY", "test-key"):
+        # Process for User 1
+        results = rag_service.process_documents(user1, db_session)
+        
+        assert len(results) == 1
+        assert results[0].filename == "doc1.txt"
+        
+        # Verify DB updates
+        db_session.refresh(doc1)
+        db_session.refresh(doc2)
+        assert doc1.status == "processed"
+        assert doc2.status == "pending" # User 2 doc untouched
+        
+        # Verify chunks go to user 1's collection with user metadata
+        mock_vector_db_service.get_collection.assert_called_with("documents-u1")
+        args, kwargs = mock_vector_db_service.get_collection.return_value.upsert.call_args
+        metadatas = kwargs['metadatas']
+        assert metadatas[0]['user_id'] == user1
+
+def test_process_pdf_records_pages(db_session, mock_file_storage, monkeypatch, tmp_path):
+    store = InMemoryVectorStore()
+    monkeypatch.setattr(rag_service, "vector_db", store)
+    path = tmp_path / "manual.pdf"
+    make_pdf(str(path), pages=6, lines_per_page=30)
+    mock_file_storage.get_full_path.return_value = str(path)
+    doc = Document(user_id="u1", filename="manual.pdf", file_path="p1", status="pending")
+    db_session.add(doc)
+    db_session.commit()
+
+    with patch("app.services.rag_service.settings.GOOGLE_API_KEY", "test-key"), \
+         patch.object(rag_service, "_get_embedding", return_value=[1.0, 0.0]):
+        results = rag_service.process_documents("u1", db_session)
+
+    assert results[0].status == "success"
+    stored = store.get_collection("documents-u1").get()
+    assert len(stored["ids"]) == results[0].chunks_created > 1
+    page_texts = [page.text for page in DocumentExtractor(workers=1).pages(str(path), "manual.pdf")]
+    for text, metadata in zip(stored["documents"], stored["metadatas"]):
+        # Each chunk lies within the pages it cites.
+        assert text in "\n".join(page_texts[metadata["page_start"] - 1:metadata["page_end"]])
+
+def test_process_failure_removes_partial_chunks(db_session, mock_file_storage, monkeypatch, tmp_path):
+    store = InMemoryVectorStore()
+    monkeypatch.setattr(rag_service, "vector_db", store)
+    monkeypatch.setattr("app.services.rag_service.INGEST_BATCH_SIZE", 2)
+    path = tmp_path / "long.txt"
+    path.write_text("".join(f"Sentence {i} is about shipping times. " for i in range(500)), encoding="utf-8")
+    mock_file_storage.get_full_path.return_value = str(path)
+    doc = Document(user_id="u1", filename="long.txt", file_path="p1", status="pending")
+    db_session.add(doc)
+    db_session.commit()
+
+    calls = iter(range(1000))
+    def flaky_embedding(text, api_key):
+        if next(calls) == 5:
+            raise RuntimeError("quota exceeded")
+        return [1.0, 0.0]
+
+    with patch("app.services.rag_service.settings.GOOGLE_API_KEY", "test-key"), \
+         patch.object(rag_service, "_get_embedding", side_effect=flaky_embedding):
+        results = rag_service.process_documents("u1", db_session)
+
+    assert results[0].status == "error: quota exceeded"
+    assert store.get_collection("documents-u1").count() == 0
 
 def test_list_documents_scoped(db_session):
     db_session.add(Document(user_id="u1", filename="a.txt", file_path="p", status="processed"))
@@ -84,11 +141,285 @@ def test_list_documents_scoped(db_session):
     assert len(docs2) == 1
     assert docs2[0]["filename"] == "b.txt"
 
-def test_query_scoped(mock_vector_db_service):
-    with patch("app.services.rag_service.settings") as mock_settings:
-        mock_settings.GOOGLE_API_KEY = "test-key"
-        rag_service.query("check", "u1")
+def test_query_scoped(db_session, monkeypatch):
+    store = InMemoryVectorStore()
+    monkeypatch.setattr(rag_service, "vector_db", store)
+    store.get_collection("documents-u1").upsert(ids=["a"], embeddings=[[1.0, 0.0]], documents=["refund policy"])
+    store.get_collection("documents-u2").upsert(ids=["b"], embeddings=[[1.0, 0.0]], documents=["other tenant"])
+
+    with patch.object(rag_service, "_get_query_embedding", return_value=[1.0, 0.0]):
+        chunks = rag_service.query("refund", "u1", api_key="test-key", db=db_session)
+
+    assert chunks == ["refund policy"]
+
+def test_query_uses_business_top_k(db_session, monkeypatch):
+    business = BusinessFactory(rag_top_k=2)
+    db_session.commit()
+    store = InMemoryVectorStore()
+    monkeypatch.setattr(rag_service, "vector_db", store)
+    store.get_collection(f"documents-{business.user_id}").upsert(
+        ids=["a", "b", "c"],
+        embeddings=[[1.0, 0.0], [0.0, 1.0], [0.7, 0.7]],
+        documents=["shipping times", "returns window", "store hours"],
+    )
+
+    with patch.object(rag_service, "_get_query_embedding", side_effect=RuntimeError("embedding down")):
+        chunks = rag_service.query("shipping returns hours", business.user_id, api_key="test-key", db=db_session)
+
+    # Keyword-only when the embedding fails, capped at the business's top_k.
+    assert len(chunks) == 2
+
+def test_delete_document_scoped(db_session, mock_file_storage, monkeypatch):
+    store = InMemoryVectorStore()
+    monkeypatch.setattr(rag_service, "vector_db", store)
+    for user_id in ("u1", "u2"):
+        store.get_collection(f"documents-{user_id}").upsert(
+            ids=[f"{user_id}-0"], embeddings=[[1.0, 0.0]], documents=["chunk"],
+            metadatas=[{"filename": "same.txt", "user_id": user_id}],
+        )
+    doc = Document(user_id="u1", filename="same.txt", file_path="p1", status="processed")
+    db_session.add(doc)
+    db_session.commit()
+
+    assert rag_service.delete_document(doc.id, "u1", db_session)
+
+    assert store.get_collection("documents-u1").count() == 0
+    assert store.get_collection("documents-u2").count() == 1
+
+def _faq(answers):
+    return "\n\n".join(
+        f"Q{i}. How does item {i} work?\nA. {answer} It ships within {i % 7 + 1} days and can be returned for 30 days."
+        for i, answer in enumerate(answers)
+    )
+
+def test_replace_document_reembeds_only_changed_chunks(db_session, mock_file_storage, monkeypatch, tmp_path):
+    store = InMemoryVectorStore()
+    monkeypatch.setattr(rag_service, "vector_db", store)
+    answers = [f"Item {i} is assembled by hand from oak and steel parts." for i in range(120)]
+    path = tmp_path / "faq.txt"
+    path.write_text(_faq(answers), encoding="utf-8")
+    mock_file_storage.get_full_path.return_value = str(path)
+    mock_file_storage.save.return_value = StoredFile("p1", 0, "0" * 64)
+    doc = Document(user_id="u1", filename="faq.txt", file_path="p1", status="pending")
+    db_session.add(doc)
+    db_session.commit()
+
+    embed = MagicMock(return_value=[1.0, 0.0])
+    with patch("app.services.rag_service.settings.GOOGLE_API_KEY", "test-key"), \
+         patch.object(rag_service, "_get_embedding", embed):
+        first = rag_service.process_documents("u1", db_session)[0]
+        before = set(store.get_collection("documents-u1").get()["ids"])
+
+        answers[60] = "Item 60 is now printed from recycled plastic."
+        path.write_text(_faq(answers), encoding="utf-8")
+        embed.reset_mock()
+        upload = MagicMock()
+        upload.filename = "faq.txt"
+        upload.file = io.BytesIO(path.read_bytes())
+        result = rag_service.replace_document(doc.id, upload, "u1", db_session)
+
+    after = set(store.get_collection("documents-u1").get()["ids"])
+    assert result.status == "success"
+    assert 0 < result.chunks_created <= 3
+    assert embed.call_count <= result.chunks_created
+    assert result.chunks_removed == len(before - after)
+    assert result.chunks_unchanged == len(before & after) > first.chunks_created - 4
+    assert len(after) == result.chunks_created + result.chunks_unchanged
+    db_session.refresh(doc)
+    assert (doc.version, doc.status) == (2, "processed")
+
+def test_replace_document_drops_legacy_chunks(db_session, mock_file_storage, monkeypatch, tmp_path):
+    store = InMemoryVectorStore()
+    monkeypatch.setattr(rag_service, "vector_db", store)
+    collection = store.get_collection("documents-u1")
+    collection.upsert(
+        ids=["legacy-0"], embeddings=[[1.0, 0.0]], documents=["old chunk"],
+        metadatas=[{"filename": "old.txt", "user_id": "u1", "chunk_index": 0}],
+    )
+    path = tmp_path / "new.txt"
+    path.write_text("The new version of the policy.", encoding="utf-8")
+    mock_file_storage.get_full_path.return_value = str(path)
+    mock_file_storage.save.return_value = StoredFile("p2", 0, "0" * 64)
+    doc = Document(user_id="u1", filename="old.txt", file_path="p1", status="processed")
+    db_session.add(doc)
+    db_session.commit()
+
+    upload = MagicMock()
+    upload.filename = "new.txt"
+    upload.file = io.BytesIO(path.read_bytes())
+    with patch("app.services.rag_service.settings.GOOGLE_API_KEY", "test-key"), \
+         patch.object(rag_service, "_get_embedding", return_value=[1.0, 0.0]):
+        result = rag_service.replace_document(doc.id, upload, "u1", db_session)
+
+    assert (result.chunks_created, result.chunks_removed) == (1, 1)
+    stored = collection.get()
+    assert stored["documents"] == ["The new version of the policy."]
+    assert stored["metadatas"][0]["document_id"] == doc.id
+    mock_file_storage.delete.assert_called_once_with("p1")
+
+def test_failed_replace_keeps_the_previous_file(db_session, mock_file_storage, monkeypatch, tmp_path):
+    monkeypatch.setattr(rag_service, "vector_db", InMemoryVectorStore())
+    path = tmp_path / "new.txt"
+    path.write_text("The new version of the policy.", encoding="utf-8")
+    mock_file_storage.get_full_path.return_value = str(path)
+    mock_file_storage.save.return_value = StoredFile("p2", 0, "0" * 64)
+    doc = Document(user_id="u1", filename="policy.txt", file_path="p1", status="processed", content_hash="h1")
+    db_session.add(doc)
+    db_session.commit()
+
+    upload = MagicMock()
+    upload.filename = "new.txt"
+    upload.file = io.BytesIO(path.read_bytes())
+    with patch("app.services.rag_service.settings.GOOGLE_API_KEY", "test-key"), \
+         patch.object(rag_service, "_get_embedding", side_effect=RuntimeError("model down")):
+        result = rag_service.replace_document(doc.id, upload, "u1", db_session)
+
+    assert result.status == "error: model down"
+    mock_file_storage.delete.assert_called_once_with("p2")
+    db_session.refresh(doc)
+    assert (doc.file_path, doc.filename, doc.content_hash, doc.version) == ("p1", "policy.txt", "h1", 1)
+    assert doc.status == "processed" and doc.error_message == "model down"
+
+@pytest.fixture
+def local_storage(monkeypatch, tmp_path):
+    storage = LocalFileStorage(str(tmp_path / "uploads"))
+    monkeypatch.setattr(rag_service, "file_storage", storage)
+    return storage
+
+def _stored_document(db_session, storage, filename, data):
+    import asyncio
+    loop = asyncio.new_event_loop()
+    result = loop.run_until_complete(rag_service.upload_document(_upload(filename, data), "u1", db_session))
+    return db_session.get(Document, result.document_id)
+
+def test_failed_same_name_replace_keeps_the_live_file(db_session, local_storage, monkeypatch):
+    monkeypatch.setattr(rag_service, "vector_db", InMemoryVectorStore())
+    doc = _stored_document(db_session, local_storage, "policy.txt", b"The first version of the policy.")
+    with patch("app.services.rag_service.settings.GOOGLE_API_KEY", "test-key"), \
+         patch.object(rag_service, "_get_embedding", return_value=[1.0, 0.0]):
+        rag_service.process_documents("u1", db_session)
+    live = (doc.file_path, doc.content_hash, doc.version)
+
+    with patch("app.services.rag_service.settings.GOOGLE_API_KEY", "test-key"), \
+         patch.object(rag_service, "_get_embedding", side_effect=RuntimeError("model down")):
+        result = rag_service.replace_document(
+            doc.id, _upload("policy.txt", b"The second version of the policy."), "u1", db_session
+        )
+
+    assert result.status == "error: model down"
+    db_session.refresh(doc)
+    assert (doc.file_path, doc.content_hash, doc.version, doc.status) == live + ("processed",)
+    with local_storage.local_copy(doc.file_path) as path:
+        assert open(path, "rb").read() == b"The first version of the policy."
+    assert local_storage.list_files("u1") == [doc.id]  # the failed version's folder is gone too
+
+def test_same_name_replace_switches_files_once_indexed(db_session, local_storage, monkeypatch):
+    monkeypatch.setattr(rag_service, "vector_db", InMemoryVectorStore())
+    doc = _stored_document(db_session, local_storage, "policy.txt", b"The first version of the policy.")
+    other = _stored_document(db_session, local_storage, "faq.txt", b"Questions and answers.")
+    previous_path = doc.file_path
+
+    with patch("app.services.rag_service.settings.GOOGLE_API_KEY", "test-key"), \
+         patch.object(rag_service, "_get_embedding", return_value=[1.0, 0.0]):
+        rag_service.process_documents("u1", db_session)
+        result = rag_service.replace_document(
+            doc.id, _upload("faq.txt", b"The second version of the policy."), "u1", db_session
+        )
+
+    assert result.status == "success"
+    db_session.refresh(doc)
+    assert doc.file_path != previous_path and doc.version == 2
+    with local_storage.local_copy(doc.file_path) as path:
+        assert open(path, "rb").read() == b"The second version of the policy."
+    with pytest.raises(FileNotFoundError):
+        with local_storage.local_copy(previous_path):
+            pass
+    # Same name as another document: that document's file is untouched
+    with local_storage.local_copy(other.file_path) as path:
+        assert open(path, "rb").read() == b"Questions and answers."
+
+def test_replace_document_not_found(db_session, mock_file_storage):
+    db_session.add(Document(user_id="u2", filename="a.txt", file_path="p", status="processed"))
+    db_session.commit()
+    other = db_session.query(Document).first()
+
+    assert rag_service.replace_document(other.id, MagicMock(), "u1", db_session) is None
+    mock_file_storage.save.assert_not_called()
+
+def _upload(name, data):
+    upload = MagicMock()
+    upload.filename = name
+    upload.file = io.BytesIO(data)
+    return upload
+
+def test_upload_same_bytes_is_duplicate(db_session, mock_file_storage):
+    import asyncio
+    loop = asyncio.new_event_loop()
+    first = loop.run_until_complete(rag_service.upload_document(_upload("faq.pdf", b"same bytes"), "u1", db_session))
+    again = loop.run_until_complete(rag_service.upload_document(_upload("faq copy.pdf", b"same bytes"), "u1", db_session))
+    other_tenant = loop.run_until_complete(rag_service.upload_document(_upload("faq.pdf", b"same bytes"), "u2", db_session))
+
+    assert again.duplicate and again.document_id == first.document_id and again.filename == "faq.pdf"
+    assert not other_tenant.duplicate
+    assert mock_file_storage.save.call_count == 2
+    assert db_session.query(Document).filter(Document.user_id == "u1").count() == 1
+
+def test_upload_hashes_and_stores_off_the_event_loop(db_session, mock_file_storage):
+    import asyncio
+    import threading
+    threads = []
+
+    def save(file_obj, filename, user_id, max_bytes=None, folder=None):
+        threads.append(threading.current_thread())
+        return StoredFile("p1", 0, "0" * 64)
+
+    mock_file_storage.save.side_effect = save
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(rag_service.upload_document(_upload("faq.pdf", b"bytes"), "u1", db_session))
+
+    assert threads and threads[0] is not threading.main_thread()
+
+def test_identical_chunks_are_embedded_once(db_session, mock_file_storage, monkeypatch, tmp_path):
+    store = InMemoryVectorStore()
+    monkeypatch.setattr(rag_service, "vector_db", store)
+    path = tmp_path / "faq.txt"
+    path.write_text(_faq([f"Item {i} is made of oak." for i in range(40)]), encoding="utf-8")
+    mock_file_storage.get_full_path.return_value = str(path)
+    # The same file as two of u1's documents, and as u2's document (same content hash)
+    docs = [
+        Document(user_id="u1", filename="faq.txt", file_path="p1", status="pending", content_hash="h1"),
+        Document(user_id="u1", filename="faq.txt", file_path="p2", status="pending"),
+        Document(user_id="u2", filename="faq.txt", file_path="p3", status="pending", content_hash="h1"),
+    ]
+    db_session.add(docs[0])
+    db_session.commit()
+
+    embed = MagicMock(return_value=[1.0, 0.0])
+    with patch("app.services.rag_service.settings.GOOGLE_API_KEY", "test-key"), \
+         patch.object(rag_service, "_get_embedding", embed):
+        first = rag_service.process_documents("u1", db_session)[0]
+        assert embed.call_count == first.chunks_created > 1
+        db_session.add_all(docs[1:])
+        db_session.commit()
+        second = rag_service.process_documents("u1", db_session)[0]
+        third = rag_service.process_documents("u2", db_session)[0]
+
+    assert embed.call_count == first.chunks_created
+    assert second.chunks_created == third.chunks_created == first.chunks_created
+    # Reuse is not reported to the tenant: it would reveal another tenant's identical file
+    assert "embeddings_reused" not in third.model_dump()
+    assert store.get_collection("documents-u1").count() == 2 * first.chunks_created
+    assert store.get_collection("documents-u2").count() == first.chunks_created
+
+def test_replace_with_same_file_is_unchanged(db_session, mock_file_storage):
+    upload = _upload("faq.txt", b"same bytes")
+    doc = Document(user_id="u1", filename="faq.txt", file_path="p1", status="processed",
+                   content_hash=hashlib.sha256(b"same bytes").hexdigest())
+    db_session.add(doc)
+    db_session.commit()
+
+    result = rag_service.replace_document(doc.id, upload, "u1", db_session)
 
-    mock_vector_db_service.query.assert_called_once()
-    args, kwargs = mock_vector_db_service.query.call_args
-    assert kwargs['where'] == {"user_id": "u1"}
+    assert result.status == "unchanged"
+    mock_file_storage.save.assert_not_called()
+    assert doc.version == 1
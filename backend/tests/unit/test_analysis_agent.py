@@ -0,0 +1,147 @@
+"""Unit tests for incremental session analysis in app.services.analysis_agent."""
+import json
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.services.analysis_agent import analyze_session, analyze_sessions_batch, persist_analysis
+from tests.factories import ChatSessionFactory, GuestMessageFactory, GuestUserFactory
+
+
+@pytest.fixture
+def chat(db_session):
+    guest = GuestUserFactory()
+    session = ChatSessionFactory(guest=guest, guest_id=guest.id)
+    db_session.commit()
+    return session
+
+
+def _add_messages(session, texts, start=None):
+    start = start or datetime.now(timezone.utc) - timedelta(hours=1)
+    return [
+        GuestMessageFactory(
+            session=session,
+            guest=session.guest,
+            message_text=text,
+            created_at=start + timedelta(seconds=i),
+        )
+        for i, text in enumerate(texts)
+    ]
+
+
+def _mock_client(summary="User asked about pricing.", intent="Sales"):
+    client = MagicMock()
+    client.models.generate_content.return_value = MagicMock(
+        text=json.dumps({"summary": summary, "intent": intent})
+    )
+    return client
+
+
+def _sent_prompt(client):
+    return client.models.generate_content.call_args.kwargs["contents"]
+
+
+@pytest.mark.unit
+class TestIncrementalAnalysis:
+    async def test_first_analysis_sends_all_messages_and_sets_watermark(self, db_session, chat):
+        messages = _add_messages(chat, ["first question", "second question"])
+        db_session.commit()
+        client = _mock_client()
+
+        with patch("app.services.analysis_agent.genai.Client", return_value=client):
+            summary, intent = await analyze_session(db_session, chat.id, api_key="key")
+        await persist_analysis(db_session, chat.id, summary, intent)
+
+        prompt = _sent_prompt(client)
+        assert "first question" in prompt and "second question" in prompt
+        db_session.refresh(chat)
+        assert chat.analyzed_message_id == messages[-1].id
+        assert chat.summary == "User asked about pricing."
+
+    async def test_second_analysis_sends_only_new_messages(self, db_session, chat):
+        old = _add_messages(chat, ["old question"])
+        chat.summary = "User asked an old question."
+        chat.analyzed_message_id = old[-1].id
+        chat.analyzed_message_at = old[-1].created_at
+        _add_messages(chat, ["new question"], start=old[-1].created_at + timedelta(seconds=5))
+        db_session.commit()
+        client = _mock_client()
+
+        with patch("app.services.analysis_agent.genai.Client", return_value=client):
+            await analyze_session(db_session, chat.id, api_key="key")
+
+        prompt = _sent_prompt(client)
+        assert "new question" in prompt
+        assert "User: old question" not in prompt
+        assert "User asked an old question." in prompt
+
+    async def test_no_new_messages_skips_llm_call(self, db_session, chat):
+        old = _add_messages(chat, ["only question"])
+        chat.summary = "Existing summary."
+        chat.top_intent = "Support"
+        chat.analyzed_message_id = old[-1].id
+        chat.analyzed_message_at = old[-1].created_at
+        db_session.commit()
+
+        with patch("app.services.analysis_agent.genai.Client") as client_cls:
+            result = await analyze_session(db_session, chat.id, api_key="key")
+
+        assert result == ("Existing summary.", "Support")
+        assert not client_cls.called
+
+    async def test_long_backlog_is_cut_to_rolling_window(self, db_session, chat):
+        _add_messages(chat, [f"message {i}" for i in range(6)])
+        db_session.commit()
+        client = _mock_client()
+
+        with patch("app.services.analysis_agent.settings.ANALYSIS_WINDOW_MESSAGES", 2), \
+                patch("app.services.analysis_agent.genai.Client", return_value=client):
+            await analyze_session(db_session, chat.id, api_key="key")
+
+        prompt = _sent_prompt(client)
+        assert "message 4" in prompt and "message 5" in prompt
+        assert "message 3" not in prompt
+        assert "[Earlier messages omitted]" in prompt
+
+    async def test_failed_analysis_keeps_watermark(self, db_session, chat):
+        _add_messages(chat, ["question"])
+        db_session.commit()
+        client = MagicMock()
+        client.models.generate_content.side_effect = RuntimeError("boom")
+
+        with patch("app.services.analysis_agent.genai.Client", return_value=client):
+            await analyze_session(db_session, chat.id, api_key="key")
+
+        assert chat.analyzed_message_id is None
+
+
+@pytest.mark.unit
+class TestBatchAnalysis:
+    async def test_maps_results_back_to_keys(self):
+        client = MagicMock()
+        client.aio.models.generate_content = AsyncMock(return_value=MagicMock(text=json.dumps([
+            {"session": "0", "summary": "Asked about delivery.", "intent": "Sales"},
+            {"session": "1", "summary": "Reported a bug.", "intent": "Nonsense"},
+            {"session": "9", "summary": "Not requested.", "intent": "Sales"},
+        ])))
+
+        with patch("app.services.analysis_agent.genai.Client", return_value=client):
+            results = await analyze_sessions_batch(
+                {"0": "User: when will it arrive?", "1": "User: the page crashes", "2": "User: hi"},
+                api_key="key",
+            )
+
+        assert results == {
+            "0": ("Asked about delivery.", "Sales"),
+            "1": ("Reported a bug.", "General"),
+        }
+        prompt = client.aio.models.generate_content.call_args.kwargs["contents"]
+        assert "### SESSION 2" in prompt
+
+    async def test_unparseable_response_returns_nothing(self):
+        client = MagicMock()
+        client.aio.models.generate_content = AsyncMock(return_value=MagicMock(text="not json"))
+
+        with patch("app.services.analysis_agent.genai.Client", return_value=client):
+            assert await analyze_sessions_batch({"0": "User: hi"}, api_key="key") == {}
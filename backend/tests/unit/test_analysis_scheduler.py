@@ -0,0 +1,205 @@
+"""Unit tests for app.services.analysis_scheduler and the analysis worker's job runner."""
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.models.analysis_job import AnalysisJob, AnalysisJobStatus
+from app.services.analysis_scheduler import AnalysisScheduler
+from tests.factories import ChatSessionFactory
+
+
+@pytest.fixture
+def scheduler():
+    return AnalysisScheduler(debounce_seconds=30, max_attempts=2)
+
+
+@pytest.fixture
+def chat_session(db_session):
+    session = ChatSessionFactory()
+    db_session.commit()
+    return session
+
+
+def _make_due(db_session, session_id):
+    job = db_session.query(AnalysisJob).filter(AnalysisJob.session_id == session_id).one()
+    job.run_after = datetime.now(timezone.utc) - timedelta(seconds=1)
+    db_session.commit()
+    return job
+
+
+@pytest.mark.unit
+class TestSchedule:
+    def test_repeated_triggers_keep_one_debounced_job(self, scheduler, db_session, chat_session):
+        scheduler.schedule(db_session, chat_session.id, intents=["Sales"])
+        scheduler.schedule(db_session, chat_session.id, intents=["Sales"])
+        scheduler.schedule(db_session, chat_session.id, intents=["Sales"])
+
+        jobs = db_session.query(AnalysisJob).all()
+        assert len(jobs) == 1
+        assert jobs[0].generation == 3
+        assert jobs[0].status == AnalysisJobStatus.PENDING.value
+
+    def test_requested_at_kept_while_pending_and_reset_after_a_run(self, scheduler, db_session, chat_session):
+        scheduler.schedule(db_session, chat_session.id)
+        job = _make_due(db_session, chat_session.id)
+        first_request = job.requested_at = datetime(2026, 1, 1)
+        db_session.commit()
+
+        scheduler.schedule(db_session, chat_session.id)
+        db_session.expire_all()
+        assert db_session.query(AnalysisJob).one().requested_at == first_request
+
+        _make_due(db_session, chat_session.id)
+        [claimed] = scheduler.claim_due(db_session, limit=1)
+        scheduler.complete(db_session, claimed)
+        scheduler.schedule(db_session, chat_session.id)
+
+        db_session.expire_all()
+        stored = db_session.query(AnalysisJob).one()
+        assert stored.requested_at > first_request
+        assert (stored.status, stored.attempts, stored.generation) == (AnalysisJobStatus.PENDING.value, 0, 3)
+
+    def test_job_is_not_due_until_debounce_elapses(self, scheduler, db_session, chat_session):
+        scheduler.schedule(db_session, chat_session.id)
+        assert scheduler.claim_due(db_session, limit=5) == []
+
+        _make_due(db_session, chat_session.id)
+        claimed = scheduler.claim_due(db_session, limit=5)
+
+        assert [job.session_id for job in claimed] == [chat_session.id]
+        assert db_session.query(AnalysisJob).one().status == AnalysisJobStatus.RUNNING.value
+
+    def test_claim_respects_limit(self, scheduler, db_session):
+        sessions = [ChatSessionFactory() for _ in range(3)]
+        db_session.commit()
+        for session in sessions:
+            scheduler.schedule(db_session, session.id)
+            _make_due(db_session, session.id)
+
+        assert len(scheduler.claim_due(db_session, limit=2)) == 2
+        assert len(scheduler.claim_due(db_session, limit=2)) == 1
+
+
+@pytest.mark.unit
+class TestCompletion:
+    def test_complete_marks_done(self, scheduler, db_session, chat_session):
+        scheduler.schedule(db_session, chat_session.id)
+        _make_due(db_session, chat_session.id)
+        [job] = scheduler.claim_due(db_session, limit=1)
+
+        scheduler.complete(db_session, job)
+
+        db_session.expire_all()
+        assert db_session.query(AnalysisJob).one().status == AnalysisJobStatus.DONE.value
+
+    def test_message_during_run_keeps_job_pending(self, scheduler, db_session, chat_session):
+        scheduler.schedule(db_session, chat_session.id)
+        _make_due(db_session, chat_session.id)
+        [job] = scheduler.claim_due(db_session, limit=1)
+
+        scheduler.schedule(db_session, chat_session.id)
+        scheduler.complete(db_session, job)
+
+        db_session.expire_all()
+        assert db_session.query(AnalysisJob).one().status == AnalysisJobStatus.PENDING.value
+
+    def test_message_during_run_is_not_claimed_by_a_second_worker(self, scheduler, db_session, chat_session):
+        scheduler.schedule(db_session, chat_session.id)
+        _make_due(db_session, chat_session.id)
+        [job] = scheduler.claim_due(db_session, limit=1)
+
+        scheduler.schedule(db_session, chat_session.id)
+        _make_due(db_session, chat_session.id)
+
+        db_session.expire_all()
+        stored = db_session.query(AnalysisJob).one()
+        assert (stored.status, stored.generation) == (AnalysisJobStatus.RUNNING.value, job.generation + 1)
+        assert scheduler.claim_due(db_session, limit=1) == []
+
+        scheduler.complete(db_session, job)
+        [rerun] = scheduler.claim_due(db_session, limit=1)
+        assert (rerun.generation, rerun.attempts) == (job.generation + 1, 1)
+
+    def test_failed_run_of_a_rescheduled_job_is_requeued(self, scheduler, db_session, chat_session):
+        scheduler.schedule(db_session, chat_session.id)
+        _make_due(db_session, chat_session.id)
+        [job] = scheduler.claim_due(db_session, limit=1)
+
+        scheduler.schedule(db_session, chat_session.id)
+        scheduler.fail(db_session, job, "timeout")
+
+        db_session.expire_all()
+        stored = db_session.query(AnalysisJob).one()
+        assert (stored.status, stored.last_error) == (AnalysisJobStatus.PENDING.value, "timeout")
+
+    def test_failure_retries_then_gives_up(self, scheduler, db_session, chat_session):
+        scheduler.schedule(db_session, chat_session.id)
+        _make_due(db_session, chat_session.id)
+        [job] = scheduler.claim_due(db_session, limit=1)
+        scheduler.fail(db_session, job, "timeout")
+
+        db_session.expire_all()
+        assert db_session.query(AnalysisJob).one().status == AnalysisJobStatus.PENDING.value
+
+        _make_due(db_session, chat_session.id)
+        [job] = scheduler.claim_due(db_session, limit=1)
+        scheduler.fail(db_session, job, "timeout")
+
+        db_session.expire_all()
+        stored = db_session.query(AnalysisJob).one()
+        assert stored.status == AnalysisJobStatus.FAILED.value
+        assert stored.last_error == "timeout"
+
+    def test_recover_leaves_jobs_within_their_lease(self, scheduler, db_session, chat_session):
+        """A worker starting up must not requeue jobs its live peers are running."""
+        scheduler.schedule(db_session, chat_session.id)
+        _make_due(db_session, chat_session.id)
+        scheduler.claim_due(db_session, limit=1)
+
+        assert scheduler.recover(db_session) == 0
+        assert scheduler.claim_due(db_session, limit=1) == []
+
+    def test_recover_requeues_jobs_past_their_lease(self, scheduler, db_session, chat_session):
+        scheduler.schedule(db_session, chat_session.id)
+        _make_due(db_session, chat_session.id)
+        scheduler.claim_due(db_session, limit=1)
+        job = db_session.query(AnalysisJob).one()
+        job.started_at = datetime.now(timezone.utc) - scheduler.lease - timedelta(seconds=1)
+        db_session.commit()
+
+        assert scheduler.recover(db_session) == 1
+        assert len(scheduler.claim_due(db_session, limit=1)) == 1
+
+
+@pytest.mark.unit
+class TestMetrics:
+    def test_reports_depth_and_lag(self, scheduler, db_session, chat_session):
+        scheduler.schedule(db_session, chat_session.id)
+        job = _make_due(db_session, chat_session.id)
+        job.requested_at = datetime.now(timezone.utc) - timedelta(seconds=90)
+        db_session.commit()
+
+        metrics = scheduler.metrics(db_session)
+
+        assert metrics["pending"] == 1
+        assert metrics["due"] == 1
+        assert metrics["running"] == 0
+        assert metrics["lag_seconds"] >= 90
+
+
+@pytest.mark.unit
+class TestWorkerRunJob:
+    async def test_successful_run_completes_job(self, scheduler, db_session, chat_session):
+        from app.workers import analysis_worker
+
+        scheduler.schedule(db_session, chat_session.id)
+        _make_due(db_session, chat_session.id)
+        [job] = scheduler.claim_due(db_session, limit=1)
+
+        with patch.object(analysis_worker, "_run_analysis_in_background", AsyncMock(return_value=True)), \
+                patch.object(analysis_worker, "_with_db", lambda fn, *args: fn(db_session, *args)):
+            assert await analysis_worker.run_job(job) is True
+
+        db_session.expire_all()
+        assert db_session.query(AnalysisJob).one().status == AnalysisJobStatus.DONE.value
@@ -0,0 +1,164 @@
+"""Unit tests for app.services.batch_analysis.
+
+Covers session selection, request packing, persistence and checkpoint resume.
+The LLM call (``analyze_sessions_batch``) is mocked.
+"""
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.models.chat_session import ChatSession
+from app.services.batch_analysis import BatchAnalyzer, load_checkpoint, save_checkpoint
+from tests.factories import (
+    BusinessFactory,
+    ChatSessionFactory,
+    GuestMessageFactory,
+    GuestUserFactory,
+    WidgetSettingsFactory,
+)
+
+NOW = datetime.now(timezone.utc)
+STALE_BEFORE = NOW - timedelta(days=7)
+
+
+@pytest.fixture
+def business(db_session):
+    business = BusinessFactory(intents=["Orders", "Returns", "General"])
+    db_session.commit()
+    return business
+
+
+@pytest.fixture
+def guest(db_session, business):
+    widget = WidgetSettingsFactory(user=business.user, user_id=business.user_id)
+    guest = GuestUserFactory(widget=widget, widget_id=widget.id)
+    db_session.commit()
+    return guest
+
+
+def _session(guest, messages=1, **kwargs):
+    session = ChatSessionFactory(guest=guest, guest_id=guest.id, **kwargs)
+    for i in range(messages):
+        GuestMessageFactory(session=session, guest=guest, message_text=f"message {i}")
+    return session
+
+
+def _answer_all(transcripts, intents=None, api_key=None):
+    return {key: (f"summary {key}", "Orders") for key in transcripts}
+
+
+@pytest.mark.unit
+class TestSelection:
+    def test_selects_unsummarised_and_stale_sessions_only(self, db_session, guest):
+        fresh = _session(guest, summary="ok", summary_generated_at=NOW)
+        stale = _session(guest, summary="old", summary_generated_at=NOW - timedelta(days=30))
+        never = _session(guest)
+        _session(guest, messages=0)
+        db_session.commit()
+
+        page = BatchAnalyzer().select_page(db_session, STALE_BEFORE)
+
+        ids = {session_id for session_id, _ in page}
+        assert ids == {stale.id, never.id}
+        assert fresh.id not in ids
+        assert all(intents == ["Orders", "Returns", "General"] for _, intents in page)
+
+    def test_skips_stale_sessions_without_new_messages(self, db_session, guest):
+        idle = ChatSessionFactory(guest=guest, guest_id=guest.id, summary="old",
+                                  summary_generated_at=NOW - timedelta(days=30))
+        GuestMessageFactory(session=idle, guest=guest, created_at=NOW - timedelta(days=31))
+        db_session.commit()
+
+        assert BatchAnalyzer().select_page(db_session, STALE_BEFORE) == []
+
+    def test_filters_by_business(self, db_session, business, guest):
+        mine = _session(guest)
+        _session(GuestUserFactory())
+        db_session.commit()
+
+        page = BatchAnalyzer().select_page(db_session, STALE_BEFORE, business_id=business.id)
+        assert [session_id for session_id, _ in page] == [mine.id]
+
+    def test_transcript_extends_the_existing_summary(self, db_session, guest):
+        old = NOW - timedelta(days=30)
+        session = ChatSessionFactory(guest=guest, guest_id=guest.id, summary="Asked about delivery.",
+                                     summary_generated_at=old)
+        covered = GuestMessageFactory(session=session, guest=guest, message_text="covered", created_at=old)
+        GuestMessageFactory(session=session, guest=guest, message_text="new question")
+        session.analyzed_message_id, session.analyzed_message_at = covered.id, covered.created_at
+        db_session.commit()
+
+        transcript = BatchAnalyzer().load_transcripts(db_session, [session.id])[session.id].transcript
+
+        assert transcript == "Existing summary: Asked about delivery.\nNew messages:\nUser: new question"
+
+    def test_pack_respects_count_and_size(self):
+        analyzer = BatchAnalyzer(sessions_per_request=2, max_request_chars=10)
+        items = [type("Item", (), {"transcript": t})() for t in ["aaaa", "bbbb", "cccc", "dddddddddd"]]
+
+        batches = analyzer.pack(items)
+
+        assert [len(batch) for batch in batches] == [2, 1, 1]
+
+
+@pytest.mark.unit
+class TestRun:
+    async def test_packs_sessions_and_persists_results(self, db_session, guest):
+        sessions = [_session(guest, messages=2) for _ in range(5)]
+        db_session.commit()
+        mock = AsyncMock(side_effect=_answer_all)
+
+        with patch("app.services.batch_analysis.analyze_sessions_batch", mock):
+            stats = await BatchAnalyzer(sessions_per_request=2).run(db_session, "key", STALE_BEFORE)
+
+        assert stats.analyzed == 5
+        assert stats.requests == 3
+        assert mock.call_args.kwargs["intents"] == ["Orders", "Returns", "General"]
+        for session in sessions:
+            db_session.refresh(session)
+            assert session.summary.startswith("summary")
+            assert session.top_intent == "Orders"
+            assert session.analyzed_message_id is not None
+
+    async def test_unanswered_sessions_are_counted_as_failed(self, db_session, guest):
+        sessions = [_session(guest) for _ in range(2)]
+        db_session.commit()
+        mock = AsyncMock(return_value={"0": ("only the first", "General")})
+
+        with patch("app.services.batch_analysis.analyze_sessions_batch", mock):
+            stats = await BatchAnalyzer().run(db_session, "key", STALE_BEFORE)
+
+        assert stats.analyzed == 1
+        assert stats.failed == 1
+        assert len(stats.failed_ids) == 1
+        assert db_session.get(ChatSession, stats.failed_ids[0]).summary is None
+        assert {s.id for s in sessions} >= set(stats.failed_ids)
+
+    async def test_resumes_from_checkpoint_and_removes_it(self, db_session, guest, tmp_path):
+        sessions = sorted((_session(guest) for _ in range(3)), key=lambda s: s.id)
+        db_session.commit()
+        checkpoint = str(tmp_path / "checkpoint.json")
+        save_checkpoint(checkpoint, sessions[0].id)
+        mock = AsyncMock(side_effect=_answer_all)
+
+        with patch("app.services.batch_analysis.analyze_sessions_batch", mock):
+            stats = await BatchAnalyzer().run(db_session, "key", STALE_BEFORE, checkpoint_path=checkpoint)
+
+        assert stats.analyzed == 2
+        assert db_session.get(ChatSession, sessions[0].id).summary is None
+        assert load_checkpoint(checkpoint) is None
+
+    async def test_checkpoint_is_saved_per_page(self, db_session, guest, tmp_path):
+        sessions = sorted((_session(guest) for _ in range(3)), key=lambda s: s.id)
+        db_session.commit()
+        checkpoint = str(tmp_path / "checkpoint.json")
+        mock = AsyncMock(side_effect=_answer_all)
+
+        with patch("app.services.batch_analysis.analyze_sessions_batch", mock):
+            stats = await BatchAnalyzer(page_size=2).run(
+                db_session, "key", STALE_BEFORE, checkpoint_path=checkpoint, max_sessions=2
+            )
+
+        assert stats.analyzed == 2
+        assert load_checkpoint(checkpoint) == sessions[1].id
@@ -0,0 +1,95 @@
+"""Unit tests for multi-worker configuration checks and the shared vector store client."""
+import sys
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.core.deployment import check_worker_count, default_workers, process_local_state
+from app.services.vector_store.chroma import VERSIONS_COLLECTION, ChromaVectorStore
+
+
+def _settings(storage="memory://", workers=1):
+    return SimpleNamespace(RATE_LIMIT_STORAGE_URI=storage, WEB_CONCURRENCY=workers)
+
+
+@pytest.mark.unit
+class TestProcessLocalState:
+    def test_defaults_are_process_local(self):
+        problems = process_local_state(_settings(), ChromaVectorStore(path="chroma_db"))
+        assert len(problems) == 2
+        assert "RATE_LIMIT_STORAGE_URI" in problems[0]
+        assert "CHROMA_SERVER_HOST" in problems[1]
+
+    def test_shared_backends_pass(self):
+        store = ChromaVectorStore(host="chroma", port=8000)
+        assert process_local_state(_settings("redis://redis:6379"), store) == []
+
+
+@pytest.mark.unit
+class TestWorkerCount:
+    def test_defaults_to_one_worker_on_process_local_state(self):
+        assert default_workers(_settings(), ChromaVectorStore(path="chroma_db")) == 1
+
+    def test_defaults_to_a_worker_per_core_on_shared_state(self, monkeypatch):
+        monkeypatch.setattr("os.sched_getaffinity", lambda pid: {0, 1, 2, 3}, raising=False)
+        store = ChromaVectorStore(host="chroma", port=8000)
+        assert default_workers(_settings("redis://redis:6379"), store) == 4
+
+    def test_refuses_several_workers_on_process_local_state(self):
+        with pytest.raises(RuntimeError, match="WEB_CONCURRENCY=4 but rate limits"):
+            check_worker_count(_settings(workers=4), ChromaVectorStore(path="chroma_db"))
+
+    def test_allows_one_worker_or_shared_state(self):
+        check_worker_count(_settings(workers=1), ChromaVectorStore(path="chroma_db"))
+        check_worker_count(_settings("redis://redis:6379", workers=4), ChromaVectorStore(host="chroma", port=8000))
+
+
+@pytest.mark.unit
+class TestChromaClient:
+    def test_server_host_uses_http_client(self):
+        chromadb = sys.modules["chromadb"]
+        chromadb.HttpClient.reset_mock()
+        store = ChromaVectorStore(host="chroma", port=9000, ssl=True)
+
+        store.connect()
+        store.connect()
+
+        chromadb.HttpClient.assert_called_once_with(host="chroma", port=9000, ssl=True)
+        assert store.client is chromadb.HttpClient.return_value
+        assert not store.is_local
+
+    def test_writes_bump_the_collection_version(self, monkeypatch):
+        chromadb = sys.modules["chromadb"]
+        collections = {}
+
+        def get_or_create_collection(name, **kwargs):
+            if name not in collections:
+                collections[name] = MagicMock()
+                collections[name].name = name
+            return collections[name]
+
+        client = chromadb.HttpClient.return_value
+        monkeypatch.setattr(client.get_or_create_collection, "side_effect", get_or_create_collection)
+        store = ChromaVectorStore(host="chroma", port=9000)
+
+        store.get_collection("documents-u1").delete(ids=["a"])
+
+        versions = collections[VERSIONS_COLLECTION]
+        assert versions.upsert.call_args.kwargs["ids"] == ["documents-u1"]
+        token = versions.upsert.call_args.kwargs["metadatas"][0]["version"]
+        versions.get.return_value = {"ids": ["documents-u1"], "metadatas": [{"version": token}]}
+        assert store.get_collection("documents-u1").version() == token
+        monkeypatch.setattr(client.list_collections, "return_value", ["documents-u1", VERSIONS_COLLECTION])
+        assert store.list_collections() == ["documents-u1"]
+
+    def test_nothing_opened_until_first_use(self):
+        chromadb = sys.modules["chromadb"]
+        chromadb.PersistentClient.reset_mock()
+        store = ChromaVectorStore(path="somewhere")
+        chromadb.PersistentClient.assert_not_called()
+
+        store.get_collection("products-1")
+        chromadb.PersistentClient.assert_called_once_with(path="somewhere")
+        store.close()
+        assert store._client is None
@@ -0,0 +1,88 @@
+"""Unit tests for app.services.document_extraction (page streaming, pool and budgets)."""
+import io
+
+import pytest
+
+from app.services.document_extraction import DocumentExtractionError, DocumentExtractor, Page
+from app.services.file_storage import LocalFileStorage
+from benchmarks.pdf_corpus import make_pdf
+
+
+@pytest.fixture
+def manual(tmp_path):
+    path = tmp_path / "manual.pdf"
+    make_pdf(str(path), pages=20, lines_per_page=5)
+    return str(path)
+
+
+def _budget(**overrides):
+    budget = dict(max_bytes=10_000_000, max_pages=100, timeout=60)
+    budget.update(overrides)
+    return budget
+
+
+@pytest.mark.unit
+class TestDocumentExtractor:
+    def test_inline_pages_in_order(self, manual):
+        pages = list(DocumentExtractor(workers=1, batch_pages=3, **_budget()).pages(manual, "manual.pdf"))
+        assert [page.number for page in pages] == list(range(1, 21))
+        assert all(page.text.startswith(f"Page {page.number}.") for page in pages)
+
+    def test_pool_matches_inline(self, manual):
+        extractor = DocumentExtractor(workers=2, batch_pages=3, **_budget())
+        try:
+            pooled = list(extractor.pages(manual, "manual.pdf"))
+        finally:
+            extractor.shutdown()
+        inline = list(DocumentExtractor(workers=1, **_budget()).pages(manual, "manual.pdf"))
+        assert pooled == inline
+
+    def test_pool_reads_replaced_file(self, tmp_path):
+        """A new version saved under the same name must not be read through the
+        reader the workers cached for the old one."""
+        storage = LocalFileStorage(str(tmp_path))
+        versions = tmp_path / "versions"
+        versions.mkdir()
+        make_pdf(str(versions / "v1.pdf"), pages=12, lines_per_page=3, seed=1)
+        make_pdf(str(versions / "v2.pdf"), pages=30, lines_per_page=3, seed=2)
+        extractor = DocumentExtractor(workers=2, batch_pages=3, **_budget())
+        inline = DocumentExtractor(workers=1, **_budget())
+        try:
+            for version in ("v1.pdf", "v2.pdf"):
+                stored = storage.save(io.BytesIO((versions / version).read_bytes()), "manual.pdf", "user-1")
+                pooled = list(extractor.pages(stored.path, "manual.pdf"))
+                assert pooled == list(inline.pages(str(versions / version), version))
+        finally:
+            extractor.shutdown()
+
+    def test_default_pool_is_a_share_of_the_cores(self, monkeypatch):
+        monkeypatch.setattr("app.services.document_extraction.available_cpus", lambda: 8)
+        assert DocumentExtractor(web_workers=4).workers == 2
+        assert DocumentExtractor(web_workers=16).workers == 1
+        assert DocumentExtractor().workers == 8
+        assert DocumentExtractor(workers=3, web_workers=4).workers == 3
+
+    def test_text_file_is_one_page(self, tmp_path):
+        path = tmp_path / "faq.txt"
+        path.write_text("Opening hours: 9 to 5.", encoding="utf-8")
+        pages = list(DocumentExtractor(**_budget()).pages(str(path), "faq.txt"))
+        assert pages == [Page(None, "Opening hours: 9 to 5.")]
+
+    def test_size_budget(self, manual):
+        with pytest.raises(DocumentExtractionError, match="MB"):
+            list(DocumentExtractor(**_budget(max_bytes=100)).pages(manual, "manual.pdf"))
+
+    def test_page_budget(self, manual):
+        with pytest.raises(DocumentExtractionError, match="20 pages"):
+            list(DocumentExtractor(**_budget(max_pages=10)).pages(manual, "manual.pdf"))
+
+    def test_time_budget(self, manual):
+        extractor = DocumentExtractor(workers=1, batch_pages=5, **_budget(timeout=0))
+        with pytest.raises(DocumentExtractionError, match="longer than"):
+            list(extractor.pages(manual, "manual.pdf"))
+
+    def test_unreadable_pdf(self, tmp_path):
+        path = tmp_path / "broken.pdf"
+        path.write_bytes(b"not a pdf")
+        with pytest.raises(DocumentExtractionError, match="could not be read"):
+            list(DocumentExtractor(**_budget()).pages(str(path), "broken.pdf"))
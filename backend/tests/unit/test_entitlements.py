@@ -0,0 +1,155 @@
+"""Unit tests for app.services.entitlements.
+
+Covers limit resolution, caching/invalidation and the ledger-backed usage helpers.
+"""
+
+import pytest
+
+from app.services.entitlements import EntitlementService, DEFAULT_DAILY_SESSIONS, DEFAULT_MESSAGES_PER_SESSION
+from tests.factories import (
+    BusinessFactory,
+    ChatSessionFactory,
+    GuestUserFactory,
+    PlanFactory,
+    UserFactory,
+    WidgetSettingsFactory,
+)
+
+
+@pytest.fixture
+def service():
+    return EntitlementService(ttl_seconds=60)
+
+
+@pytest.fixture
+def business(db_session):
+    user = UserFactory()
+    business = BusinessFactory(
+        user=user,
+        user_id=user.id,
+        subscription_tier="nexus",
+        allocated_ai_responses=2,
+        used_ai_responses=0,
+        allocated_escalations=0,
+        used_escalations=0,
+        allocated_messages_per_session=10,
+        allocated_daily_sessions=1,
+        allocated_whitelisted_domains=3,
+    )
+    PlanFactory(name="Nexus", tier=2)
+    db_session.commit()
+    return business
+
+
+@pytest.mark.unit
+class TestResolution:
+    def test_get_resolves_business_limits(self, service, db_session, business):
+        ent = service.get(db_session, business.user_id)
+
+        assert ent.business_id == business.id
+        assert ent.tier == "nexus"
+        assert ent.tier_level == 2
+        assert ent.ai_responses_remaining == 2
+        assert ent.whitelisted_domains == 3
+
+    def test_get_unknown_user_returns_none(self, service, db_session):
+        assert service.get(db_session, "no-such-user") is None
+
+    def test_escalations_fall_back_to_tier_default(self, service, db_session, business):
+        ent = service.get(db_session, business.user_id)
+        assert ent.escalations_allocated == 100  # nexus max_monthly_escalations
+
+    def test_session_message_limit_takes_lower_of_widget_and_plan(self, service, db_session, business):
+        widget = WidgetSettingsFactory(user=business.user, user_id=business.user_id, max_messages_per_session=5)
+        ent = service.get(db_session, business.user_id)
+
+        assert ent.session_message_limit(widget) == 5
+        widget.max_messages_per_session = 40
+        assert ent.session_message_limit(widget) == 10
+
+    def test_session_message_limit_defaults_without_widget(self, service, db_session, business):
+        business.allocated_messages_per_session = 0
+        db_session.commit()
+        ent = service.get(db_session, business.user_id)
+        assert ent.session_message_limit() == DEFAULT_MESSAGES_PER_SESSION
+
+
+@pytest.mark.unit
+class TestCaching:
+    def test_second_get_is_served_from_cache(self, service, db_session, business):
+        first = service.get(db_session, business.user_id)
+        business.business_name = "Renamed"
+        db_session.commit()
+
+        assert service.get(db_session, business.user_id) is first
+
+    def test_invalidate_by_business_id_forces_reload(self, service, db_session, business):
+        service.get(db_session, business.user_id)
+        business.business_name = "Renamed"
+        db_session.commit()
+
+        service.invalidate(business_id=business.id)
+        assert service.get(db_session, business.user_id).business_name == "Renamed"
+
+    def test_expired_entry_is_reloaded(self, db_session, business):
+        service = EntitlementService(ttl_seconds=0)
+        first = service.get(db_session, business.user_id)
+        assert service.get(db_session, business.user_id) is not first
+
+
+@pytest.mark.unit
+class TestConsumption:
+    def test_reserve_ai_response_until_exhausted(self, service, db_session, business):
+        first = service.reserve_ai_response(db_session, service.get(db_session, business.user_id))
+        second = service.reserve_ai_response(db_session, service.get(db_session, business.user_id))
+        third = service.reserve_ai_response(db_session, service.get(db_session, business.user_id))
+
+        assert first and second
+        assert third is None
+        assert not service.has_ai_credit(service.get(db_session, business.user_id))
+
+    def test_refund_returns_credit(self, service, db_session, business):
+        ent = service.get(db_session, business.user_id)
+        reservation = service.reserve_ai_response(db_session, ent)
+
+        service.refund_usage(db_session, ent, reservation)
+
+        assert service.get(db_session, business.user_id).ai_responses_remaining == 2
+        service.invalidate(business_id=business.id)
+        assert service.get(db_session, business.user_id).ai_responses_remaining == 2
+
+    def test_reserve_respects_db_usage_over_stale_cache(self, service, db_session, business):
+        ent = service.get(db_session, business.user_id)
+        business.used_ai_responses = 2
+        db_session.commit()
+
+        assert service.reserve_ai_response(db_session, ent) is None
+
+    def test_consume_escalation_stops_at_allocation(self, service, db_session, business):
+        business.allocated_escalations = 1
+        db_session.commit()
+        ent = service.get(db_session, business.user_id)
+
+        assert service.consume_escalation(db_session, ent) is True
+        assert service.consume_escalation(db_session, service.get(db_session, business.user_id)) is False
+
+    def test_can_start_session_enforces_daily_limit(self, service, db_session, business):
+        widget = WidgetSettingsFactory(user=business.user, user_id=business.user_id)
+        guest = GuestUserFactory(widget=widget, widget_id=widget.id)
+        db_session.commit()
+        ent = service.get(db_session, business.user_id)
+
+        assert service.can_start_session(db_session, ent, guest.id) is True
+        ChatSessionFactory(guest=guest, guest_id=guest.id)
+        db_session.commit()
+        assert service.can_start_session(db_session, ent, guest.id) is False
+
+    def test_can_start_session_falls_back_without_a_business(self, service, db_session):
+        guest = GuestUserFactory()
+        db_session.commit()
+
+        assert service.can_start_session(db_session, None, guest.id) is True
+        for _ in range(DEFAULT_DAILY_SESSIONS):
+            ChatSessionFactory(guest=guest, guest_id=guest.id)
+        db_session.commit()
+        assert service.can_start_session(db_session, None, guest.id) is False
@@ -0,0 +1,228 @@
+import hashlib
+import io
+import os
+
+import pytest
+
+from app.core.subscription import SubscriptionTier
+from app.services.entitlements import upload_limit
+from app.services.file_storage import (
+    FileTooLargeError,
+    LocalFileStorage,
+    S3FileStorage,
+    create_file_storage,
+    map_file,
+)
+from app.services.file_storage.s3 import MIN_PART_SIZE
+
+
+class FakeS3Client:
+    """In-process stand-in for the S3 API calls the backend makes (as served by MinIO)."""
+
+    class exceptions:
+        class NoSuchKey(Exception):
+            pass
+
+    def __init__(self, page_size=1000):
+        self.objects = {}
+        self.uploads = {}
+        self.calls = []
+        self.page_size = page_size
+
+    def put_object(self, Bucket, Key, Body):
+        self.calls.append("put_object")
+        self.objects[Key] = bytes(Body)
+
+    def create_multipart_upload(self, Bucket, Key):
+        self.calls.append("create_multipart_upload")
+        upload_id = f"upload-{len(self.uploads)}"
+        self.uploads[upload_id] = {}
+        return {"UploadId": upload_id}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self.calls.append("upload_part")
+        self.uploads[UploadId][PartNumber] = bytes(Body)
+        return {"ETag": hashlib.md5(Body).hexdigest()}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        self.calls.append("complete_multipart_upload")
+        parts = self.uploads.pop(UploadId)
+        numbers = [part["PartNumber"] for part in MultipartUpload["Parts"]]
+        assert numbers == sorted(parts)
+        # Every part but the last must meet S3's minimum size.
+        assert all(len(parts[n]) >= MIN_PART_SIZE for n in numbers[:-1])
+        self.objects[Key] = b"".join(parts[n] for n in numbers)
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.calls.append("abort_multipart_upload")
+        self.uploads.pop(UploadId)
+
+    def get_object(self, Bucket, Key):
+        if Key not in self.objects:
+            raise self.exceptions.NoSuchKey(Key)
+        return {"Body": io.BytesIO(self.objects[Key])}
+
+    def list_objects_v2(self, Bucket, Prefix, ContinuationToken=None):
+        keys = sorted(key for key in self.objects if key.startswith(Prefix))
+        start = int(ContinuationToken or 0)
+        page = keys[start:start + self.page_size]
+        truncated = start + self.page_size < len(keys)
+        result = {"Contents": [{"Key": key} for key in page], "IsTruncated": truncated}
+        if truncated:
+            result["NextContinuationToken"] = str(start + self.page_size)
+        return result
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop(Key, None)
+
+
+def _data(size, seed=0):
+    return hashlib.sha256(str(seed).encode()).digest() * (size // 32) + b"x" * (size % 32)
+
+
+# --- Local ---
+
+def test_local_save_streams_with_hash(tmp_path):
+    storage = LocalFileStorage(str(tmp_path))
+    data = _data(3 * 1024 * 1024 + 17)
+
+    stored = storage.save(io.BytesIO(data), "manual.pdf", "u1")
+
+    assert stored.size == len(data)
+    assert stored.sha256 == hashlib.sha256(data).hexdigest()
+    with storage.local_copy(stored.path) as path:
+        assert open(path, "rb").read() == data
+    assert storage.list_files("u1") == ["manual.pdf"]
+
+
+def test_local_save_over_limit_keeps_previous_version(tmp_path):
+    storage = LocalFileStorage(str(tmp_path))
+    first = storage.save(io.BytesIO(b"version one"), "faq.txt", "u1")
+
+    with pytest.raises(FileTooLargeError):
+        storage.save(io.BytesIO(_data(2 * 1024 * 1024)), "faq.txt", "u1", max_bytes=1024 * 1024)
+
+    assert open(first.path, "rb").read() == b"version one"
+    assert os.listdir(tmp_path / "u1") == ["faq.txt"]
+
+
+def test_local_save_drops_directories_from_filename(tmp_path):
+    storage = LocalFileStorage(str(tmp_path / "uploads"))
+
+    stored = storage.save(io.BytesIO(b"data"), "../../etc/passwd", "u1")
+
+    assert stored.path == os.path.join(str(tmp_path / "uploads"), "u1", "passwd")
+    with pytest.raises(ValueError):
+        storage.save(io.BytesIO(b"data"), "..", "u1")
+
+
+def test_local_folder_keeps_versions_apart_and_delete_prunes_it(tmp_path):
+    storage = LocalFileStorage(str(tmp_path))
+    first = storage.save(io.BytesIO(b"version one"), "faq.txt", "u1")
+    second = storage.save(io.BytesIO(b"version two"), "faq.txt", "u1", folder="doc-1/v2-abc")
+
+    assert second.path == os.path.join(str(tmp_path), "u1", "doc-1", "v2-abc", "faq.txt")
+    assert open(first.path, "rb").read() == b"version one"
+    assert storage.delete(second.path)
+    assert sorted(os.listdir(tmp_path / "u1")) == ["faq.txt"]
+    with pytest.raises(ValueError):
+        storage.save(io.BytesIO(b"x"), "faq.txt", "u1", folder="../u2")
+
+
+def test_local_copy_missing_file(tmp_path):
+    storage = LocalFileStorage(str(tmp_path))
+    with pytest.raises(FileNotFoundError):
+        with storage.local_copy(str(tmp_path / "u1" / "gone.txt")):
+            pass
+
+
+# --- S3 ---
+
+def test_s3_small_file_is_one_put(tmp_path):
+    client = FakeS3Client()
+    storage = S3FileStorage("bucket", prefix="uploads/", client=client)
+
+    stored = storage.save(io.BytesIO(b"hello"), "a.txt", "u1")
+
+    assert stored.path == "uploads/u1/a.txt"
+    assert stored.sha256 == hashlib.sha256(b"hello").hexdigest()
+    assert client.calls == ["put_object"]
+    with storage.local_copy(stored.path) as path:
+        assert open(path, "rb").read() == b"hello"
+    assert not os.path.exists(path)
+
+
+def test_s3_folder_is_part_of_the_key():
+    storage = S3FileStorage("bucket", prefix="uploads/", client=FakeS3Client())
+
+    assert storage.save(io.BytesIO(b"x"), "a.txt", "u1", folder="doc-1/v2-abc").path == "uploads/u1/doc-1/v2-abc/a.txt"
+
+
+def test_s3_large_file_is_multipart():
+    client = FakeS3Client()
+    storage = S3FileStorage("bucket", client=client, part_size=MIN_PART_SIZE)
+    data = _data(2 * MIN_PART_SIZE + 123)
+
+    stored = storage.save(io.BytesIO(data), "big.pdf", "u1")
+
+    assert client.calls.count("upload_part") == 3
+    assert client.calls[-1] == "complete_multipart_upload"
+    assert client.objects["u1/big.pdf"] == data
+    assert (stored.size, stored.sha256) == (len(data), hashlib.sha256(data).hexdigest())
+
+
+def test_s3_over_limit_aborts_upload():
+    client = FakeS3Client()
+    storage = S3FileStorage("bucket", client=client, part_size=MIN_PART_SIZE)
+
+    with pytest.raises(FileTooLargeError):
+        storage.save(io.BytesIO(_data(3 * MIN_PART_SIZE)), "big.pdf", "u1", max_bytes=2 * MIN_PART_SIZE)
+
+    assert "abort_multipart_upload" in client.calls
+    assert client.objects == {} and client.uploads == {}
+
+
+def test_s3_list_and_delete():
+    client = FakeS3Client(page_size=2)
+    storage = S3FileStorage("bucket", prefix="uploads/", client=client)
+    for name in ("a.txt", "b.txt", "c.txt"):
+        storage.save(io.BytesIO(b"x"), name, "u1")
+    storage.save(io.BytesIO(b"x"), "other.txt", "u2")
+
+    assert storage.list_files("u1") == ["a.txt", "b.txt", "c.txt"]
+    assert storage.delete("uploads/u1/b.txt")
+    assert storage.list_files("u1") == ["a.txt", "c.txt"]
+    with pytest.raises(FileNotFoundError):
+        with storage.local_copy("uploads/u1/b.txt"):
+            pass
+
+
+def test_s3_needs_bucket_and_valid_part_size():
+    with pytest.raises(ValueError):
+        S3FileStorage("", client=FakeS3Client())
+    with pytest.raises(ValueError):
+        S3FileStorage("bucket", part_size=1024, client=FakeS3Client())
+
+
+# --- Shared ---
+
+def test_map_file(tmp_path):
+    path = tmp_path / "data.bin"
+    path.write_bytes(b"mapped bytes")
+    with map_file(str(path)) as mapping:
+        assert mapping[:6] == b"mapped"
+    empty = tmp_path / "empty.bin"
+    empty.write_bytes(b"")
+    with map_file(str(empty)) as mapping:
+        assert mapping[:] == b""
+
+
+def test_upload_limit_by_tier():
+    assert upload_limit(SubscriptionTier.SPARK.value) == 10_000_000
+    assert upload_limit(SubscriptionTier.FLUX.value) == 50_000_000
+    assert upload_limit(None) == upload_limit(SubscriptionTier.SPARK.value)
+
+
+def test_create_file_storage_unknown_backend():
+    with pytest.raises(ValueError):
+        create_file_storage("ftp")
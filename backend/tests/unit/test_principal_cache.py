@@ -0,0 +1,82 @@
+"""Unit tests for app.auth.principal and the get_current_tenant dependency."""
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.auth.principal import CurrentTenant, PrincipalCache
+from app.auth.router import get_current_tenant
+from app.core.security import create_access_token, verify_token
+from tests.factories import BusinessFactory, UserFactory, WidgetSettingsFactory
+
+
+def _credentials(user_id: str) -> HTTPAuthorizationCredentials:
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=create_access_token(subject=user_id))
+
+
+def _tenant(user_id="u1", business_id="b1") -> CurrentTenant:
+    return CurrentTenant(user_id=user_id, email="a@example.com", is_admin=False, business_id=business_id, widget_id=None)
+
+
+@pytest.mark.unit
+class TestPrincipalCache:
+    def test_verify_reuses_payload_until_expiry(self):
+        cache = PrincipalCache()
+        token = create_access_token(subject="u1")
+        with patch("app.auth.principal.verify_token", wraps=verify_token) as verify:
+            assert cache.verify(token)["sub"] == "u1"
+            assert cache.verify(token)["sub"] == "u1"
+        assert verify.call_count == 1
+
+    def test_invalid_token_is_not_cached(self):
+        cache = PrincipalCache()
+        assert cache.verify("not-a-jwt") is None
+        assert cache.verify("not-a-jwt") is None
+
+    def test_entries_expire(self):
+        cache = PrincipalCache(ttl_seconds=0)
+        cache.store(_tenant())
+        assert cache.get("u1") is None
+
+    def test_invalidate_by_business(self):
+        cache = PrincipalCache(ttl_seconds=60)
+        cache.store(_tenant())
+        cache.invalidate(business_id="b1")
+        assert cache.get("u1") is None
+
+
+@pytest.mark.unit
+class TestGetCurrentTenant:
+    async def test_resolves_ids_then_serves_from_cache(self, db_session):
+        user = UserFactory()
+        business = BusinessFactory(user=user, user_id=user.id)
+        widget = WidgetSettingsFactory(user=user, user_id=user.id)
+        db_session.commit()
+
+        tenant = await get_current_tenant(_credentials(user.id), db_session)
+        assert (tenant.user_id, tenant.business_id, tenant.widget_id) == (user.id, business.id, widget.id)
+
+        unused_db = MagicMock()
+        assert await get_current_tenant(_credentials(user.id), unused_db) == tenant
+        unused_db.query.assert_not_called()
+
+    async def test_user_without_business(self, db_session):
+        user = UserFactory()
+        db_session.commit()
+
+        tenant = await get_current_tenant(_credentials(user.id), db_session)
+        assert tenant.business_id is None
+        assert tenant.widget_id is None
+
+    async def test_unknown_user(self, db_session):
+        with pytest.raises(HTTPException) as exc:
+            await get_current_tenant(_credentials("missing"), db_session)
+        assert exc.value.status_code == 404
+
+    def test_creating_business_refreshes_tenant(self, authenticated_client):
+        client, _ = authenticated_client
+        assert client.get("/products/").status_code == 404
+
+        assert client.post("/business", json={"business_name": "New Business"}).status_code == 200
+        assert client.get("/products/").status_code == 200
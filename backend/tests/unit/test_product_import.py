@@ -0,0 +1,143 @@
+"""Unit tests for app.services.product_import (SQLite upsert path)."""
+import io
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.models.product import Product
+from app.models.product_import_job import ProductImportJob
+from app.services.product_import import ProductImporter, ProductImportError
+from tests.factories import BusinessFactory, ProductFactory
+
+
+def _csv(text: str) -> io.BytesIO:
+    return io.BytesIO(text.encode("utf-8"))
+
+
+@pytest.fixture
+def importer():
+    return ProductImporter(chunk_size=2)
+
+
+@pytest.fixture
+def business(db_session):
+    business = BusinessFactory()
+    db_session.commit()
+    return business
+
+
+def _products(db_session, business):
+    return {p.sku: p for p in db_session.query(Product).filter(Product.business_id == business.id)}
+
+
+@pytest.mark.unit
+class TestImportCsv:
+    def test_inserts_and_updates_across_chunks(self, importer, db_session, business):
+        ProductFactory(business=business, sku="A-1", name="Old name", price=5, category="Old")
+        db_session.commit()
+
+        report = importer.import_csv(db_session, business.id, _csv(
+            "sku,name,price,stock_quantity\n"
+            "A-1,New name,\"1,200.50\",3\n"
+            "B-2,Bee,10,1\n"
+            "C-3,Sea,20,0\n"
+        ))
+
+        assert (report.imported, report.updated, report.error_count) == (2, 1, 0)
+        products = _products(db_session, business)
+        db_session.refresh(products["A-1"])
+        assert products["A-1"].name == "New name"
+        assert products["A-1"].price == Decimal("1200.50")
+        assert products["A-1"].category == "Old"  # no category column in the file
+        assert products["C-3"].name == "Sea"
+
+    def test_bad_rows_are_reported_with_line_numbers(self, importer, db_session, business):
+        report = importer.import_csv(db_session, business.id, _csv(
+            "sku,name,price,stock_quantity\n"
+            ",No sku,1,1\n"
+            "D-4,Bad price,abc,1\n"
+            "E-5,Good,2,x\n"
+            "F-6,Fine,2,2\n"
+        ))
+
+        assert report.imported == 1
+        assert report.error_count == 3
+        assert [e["row"] for e in report.errors] == [2, 3, 4]
+        assert "Invalid price" in report.errors[1]["error"]
+
+    def test_duplicate_sku_in_file_keeps_last_row(self, importer, db_session, business):
+        report = importer.import_csv(db_session, business.id, _csv(
+            "sku,name,price\nG-7,First,1\nG-7,Second,2\n"
+        ))
+
+        assert report.imported == 1
+        assert _products(db_session, business)["G-7"].name == "Second"
+
+    def test_other_business_with_same_sku_is_untouched(self, importer, db_session, business):
+        other = ProductFactory(sku="H-8", name="Theirs")
+        db_session.commit()
+
+        importer.import_csv(db_session, business.id, _csv("sku,name,price\nH-8,Mine,1\n"))
+
+        db_session.refresh(other)
+        assert other.name == "Theirs"
+        assert _products(db_session, business)["H-8"].name == "Mine"
+
+    def test_failed_chunk_is_rolled_back_and_reported(self, importer, db_session, business):
+        write_chunk = ProductImporter._write_chunk
+
+        def fail_second_chunk(self, db, insert, business_id, chunk, *args):
+            if "C-3" in chunk:
+                raise OperationalError("INSERT", {}, Exception("database is locked"))
+            return write_chunk(self, db, insert, business_id, chunk, *args)
+
+        with patch.object(ProductImporter, "_write_chunk", fail_second_chunk):
+            report = importer.import_csv(db_session, business.id, _csv(
+                "sku,name,price\nA-1,Ay,1\nB-2,Bee,2\nC-3,Sea,3\nD-4,Dee,4\nE-5,Ee,5\n"
+            ))
+
+        assert (report.imported, report.error_count) == (3, 2)
+        assert [(e["row"], e["sku"]) for e in report.errors] == [(4, "C-3"), (5, "D-4")]
+        assert set(_products(db_session, business)) == {"A-1", "B-2", "E-5"}
+
+    def test_missing_sku_column_is_rejected(self, importer, db_session, business):
+        with pytest.raises(ProductImportError):
+            importer.import_csv(db_session, business.id, _csv("name,price\nX,1\n"))
+
+    def test_invalid_encoding_is_rejected(self, importer, db_session, business):
+        with pytest.raises(ProductImportError):
+            importer.import_csv(db_session, business.id, io.BytesIO(b"sku,name\nA,\xff\xfe\n"))
+
+
+@pytest.mark.unit
+class TestRunJob:
+    def test_job_records_report_and_removes_spool(self, importer, db_session, business, tmp_path):
+        path = tmp_path / "upload.csv"
+        path.write_text("sku,name,price\nJ-1,Jay,1\n,Missing,1\n")
+        business_id = business.id
+        job_id = importer.create_job(db_session, business.id, "upload.csv").id
+
+        with patch("app.services.product_import.SessionLocal", return_value=db_session), \
+                patch("app.services.product_index.product_index.sync") as mock_sync:
+            importer.run_job(job_id, str(path))
+
+        job = db_session.get(ProductImportJob, job_id)
+        assert job.status == "done"
+        assert (job.imported, job.error_count) == (1, 1)
+        assert not path.exists()
+        mock_sync.assert_called_once_with(business_id)
+
+    def test_failed_job_records_error(self, importer, db_session, business, tmp_path):
+        path = tmp_path / "upload.csv"
+        path.write_text("name\nNo sku column\n")
+        job_id = importer.create_job(db_session, business.id, "upload.csv").id
+
+        with patch("app.services.product_import.SessionLocal", return_value=db_session), \
+                patch("app.services.product_index.product_index.sync"):
+            importer.run_job(job_id, str(path))
+
+        job = db_session.get(ProductImportJob, job_id)
+        assert job.status == "failed"
+        assert "sku" in job.last_error
@@ -0,0 +1,93 @@
+"""Unit tests for app.services.product_index with a mocked vector store and embedder."""
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.services.product_index import ProductIndex, _content_hash, product_text
+from tests.factories import BusinessFactory, ProductFactory
+
+
+@pytest.fixture
+def collection():
+    collection = MagicMock()
+    collection.get.return_value = {"ids": [], "metadatas": []}
+    return collection
+
+
+@pytest.fixture
+def index(collection):
+    store = MagicMock()
+    store.get_collection.return_value = collection
+    return ProductIndex(vector_db=store, batch_size=2)
+
+
+@pytest.fixture
+def embedder():
+    with patch("app.services.product_index.genai") as mock_genai:
+        mock_genai.embed_content.side_effect = lambda model, content, task_type: {
+            "embedding": [[0.1, 0.2] for _ in content]
+        }
+        yield mock_genai
+
+
+@pytest.fixture
+def products(db_session):
+    business = BusinessFactory()
+    items = [ProductFactory(business=business, name=f"Item {i}") for i in range(3)]
+    db_session.commit()
+    return business, items
+
+
+@pytest.mark.unit
+class TestUpsert:
+    def test_embeds_in_batches_with_business_collection(self, index, collection, embedder, products):
+        business, items = products
+
+        assert index.upsert(business.id, items, "key") == 3
+
+        index.vector_db.get_collection.assert_called_with(f"products-{business.id}")
+        assert collection.upsert.call_count == 2
+        metadata = collection.upsert.call_args_list[0].kwargs["metadatas"][0]
+        assert metadata["business_id"] == business.id
+
+    def test_unchanged_products_are_not_reembedded(self, index, collection, embedder, products):
+        business, items = products
+        collection.get.return_value = {
+            "ids": [items[0].id],
+            "metadatas": [{"content_hash": _content_hash(product_text(items[0]))}],
+        }
+
+        assert index.upsert(business.id, items, "key") == 2
+        embedded_ids = [i for call in collection.upsert.call_args_list for i in call.kwargs["ids"]]
+        assert items[0].id not in embedded_ids
+
+
+@pytest.mark.unit
+class TestSync:
+    def test_removes_inactive_and_deleted_products(self, index, collection, embedder, products, db_session):
+        business, items = products
+        items[1].is_active = False
+        db_session.commit()
+
+        with patch("app.services.product_index.SessionLocal", return_value=db_session):
+            index.sync(business.id, [items[0].id, items[1].id, "deleted-id"], api_key="key")
+
+        assert collection.upsert.call_args.kwargs["ids"] == [items[0].id]
+        assert set(collection.delete.call_args.kwargs["ids"]) == {items[1].id, "deleted-id"}
+
+    def test_errors_are_swallowed(self, index, collection, embedder, products, db_session):
+        business, _ = products
+        collection.get.side_effect = RuntimeError("chroma down")
+
+        with patch("app.services.product_index.SessionLocal", return_value=db_session):
+            index.sync(business.id, api_key="key")
+
+
+@pytest.mark.unit
+def test_query_returns_similarity_by_product_id(index, collection, embedder):
+    collection.query.return_value = {"ids": [["p1", "p2"]], "distances": [[0.1, 0.6]]}
+
+    hits = index.query("biz", "phone charger", "key")
+
+    assert hits == pytest.approx({"p1": 0.9, "p2": 0.4})
+    assert embedder.embed_content.call_args.kwargs["task_type"] == "retrieval_query"
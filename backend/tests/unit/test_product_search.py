@@ -0,0 +1,154 @@
+"""Unit tests for app.services.product_search (SQLite fallback path)."""
+import pytest
+
+from app.models.product import Product
+from app.services.product_search import ProductSearch
+from tests.factories import BusinessFactory, ProductFactory
+
+
+@pytest.fixture
+def search():
+    return ProductSearch(max_limit=5)
+
+
+@pytest.fixture
+def business(db_session):
+    business = BusinessFactory()
+    ProductFactory(business=business, name="Solar Panel 300W", sku="SOL-300", category="Solar",
+                   description="Monocrystalline panel", price=250, stock_quantity=4)
+    ProductFactory(business=business, name="Lithium Battery", sku="BAT-100", category="Power",
+                   description="Pairs well with any solar panel", price=40, stock_quantity=0)
+    ProductFactory(business=business, name="Gel Battery", sku="BAT-200", category="Power",
+                   description="Sealed battery", price=90, stock_quantity=7)
+    ProductFactory(business=business, name="Hidden Panel", sku="OLD-1", category="Solar", is_active=False)
+    db_session.commit()
+    return business
+
+
+def _names(result):
+    return [p.name for p in result.products]
+
+
+@pytest.mark.unit
+class TestProductSearch:
+    def test_ranks_name_matches_above_description_matches(self, search, db_session, business):
+        result = search.search(db_session, business.id, query="solar panel")
+        assert _names(result) == ["Solar Panel 300W", "Lithium Battery"]
+
+    def test_matches_partial_sku(self, search, db_session, business):
+        assert _names(search.search(db_session, business.id, query="BAT-2")) == ["Gel Battery"]
+
+    def test_filters_run_with_query(self, search, db_session, business):
+        result = search.search(db_session, business.id, query="battery", max_price=50)
+        assert _names(result) == ["Lithium Battery"]
+
+        result = search.search(db_session, business.id, query="battery", in_stock_only=True)
+        assert _names(result) == ["Gel Battery"]
+
+    def test_category_filter_is_case_insensitive(self, search, db_session, business):
+        result = search.search(db_session, business.id, category="power")
+        assert _names(result) == ["Gel Battery", "Lithium Battery"]
+
+    def test_empty_query_lists_active_catalogue(self, search, db_session, business):
+        result = search.search(db_session, business.id)
+        assert "Hidden Panel" not in _names(result)
+        assert len(result.products) == 3
+
+    def test_pagination_and_has_more(self, search, db_session, business):
+        first = search.search(db_session, business.id, limit=2)
+        second = search.search(db_session, business.id, limit=2, offset=2)
+
+        assert first.has_more is True
+        assert second.has_more is False
+        assert set(_names(first)).isdisjoint(_names(second))
+
+    def test_limit_is_capped(self, db_session, business):
+        result = ProductSearch(max_limit=1).search(db_session, business.id, limit=100)
+        assert len(result.products) == 1
+
+    def test_other_businesses_are_not_searched(self, search, db_session, business):
+        other = BusinessFactory()
+        ProductFactory(business=other, name="Solar Lamp", sku="LAMP-1")
+        db_session.commit()
+
+        assert "Solar Lamp" not in _names(search.search(db_session, business.id, query="solar"))
+
+
+class FakeIndex:
+    def __init__(self, hits=None, error=None):
+        self.hits = hits or {}
+        self.error = error
+
+    def query(self, business_id, text, api_key, n_results=20):
+        if self.error:
+            raise self.error
+        return self.hits
+
+
+@pytest.mark.unit
+class TestHybridSearch:
+    def test_semantic_hits_are_found_without_keyword_overlap(self, db_session, business):
+        bank = ProductFactory(business=business, name="Power Bank 20000mAh", category="Power",
+                              description="Portable charger", stock_quantity=3)
+        db_session.commit()
+        search = ProductSearch(index=FakeIndex({bank.id: 0.83}))
+
+        result = search.search(db_session, business.id, query="keep my phone charged during power cuts", api_key="key")
+
+        assert _names(result)[0] == "Power Bank 20000mAh"
+
+    def test_low_similarity_hits_are_dropped(self, db_session, business):
+        bank = ProductFactory(business=business, name="Power Bank", stock_quantity=3)
+        db_session.commit()
+        search = ProductSearch(index=FakeIndex({bank.id: 0.2}), min_similarity=0.5)
+
+        result = search.search(db_session, business.id, query="phone charged", api_key="key")
+
+        assert _names(result) == []
+
+    def test_products_found_both_ways_rank_first(self, db_session, business):
+        products = {p.name: p for p in db_session.query(Product).filter(Product.business_id == business.id)}
+        search = ProductSearch(index=FakeIndex({
+            products["Gel Battery"].id: 0.9,
+            products["Solar Panel 300W"].id: 0.6,
+        }))
+
+        result = search.search(db_session, business.id, query="battery", api_key="key")
+
+        assert _names(result) == ["Gel Battery", "Lithium Battery", "Solar Panel 300W"]
+
+    def test_pages_past_the_fused_window_continue_with_keywords(self, db_session, business):
+        for i in range(6):
+            ProductFactory(business=business, name=f"Battery Pack {i}", stock_quantity=1)
+        db_session.commit()
+        products = {p.name: p for p in db_session.query(Product).filter(Product.business_id == business.id)}
+        search = ProductSearch(index=FakeIndex({products["Solar Panel 300W"].id: 0.9}), candidates=3)
+        keyword_only = _names(ProductSearch(candidates=3).search(db_session, business.id, query="battery", limit=50))
+
+        pages = [search.search(db_session, business.id, query="battery", limit=3, offset=offset, api_key="key")
+                 for offset in (0, 3, 6)]
+
+        names = [name for page in pages for name in _names(page)]
+        assert [page.has_more for page in pages] == [True, True, False]
+        assert sorted(names) == sorted(keyword_only + ["Solar Panel 300W"])
+        assert names[4:] == keyword_only[3:]
+
+    def test_filters_apply_to_semantic_hits(self, db_session, business):
+        products = {p.name: p for p in db_session.query(Product).filter(Product.business_id == business.id)}
+        search = ProductSearch(index=FakeIndex({products["Solar Panel 300W"].id: 0.9}))
+
+        result = search.search(db_session, business.id, query="sunlight", category="Power", api_key="key")
+
+        assert _names(result) == []
+
+    def test_index_failure_falls_back_to_keywords(self, db_session, business):
+        search = ProductSearch(index=FakeIndex(error=RuntimeError("chroma down")))
+
+        result = search.search(db_session, business.id, query="battery", api_key="key")
+
+        assert _names(result) == ["Gel Battery", "Lithium Battery"]
+
+    def test_no_api_key_skips_index(self, db_session, business):
+        search = ProductSearch(index=FakeIndex(error=AssertionError("should not be called")))
+
+        assert _names(search.search(db_session, business.id, query="battery")) == ["Gel Battery", "Lithium Battery"]
@@ -0,0 +1,197 @@
+"""Unit tests for app.services.agent_system.response_sanitizer and sanitize_model_response."""
+import random
+import re
+from unittest.mock import MagicMock
+
+import pytest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from app.services.agent_system.callbacks import (
+    INTERNAL_DETAIL_PATTERNS,
+    _LEAK_PATTERNS,
+    response_sanitizer,
+    sanitize_model_response,
+)
+from app.services.agent_system.response_sanitizer import ResponseSanitizer
+
+LONG_CLEAN = "We are open Monday to Saturday and deliver within two working days. " * 40
+
+
+def _response(text):
+    return LlmResponse(content=types.Content(role="model", parts=[types.Part(text=text)]))
+
+
+def _cascade(text):
+    """The original implementation: a search per leak pattern, then ``re.sub`` per rule in order."""
+    if any(re.search(pattern, text, re.IGNORECASE) for pattern in _LEAK_PATTERNS):
+        return None
+    for pattern, replacement in INTERNAL_DETAIL_PATTERNS:
+        text = re.sub(pattern, replacement, text, flags=re.IGNORECASE)
+    return re.sub(r"[ \t]+", " ", text).strip()
+
+
+# Inputs where two rules overlap, or where one rule's replacement lets a later rule match.
+OVERLAPPING_RULES = [
+    "I can transfer you to the escalation agent for help.",
+    "Let me transfer you to the escalation_agent now.",
+    "I can rag_agent transfer you to billing.",
+    "According to my knowledge base includes the return policy.",
+    "My rag_agent knowledge base has it.",
+    "I'm using the 'get_context' tool now.",
+    "I'll use the get_context tool now.",
+    "Our specialized get_context agents agree.",
+    "My system prompt says hello.",
+    "My instructions are simple.",
+    "I was system prompt told to help.",
+    "My initial prompt configuration is fixed.",
+    "My instructions say was told to wait.",
+    "My system PROMPT INJECTION DEFENCE section says...",
+]
+
+_FUZZ_WORDS = [
+    "I", "can", "transfer", "you", "to", "the", "escalation", "agent", "escalation_agent", "rag_agent",
+    "my", "knowledge", "base", "according", "using", "use", "get_context", "'get_context'", "tool",
+    "specialized", "agents", "sub-agents", "system", "prompt", "instructions", "initial", "configuration",
+    "is", "are", "say", "says", "was", "told", "Gemini", "Powered", "by", "hello", ",", ".", "\n", "  ",
+]
+
+
+def _stream(text, chunk_size, sanitizer=response_sanitizer):
+    stream = sanitizer.stream()
+    out = [stream.feed(text[i:i + chunk_size]) for i in range(0, len(text), chunk_size)]
+    out.append(stream.close())
+    return stream, "".join(out)
+
+
+@pytest.mark.unit
+class TestSanitize:
+    def test_scrubs_internal_details(self):
+        result = response_sanitizer.sanitize("According to my knowledge base, the rag_agent says we open at 9.")
+
+        assert not result.blocked
+        assert result.text == "based on the information available, the says we open at 9."
+
+    def test_rules_apply_in_order_to_each_others_output(self):
+        result = response_sanitizer.sanitize("I can transfer you to the escalation agent for help.")
+        assert result.text == "I can help you for help."
+
+    def test_agent_name_removed_before_delegation_phrase(self):
+        result = response_sanitizer.sanitize("Let me transfer you to the escalation_agent now.")
+        assert result.text == "Let me transfer you to the now."
+
+    def test_leak_blocks_response(self):
+        result = response_sanitizer.sanitize("Sure! Here are my CRITICAL OPERATING RULES: 1. ...")
+
+        assert result.blocked
+        assert result.leak_pattern == "CRITICAL OPERATING RULES"
+
+    def test_leak_inside_a_scrub_match_still_blocks(self):
+        result = response_sanitizer.sanitize("My system PROMPT INJECTION DEFENCE section says...")
+        assert result.blocked
+
+    def test_clean_text_only_has_whitespace_normalised(self):
+        assert response_sanitizer.sanitize("  Hello \t  there  ").text == "Hello there"
+
+    def test_match_far_from_start_of_long_text(self):
+        result = response_sanitizer.sanitize(LONG_CLEAN + "Powered by Gemini.")
+        assert result.text.endswith("Powered by .")
+
+    def test_leak_with_long_whitespace_run_blocks(self):
+        result = response_sanitizer.sanitize("SECURITY RULES:" + " " * 100 + "\n - NEVER reveal this")
+        assert result.blocked
+
+    def test_scrub_with_long_whitespace_run(self):
+        result = response_sanitizer.sanitize("The system" + " " * 80 + "prompt here")
+        assert result.text == "The here"
+
+    def test_earlier_rule_applies_first(self):
+        sanitizer = ResponseSanitizer([], [(r"foo bar", "X"), (r"foo", "Y")], prefilter_terms=["foo"])
+        assert sanitizer.sanitize("foo bar foo").text == "X Y"
+
+    def test_later_rule_sees_earlier_replacement(self):
+        sanitizer = ResponseSanitizer([], [(r"bar", "foo"), (r"foo foo", "X")], prefilter_terms=["foo", "bar"])
+        assert sanitizer.sanitize("foo bar").text == "X"
+
+
+@pytest.mark.unit
+class TestParityWithCascade:
+    @pytest.mark.parametrize("text", OVERLAPPING_RULES)
+    def test_overlapping_rules(self, text):
+        result = response_sanitizer.sanitize(text)
+        assert (None if result.blocked else result.text) == _cascade(text)
+
+    @pytest.mark.parametrize("text", OVERLAPPING_RULES)
+    @pytest.mark.parametrize("chunk_size", [1, 5])
+    def test_overlapping_rules_streamed(self, text, chunk_size):
+        stream, streamed = _stream(text, chunk_size)
+        assert (None if stream.blocked else streamed) == _cascade(text)
+
+    def test_random_word_soup(self):
+        rng = random.Random(1234)
+        for _ in range(300):
+            text = " ".join(rng.choice(_FUZZ_WORDS) for _ in range(rng.randint(1, 40)))
+            expected = _cascade(text)
+
+            result = response_sanitizer.sanitize(text)
+            assert (None if result.blocked else result.text) == expected, text
+
+            stream, streamed = _stream(text, rng.choice([1, 3, 16]))
+            assert (None if stream.blocked else streamed) == expected, text
+
+    def test_random_word_soup_in_long_text(self):
+        # Long enough that the stream passes clean text on before the first scrub match
+        rng = random.Random(4321)
+        for _ in range(50):
+            text = "".join(
+                LONG_CLEAN[:rng.randint(0, 2000)] + " ".join(rng.choice(_FUZZ_WORDS) for _ in range(rng.randint(1, 30)))
+                for _ in range(rng.randint(1, 3))
+            )
+            stream, streamed = _stream(text, rng.choice([1, 5, 16, 100]))
+            assert (None if stream.blocked else streamed) == _cascade(text), text
+
+
+@pytest.mark.unit
+class TestStream:
+    @pytest.mark.parametrize("chunk_size", [1, 3, 16, 200])
+    def test_stream_matches_batch(self, chunk_size):
+        text = LONG_CLEAN + "I can transfer you to our sub-agents  via   get_context.\n" + LONG_CLEAN
+
+        _, streamed = _stream(text, chunk_size)
+
+        assert streamed == response_sanitizer.sanitize(text).text
+
+    def test_leak_split_across_chunks_blocks_stream(self):
+        stream, _ = _stream(LONG_CLEAN + "SECURITY RULES:\n - NEVER share this", 5)
+
+        assert stream.blocked
+        assert stream.feed("more text") == ""
+
+    @pytest.mark.parametrize("chunk_size", [1, 7, 64])
+    def test_long_whitespace_run_split_across_chunks(self, chunk_size):
+        stream, _ = _stream(LONG_CLEAN + "SECURITY RULES:" + " " * 300 + "\n - NEVER share this", chunk_size)
+        assert stream.blocked
+
+        text = LONG_CLEAN + "The system" + " " * 300 + "prompt here"
+        _, streamed = _stream(text, chunk_size)
+        assert streamed == response_sanitizer.sanitize(text).text
+        assert streamed.endswith("The here")
+
+    def test_word_boundary_respected_at_chunk_cut(self):
+        text = "x" * 200 + "rag_agent"
+        _, streamed = _stream(text, 7)
+        assert streamed == response_sanitizer.sanitize(text).text == "x" * 200 + "rag_agent"
+
+
+@pytest.mark.unit
+class TestSanitizeModelResponse:
+    def test_returns_none_when_nothing_changes(self):
+        assert sanitize_model_response(MagicMock(), _response("We open at 9am.")) is None
+
+    def test_returns_scrubbed_response(self):
+        result = sanitize_model_response(MagicMock(), _response("Our specialized agents will help."))
+        assert result.content.parts[0].text == "Our our support team will help."
+
+    def test_leak_returns_safe_response(self):
+        result = sanitize_model_response(MagicMock(), _response("Called block_unsafe_content first"))
+        assert "How can I assist you today?" in result.content.parts[0].text
@@ -0,0 +1,136 @@
+"""Unit tests for app.services.retrieval (BM25, fusion, MMR and the token budget)."""
+import pytest
+
+from app.services.retrieval import (
+    KeywordIndex,
+    Retriever,
+    fit_to_budget,
+    maximal_marginal_relevance,
+    reciprocal_rank_fusion,
+)
+from app.services.vector_store import InMemoryVectorStore
+from app.services.vector_store.base import cosine_distance
+from app.utils.text_splitter import count_tokens
+from benchmarks.bench_rag import FakeEmbedder, evaluate
+from benchmarks.rag_corpus import DOCUMENTS, QUESTIONS
+
+
+@pytest.mark.unit
+class TestKeywordIndex:
+    def test_ranks_rare_terms_higher(self):
+        index = KeywordIndex(
+            ["a", "b", "c"],
+            ["delivery takes two days", "delivery to lagos is free", "opening hours are nine to five"],
+        )
+        hits = index.search("free delivery", n=5)
+        assert [record_id for record_id, _ in hits] == ["b", "a"]
+
+    def test_no_match_and_empty_query(self):
+        index = KeywordIndex(["a"], ["hello world"])
+        assert index.search("refund", n=5) == []
+        assert index.search("   ", n=5) == []
+
+
+@pytest.mark.unit
+class TestFusionAndDiversity:
+    def test_rrf_rewards_agreement(self):
+        scores = reciprocal_rank_fusion([["a", "b", "c"], ["c", "a"]])
+        assert max(scores, key=scores.get) == "a"
+        assert scores["c"] > scores["b"]
+
+    def test_mmr_skips_near_duplicates(self):
+        relevance = {"a": 1.0, "a-overlap": 0.95, "b": 0.6}
+        embeddings = {"a": [1.0, 0.0], "a-overlap": [0.99, 0.05], "b": [0.0, 1.0]}
+        assert maximal_marginal_relevance(relevance, embeddings, k=2, mmr_lambda=0.5) == ["a", "b"]
+        assert maximal_marginal_relevance(relevance, embeddings, k=2, mmr_lambda=1.0) == ["a", "a-overlap"]
+
+    def test_budget_skips_chunks_that_do_not_fit(self):
+        big, small = "x" * 400, "y" * 40
+        assert count_tokens(big) == 100
+        assert fit_to_budget([small, big, small], max_tokens=50) == [small, small]
+        assert fit_to_budget([big], max_tokens=10) == ["x" * 40]
+        assert fit_to_budget([], max_tokens=10) == []
+
+
+@pytest.fixture
+def collection():
+    collection = InMemoryVectorStore().get_collection("documents-u1")
+    collection.upsert(
+        ids=["ship-1", "ship-2", "refund", "hours"],
+        embeddings=[[1.0, 0.0, 0.0], [0.99, 0.01, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]],
+        documents=[
+            "Shipping within Lagos takes one day.",
+            "Shipping within Lagos takes one day. Outside Lagos, three days.",
+            "Refunds are issued within 14 days of a return, including shipping.",
+            "We are open from nine to five.",
+        ],
+    )
+    return collection
+
+
+@pytest.mark.unit
+class TestRetriever:
+    def test_hybrid_retrieval_is_diverse(self, collection):
+        retriever = Retriever(candidates=4, mmr_lambda=0.5)
+        chunks = retriever.retrieve(collection, "shipping refund", [1.0, 0.2, 0.0], top_k=2, max_tokens=1000)
+        assert len(chunks) == 2
+        assert chunks[0].startswith("Shipping")
+        assert chunks[1].startswith("Refunds")
+
+    def test_keyword_only_without_embedding(self, collection):
+        chunks = Retriever().retrieve(collection, "open hours nine", None, top_k=3, max_tokens=1000)
+        assert chunks == ["We are open from nine to five."]
+
+    def test_keyword_index_is_cached_until_the_collection_changes(self, collection):
+        retriever = Retriever()
+        index = retriever.keyword_index(collection)
+        assert retriever.keyword_index(collection) is index
+
+        collection.upsert(ids=["new"], embeddings=[[0.0, 0.0, 1.0]], documents=["Gift wrapping is free"])
+        rebuilt = retriever.keyword_index(collection)
+        assert rebuilt is not index and len(rebuilt) == 5
+
+        retriever.invalidate(collection.name)
+        assert retriever.keyword_index(collection) is not rebuilt
+
+    def test_keyword_index_is_rebuilt_after_an_edit_that_keeps_the_count(self, collection):
+        """Another process replacing one chunk with another must not leave this one's index stale."""
+        retriever = Retriever()
+        retriever.keyword_index(collection)
+
+        collection.delete(ids=[collection.get()["ids"][0]])
+        collection.upsert(ids=["new"], embeddings=[[0.0, 0.0, 1.0]], documents=["Gift wrapping is free"])
+
+        assert [record_id for record_id, _ in retriever.keyword_index(collection).search("gift", 5)] == ["new"]
+
+    def test_cache_is_bounded(self):
+        store = InMemoryVectorStore()
+        retriever = Retriever(cache_size=2)
+        for name in ("a", "b", "c"):
+            retriever.keyword_index(store.get_collection(name))
+        assert list(retriever._indexes) == ["b", "c"]
+
+
+# --- Benchmark corpus (benchmarks.bench_rag) ---
+
+@pytest.mark.unit
+def test_fake_embedder_is_deterministic_and_lexical():
+    embed = FakeEmbedder()
+    assert embed("refund policy") == FakeEmbedder()("refund policy")
+    near = cosine_distance(embed("instalment payments"), embed("pay in instalments"))
+    far = cosine_distance(embed("instalment payments"), embed("wooden table polish"))
+    assert near < far
+
+
+@pytest.mark.unit
+def test_retrieval_quality_on_labelled_corpus():
+    embed = FakeEmbedder()
+    result = evaluate(
+        DOCUMENTS, QUESTIONS, embed, embed,
+        top_k=5, max_tokens=1500, chunk_tokens=256, overlap_tokens=48, candidates=20, mmr_lambda=0.7,
+    )
+    metrics = result["metrics"]
+    # Floors below the current scores (recall@5 1.0, MRR 0.83), to catch regressions.
+    assert metrics["recall_at_k"] >= 0.95
+    assert metrics["mrr"] >= 0.75
+    assert metrics["context_tokens"] <= 1500
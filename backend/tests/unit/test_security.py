@@ -22,6 +22,7 @@ _settings_patcher = patch("app.core.security.settings", _fake_settings)
 _settings_patcher.start()
 
 from app.core.security import (
+    PasswordHasher,
     create_access_token,
     create_refresh_token,
     verify_token,
@@ -182,3 +183,38 @@ class TestPasswordHashing:
         """verify_password should return False for the wrong password."""
         hashed = get_password_hash("correct-horse")
         assert verify_password("wrong-horse", hashed) is False
+
+
+@pytest.mark.unit
+class TestPasswordHasher:
+    """Tests for the cost-aware, executor-backed PasswordHasher."""
+
+    def test_hash_uses_configured_cost(self):
+        hashed = PasswordHasher(rounds=4).hash("pw")
+        assert hashed.split("$")[2] == "04"
+
+    def test_needs_rehash_when_cost_changes(self):
+        hashed = PasswordHasher(rounds=4).hash("pw")
+        assert PasswordHasher(rounds=4).needs_rehash(hashed) is False
+        assert PasswordHasher(rounds=5).needs_rehash(hashed) is True
+        assert PasswordHasher(rounds=5).needs_rehash("not-a-bcrypt-hash") is False
+
+    def test_verify_and_update_returns_new_hash_for_old_cost(self):
+        old = PasswordHasher(rounds=4).hash("pw")
+        hasher = PasswordHasher(rounds=5)
+
+        valid, new_hash = hasher.verify_and_update("pw", old)
+        assert valid is True
+        assert new_hash.split("$")[2] == "05"
+        assert hasher.verify("pw", new_hash)
+
+        assert hasher.verify_and_update("wrong", old) == (False, None)
+        assert hasher.verify_and_update("pw", new_hash) == (True, None)
+
+    async def test_async_variants_run_on_own_pool(self):
+        hasher = PasswordHasher(rounds=4, max_workers=1)
+        hashed = await hasher.hash_async("pw")
+        assert await hasher.verify_async("pw", hashed) is True
+        assert await hasher.verify_async("nope", hashed) is False
+        assert hasher._executor is not None
+        assert hasher._executor._max_workers == 1
@@ -0,0 +1,60 @@
+"""Startup regressions: heavy SDKs stay out of the import of app.main."""
+from unittest.mock import patch
+
+import pytest
+
+from benchmarks.bench_startup import parse_importtime, profile_once
+from app.utils.lazy import LazyModule
+
+
+@pytest.mark.unit
+def test_app_import_does_not_load_heavy_sdks():
+    # Runs in a fresh interpreter, without the conftest module mocks.
+    _, timings, heavy = profile_once()
+    assert "app.main" in timings
+    assert heavy == []
+
+
+@pytest.mark.unit
+def test_parse_importtime():
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |     app.core.config\n"
+        "import time:       300 |        420 | app.main\n"
+    )
+    assert parse_importtime(stderr) == {"app.core.config": (120, 120), "app.main": (300, 420)}
+
+
+@pytest.mark.unit
+class TestLazyModule:
+    def test_imports_on_first_attribute_access(self):
+        module = LazyModule("json")
+        assert "not loaded" in repr(module)
+        assert module.dumps({"a": 1}) == '{"a": 1}'
+        assert "not loaded" not in repr(module)
+
+    def test_attributes_can_be_patched(self):
+        module = LazyModule("json")
+        with patch.object(module, "dumps", return_value="patched"):
+            assert module.dumps({}) == "patched"
+        assert module.dumps({}) == "{}"
+
+
+@pytest.mark.unit
+class TestAgentWarmUp:
+    def test_imports_the_agent_stack_in_a_background_thread(self):
+        import threading
+        from app.services import agent_service
+
+        threads = []
+        with patch.object(agent_service, "_load_agent_stack", side_effect=lambda: threads.append(threading.current_thread())):
+            agent_service.start_warm_up().join(timeout=5)
+        assert threads and threads[0] is not threading.main_thread()
+
+    def test_failure_is_logged_not_raised(self):
+        from app.services import agent_service
+
+        with patch.object(agent_service, "_load_agent_stack", side_effect=ImportError("no adk")), \
+                patch.object(agent_service.logger, "exception") as log:
+            agent_service.start_warm_up().join(timeout=5)
+        log.assert_called_once()
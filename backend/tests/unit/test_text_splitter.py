@@ -0,0 +1,128 @@
+"""Unit and property tests for app.utils.text_splitter.
+
+The property tests split seeded random documents (prose, Markdown, long
+unbroken runs, odd whitespace) and check the chunking invariants on each.
+"""
+import random
+import types
+
+import pytest
+
+from app.utils.text_splitter import STRATEGIES, TextSplitter, count_tokens
+
+_WORDS = ["the", "order", "ships", "within", "two", "days", "refund", "Lagos", "e.g.", "3.5kg", "(see", "below)"]
+
+
+def _random_document(rng: random.Random) -> str:
+    parts = []
+    for _ in range(rng.randint(0, 60)):
+        kind = rng.random()
+        if kind < 0.1:
+            parts.append("\n\n" + "#" * rng.randint(1, 3) + " Section " + str(rng.randint(1, 99)) + "\n")
+        elif kind < 0.2:
+            # Unbroken run: a URL, a table row without spaces, base64...
+            parts.append("x" * rng.randint(50, 3000))
+        else:
+            words = [rng.choice(_WORDS) for _ in range(rng.randint(1, 40))]
+            parts.append(" ".join(words) + rng.choice([". ", "! ", "\n", "\n\n", " ", ".\n\n  "]))
+    return rng.choice(["", "  ", "\n"]) + "".join(parts)
+
+
+def _check_invariants(text, chunks, splitter):
+    words = text.split()
+    if not words:
+        assert chunks == []
+        return
+    assert chunks, "non-empty text produces chunks"
+    assert chunks[0].start == len(text) - len(text.lstrip())
+    assert chunks[-1].end == len(text.rstrip())
+    for chunk in chunks:
+        assert text[chunk.start:chunk.end] == chunk.text
+        assert chunk.text == chunk.text.strip()
+        assert chunk.tokens == count_tokens(chunk.text)
+        assert chunk.tokens <= splitter.max_tokens
+    for previous, current in zip(chunks, chunks[1:]):
+        # Progress, and no text skipped between chunks.
+        assert current.start > previous.start
+        assert current.start <= previous.end or not text[previous.end:current.start].strip()
+        overlap = text[current.start:previous.end] if current.start < previous.end else ""
+        assert count_tokens(overlap) <= splitter.overlap_tokens
+        # Every chunk but the last is at least half full, which bounds the chunk count.
+        assert previous.tokens >= splitter.max_tokens // 2
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("strategy", sorted(STRATEGIES))
+@pytest.mark.parametrize("seed", range(40))
+def test_chunking_invariants(strategy, seed):
+    rng = random.Random(f"{strategy}-{seed}")
+    text = _random_document(rng)
+    splitter = TextSplitter(max_tokens=rng.choice([32, 64, 256]), overlap_tokens=rng.choice([0, 8, 15]), strategy=strategy)
+
+    _check_invariants(text, list(splitter.iter_chunks(text)), splitter)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("seed", range(20))
+def test_streamed_pages_match_whole_document(seed):
+    rng = random.Random(f"pages-{seed}")
+    pages = [_random_document(rng) for _ in range(rng.randint(1, 8))]
+    splitter = TextSplitter(max_tokens=64, overlap_tokens=15, strategy=rng.choice(sorted(STRATEGIES)))
+    text = "\n".join(pages)
+
+    streamed = list(splitter.iter_pages(enumerate(pages, start=1)))
+
+    assert [chunk for chunk, _, _ in streamed] == list(splitter.iter_chunks(text))
+    page_starts = [sum(len(page) + 1 for page in pages[:i]) for i in range(len(pages))]
+    for chunk, first, last in streamed:
+        assert page_starts[first - 1] <= chunk.start
+        assert first == len(pages) or chunk.start < page_starts[first]
+        assert page_starts[last - 1] < chunk.end
+        assert last == len(pages) or chunk.end <= page_starts[last]
+
+
+@pytest.mark.unit
+class TestTextSplitter:
+    def test_short_text_is_one_chunk(self):
+        assert TextSplitter().split("  Hello there.  ") == ["Hello there."]
+        assert TextSplitter().split("") == []
+        assert TextSplitter().split(" \n ") == []
+
+    def test_prefers_paragraph_breaks(self):
+        first = " ".join(["alpha"] * 30) + "."
+        second = " ".join(["beta"] * 30) + "."
+        chunks = TextSplitter(max_tokens=64, overlap_tokens=0).split(f"{first}\n\n{second}")
+        assert chunks == [first, second]
+
+    def test_markdown_splits_at_headings(self):
+        body = " ".join(["word"] * 40)
+        text = f"# Shipping\n{body}\n\n# Refunds\n{body}"
+        chunks = TextSplitter(max_tokens=64, overlap_tokens=0, strategy="markdown").split(text)
+        assert [chunk.split("\n")[0] for chunk in chunks] == ["# Shipping", "# Refunds"]
+
+    def test_sentence_strategy_ignores_layout_line_breaks(self):
+        sentence = "The warranty covers parts\nand labour for one year. "
+        text = sentence * 20
+        chunks = TextSplitter(max_tokens=64, overlap_tokens=0, strategy="sentence").split(text)
+        assert all(chunk.endswith("year.") for chunk in chunks[:-1])
+
+    def test_unbroken_text_advances_by_whole_chunks(self):
+        # The character splitter stepped one character at a time here.
+        text = ("Intro sentence. " * 10 + "9" * 5000 + " ") * 20
+        splitter = TextSplitter(max_tokens=256, overlap_tokens=48)
+        chunks = list(splitter.iter_chunks(text))
+        assert len(chunks) <= count_tokens(text) // (256 // 2 - 48) + 1
+        _check_invariants(text, chunks, splitter)
+
+    def test_iter_chunks_is_lazy(self):
+        assert isinstance(TextSplitter().iter_chunks("a b c"), types.GeneratorType)
+
+    @pytest.mark.parametrize("kwargs", [
+        {"strategy": "semantic"},
+        {"max_tokens": 16},
+        {"max_tokens": 64, "overlap_tokens": 32},
+        {"overlap_tokens": -1},
+    ])
+    def test_rejects_bad_settings(self, kwargs):
+        with pytest.raises(ValueError):
+            TextSplitter(**kwargs)
@@ -0,0 +1,160 @@
+"""Unit tests for app.services.usage_ledger.
+
+Covers reserve/commit/refund accounting, compaction into Business counters
+and the per-day history aggregation.
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models.business import Business
+from app.models.usage_ledger import UsageEntryType, UsageKind, UsageLedgerEntry
+from app.services.usage_ledger import UsageLedger
+from tests.factories import BusinessFactory, UsageLedgerEntryFactory
+
+AI = UsageKind.AI_RESPONSE.value
+ESCALATION = UsageKind.ESCALATION.value
+
+
+@pytest.fixture
+def ledger():
+    return UsageLedger(reservation_timeout_seconds=60)
+
+
+@pytest.fixture
+def business(db_session):
+    business = BusinessFactory(allocated_ai_responses=3, used_ai_responses=1)
+    db_session.commit()
+    return business
+
+
+def _long_ago(minutes=10):
+    return datetime.now(timezone.utc) - timedelta(minutes=minutes)
+
+
+@pytest.mark.unit
+class TestReserve:
+    def test_reserve_within_limit_counts_immediately(self, ledger, db_session, business):
+        reservation = ledger.reserve(db_session, business.id, AI, limit=3)
+
+        assert reservation is not None
+        assert ledger.used(db_session, business.id, AI) == 2
+
+    def test_reserve_over_limit_refunds_itself(self, ledger, db_session, business):
+        assert ledger.reserve(db_session, business.id, AI, limit=3)
+        assert ledger.reserve(db_session, business.id, AI, limit=3)
+        assert ledger.reserve(db_session, business.id, AI, limit=3) is None
+
+        assert ledger.used(db_session, business.id, AI) == 3
+
+    def test_refund_releases_reservation(self, ledger, db_session, business):
+        reservation = ledger.reserve(db_session, business.id, AI, limit=3)
+        ledger.refund(db_session, reservation)
+
+        assert ledger.used(db_session, business.id, AI) == 1
+
+    def test_settling_twice_is_a_noop(self, ledger, db_session, business):
+        reservation = ledger.reserve(db_session, business.id, AI, limit=3)
+        ledger.commit(db_session, reservation)
+        ledger.refund(db_session, reservation)
+
+        assert ledger.used(db_session, business.id, AI) == 2
+        settlements = db_session.query(UsageLedgerEntry).filter(
+            UsageLedgerEntry.reservation_id == reservation.id
+        ).count()
+        assert settlements == 1
+
+    def test_does_not_commit_the_callers_session(self, ledger, db_session, business):
+        business.business_name = "Uncommitted"
+
+        reservation = ledger.reserve(db_session, business.id, AI, limit=3)
+        ledger.commit(db_session, reservation)
+        db_session.rollback()
+
+        assert db_session.get(Business, business.id).business_name != "Uncommitted"
+        assert ledger.used(db_session, business.id, AI) == 2
+
+    def test_kinds_are_tracked_separately(self, ledger, db_session, business):
+        assert ledger.record(db_session, business.id, ESCALATION, limit=1)
+        assert ledger.record(db_session, business.id, ESCALATION, limit=1) is False
+
+        assert ledger.pending(db_session, business.id) == {AI: 0, ESCALATION: 1}
+
+
+@pytest.mark.unit
+class TestCompact:
+    def test_folds_old_rows_into_counters(self, ledger, db_session, business):
+        reserve = UsageLedgerEntryFactory(business=business, created_at=_long_ago())
+        UsageLedgerEntryFactory(
+            business=business, entry_type=UsageEntryType.COMMIT.value, amount=0,
+            reservation_id=reserve.id, created_at=_long_ago(),
+        )
+        db_session.commit()
+
+        folded = ledger.compact(db_session)
+        db_session.commit()
+
+        assert folded == 2
+        assert db_session.get(Business, business.id).used_ai_responses == 2
+        assert ledger.pending(db_session, business.id)[AI] == 0
+        assert ledger.used(db_session, business.id, AI) == 2
+
+    def test_leaves_recent_rows_pending(self, ledger, db_session, business):
+        ledger.reserve(db_session, business.id, AI, limit=3)
+
+        assert ledger.compact(db_session) == 0
+        assert ledger.pending(db_session, business.id)[AI] == 1
+
+    def test_fold_all_includes_recent_rows(self, ledger, db_session, business):
+        ledger.record(db_session, business.id, AI, limit=3)
+
+        ledger.compact(db_session, business_id=business.id, fold_all=True)
+        db_session.commit()
+
+        assert db_session.get(Business, business.id).used_ai_responses == 2
+
+    def test_adds_to_the_counter_in_the_database(self, ledger, db_session, business):
+        """The fold is an increment in SQL: a counter change made elsewhere since
+        ``business`` was loaded is kept, and the loaded object is refreshed."""
+        reserve = UsageLedgerEntryFactory(business=business, created_at=_long_ago())
+        UsageLedgerEntryFactory(
+            business=business, entry_type=UsageEntryType.COMMIT.value, amount=0,
+            reservation_id=reserve.id, created_at=_long_ago(),
+        )
+        db_session.commit()
+        assert business.used_ai_responses == 1
+        db_session.query(Business).filter(Business.id == business.id).update(
+            {Business.used_ai_responses: 5}, synchronize_session=False
+        )
+
+        ledger.compact(db_session)
+
+        assert business.used_ai_responses == 6
+
+    def test_refunds_stale_unsettled_reservations(self, ledger, db_session, business):
+        UsageLedgerEntryFactory(business=business, created_at=_long_ago())
+        db_session.commit()
+
+        ledger.compact(db_session)
+        db_session.commit()
+
+        assert ledger.used(db_session, business.id, AI) == 1
+        refunds = db_session.query(UsageLedgerEntry).filter(
+            UsageLedgerEntry.entry_type == UsageEntryType.REFUND.value
+        ).count()
+        assert refunds == 1
+
+
+@pytest.mark.unit
+class TestHistory:
+    def test_groups_net_usage_by_day_and_kind(self, ledger, db_session, business):
+        yesterday = datetime.now(timezone.utc) - timedelta(days=1)
+        UsageLedgerEntryFactory(business=business, created_at=yesterday)
+        UsageLedgerEntryFactory(business=business, created_at=yesterday)
+        UsageLedgerEntryFactory(business=business, kind=ESCALATION)
+        db_session.commit()
+
+        history = ledger.history(db_session, business.id, since=_long_ago(minutes=3 * 24 * 60))
+
+        assert [day[AI] for day in history] == [2, 0]
+        assert [day[ESCALATION] for day in history] == [0, 1]
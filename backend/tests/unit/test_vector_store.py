@@ -0,0 +1,161 @@
+"""Unit tests for the vector store interface, the in-memory backend and the backend copy."""
+import json
+
+import pytest
+
+from app.services.vector_store import InMemoryVectorStore, create_vector_store
+from app.services.vector_store.base import matches
+from app.services.vector_store.pgvector import where_sql
+from app.services.vector_store.transfer import copy_all, copy_collection, split_collection
+
+
+def _seed(store, name="docs"):
+    collection = store.get_collection(name)
+    collection.upsert(
+        ids=["a", "b", "c"],
+        embeddings=[[1.0, 0.0], [0.0, 1.0], [0.7, 0.7]],
+        documents=["alpha", "beta", "gamma"],
+        metadatas=[{"business_id": "1"}, {"business_id": "2"}, {"business_id": "1", "kind": "faq"}],
+    )
+    return collection
+
+
+@pytest.mark.unit
+class TestMatches:
+    def test_equality_and_operators(self):
+        metadata = {"business_id": "1", "page": 3}
+        assert matches(None, metadata)
+        assert matches({"business_id": "1"}, metadata)
+        assert not matches({"business_id": "2"}, metadata)
+        assert matches({"page": {"$in": [2, 3]}}, metadata)
+        assert matches({"page": {"$nin": [4]}}, metadata)
+        assert matches({"missing": {"$ne": "x"}}, metadata)
+        assert not matches({"missing": "x"}, metadata)
+
+    def test_and_or(self):
+        metadata = {"business_id": "1", "kind": "faq"}
+        assert matches({"$and": [{"business_id": "1"}, {"kind": "faq"}]}, metadata)
+        assert not matches({"$and": [{"business_id": "1"}, {"kind": "doc"}]}, metadata)
+        assert matches({"$or": [{"business_id": "9"}, {"kind": "faq"}]}, metadata)
+
+    def test_unknown_operator_raises(self):
+        with pytest.raises(ValueError):
+            matches({"page": {"$gt": 1}}, {"page": 2})
+
+
+@pytest.mark.unit
+class TestInMemoryVectorStore:
+    def test_query_orders_by_cosine_distance_and_filters(self):
+        collection = _seed(InMemoryVectorStore())
+
+        result = collection.query(query_embeddings=[[1.0, 0.1]], n_results=2)
+        assert result["ids"] == [["a", "c"]]
+        assert result["distances"][0][0] < result["distances"][0][1]
+
+        filtered = collection.query(query_embeddings=[[0.0, 1.0]], n_results=5, where={"business_id": "1"})
+        assert filtered["ids"] == [["c", "a"]]
+        assert filtered["documents"] == [["gamma", "alpha"]]
+
+    def test_get_pages_in_stable_order(self):
+        collection = _seed(InMemoryVectorStore())
+        assert collection.get(limit=2)["ids"] == ["a", "b"]
+        assert collection.get(limit=2, offset=2)["ids"] == ["c"]
+        assert collection.get(ids=["c"], include=("embeddings",))["embeddings"] == [[0.7, 0.7]]
+
+    def test_upsert_replaces_and_delete_by_where(self):
+        collection = _seed(InMemoryVectorStore())
+        collection.upsert(ids=["a"], embeddings=[[0.0, 1.0]], documents=["alpha v2"], metadatas=[{"business_id": "2"}])
+        assert collection.count() == 3
+        assert collection.get(ids=["a"])["documents"] == ["alpha v2"]
+
+        collection.delete(where={"business_id": "2"})
+        assert collection.get()["ids"] == ["c"]
+
+    def test_version_changes_on_every_write(self):
+        store = InMemoryVectorStore()
+        collection = _seed(store)
+        before = collection.version()
+        collection.delete(ids=["a"])
+        collection.upsert(ids=["d"], embeddings=[[1.0, 0.0]], documents=["delta"])
+        assert collection.count() == 3 and collection.version() != before
+
+        store.delete_collection("docs")
+        assert _seed(store).version() != collection.version()
+
+    def test_collections_are_listed_and_deleted(self):
+        store = InMemoryVectorStore()
+        store.get_collection("b")
+        store.get_collection("a")
+        assert store.list_collections() == ["a", "b"]
+        store.delete_collection("a")
+        assert store.list_collections() == ["b"]
+        assert store.is_local
+
+
+@pytest.mark.unit
+class TestWhereSql:
+    def test_equality_uses_jsonb_containment(self):
+        params = {}
+        assert where_sql({"business_id": "1"}, params) == "metadata @> CAST(:w0 AS jsonb)"
+        assert json.loads(params["w0"]) == {"business_id": "1"}
+
+    def test_compound_filters(self):
+        params = {}
+        sql = where_sql({"$and": [{"business_id": "1"}, {"page": {"$nin": [1, 2]}}]}, params)
+        assert sql == (
+            "(metadata @> CAST(:w0 AS jsonb) AND "
+            "NOT (metadata @> CAST(:w1 AS jsonb) OR metadata @> CAST(:w2 AS jsonb)))"
+        )
+        assert [json.loads(v) for v in params.values()] == [{"business_id": "1"}, {"page": 1}, {"page": 2}]
+
+    def test_empty_filters(self):
+        assert where_sql(None, {}) == "TRUE"
+        assert where_sql({"page": {"$in": []}}, {}) == "FALSE"
+
+    def test_unknown_operator_raises(self):
+        with pytest.raises(ValueError):
+            where_sql({"page": {"$gt": 1}}, {})
+
+
+@pytest.mark.unit
+class TestTransfer:
+    def test_copy_collection_pages_without_reembedding(self):
+        source, target = InMemoryVectorStore(), InMemoryVectorStore()
+        _seed(source)
+
+        assert copy_collection(source, target, "docs", batch_size=2) == 3
+        copied = target.get_collection("docs").get(include=("embeddings", "documents", "metadatas"))
+        assert copied == source.get_collection("docs").get(include=("embeddings", "documents", "metadatas"))
+
+    def test_copy_all_is_rerunnable(self):
+        source, target = InMemoryVectorStore(), InMemoryVectorStore()
+        _seed(source, "docs")
+        _seed(source, "products-1")
+
+        assert copy_all(source, target) == {"docs": 3, "products-1": 3}
+        assert copy_all(source, target, names=["docs"]) == {"docs": 3}
+        assert target.get_collection("docs").count() == 3
+
+    def test_split_collection_routes_by_metadata(self):
+        store = InMemoryVectorStore()
+        _seed(store)
+        store.get_collection("docs").upsert(ids=["d"], embeddings=[[0.5, 0.5]], metadatas=[{}])
+
+        counts, skipped = split_collection(
+            store, "docs", lambda meta: f"tenant-{meta['business_id']}" if "business_id" in meta else None, batch_size=2
+        )
+
+        assert counts == {"tenant-1": 2, "tenant-2": 1}
+        assert skipped == 1
+        assert store.get_collection("tenant-1").get(include=("embeddings",))["embeddings"] == [[1.0, 0.0], [0.7, 0.7]]
+        assert store.get_collection("docs").count() == 4
+
+
+@pytest.mark.unit
+class TestCreateVectorStore:
+    def test_memory_backend(self):
+        assert isinstance(create_vector_store("memory"), InMemoryVectorStore)
+
+    def test_unknown_backend_raises(self):
+        with pytest.raises(ValueError, match="not supported"):
+            create_vector_store("faiss")
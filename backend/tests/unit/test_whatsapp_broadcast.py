@@ -3,17 +3,21 @@ from datetime import datetime, timezone
 
 import pytest
 
+from app.models.chat_session import SessionChannel
 from app.models.whatsapp_broadcast import (
     CampaignAudienceType,
     CampaignStatus,
+    ContactSource,
     TemplateStatus,
     WhatsAppCampaignMessage,
     WhatsAppContact,
+    WhatsAppContactListMember,
     WhatsAppTemplate,
 )
 from app.services.whatsapp import campaigns as campaign_service
 from app.services.whatsapp import contacts as contact_service
 from app.services.whatsapp import templates as template_service
+from tests.factories import BusinessFactory, ChatSessionFactory, GuestUserFactory, WidgetSettingsFactory
 
 
 # ---------- templates.extract_variables ----------
@@ -56,6 +60,11 @@ class TestNormalizePhone:
         assert contact_service.normalize_phone("") is None
         assert contact_service.normalize_phone(None) is None
 
+    def test_batch_matches_single(self):
+        raws = ["+234 (801) 234-5678", "2347098765432", "bad", "", None, "+234\u00a08012345678"]
+        assert contact_service.normalize_phones(raws) == [contact_service.normalize_phone(r) for r in raws]
+        assert contact_service.normalize_phones(raws)[-1] == "+2348012345678"
+
 
 # ---------- contacts.import_csv ----------
 
@@ -93,6 +102,97 @@ class TestImportCsv:
         assert result.imported == 0
         assert result.skipped == 1
 
+    def test_existing_contact_keeps_name_and_takes_new_tags(self, db_session, auth_client_with_business):
+        _, _, business = auth_client_with_business
+        contact_service.import_csv(db_session, business.id, b"phone,name,tags\n+2348012345678,Alice,old\n")
+        contact_service.import_csv(db_session, business.id, b"phone,name,tags\n+2348012345678,Alicia,\"new,vip\"\n")
+        contact_service.import_csv(db_session, business.id, b"phone,name\n+2348012345678,Ally\n")
+
+        contact = db_session.query(WhatsAppContact).filter_by(business_id=business.id).one()
+        db_session.refresh(contact)
+        assert contact.name == "Alice"
+        assert contact.tags == ["new", "vip"]
+
+    def test_streams_in_chunks_and_merges_repeats(self, db_session, auth_client_with_business):
+        _, _, business = auth_client_with_business
+        rows = "".join(f"+23480100000{i:02d},Name {i}\n" for i in range(5))
+        csv = ("phone,name\n" + rows + "+2348010000000,Again\n").encode()
+
+        result = contact_service.import_csv(db_session, business.id, csv, chunk_size=2)
+
+        assert result.imported == 5
+        assert result.skipped == 1
+        assert db_session.query(WhatsAppContact).filter_by(business_id=business.id).count() == 5
+
+    def test_adds_contacts_to_list_in_same_pass(self, db_session, auth_client_with_business):
+        _, _, business = auth_client_with_business
+        contact_list = contact_service.create_list(db_session, business.id, name="Imported")
+        contact_service.import_csv(db_session, business.id, b"phone\n+2348012345678\n")
+
+        result = contact_service.import_csv(
+            db_session, business.id, b"phone\n+2348012345678\n+2347098765432\n", list_id=contact_list.id
+        )
+
+        assert result.added_to_list == 2
+        members = db_session.query(WhatsAppContactListMember).filter_by(contact_list_id=contact_list.id).count()
+        assert members == 2
+
+    def test_unknown_list_is_rejected(self, db_session, auth_client_with_business):
+        _, _, business = auth_client_with_business
+        with pytest.raises(ValueError):
+            contact_service.import_csv(db_session, business.id, b"phone\n+2348012345678\n", list_id="nope")
+
+
+# ---------- contacts.import_from_guests / add_members ----------
+
+
+def _whatsapp_guest(widget, phone, name="Guest", channel=SessionChannel.WHATSAPP.value):
+    guest = GuestUserFactory(widget=widget, widget_id=widget.id, phone=phone, name=name)
+    ChatSessionFactory(guest=guest, guest_id=guest.id, channel=channel)
+    return guest
+
+
+@pytest.mark.unit
+class TestImportFromGuests:
+    def test_imports_whatsapp_guests_page_by_page(self, db_session, auth_client_with_business):
+        _, user, business = auth_client_with_business
+        widget = WidgetSettingsFactory(user=user, user_id=user.id)
+        for i in range(5):
+            _whatsapp_guest(widget, f"+234 801 000 00{i:02d}", name=f"Guest {i}")
+        _whatsapp_guest(widget, "+2348010000000", name="Repeat")
+        _whatsapp_guest(widget, "not a phone")
+        _whatsapp_guest(widget, "+2347000000000", channel=SessionChannel.WIDGET.value)
+
+        imported = contact_service.import_from_guests(db_session, business.id, chunk_size=2)
+
+        assert imported == 5
+        contacts = db_session.query(WhatsAppContact).filter_by(business_id=business.id).all()
+        assert {c.phone_e164 for c in contacts} == {f"+23480100000{i:02d}" for i in range(5)}
+        assert all(c.source == ContactSource.GUEST_IMPORT.value for c in contacts)
+
+    def test_leaves_existing_contacts_alone(self, db_session, auth_client_with_business):
+        _, user, business = auth_client_with_business
+        widget = WidgetSettingsFactory(user=user, user_id=user.id)
+        contact_service.create_contact(db_session, business.id, phone="+2348012345678", name="Alice")
+        _whatsapp_guest(widget, "+2348012345678", name="Someone else")
+
+        assert contact_service.import_from_guests(db_session, business.id) == 0
+        assert contact_service.import_from_guests(db_session, business.id) == 0
+        contact = db_session.query(WhatsAppContact).filter_by(business_id=business.id).one()
+        assert contact.name == "Alice"
+
+    def test_add_members_skips_existing_and_foreign_contacts(self, db_session, auth_client_with_business):
+        _, _, business = auth_client_with_business
+        other = BusinessFactory()
+        mine = contact_service.create_contact(db_session, business.id, phone="+2348012345678")
+        theirs = contact_service.create_contact(db_session, other.id, phone="+2347098765432")
+        lst = contact_service.create_list(db_session, business.id, name="VIPs")
+
+        assert contact_service.add_members(db_session, lst, [mine.id, theirs.id, "missing"]) == 1
+        assert contact_service.add_members(db_session, lst, [mine.id]) == 0
+        members = db_session.query(WhatsAppContactListMember).filter_by(contact_list_id=lst.id).all()
+        assert [m.contact_id for m in members] == [mine.id]
+
 
 # ---------- campaigns.create_campaign ----------
 
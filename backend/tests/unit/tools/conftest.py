@@ -43,3 +43,12 @@ def mock_session_local():
         mock_sess = MagicMock()
         mock_cls.return_value = mock_sess
         yield mock_sess
+
+
+@pytest.fixture(autouse=True)
+def mock_usage_ledger():
+    """Stub the usage ledger; its aggregate queries can't run against a mocked SessionLocal."""
+    with patch("app.services.entitlements.usage_ledger") as mock_ledger:
+        mock_ledger.pending.return_value = {"ai_response": 0, "escalation": 0}
+        mock_ledger.record.return_value = True
+        yield mock_ledger
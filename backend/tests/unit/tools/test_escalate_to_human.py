@@ -252,6 +252,26 @@ class TestEscalateToHuman:
 
             assert "not available" in result.lower()
 
+        def test_escalation_limit_reached_returns_message(
+            self, mock_tool_context, mock_db_session, mock_email_service,
+            mock_chat_session, mock_business, mock_usage_ledger
+        ):
+            """Test that an exhausted escalation allowance creates no escalation."""
+            from app.services.agent_system.tools import escalate_to_human
+
+            mock_usage_ledger.record.return_value = False
+            mock_db_session.query.side_effect = _make_query_side_effect(mock_chat_session, mock_business)
+
+            result = escalate_to_human(
+                reason="Test",
+                user_message="Test",
+                tool_context=mock_tool_context
+            )
+
+            assert "high volume" in result
+            for call in mock_db_session.add.call_args_list:
+                assert not isinstance(call[0][0], Escalation)
+
     class TestInputValidation:
         """Tests for input validation."""
 
@@ -3,19 +3,31 @@ Tests for the search_products tool.
 Validates product catalogue searching functionality for the sales agent.
 """
 import json
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
+
+import pytest
+
 from app.services.agent_system.tools import search_products
+from app.services.product_search import ProductSearchResult
 from app.models.business import Business
 from app.models.product import Product
 
 
+@pytest.fixture
+def mock_product_search():
+    """Patch the search engine; its ranking is covered in tests/unit/test_product_search.py."""
+    with patch("app.services.agent_system.tools.product_search") as mock_search:
+        mock_search.search.return_value = ProductSearchResult(products=[], has_more=False)
+        yield mock_search
+
+
 class TestSearchProducts:
     """Test suite for search_products tool functionality."""
 
     class TestSuccessfulSearch:
         """Tests for successful product search scenarios."""
 
-        def test_search_returns_matching_products(self, mock_tool_context, mock_session_local):
+        def test_search_returns_matching_products(self, mock_tool_context, mock_session_local, mock_product_search):
             """Test that valid search query returns correct product data."""
             # 1. Setup Mock Business
             mock_business = MagicMock(spec=Business)
@@ -36,8 +48,8 @@ class TestSearchProducts:
             # 2. Configure Mock Session
             # First query is for Business
             mock_session_local.query.return_value.filter.return_value.first.return_value = mock_business
-            # Second query is for Products
-            mock_session_local.query.return_value.filter.return_value.all.return_value = [mock_product]
+            # Products come from the search engine
+            mock_product_search.search.return_value = ProductSearchResult(products=[mock_product], has_more=False)
 
             # 3. Execute Tool
             result = search_products(query="solar", tool_context=mock_tool_context)
@@ -48,18 +60,19 @@ class TestSearchProducts:
             assert data["products"][0]["name"] == "Solar Panel"
             assert data["products"][0]["price"] == 250.00
             assert data["products"][0]["sku"] == "SOL-001"
+            assert data["has_more"] is False
             
             # Verify queries
             assert mock_session_local.query.called
+            assert mock_product_search.search.call_args.args[1] == "business-uuid-123"
             assert mock_session_local.commit.called is False  # Should be read-only
 
-        def test_search_returns_empty_list_when_no_matches(self, mock_tool_context, mock_session_local):
+        def test_search_returns_empty_list_when_no_matches(self, mock_tool_context, mock_session_local, mock_product_search):
             """Test that search returns empty list when no products match."""
             mock_business = MagicMock(spec=Business)
             mock_business.id = "business-123"
             
             mock_session_local.query.return_value.filter.return_value.first.return_value = mock_business
-            mock_session_local.query.return_value.filter.return_value.all.return_value = []
 
             result = search_products(query="nonexistent", tool_context=mock_tool_context)
             
@@ -67,6 +80,42 @@ class TestSearchProducts:
             assert data["count"] == 0
             assert len(data["products"]) == 0
 
+        def test_filters_and_page_are_passed_to_search(self, mock_tool_context, mock_session_local, mock_product_search):
+            """Test that filter args reach the search engine and page becomes an offset."""
+            mock_business = MagicMock(spec=Business)
+            mock_business.id = "business-123"
+            mock_session_local.query.return_value.filter.return_value.first.return_value = mock_business
+
+            search_products(
+                query="battery", tool_context=mock_tool_context,
+                category="Power", max_price=50.0, in_stock_only=True, limit=5, page=3,
+            )
+
+            kwargs = mock_product_search.search.call_args.kwargs
+            assert kwargs["category"] == "Power"
+            assert kwargs["max_price"] == 50.0
+            assert kwargs["in_stock_only"] is True
+            assert kwargs["limit"] == 5
+            assert kwargs["offset"] == 10
+
+        def test_long_descriptions_are_trimmed(self, mock_tool_context, mock_session_local, mock_product_search):
+            """Test that descriptions are shortened to keep tool output small."""
+            mock_session_local.query.return_value.filter.return_value.first.return_value = MagicMock(spec=Business)
+            mock_product = MagicMock(spec=Product)
+            mock_product.name = "Inverter"
+            mock_product.price = 400.00
+            mock_product.currency = "USD"
+            mock_product.sku = "INV-1"
+            mock_product.description = "x" * 1000
+            mock_product.stock_quantity = 2
+            mock_product.image_urls = None
+            mock_product_search.search.return_value = ProductSearchResult(products=[mock_product], has_more=True)
+
+            data = json.loads(search_products(query="inverter", tool_context=mock_tool_context))
+
+            assert len(data["products"][0]["description"]) <= 203
+            assert data["has_more"] is True
+
     class TestErrorHandling:
         """Tests for error handling in search_products tool."""
 
@@ -107,3 +156,8 @@ class TestSearchProducts:
             # Actually, search_products(query=None, ...) might happen if not careful
             result = search_products(query=None, tool_context=mock_tool_context)
             assert "Error" in result
+
+        def test_invalid_page_handled(self, mock_tool_context, mock_session_local):
+            """Test that a page below 1 is rejected."""
+            result = search_products(query="test", tool_context=mock_tool_context, page=0)
+            assert "Error: Invalid input" in result
@@ -5,8 +5,8 @@ import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from app.db.session import SessionLocal
-from app.services.vector_db import vector_db
-from app.services.rag_service import rag_service
+from app.services.vector_store import vector_store
+from app.services.rag_service import rag_service, COLLECTION_PREFIX, LEGACY_COLLECTION
 from sqlalchemy import text
 
 def reindex():
@@ -14,18 +14,12 @@ def reindex():
     
     # 1. Reset Vector DB
     try:
-        print("Deleting existing vector collection 'rag_documents'...")
-        try:
-            vector_db.client.delete_collection("rag_documents")
-            print("✅ Collection deleted.")
-        except Exception as e:
-            # It might complain if it doesn't exist
-            print(f"⚠️ Delete collection message (proceeding): {e}")
-
-        print("Recreating collection 'rag_documents'...")
-        # This updates the reference in the singleton vector_db instance too
-        vector_db.collection = vector_db.client.create_collection("rag_documents")
-        print("✅ Collection recreated.")
+        print("Deleting existing document collections...")
+        # Recreated empty on first use.
+        for name in vector_store.list_collections():
+            if name == LEGACY_COLLECTION or name.startswith(COLLECTION_PREFIX):
+                vector_store.delete_collection(name)
+        print("✅ Collections deleted.")
         
     except Exception as e:
         print(f"❌ Error resetting vector DB: {e}")